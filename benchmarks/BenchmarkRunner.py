@@ -0,0 +1,155 @@
+import argparse
+import fnmatch
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import traceback
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.Fixtures import FixtureCache
+
+_benchmarks_dir = os.path.dirname(os.path.abspath(__file__))
+
+DefaultBaselineFile = os.path.join(_benchmarks_dir, "baseline.json")
+DefaultFixturesDir = os.path.join(_benchmarks_dir, "fixtures")
+DefaultThreshold = 0.2  # A benchmark regressed when its median is this much slower than the baseline.
+
+
+##  Times a function.
+#   \param run The function to time.
+#   \param repeat How often to time it.
+#   \param warmup How often to run it first without timing it.
+#   \return The minimum, median and mean time in seconds.
+def timeFunction(run: Callable[[], Any], repeat: int = 5, warmup: int = 1) -> Dict[str, Any]:
+    for _ in range(warmup):
+        run()
+    times = []  # type: List[float]
+    for _ in range(repeat):
+        gc.collect()  # Don't let garbage of earlier runs be collected while timing.
+        start_time = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start_time)
+    return {"min": min(times), "median": statistics.median(times), "mean": statistics.mean(times), "repeat": repeat}
+
+
+##  Runs benchmarks, each in an application with only the default settings.
+#   \param names The names of the benchmarks to run.
+#   \return The timings by benchmark name. Benchmarks that couldn't run, for
+#   instance because a dependency is missing, get an "error" instead.
+def runBenchmarks(names: List[str], fixtures: FixtureCache, repeat: int = 5, warmup: int = 1) -> Dict[str, Dict[str, Any]]:
+    from benchmarks.Benchmarks import benchmarkEnvironment, getBenchmarks
+    benchmarks = getBenchmarks()
+
+    results = {}  # type: Dict[str, Dict[str, Any]]
+    for name in names:
+        set_up, setting_overrides = benchmarks[name]
+        try:
+            with benchmarkEnvironment(**setting_overrides):
+                results[name] = timeFunction(set_up(fixtures), repeat = repeat, warmup = warmup)
+        except Exception as e:
+            traceback.print_exc()
+            results[name] = {"error": "{type}: {message}".format(type = type(e).__name__, message = e)}
+    return results
+
+
+def getMachineInfo() -> Dict[str, Any]:
+    return {"platform": platform.platform(), "processor": platform.processor(), "cpu_count": os.cpu_count(),
+            "python": platform.python_version()}
+
+
+def loadBaseline(file_name: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(file_name):
+        return None
+    with open(file_name, encoding = "utf-8") as f:
+        return json.load(f)
+
+
+##  Stores results as the baseline. Results of benchmarks that weren't run
+#   this time are kept.
+def saveBaseline(file_name: str, results: Dict[str, Dict[str, Any]]) -> None:
+    baseline = loadBaseline(file_name) or {"results": {}}
+    baseline["machine"] = getMachineInfo()
+    baseline["results"].update((name, result) for name, result in results.items() if "error" not in result)
+    with open(file_name, "w", encoding = "utf-8") as f:
+        json.dump(baseline, f, indent = 4, sort_keys = True)
+
+
+##  Finds the benchmarks that got slower than their baseline.
+#   \param threshold The fraction a median may be slower than the baseline.
+#   \return The name, baseline median, current median and relative change of
+#   every benchmark that got slower.
+def findRegressions(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any], threshold: float = DefaultThreshold) -> List[Tuple[str, float, float, float]]:
+    regressions = []
+    for name, result in results.items():
+        baseline_result = baseline.get("results", {}).get(name)
+        if "error" in result or not baseline_result:
+            continue
+        change = result["median"] / baseline_result["median"] - 1
+        if change > threshold:
+            regressions.append((name, baseline_result["median"], result["median"], change))
+    return regressions
+
+
+def formatReport(results: Dict[str, Dict[str, Any]], baseline: Optional[Dict[str, Any]]) -> str:
+    lines = ["%-36s %10s %10s %10s %8s" % ("Benchmark", "Min (s)", "Median (s)", "Baseline", "Change")]
+    for name, result in results.items():
+        if "error" in result:
+            lines.append("%-36s %s" % (name, result["error"]))
+            continue
+        baseline_result = (baseline or {}).get("results", {}).get(name)
+        if baseline_result:
+            baseline_text = "%10.4f %+7.1f%%" % (baseline_result["median"], (result["median"] / baseline_result["median"] - 1) * 100)
+        else:
+            baseline_text = "%10s %8s" % ("-", "-")
+        lines.append("%-36s %10.4f %10.4f %s" % (name, result["min"], result["median"], baseline_text))
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from benchmarks.Benchmarks import getBenchmarks
+
+    parser = argparse.ArgumentParser(description = "Benchmark the slicing hot paths on generated fixtures.")
+    parser.add_argument("patterns", nargs = "*", default = ["*"], help = "Only run the benchmarks that match these patterns.")
+    parser.add_argument("--list", action = "store_true", help = "List the benchmarks and exit.")
+    parser.add_argument("--repeat", type = int, default = 5, help = "How often to time each benchmark.")
+    parser.add_argument("--baseline", default = DefaultBaselineFile, help = "The file with the baseline results.")
+    parser.add_argument("--save-baseline", action = "store_true", help = "Store the results as the new baseline.")
+    parser.add_argument("--threshold", type = float, default = DefaultThreshold,
+                        help = "Report a regression when a benchmark is this fraction slower than the baseline.")
+    parser.add_argument("--fixtures-dir", default = DefaultFixturesDir, help = "Where to keep the generated fixtures.")
+    parser.add_argument("--output", help = "Also write the results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    names = [name for name in getBenchmarks() if any(fnmatch.fnmatch(name, pattern) for pattern in args.patterns)]
+    if args.list:
+        print("\n".join(names))
+        return 0
+    if not names:
+        print("No benchmarks match %s" % " ".join(args.patterns), file = sys.stderr)
+        return 2
+
+    results = runBenchmarks(names, FixtureCache(args.fixtures_dir), repeat = args.repeat)
+    baseline = loadBaseline(args.baseline)
+    print(formatReport(results, baseline))
+
+    if args.output:
+        with open(args.output, "w", encoding = "utf-8") as f:
+            json.dump({"machine": getMachineInfo(), "results": results}, f, indent = 4, sort_keys = True)
+    if args.save_baseline:
+        saveBaseline(args.baseline, results)
+        print("Saved the baseline to %s" % args.baseline)
+        return 0
+
+    if baseline is None:
+        print("No baseline at %s, run with --save-baseline to create one." % args.baseline)
+        return 0
+    if baseline.get("machine") != getMachineInfo():
+        print("Warning: the baseline was made on another machine or Python version, timings may not compare.")
+    regressions = findRegressions(results, baseline, args.threshold)
+    for name, baseline_median, median, change in regressions:
+        print("REGRESSION: %s took %.4f s, %.1f%% slower than the baseline of %.4f s" % (name, median, change * 100, baseline_median))
+    return 1 if regressions else 0
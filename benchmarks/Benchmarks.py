@@ -0,0 +1,117 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Tuple
+from unittest.mock import MagicMock, patch
+
+import numpy
+
+from benchmarks.Fixtures import FixtureCache, SettingsStack
+
+BenchmarkSetUp = Callable[[FixtureCache], Callable[[], Any]]
+
+##  The benchmarks by name, in the order they run, with the setting values
+#   they need that differ from the defaults. Each benchmark is a function that
+#   takes a FixtureCache, prepares its input and returns the function to time.
+_benchmarks = OrderedDict()  # type: Dict[str, Tuple[BenchmarkSetUp, Dict[str, Any]]]
+
+
+##  Registers a benchmark.
+#   \param name The name of the benchmark in the results and the baseline.
+#   \param setting_overrides Setting values that differ from the defaults.
+def benchmark(name: str, **setting_overrides: Any) -> Callable[[BenchmarkSetUp], BenchmarkSetUp]:
+    def register(function: BenchmarkSetUp) -> BenchmarkSetUp:
+        _benchmarks[name] = (function, setting_overrides)
+        return function
+    return register
+
+
+def getBenchmarks() -> Dict[str, Tuple[BenchmarkSetUp, Dict[str, Any]]]:
+    return OrderedDict(_benchmarks)
+
+
+##  Runs the code of the benchmarks against an application that only has the
+#   default settings, the way the tests do.
+@contextmanager
+def benchmarkEnvironment(**setting_overrides: Any) -> Iterator[MagicMock]:
+    global_stack = SettingsStack.createGlobalStack(**setting_overrides)
+    application = MagicMock()
+    application.getGlobalContainerStack = MagicMock(return_value = global_stack)
+    application.getTheme().getColor().getRgbF = MagicMock(return_value = (0.5, 0.5, 0.5, 1.0))
+    extruder_manager = MagicMock()
+    extruder_manager.getUsedExtruderStacks = MagicMock(return_value = list(global_stack.extruders.values()))
+    extruder_manager.getActiveExtruderStacks = MagicMock(return_value = list(global_stack.extruders.values()))
+    with patch("UM.Application.Application.getInstance", MagicMock(return_value = application)):
+        with patch("steslicer.Settings.ExtruderManager.ExtruderManager.getInstance", MagicMock(return_value = extruder_manager)):
+            yield application
+
+
+def _parseCli(stream: str) -> Any:
+    from steslicer.Utils.CliParser import CliParser
+    parser = CliParser(0)
+    parser.processCliStream(stream)
+    return parser
+
+
+@benchmark("CliParser.processCliStream")
+def cliParser(fixtures: FixtureCache) -> Callable[[], Any]:
+    stream = fixtures.getCli(layers = 200, polylines_per_layer = 10, points_per_polyline = 100)
+    return lambda: _parseCli(stream)
+
+
+@benchmark("FlavorParser.processGCodeStream")
+def flavorParser(fixtures: FixtureCache) -> Callable[[], Any]:
+    from plugins.GCodeReader.FlavorParser import FlavorParser
+    stream = fixtures.getGCode(layers = 200, moves_per_layer = 400)
+    return lambda: FlavorParser().processGCodeStream(stream)
+
+
+@benchmark("LayerDataBuilder.build")
+def layerDataBuilder(fixtures: FixtureCache) -> Callable[[], Any]:
+    from steslicer.LayerDataBuilder import LayerDataBuilder
+    layers = _parseCli(fixtures.getCli(layers = 200, polylines_per_layer = 10, points_per_polyline = 100)).getLayersData()
+    material_color_map = numpy.array([[0.0, 0.7, 0.9, 1.0]], dtype = numpy.float32)
+
+    def build():
+        # Building adds the data to the builder, so every run needs a new one.
+        builder = LayerDataBuilder()
+        for layer_id, layer in layers.items():
+            builder.addLayer(layer_id, layer)
+        return builder.build(material_color_map)
+    return build
+
+
+@benchmark("ShapeArray.fromNode")
+def shapeArray(fixtures: FixtureCache) -> Callable[[], Any]:
+    from UM.Math.Matrix import Matrix
+    from UM.Math.Polygon import Polygon
+    from steslicer.Arranging.ShapeArray import ShapeArray
+
+    vertices, _ = fixtures.getMesh(rings = 200, segments = 400)
+    hull = Polygon(numpy.rint(vertices[:, [0, 1]])).getConvexHull()
+    node = MagicMock()
+    node._transformation = Matrix()
+    node.callDecoration = lambda name: hull if name == "getConvexHull" else None
+    return lambda: ShapeArray.fromNode(node, min_offset = 8)
+
+
+@benchmark("SplitByPlane")
+def splitByPlane(fixtures: FixtureCache) -> Callable[[], Any]:
+    import trimesh
+    from steslicer.Utils.SplitPlane import SplitByPlane
+
+    vertices, faces = fixtures.getMesh(rings = 200, segments = 400)
+    mesh = trimesh.Trimesh(vertices = vertices, faces = faces)
+    plane_normal = numpy.array([0.0, 0.6, 0.8])
+    plane_origin = numpy.array([0.0, 0.0, 2.0])
+    return lambda: SplitByPlane(mesh, plane_normal, plane_origin, True)
+
+
+@benchmark("GenerateBasementJob", printing_mode = "cylindrical", cylindrical_raft_enabled = True, cylindrical_raft_diameter = 60)
+def generateBasement(fixtures: FixtureCache) -> Callable[[], Any]:
+    from steslicer.Utils.GenerateBasementJob import GenerateBasementJob
+
+    def generate():
+        job = GenerateBasementJob()
+        job.run()
+        return job
+    return generate
@@ -0,0 +1,188 @@
+import json
+import math
+import os
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy
+
+##  Version of the generators below. Cached fixtures of another version are
+#   generated again, so change this whenever a generator changes its output.
+FixturesVersion = 1
+
+_definitions_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "resources", "definitions")
+
+
+##  Generates a CLI file like the Glicer engine writes: layers of closed
+#   polylines around the rotation axis, alternating between walls and infill.
+#   \param layers Number of layers.
+#   \param polylines_per_layer Number of polylines in each layer.
+#   \param points_per_polyline Number of points in each polyline.
+def generateCli(layers: int, polylines_per_layer: int, points_per_polyline: int, seed: int = 0) -> str:
+    random = numpy.random.RandomState(seed)
+    lines = ["$$HEADERSTART", "$$ASCII", "$$UNITS/00000000.010000", "$$LAYERS/%s" % layers, "$$HEADEREND",
+             "$$GEOMETRYSTART"]
+    angles = numpy.linspace(0, 2 * math.pi, points_per_polyline)
+    for layer_number in range(layers):
+        lines.append("$$LAYER/%.3f" % (0.2 * (layer_number + 1)))
+        for polyline_number in range(polylines_per_layer):
+            lines.append("//perimeter//" if polyline_number < polylines_per_layer // 2 else "//infill//")
+            radius = 5 + polyline_number * 0.4 + random.uniform(0, 0.05, points_per_polyline)
+            coordinates = numpy.empty(points_per_polyline * 2)
+            coordinates[0::2] = radius * numpy.cos(angles)
+            coordinates[1::2] = radius * numpy.sin(angles)
+            lines.append("$$POLYLINE/1,1,%s,%s" % (points_per_polyline, ",".join("%.3f" % value for value in coordinates)))
+    lines.append("$$GEOMETRYEND")
+    return "\n".join(lines) + "\n"
+
+
+##  Generates g-code like CuraEngine writes: walls, infill and travels with
+#   retractions in every layer.
+#   \param layers Number of layers.
+#   \param moves_per_layer Number of extruding moves in each layer.
+def generateGCode(layers: int, moves_per_layer: int, seed: int = 0) -> str:
+    random = numpy.random.RandomState(seed)
+    lines = [";FLAVOR:Marlin", ";LAYER_COUNT:%s" % layers, "M82", "G92 E0", "G28", "T0"]
+    extrusion = 0.0
+    for layer_number in range(layers):
+        z = 0.2 * (layer_number + 1)
+        lines.append(";LAYER:%s" % layer_number)
+        lines.append("G0 F9000 X%.3f Y%.3f Z%.3f" % (random.uniform(80, 120), random.uniform(80, 120), z))
+        wall_moves = moves_per_layer // 2
+        lines.append(";TYPE:WALL-OUTER")
+        angles = numpy.linspace(0, 2 * math.pi, wall_moves)
+        for x, y in zip(100 + 20 * numpy.cos(angles), 100 + 20 * numpy.sin(angles)):
+            extrusion += 0.05
+            lines.append("G1 F1800 X%.3f Y%.3f E%.5f" % (x, y, extrusion))
+        # Retract, travel and prime.
+        lines.append("G1 F2700 E%.5f" % (extrusion - 6.5))
+        lines.append("G0 F9000 X90 Y90")
+        lines.append("G1 F2700 E%.5f" % extrusion)
+        lines.append(";TYPE:FILL")
+        for move_number in range(moves_per_layer - wall_moves):
+            extrusion += 0.08
+            x = 85 + (move_number % 2) * 30
+            y = 85 + 30 * move_number / (moves_per_layer - wall_moves)
+            lines.append("G1 F3000 X%.3f Y%.3f E%.5f" % (x, y, extrusion))
+    lines.extend(["M104 S0", "M140 S0", "G92 E1", "G1 E-1 F300", "G28 X0 Y0", "M84"])
+    return "\n".join(lines) + "\n"
+
+
+##  Generates a closed, bumpy sphere as a high-poly mesh.
+#   \param rings Number of rings from pole to pole.
+#   \param segments Number of segments around each ring.
+#   \return The vertices and the faces (vertex indices) of the mesh.
+def generateMesh(rings: int, segments: int, seed: int = 0, radius: float = 20.0) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    random = numpy.random.RandomState(seed)
+    polar = numpy.linspace(0, math.pi, rings + 1)[1:-1]
+    azimuth = numpy.linspace(0, 2 * math.pi, segments, endpoint = False)
+    polar_grid, azimuth_grid = numpy.meshgrid(polar, azimuth, indexing = "ij")
+    distance = radius * (1 + 0.05 * random.uniform(-1, 1, polar_grid.shape))
+    ring_vertices = numpy.column_stack((
+        (distance * numpy.sin(polar_grid) * numpy.cos(azimuth_grid)).ravel(),
+        (distance * numpy.sin(polar_grid) * numpy.sin(azimuth_grid)).ravel(),
+        (distance * numpy.cos(polar_grid)).ravel()))
+    vertices = numpy.vstack((ring_vertices, [[0, 0, radius], [0, 0, -radius]])).astype(numpy.float64)
+    top, bottom = len(ring_vertices), len(ring_vertices) + 1
+
+    faces = []
+    next_segment = (numpy.arange(segments) + 1) % segments
+    for ring in range(rings - 2):
+        current = ring * segments + numpy.arange(segments)
+        below = (ring + 1) * segments + numpy.arange(segments)
+        faces.append(numpy.column_stack((current, below, ring * segments + next_segment)))
+        faces.append(numpy.column_stack((ring * segments + next_segment, below, (ring + 1) * segments + next_segment)))
+    first_ring = numpy.arange(segments)
+    last_ring = (rings - 2) * segments + numpy.arange(segments)
+    faces.append(numpy.column_stack((numpy.full(segments, top), first_ring, next_segment)))
+    faces.append(numpy.column_stack((numpy.full(segments, bottom), (rings - 2) * segments + next_segment, last_ring)))
+    return vertices, numpy.vstack(faces).astype(numpy.int64)
+
+
+##  Keeps generated fixtures on disk, so they are generated once and can be
+#   inspected or fed to other tools.
+class FixtureCache:
+    def __init__(self, directory: str) -> None:
+        self._directory = directory
+
+    def getDirectory(self) -> str:
+        return self._directory
+
+    def getCli(self, **parameters: Any) -> str:
+        return self._getText("cli", ".cli", generateCli, parameters)
+
+    def getGCode(self, **parameters: Any) -> str:
+        return self._getText("gcode", ".gcode", generateGCode, parameters)
+
+    def getMesh(self, **parameters: Any) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        file_name = self._getFileName("mesh", ".npz", parameters)
+        if not os.path.exists(file_name):
+            vertices, faces = generateMesh(**parameters)
+            numpy.savez(file_name, vertices = vertices, faces = faces)
+        with numpy.load(file_name) as data:
+            return data["vertices"], data["faces"]
+
+    def _getText(self, kind: str, extension: str, generator: Callable[..., str], parameters: Dict[str, Any]) -> str:
+        file_name = self._getFileName(kind, extension, parameters)
+        if not os.path.exists(file_name):
+            with open(file_name, "w", encoding = "utf-8") as f:
+                f.write(generator(**parameters))
+        with open(file_name, encoding = "utf-8") as f:
+            return f.read()
+
+    def _getFileName(self, kind: str, extension: str, parameters: Dict[str, Any]) -> str:
+        os.makedirs(self._directory, exist_ok = True)
+        name = "_".join([kind, "v%s" % FixturesVersion] + ["%s%s" % (key, value) for key, value in sorted(parameters.items())])
+        return os.path.join(self._directory, name + extension)
+
+
+##  Loads the default values of the settings in a definition file.
+def loadDefaultSettings(definition_id: str) -> Dict[str, Any]:
+    with open(os.path.join(_definitions_dir, definition_id + ".def.json"), encoding = "utf-8") as f:
+        definition = json.load(f)
+
+    result = {}  # type: Dict[str, Any]
+    def addSettings(settings: Dict[str, Any]) -> None:
+        for key, setting in settings.items():
+            result[key] = setting.get("default_value")
+            addSettings(setting.get("children", {}))
+    addSettings(definition.get("settings", {}))
+    return result
+
+
+##  A stand-in for a global or extruder stack that returns the default values
+#   of the settings, so the benchmarks don't depend on the configuration of the
+#   machine that runs them.
+class SettingsStack:
+    def __init__(self, values: Dict[str, Any], metadata: Optional[Dict[str, Any]] = None) -> None:
+        self._values = values
+        self._metadata = metadata or {}
+        self.extruders = {}  # type: Dict[str, SettingsStack]
+
+    @classmethod
+    def createGlobalStack(cls, **overrides: Any) -> "SettingsStack":
+        values = loadDefaultSettings("fdmprinter")
+        values.update(overrides)
+        global_stack = cls(values, {"id": "benchmark_printer"})
+        extruder_values = dict(values)
+        extruder_values.update((key, value) for key, value in loadDefaultSettings("fdmextruder").items() if value is not None)
+        extruder_values.update(overrides)
+        global_stack.extruders["0"] = cls(extruder_values, {"id": "benchmark_extruder", "position": "0",
+                                                            "machine": "benchmark_printer"})
+        return global_stack
+
+    def getProperty(self, key: str, property_name: str) -> Any:
+        if property_name != "value":
+            return None
+        return self._values.get(key)
+
+    def getMetaData(self) -> Dict[str, Any]:
+        return self._metadata
+
+    def getMetaDataEntry(self, key: str, default: Any = None) -> Any:
+        return self._metadata.get(key, default)
+
+    def getTop(self) -> "SettingsStack":
+        return self
+
+    def getId(self) -> str:
+        return self._metadata.get("id", "")
@@ -35,6 +35,8 @@ import trimesh.primitives
 import trimesh.repair
 
 from steslicer.Utils.TrimeshUtils import cone
+from steslicer.Utils.MeshTransfer import getFaces
+from steslicer.Utils.Tracer import Tracer
 
 NON_PRINTING_MESH_SETTINGS = ["anti_overhang_mesh", "infill_mesh", "cutting_mesh"]
 
@@ -535,180 +537,171 @@ class StartSliceJob(Job):
         self._is_cancelled = value
 
     def run(self) -> None:
-        if self._build_plate_number is None:
-            self.setResult(StartJobResult.Error)
-            return
+        with Tracer.getInstance().span("start job", build_plate = self._build_plate_number):
+            if self._build_plate_number is None:
+                self.setResult(StartJobResult.Error)
+                return
 
-        stack = SteSlicerApplication.getInstance().getGlobalContainerStack()
-        if not stack:
-            self.setResult(StartJobResult.Error)
-            return
+            stack = SteSlicerApplication.getInstance().getGlobalContainerStack()
+            if not stack:
+                self.setResult(StartJobResult.Error)
+                return
 
-        # Don't slice if there is a setting with an error value.
-        if SteSlicerApplication.getInstance().getMachineManager().stacksHaveErrors:
-            self.setResult(StartJobResult.SettingError)
-            return
+            # Don't slice if there is a setting with an error value.
+            if SteSlicerApplication.getInstance().getMachineManager().stacksHaveErrors:
+                self.setResult(StartJobResult.SettingError)
+                return
 
-        if SteSlicerApplication.getInstance().getBuildVolume().hasErrors():
-            self.setResult(StartJobResult.BuildPlateError)
-            return
+            if SteSlicerApplication.getInstance().getBuildVolume().hasErrors():
+                self.setResult(StartJobResult.BuildPlateError)
+                return
 
-        # Don't slice if the buildplate or the nozzle type is incompatible with the materials
-        if not SteSlicerApplication.getInstance().getMachineManager().variantBuildplateCompatible and \
-                not SteSlicerApplication.getInstance().getMachineManager().variantBuildplateUsable:
-            self.setResult(StartJobResult.MaterialIncompatible)
-            return
+            # Don't slice if the buildplate or the nozzle type is incompatible with the materials
+            if not SteSlicerApplication.getInstance().getMachineManager().variantBuildplateCompatible and \
+                    not SteSlicerApplication.getInstance().getMachineManager().variantBuildplateUsable:
+                self.setResult(StartJobResult.MaterialIncompatible)
+                return
 
-        for position, extruder_stack in stack.extruders.items():
-            material = extruder_stack.findContainer({"type": "material"})
-            if not extruder_stack.isEnabled:
-                continue
-            if material:
-                if material.getMetaDataEntry("compatible") == False:
-                    self.setResult(StartJobResult.MaterialIncompatible)
+            for position, extruder_stack in stack.extruders.items():
+                material = extruder_stack.findContainer({"type": "material"})
+                if not extruder_stack.isEnabled:
+                    continue
+                if material:
+                    if material.getMetaDataEntry("compatible") == False:
+                        self.setResult(StartJobResult.MaterialIncompatible)
+                        return
+
+
+            # Don't slice if there is a per object setting with an error value.
+            for node in DepthFirstIterator(self._scene.getRoot()): #type: ignore #Ignore type error because iter() should get called automatically by Python syntax.
+                if not isinstance(node, SteSlicerSceneNode) or not node.isSelectable():
+                    continue
+
+                if self._checkStackForErrors(node.callDecoration("getStack")):
+                    self.setResult(StartJobResult.ObjectSettingError)
                     return
 
+            with self._scene.getSceneLock():
+                # Remove old layer data.
+                for node in DepthFirstIterator(self._scene.getRoot()): #type: ignore #Ignore type error because iter() should get called automatically by Python syntax.
+                    if node.callDecoration("getLayerData") and node.callDecoration("getBuildPlateNumber") == self._build_plate_number:
+                        node.getParent().removeChild(node)
+                        break
+
+                object_groups = []
+                printing_mode = stack.getProperty("printing_mode", "value")
+                if printing_mode in ["cylindrical", "cylindrical_full", "spherical", "spherical_full", "conical", "conical_full"]:
+                    temp_list = []
+                    has_printing_mesh = False
+                    for node in DepthFirstIterator(
+                            self._scene.getRoot()):  # type: ignore #Ignore type error because iter() should get called automatically by Python syntax.
+                        if node.callDecoration(
+                                "isSliceable") and node.getMeshData() and node.getMeshData().getVertices() is not None:
+                            per_object_stack = node.callDecoration("getStack")
+                            is_non_printing_mesh = False
+                            if per_object_stack:
+                                is_non_printing_mesh = any(per_object_stack.getProperty(key, "value") for key in NON_PRINTING_MESH_SETTINGS)
+                            # Find a reason not to add the node
+                            if node.callDecoration("getBuildPlateNumber") != self._build_plate_number:
+                                continue
+                            if getattr(node, "_outside_buildarea", False) and not is_non_printing_mesh:
+                                continue
+
+                            if not per_object_stack.getProperty("anti_overhang_mesh", "value"):
+                                temp_list.append(node)
+                            if not is_non_printing_mesh:
+                                has_printing_mesh = True
+
+                        Job.yieldThread()
+
+                    if not has_printing_mesh:
+                        temp_list.clear()
+
+                    if temp_list:
+                        object_groups.append(temp_list)
 
-        # Don't slice if there is a per object setting with an error value.
-        for node in DepthFirstIterator(self._scene.getRoot()): #type: ignore #Ignore type error because iter() should get called automatically by Python syntax.
-            if not isinstance(node, SteSlicerSceneNode) or not node.isSelectable():
-                continue
+                else:
+                    self.setResult(StartJobResult.ObjectSettingError)
+                    return
 
-            if self._checkStackForErrors(node.callDecoration("getStack")):
-                self.setResult(StartJobResult.ObjectSettingError)
-                return
+                global_stack = SteSlicerApplication.getInstance().getGlobalContainerStack()
+                if not global_stack:
+                    return
+                extruders_enabled = {position: stack.isEnabled for position, stack in global_stack.extruders.items()}
+                filtered_object_groups = []
+                has_model_with_disabled_extruders = False
+                associated_disabled_extruders = set()
+                for group in object_groups:
+                    stack = global_stack
+                    #stack = SteSlicerApplication.getInstance().getExtruderManager().getActiveExtruderStack()
+                    skip_group = False
+                    for node in group:
+                        # Only check if the printing extruder is enabled for printing meshes
+                        is_non_printing_mesh = node.callDecoration("evaluateIsNonPrintingMesh")
+                        extruder_position = node.callDecoration("getActiveExtruderPosition")
+                        if not is_non_printing_mesh and not extruders_enabled[extruder_position]:
+                            skip_group = True
+                            has_model_with_disabled_extruders = True
+                            associated_disabled_extruders.add(extruder_position)
+                    if not skip_group:
+                        filtered_object_groups.append(group)
+
+                if has_model_with_disabled_extruders:
+                    self.setResult(StartJobResult.ObjectsWithDisabledExtruder)
+                    associated_disabled_extruders = {str(c) for c in sorted([int(p) + 1 for p in associated_disabled_extruders])}
+                    self.setMessage(", ".join(associated_disabled_extruders))
+                    return
 
-        with self._scene.getSceneLock():
-            # Remove old layer data.
-            for node in DepthFirstIterator(self._scene.getRoot()): #type: ignore #Ignore type error because iter() should get called automatically by Python syntax.
-                if node.callDecoration("getLayerData") and node.callDecoration("getBuildPlateNumber") == self._build_plate_number:
-                    node.getParent().removeChild(node)
-                    break
-
-            object_groups = []
-            printing_mode = stack.getProperty("printing_mode", "value")
-            if printing_mode in ["cylindrical", "cylindrical_full", "spherical", "spherical_full", "conical", "conical_full"]:
-                temp_list = []
-                has_printing_mesh = False
-                for node in DepthFirstIterator(
-                        self._scene.getRoot()):  # type: ignore #Ignore type error because iter() should get called automatically by Python syntax.
-                    if node.callDecoration(
-                            "isSliceable") and node.getMeshData() and node.getMeshData().getVertices() is not None:
-                        per_object_stack = node.callDecoration("getStack")
-                        is_non_printing_mesh = False
-                        if per_object_stack:
-                            is_non_printing_mesh = any(per_object_stack.getProperty(key, "value") for key in NON_PRINTING_MESH_SETTINGS)
-                        # Find a reason not to add the node
-                        if node.callDecoration("getBuildPlateNumber") != self._build_plate_number:
-                            continue
-                        if getattr(node, "_outside_buildarea", False) and not is_non_printing_mesh:
-                            continue
-
-                        if not per_object_stack.getProperty("anti_overhang_mesh", "value"):
-                            temp_list.append(node)
-                        if not is_non_printing_mesh:
-                            has_printing_mesh = True
-
-                    Job.yieldThread()
-
-                if not has_printing_mesh:
-                    temp_list.clear()
-
-                if temp_list:
-                    object_groups.append(temp_list)
+                if not filtered_object_groups:
+                    self.setResult(StartJobResult.NothingToSlice)
+                    return
 
-            else:
-                self.setResult(StartJobResult.ObjectSettingError)
-                return
+                self._buildGlicerConfigMessage(SteSlicerApplication.getInstance().getExtruderManager().getActiveExtruderStack())
 
-            global_stack = SteSlicerApplication.getInstance().getGlobalContainerStack()
-            if not global_stack:
-                return
-            extruders_enabled = {position: stack.isEnabled for position, stack in global_stack.extruders.items()}
-            filtered_object_groups = []
-            has_model_with_disabled_extruders = False
-            associated_disabled_extruders = set()
-            for group in object_groups:
-                stack = global_stack
-                #stack = SteSlicerApplication.getInstance().getExtruderManager().getActiveExtruderStack()
-                skip_group = False
-                for node in group:
-                    # Only check if the printing extruder is enabled for printing meshes
-                    is_non_printing_mesh = node.callDecoration("evaluateIsNonPrintingMesh")
-                    extruder_position = node.callDecoration("getActiveExtruderPosition")
-                    if not is_non_printing_mesh and not extruders_enabled[extruder_position]:
-                        skip_group = True
-                        has_model_with_disabled_extruders = True
-                        associated_disabled_extruders.add(extruder_position)
-                if not skip_group:
-                    filtered_object_groups.append(group)
-
-            if has_model_with_disabled_extruders:
-                self.setResult(StartJobResult.ObjectsWithDisabledExtruder)
-                associated_disabled_extruders = {str(c) for c in sorted([int(p) + 1 for p in associated_disabled_extruders])}
-                self.setMessage(", ".join(associated_disabled_extruders))
-                return
+                self._buildGlobalSettingsMessage(stack)
+                self._buildGlobalInheritsStackMessage(stack)
 
-            if not filtered_object_groups:
-                self.setResult(StartJobResult.NothingToSlice)
-                return
+                extruder_stack_list = sorted(list(global_stack.extruders.items()), key=lambda item: int(item[0]))
+                for _, extruder_stack in extruder_stack_list:
+                    self._buildExtruderMessage(extruder_stack)
+
+                indicies_collection = []
+                vertices_collection = []
+                for group in filtered_object_groups:
+                    cli_list_message = self._arcus_message.addRepeatedMessage("cli_lists")
+                    if group[0].getParent() is not None and group[0].getParent().callDecoration("isGroup"):
+                        self._handlePerObjectSettings(group[0].getParent(), cli_list_message)
+                    for object in group:
+                        mesh_data = object.getMeshData()
+                        rot_scale = object.getWorldTransformation().getTransposed().getData()[0:3, 0:3]
+                        translate = object.getWorldTransformation().getData()[:3, 3]
+
+                        # This effectively performs a limited form of MeshData.getTransformed that ignores normals.
+                        verts = mesh_data.getVertices()
+                        verts = verts.dot(rot_scale)
+                        verts += translate
+
+                        # Convert from Y up axes to Z up axes. Equals a 90 degree rotation.
+                        verts[:, [1, 2]] = verts[:, [2, 1]]
+                        verts[:, 1] *= -1
+
+                        # The faces index into the vertices, so they are kept as they are.
+                        indicies_collection.append(getFaces(mesh_data))
+                        vertices_collection.append(verts)
+
+                        cli = cli_list_message.addRepeatedMessage("cli")
+                        cli.id = id(object)
+                        cli.name = object.getName()
+                        self._handlePerObjectSettings(object, cli)
+
+                        Job.yieldThread()
+            self._buildObjectFiles(indicies_collection, vertices_collection)
 
-            self._buildGlicerConfigMessage(SteSlicerApplication.getInstance().getExtruderManager().getActiveExtruderStack())
-
-            self._buildGlobalSettingsMessage(stack)
-            self._buildGlobalInheritsStackMessage(stack)
-
-            extruder_stack_list = sorted(list(global_stack.extruders.items()), key=lambda item: int(item[0]))
-            for _, extruder_stack in extruder_stack_list:
-                self._buildExtruderMessage(extruder_stack)
-
-            indicies_collection = []
-            vertices_collection = []
-            for group in filtered_object_groups:
-                cli_list_message = self._arcus_message.addRepeatedMessage("cli_lists")
-                if group[0].getParent() is not None and group[0].getParent().callDecoration("isGroup"):
-                    self._handlePerObjectSettings(group[0].getParent(), cli_list_message)
-                for object in group:
-                    mesh_data = object.getMeshData()
-                    rot_scale = object.getWorldTransformation().getTransposed().getData()[0:3, 0:3]
-                    translate = object.getWorldTransformation().getData()[:3, 3]
-
-                    # This effectively performs a limited form of MeshData.getTransformed that ignores normals.
-                    verts = mesh_data.getVertices()
-                    verts = verts.dot(rot_scale)
-                    verts += translate
-
-                    # Convert from Y up axes to Z up axes. Equals a 90 degree rotation.
-                    verts[:, [1, 2]] = verts[:, [2, 1]]
-                    verts[:, 1] *= -1
-
-                    if mesh_data.hasIndices():
-                        faces = mesh_data.getIndices()
-                    else:
-                        num_verts = mesh_data.getVertexCount()
-                        faces = numpy.empty((int(num_verts / 3 + 1), 3), numpy.int32)
-                        for i in range(0, num_verts - 2, 3):
-                            faces[int(i / 3):] = [i, i + 1, i + 2]
-                    if faces is None:
-                        continue
-                    if faces is not None:
-                        flat_verts = numpy.take(verts, faces.flatten(), axis=0)
-                    else:
-                        flat_verts = numpy.array(verts)
-                    indicies_collection.append(faces)
-                    vertices_collection.append(flat_verts)
-
-                    cli = cli_list_message.addRepeatedMessage("cli")
-                    cli.id = id(object)
-                    cli.name = object.getName()
-                    self._handlePerObjectSettings(object, cli)
-
-                    Job.yieldThread()
-        self._buildObjectFiles(indicies_collection, vertices_collection)
-
-        self.setResult(StartJobResult.Finished)
+            self.setResult(StartJobResult.Finished)
 
     def _buildObjectFiles(self, indicies_collection, vertices_collection):
+        tracer = Tracer.getInstance()
+        repair_span = tracer.startSpan("mesh preparation", build_plate = self._build_plate_number, meshes = len(vertices_collection))
         mesh_collection = []
         for index, vertices in enumerate(vertices_collection):
             mesh = trimesh.Trimesh(vertices=vertices, faces=indicies_collection[index])
@@ -720,6 +713,7 @@ class StartSliceJob(Job):
         trimesh.repair.fix_inversion(output_mesh, multibody=True)
         output_mesh.fill_holes()
         output_mesh.fix_normals()
+        repair_span.end(faces = len(output_mesh.faces))
         # create_cutting_cylinder
         global_stack = SteSlicerApplication.getInstance().getGlobalContainerStack()
         printing_mode = global_stack.getProperty("printing_mode", "value")
@@ -768,7 +762,8 @@ class StartSliceJob(Job):
                 cutting_mesh = cone(radius=radius, height=height, sections=section)
 
             # cut mesh by cylinder
-            result = output_mesh.difference(cutting_mesh, engine="scad")
+            with tracer.span("CSG", build_plate = self._build_plate_number, printing_mode = printing_mode):
+                result = output_mesh.difference(cutting_mesh, engine="scad")
         except Exception as e:
             Logger.log("e", "Exception while differece model! %s", e)
             result = output_mesh
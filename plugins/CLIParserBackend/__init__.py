@@ -1,6 +1,8 @@
-from . import CliParserBackend
 
 from UM.i18n import i18nCatalog
+
+from steslicer.LazyPluginObject import LazyPluginObject
+
 catalog = i18nCatalog("steslicer")
 
 def getMetaData():
@@ -15,4 +17,9 @@ def getMetaData():
     }
 
 def register(app):
-    return { "backend": CliParserBackend.CliParserBackend() }
\ No newline at end of file
+    return { "backend": LazyPluginObject(_createBackend) }
+
+
+def _createBackend():
+    from . import CliParserBackend
+    return CliParserBackend.CliParserBackend()
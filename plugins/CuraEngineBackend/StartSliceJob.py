@@ -31,6 +31,8 @@ from steslicer.OneAtATimeIterator import OneAtATimeIterator
 from steslicer.Settings.ExtruderManager import ExtruderManager
 from steslicer.GcodeStartEndFormatter import GcodeStartEndFormatter
 from steslicer.Utils.TrimeshUtils import cone
+from steslicer.Utils.MeshTransfer import setObjectMesh
+from steslicer.Utils.Tracer import Tracer
 
 NON_PRINTING_MESH_SETTINGS = [
     "anti_overhang_mesh", "infill_mesh", "cutting_mesh"]
@@ -58,6 +60,7 @@ class StartSliceJob(Job):
         self._slice_message = slice_message  # type: Arcus.PythonMessage
         self._is_cancelled = False  # type: bool
         self._build_plate_number = None  # type: Optional[int]
+        self._indexed_meshes = False  # Whether the engine reads the indices of the meshes.
 
         # type: Optional[Dict[str, Any]] # cache for all setting values from all stacks (global & extruder) for the current machine
         self._all_extruders_settings = None
@@ -68,6 +71,11 @@ class StartSliceJob(Job):
     def setBuildPlate(self, build_plate_number: int) -> None:
         self._build_plate_number = build_plate_number
 
+    ##  Sends every vertex of a mesh once with the faces as indices, instead of
+    #   the three corners of every face. Only for engines that read the indices.
+    def setIndexedMeshes(self, indexed_meshes: bool) -> None:
+        self._indexed_meshes = indexed_meshes
+
     # Check if a stack has any errors.
     # returns true if it has errors, false otherwise.
     def _checkStackForErrors(self, stack: ContainerStack) -> bool:
@@ -85,99 +93,133 @@ class StartSliceJob(Job):
 
     # Runs the job that initiates the slicing.
     def run(self) -> None:
-        if self._build_plate_number is None:
-            self.setResult(StartJobResult.Error)
-            return
-
-        stack = SteSlicerApplication.getInstance().getGlobalContainerStack()
-        if not stack:
-            self.setResult(StartJobResult.Error)
-            return
-
-        # Don't slice if there is a setting with an error value.
-        if SteSlicerApplication.getInstance().getMachineManager().stacksHaveErrors:
-            self.setResult(StartJobResult.SettingError)
-            return
-
-        if SteSlicerApplication.getInstance().getBuildVolume().hasErrors():
-            self.setResult(StartJobResult.BuildPlateError)
-            return
+        with Tracer.getInstance().span("start job", build_plate = self._build_plate_number):
+            if self._build_plate_number is None:
+                self.setResult(StartJobResult.Error)
+                return
 
-        # Don't slice if the buildplate or the nozzle type is incompatible with the materials
-        if not SteSlicerApplication.getInstance().getMachineManager().variantBuildplateCompatible and \
-                not SteSlicerApplication.getInstance().getMachineManager().variantBuildplateUsable:
-            self.setResult(StartJobResult.MaterialIncompatible)
-            return
+            stack = SteSlicerApplication.getInstance().getGlobalContainerStack()
+            if not stack:
+                self.setResult(StartJobResult.Error)
+                return
 
-        for position, extruder_stack in stack.extruders.items():
-            material = extruder_stack.findContainer({"type": "material"})
-            if not extruder_stack.isEnabled:
-                continue
-            if material:
-                if material.getMetaDataEntry("compatible") == False:
-                    self.setResult(StartJobResult.MaterialIncompatible)
-                    return
+            # Don't slice if there is a setting with an error value.
+            if SteSlicerApplication.getInstance().getMachineManager().stacksHaveErrors:
+                self.setResult(StartJobResult.SettingError)
+                return
 
-        # Don't slice if there is a per object setting with an error value.
-        # type: ignore #Ignore type error because iter() should get called automatically by Python syntax.
-        for node in DepthFirstIterator(self._scene.getRoot()):
-            if not isinstance(node, SteSlicerSceneNode) or not node.isSelectable():
-                continue
+            if SteSlicerApplication.getInstance().getBuildVolume().hasErrors():
+                self.setResult(StartJobResult.BuildPlateError)
+                return
 
-            if self._checkStackForErrors(node.callDecoration("getStack")):
-                self.setResult(StartJobResult.ObjectSettingError)
+            # Don't slice if the buildplate or the nozzle type is incompatible with the materials
+            if not SteSlicerApplication.getInstance().getMachineManager().variantBuildplateCompatible and \
+                    not SteSlicerApplication.getInstance().getMachineManager().variantBuildplateUsable:
+                self.setResult(StartJobResult.MaterialIncompatible)
                 return
 
-        with self._scene.getSceneLock():
-            # Remove old layer data.
+            for position, extruder_stack in stack.extruders.items():
+                material = extruder_stack.findContainer({"type": "material"})
+                if not extruder_stack.isEnabled:
+                    continue
+                if material:
+                    if material.getMetaDataEntry("compatible") == False:
+                        self.setResult(StartJobResult.MaterialIncompatible)
+                        return
+
+            # Don't slice if there is a per object setting with an error value.
             # type: ignore #Ignore type error because iter() should get called automatically by Python syntax.
             for node in DepthFirstIterator(self._scene.getRoot()):
-                if node.callDecoration("getLayerData") and node.callDecoration("getBuildPlateNumber") == self._build_plate_number:
-                    node.getParent().removeChild(node)
-                    break
-
-            # Get the objects in their groups to print.
-            object_groups = []
-            printing_mode = stack.getProperty("printing_mode", "value")
-            if printing_mode == "classic":
-                if stack.getProperty("print_sequence", "value") == "one_at_a_time":
-                    # type: ignore #Ignore type error because iter() should get called automatically by Python syntax.
-                    for node in OneAtATimeIterator(self._scene.getRoot()):
-                        temp_list = []
+                if not isinstance(node, SteSlicerSceneNode) or not node.isSelectable():
+                    continue
+
+                if self._checkStackForErrors(node.callDecoration("getStack")):
+                    self.setResult(StartJobResult.ObjectSettingError)
+                    return
 
-                        # Node can't be printed, so don't bother sending it.
-                        if getattr(node, "_outside_buildarea", False):
-                            continue
+            with self._scene.getSceneLock():
+                # Remove old layer data.
+                # type: ignore #Ignore type error because iter() should get called automatically by Python syntax.
+                for node in DepthFirstIterator(self._scene.getRoot()):
+                    if node.callDecoration("getLayerData") and node.callDecoration("getBuildPlateNumber") == self._build_plate_number:
+                        node.getParent().removeChild(node)
+                        break
+
+                # Get the objects in their groups to print.
+                object_groups = []
+                printing_mode = stack.getProperty("printing_mode", "value")
+                if printing_mode == "classic":
+                    if stack.getProperty("print_sequence", "value") == "one_at_a_time":
+                        # type: ignore #Ignore type error because iter() should get called automatically by Python syntax.
+                        for node in OneAtATimeIterator(self._scene.getRoot()):
+                            temp_list = []
 
-                        # Filter on current build plate
-                        build_plate_number = node.callDecoration(
-                            "getBuildPlateNumber")
-                        if build_plate_number is not None and build_plate_number != self._build_plate_number:
-                            continue
+                            # Node can't be printed, so don't bother sending it.
+                            if getattr(node, "_outside_buildarea", False):
+                                continue
 
-                        children = node.getAllChildren()
-                        children.append(node)
-                        for child_node in children:
-                            if child_node.getMeshData() and child_node.getMeshData().getVertices() is not None:
-                                temp_list.append(child_node)
+                            # Filter on current build plate
+                            build_plate_number = node.callDecoration(
+                                "getBuildPlateNumber")
+                            if build_plate_number is not None and build_plate_number != self._build_plate_number:
+                                continue
+
+                            children = node.getAllChildren()
+                            children.append(node)
+                            for child_node in children:
+                                if child_node.getMeshData() and child_node.getMeshData().getVertices() is not None:
+                                    temp_list.append(child_node)
+
+                            if temp_list:
+                                object_groups.append(temp_list)
+                            Job.yieldThread()
+                        if len(object_groups) == 0:
+                            Logger.log(
+                                "w", "No objects suitable for one at a time found, or no correct order found")
+                    else:
+                        temp_list = []
+                        has_printing_mesh = False
+                        # type: ignore #Ignore type error because iter() should get called automatically by Python syntax.
+                        for node in DepthFirstIterator(self._scene.getRoot()):
+                            if node.callDecoration("isSliceable") and node.getMeshData() and node.getMeshData().getVertices() is not None:
+                                per_object_stack = node.callDecoration("getStack")
+                                is_non_printing_mesh = False
+                                if per_object_stack:
+                                    is_non_printing_mesh = any(per_object_stack.getProperty(
+                                        key, "value") for key in NON_PRINTING_MESH_SETTINGS)
+
+                                # Find a reason not to add the node
+                                if node.callDecoration("getBuildPlateNumber") != self._build_plate_number:
+                                    continue
+                                if getattr(node, "_outside_buildarea", False) and not is_non_printing_mesh:
+                                    continue
+
+                                temp_list.append(node)
+                                if not is_non_printing_mesh:
+                                    has_printing_mesh = True
+
+                            Job.yieldThread()
+
+                        # If the list doesn't have any model with suitable settings then clean the list
+                        # otherwise CuraEngine will crash
+                        if not has_printing_mesh:
+                            temp_list.clear()
 
                         if temp_list:
                             object_groups.append(temp_list)
-                        Job.yieldThread()
-                    if len(object_groups) == 0:
-                        Logger.log(
-                            "w", "No objects suitable for one at a time found, or no correct order found")
-                else:
+                elif printing_mode in ["cylindrical_full", "spherical_full", "conical_full"]:
                     temp_list = []
                     has_printing_mesh = False
-                    # type: ignore #Ignore type error because iter() should get called automatically by Python syntax.
-                    for node in DepthFirstIterator(self._scene.getRoot()):
-                        if node.callDecoration("isSliceable") and node.getMeshData() and node.getMeshData().getVertices() is not None:
+
+                    for node in DepthFirstIterator(
+                            self._scene.getRoot()):  # type: ignore #Ignore type error because iter() should get called automatically by Python syntax.
+                        if node.callDecoration(
+                                "isSliceable") and node.getMeshData() and node.getMeshData().getVertices() is not None:
                             per_object_stack = node.callDecoration("getStack")
                             is_non_printing_mesh = False
                             if per_object_stack:
-                                is_non_printing_mesh = any(per_object_stack.getProperty(
-                                    key, "value") for key in NON_PRINTING_MESH_SETTINGS)
+                                is_non_printing_mesh = any(
+                                    per_object_stack.getProperty(key, "value") for key in NON_PRINTING_MESH_SETTINGS)
 
                             # Find a reason not to add the node
                             if node.callDecoration("getBuildPlateNumber") != self._build_plate_number:
@@ -196,189 +238,116 @@ class StartSliceJob(Job):
                     if not has_printing_mesh:
                         temp_list.clear()
 
-                    if temp_list:
-                        object_groups.append(temp_list)
-            elif printing_mode in ["cylindrical_full", "spherical_full", "conical_full"]:
-                temp_list = []
-                has_printing_mesh = False
-
-                for node in DepthFirstIterator(
-                        self._scene.getRoot()):  # type: ignore #Ignore type error because iter() should get called automatically by Python syntax.
-                    if node.callDecoration(
-                            "isSliceable") and node.getMeshData() and node.getMeshData().getVertices() is not None:
-                        per_object_stack = node.callDecoration("getStack")
-                        is_non_printing_mesh = False
-                        if per_object_stack:
-                            is_non_printing_mesh = any(
-                                per_object_stack.getProperty(key, "value") for key in NON_PRINTING_MESH_SETTINGS)
-
-                        # Find a reason not to add the node
-                        if node.callDecoration("getBuildPlateNumber") != self._build_plate_number:
-                            continue
-                        if getattr(node, "_outside_buildarea", False) and not is_non_printing_mesh:
-                            continue
-
-                        temp_list.append(node)
-                        if not is_non_printing_mesh:
-                            has_printing_mesh = True
-
-                    Job.yieldThread()
-
-                # If the list doesn't have any model with suitable settings then clean the list
-                # otherwise CuraEngine will crash
-                if not has_printing_mesh:
-                    temp_list.clear()
-
-            else:
-                self.setResult(StartJobResult.ObjectSettingError)
-                return
+                else:
+                    self.setResult(StartJobResult.ObjectSettingError)
+                    return
 
-        if temp_list and printing_mode in ["cylindrical_full", "spherical_full", "conical_full"]:
-            cut_list = []
-            for node in temp_list:
-                if printing_mode == "cylindrical_full":
-                    radius = SteSlicerApplication.getInstance().getGlobalContainerStack().getProperty(
-                        "cylindrical_mode_base_diameter", "value") / 2
-                    overlap = SteSlicerApplication.getInstance().getGlobalContainerStack(
-                    ).getProperty("cylindrical_mode_overlap", "value") / 2
-                    height = node.getBoundingBox().height * 2
-                    if radius <= 15:
-                        section = 64
-                    elif 15 < radius <= 30:
-                        section = 256
-                    else:
-                        section = 1024
-                    cutting_mesh = trimesh.primitives.Cylinder(
-                        radius=radius + overlap, height=height, sections=section)
-                    cutting_mesh.apply_transform(
-                        trimesh.transformations.rotation_matrix(numpy.pi / 2, [1, 0, 0]))
-                elif printing_mode == "spherical_full":
-                    width = SteSlicerApplication.getInstance().getGlobalContainerStack().getProperty(
-                        "spherical_mode_base_width", "value")
-                    height = SteSlicerApplication.getInstance().getGlobalContainerStack().getProperty(
-                        "spherical_mode_base_height", "value")
-                    depth = SteSlicerApplication.getInstance().getGlobalContainerStack().getProperty(
-                        "spherical_mode_base_depth", "value")
-                    radius = max(width, height, depth)
-                    cutting_mesh = trimesh.primitives.Sphere(
-                        radius=radius).to_mesh()
-                    cutting_mesh.apply_transform(trimesh.transformations.scale_matrix(
-                        width/radius, [0, 0, 0], [1, 0, 0]))
-                    cutting_mesh.apply_transform(trimesh.transformations.scale_matrix(
-                        depth/radius, [0, 0, 0], [0, 0, 1]))
-                    cutting_mesh.apply_transform(trimesh.transformations.scale_matrix(
-                        height/radius, [0, 0, 0], [0, 1, 0]))
-                elif printing_mode == "conical_full":
-                    radius = SteSlicerApplication.getInstance().getGlobalContainerStack().getProperty(
-                        "conical_mode_base_radius", "value")
-                    height = SteSlicerApplication.getInstance().getGlobalContainerStack().getProperty(
-                        "conical_mode_base_height", "value")
-                    if radius <= 15:
-                        section = 64
-                    elif 15 < radius <= 30:
-                        section = 256
+            if temp_list and printing_mode in ["cylindrical_full", "spherical_full", "conical_full"]:
+                cut_list = []
+                for node in temp_list:
+                    if printing_mode == "cylindrical_full":
+                        radius = SteSlicerApplication.getInstance().getGlobalContainerStack().getProperty(
+                            "cylindrical_mode_base_diameter", "value") / 2
+                        overlap = SteSlicerApplication.getInstance().getGlobalContainerStack(
+                        ).getProperty("cylindrical_mode_overlap", "value") / 2
+                        height = node.getBoundingBox().height * 2
+                        if radius <= 15:
+                            section = 64
+                        elif 15 < radius <= 30:
+                            section = 256
+                        else:
+                            section = 1024
+                        cutting_mesh = trimesh.primitives.Cylinder(
+                            radius=radius + overlap, height=height, sections=section)
+                        cutting_mesh.apply_transform(
+                            trimesh.transformations.rotation_matrix(numpy.pi / 2, [1, 0, 0]))
+                    elif printing_mode == "spherical_full":
+                        width = SteSlicerApplication.getInstance().getGlobalContainerStack().getProperty(
+                            "spherical_mode_base_width", "value")
+                        height = SteSlicerApplication.getInstance().getGlobalContainerStack().getProperty(
+                            "spherical_mode_base_height", "value")
+                        depth = SteSlicerApplication.getInstance().getGlobalContainerStack().getProperty(
+                            "spherical_mode_base_depth", "value")
+                        radius = max(width, height, depth)
+                        cutting_mesh = trimesh.primitives.Sphere(
+                            radius=radius).to_mesh()
+                        cutting_mesh.apply_transform(trimesh.transformations.scale_matrix(
+                            width/radius, [0, 0, 0], [1, 0, 0]))
+                        cutting_mesh.apply_transform(trimesh.transformations.scale_matrix(
+                            depth/radius, [0, 0, 0], [0, 0, 1]))
+                        cutting_mesh.apply_transform(trimesh.transformations.scale_matrix(
+                            height/radius, [0, 0, 0], [0, 1, 0]))
+                    elif printing_mode == "conical_full":
+                        radius = SteSlicerApplication.getInstance().getGlobalContainerStack().getProperty(
+                            "conical_mode_base_radius", "value")
+                        height = SteSlicerApplication.getInstance().getGlobalContainerStack().getProperty(
+                            "conical_mode_base_height", "value")
+                        if radius <= 15:
+                            section = 64
+                        elif 15 < radius <= 30:
+                            section = 256
+                        else:
+                            section = 1024
+                        cutting_mesh = cone(radius=radius, height=height, sections=section,
+                                            transform=rotation_matrix(-numpy.pi / 2, [1, 0, 0]))
                     else:
-                        section = 1024
-                    cutting_mesh = cone(radius=radius, height=height, sections=section,
-                                        transform=rotation_matrix(-numpy.pi / 2, [1, 0, 0]))
-                else:
-                    cutting_mesh = None
+                        cutting_mesh = None
 
-                mesh_data = node.getMeshData()
-                if mesh_data.hasIndices():
-                    faces = mesh_data.getIndices()
-                else:
-                    num_verts = mesh_data.getVertexCount()
-                    faces = numpy.empty(
-                        (int(num_verts / 3 + 1), 3), numpy.int32)
-                    for i in range(0, num_verts - 2, 3):
-                        faces[int(i / 3):] = [i, i + 1, i + 2]
-                verts = mesh_data.getVertices()
-                rot_scale = node.getWorldTransformation().getTransposed().getData()[
-                    0:3, 0:3]
-                translate = node.getWorldTransformation().getData()[:3, 3]
-                verts = verts.dot(rot_scale)
-                verts += translate
-                mesh = trimesh.Trimesh(vertices=verts, faces=faces)
-                try:
-                    mesh.fill_holes()
-                    mesh.fix_normals()
-                    cutting_result = mesh.intersection(
-                        cutting_mesh, engine="scad")
-                    if cutting_result:
-                        cutting_result.fill_holes()
-                        cutting_result.fix_normals()
-
-                        data = MeshData.MeshData(vertices=cutting_result.vertices.astype('float32'),
-                                                 normals=cutting_result.face_normals.astype(
-                                                     'float32'),
-                                                 indices=cutting_result.faces.astype('int64'))
-                        cutting_node = SteSlicerSceneNode(
-                            node.getParent(), no_setting_override=True)
-                        cutting_node.addDecorator(
-                            node.getDecorator(SettingOverrideDecorator))
-
-                except Exception as e:
-                    Logger.log("e", "Failed to intersect model! %s", e)
-                    cutting_result = cutting_mesh
-                    if cutting_result:
-                        cutting_result.fill_holes()
-                        cutting_result.fix_normals()
-                        data = MeshData.MeshData(vertices=cutting_result.vertices.astype('float32'),
-                                                 normals=cutting_result.face_normals.astype(
-                                                     'float32'),
-                                                 indices=cutting_result.faces.astype('int64'))
-                        cutting_node = SteSlicerSceneNode(
-                            node.getParent(), no_setting_override=True)
-                        stack = cutting_node.callDecoration(
-                            "getStack")  # Don't try to get the active extruder since it may be None anyway.
-                        if not stack:
+                    mesh_data = node.getMeshData()
+                    if mesh_data.hasIndices():
+                        faces = mesh_data.getIndices()
+                    else:
+                        num_verts = mesh_data.getVertexCount()
+                        faces = numpy.empty(
+                            (int(num_verts / 3 + 1), 3), numpy.int32)
+                        for i in range(0, num_verts - 2, 3):
+                            faces[int(i / 3):] = [i, i + 1, i + 2]
+                    verts = mesh_data.getVertices()
+                    rot_scale = node.getWorldTransformation().getTransposed().getData()[
+                        0:3, 0:3]
+                    translate = node.getWorldTransformation().getData()[:3, 3]
+                    verts = verts.dot(rot_scale)
+                    verts += translate
+                    mesh = trimesh.Trimesh(vertices=verts, faces=faces)
+                    try:
+                        mesh.fill_holes()
+                        mesh.fix_normals()
+                        cutting_result = mesh.intersection(
+                            cutting_mesh, engine="scad")
+                        if cutting_result:
+                            cutting_result.fill_holes()
+                            cutting_result.fix_normals()
+
+                            data = MeshData.MeshData(vertices=cutting_result.vertices.astype('float32'),
+                                                     normals=cutting_result.face_normals.astype(
+                                                         'float32'),
+                                                     indices=cutting_result.faces.astype('int64'))
+                            cutting_node = SteSlicerSceneNode(
+                                node.getParent(), no_setting_override=True)
                             cutting_node.addDecorator(
-                                SettingOverrideDecorator())
-                            stack = cutting_node.callDecoration("getStack")
-                        settings = stack.getTop()
-                        if not (settings.getInstance("support_mesh") and settings.getProperty("support_mesh", "value")):
-                            definition = stack.getSettingDefinition(
-                                "support_mesh")
-                            new_instance = SettingInstance(
-                                definition, settings)
-                            new_instance.setProperty(
-                                "value", True, emit_signals=False)
-                            # Ensure that the state is not seen as a user state.
-                            new_instance.resetState()
-                            settings.addInstance(new_instance)
-                if cutting_node is not None:
-                    cutting_node.setName("cut_" + node.getName())
-                    cutting_node.setMeshData(data)
-                    cut_list.append(cutting_node)
-                    support_enable_top_support = stack.getProperty(
-                        "support_enable_top_support", "value")
-                    support_enable = stack.getProperty(
-                        "support_enable", "value")
-                    if support_enable and support_enable_top_support:
-                        try:
-                            height = node.getBoundingBox().height
-                            offset = stack.getProperty("support_offset_cylindrical", "value")
-                            cutting_mesh.apply_transform(trimesh.transformations.scale_matrix((height+offset)/height, [0, 0, 0], [0, 1, 0]))
-                            cutting_support = cutting_mesh.difference(cutting_result, engine="scad")
-                            cutting_support.fill_holes()
-                            cutting_support.fix_normals()
-                            cutting_support_data = MeshData.MeshData(vertices=cutting_support.vertices.astype('float32'),
-                                                                     normals=cutting_support.face_normals.astype(
-                                'float32'),
-                                indices=cutting_support.faces.astype('int64'))
-                            cutting_support_node = SteSlicerSceneNode(
+                                node.getDecorator(SettingOverrideDecorator))
+
+                    except Exception as e:
+                        Logger.log("e", "Failed to intersect model! %s", e)
+                        cutting_result = cutting_mesh
+                        if cutting_result:
+                            cutting_result.fill_holes()
+                            cutting_result.fix_normals()
+                            data = MeshData.MeshData(vertices=cutting_result.vertices.astype('float32'),
+                                                     normals=cutting_result.face_normals.astype(
+                                                         'float32'),
+                                                     indices=cutting_result.faces.astype('int64'))
+                            cutting_node = SteSlicerSceneNode(
                                 node.getParent(), no_setting_override=True)
-                            cutting_support_stack = cutting_support_node.callDecoration(
-                                "getStack")
-                            if not cutting_support_stack:
-                                cutting_support_node.addDecorator(
+                            stack = cutting_node.callDecoration(
+                                "getStack")  # Don't try to get the active extruder since it may be None anyway.
+                            if not stack:
+                                cutting_node.addDecorator(
                                     SettingOverrideDecorator())
-                                cutting_support_stack = cutting_support_node.callDecoration(
-                                    "getStack")
-                            settings = cutting_support_stack.getTop()
+                                stack = cutting_node.callDecoration("getStack")
+                            settings = stack.getTop()
                             if not (settings.getInstance("support_mesh") and settings.getProperty("support_mesh", "value")):
-                                definition = cutting_support_stack.getSettingDefinition(
+                                definition = stack.getSettingDefinition(
                                     "support_mesh")
                                 new_instance = SettingInstance(
                                     definition, settings)
@@ -387,103 +356,137 @@ class StartSliceJob(Job):
                                 # Ensure that the state is not seen as a user state.
                                 new_instance.resetState()
                                 settings.addInstance(new_instance)
-                            cutting_support_node.setName(
-                                "cut_support_" + node.getName())
-                            cutting_support_node.setMeshData(
-                                cutting_support_data)
-                            cut_list.append(cutting_support_node)
-                        except Exception as e:
-                            Logger.log("e", "Failed to intersect model! %s", e)
-
-            object_groups.append(cut_list)
-
-        global_stack = SteSlicerApplication.getInstance().getGlobalContainerStack()
-        if not global_stack:
-            return
-        extruders_enabled = {
-            position: stack.isEnabled for position, stack in global_stack.extruders.items()}
-        filtered_object_groups = []
-        has_model_with_disabled_extruders = False
-        associated_disabled_extruders = set()
-        for group in object_groups:
-            stack = global_stack
-            skip_group = False
-            for node in group:
-                # Only check if the printing extruder is enabled for printing meshes
-                is_non_printing_mesh = node.callDecoration(
-                    "evaluateIsNonPrintingMesh")
-                extruder_position = node.callDecoration(
-                    "getActiveExtruderPosition")
-                if not is_non_printing_mesh and not extruders_enabled[extruder_position]:
-                    skip_group = True
-                    has_model_with_disabled_extruders = True
-                    associated_disabled_extruders.add(extruder_position)
-            if not skip_group:
-                filtered_object_groups.append(group)
-
-        if has_model_with_disabled_extruders:
-            self.setResult(StartJobResult.ObjectsWithDisabledExtruder)
-            associated_disabled_extruders = {str(c) for c in sorted(
-                [int(p) + 1 for p in associated_disabled_extruders])}
-            self.setMessage(", ".join(associated_disabled_extruders))
-            return
-
-        # There are cases when there is nothing to slice. This can happen due to one at a time slicing not being
-        # able to find a possible sequence or because there are no objects on the build plate (or they are outside
-        # the build volume)
-        if not filtered_object_groups:
-            self.setResult(StartJobResult.NothingToSlice)
-            return
-
-        self._buildGlobalSettingsMessage(stack)
-        self._buildGlobalInheritsStackMessage(stack)
-
-        # Build messages for extruder stacks
-        # Send the extruder settings in the order of extruder positions. Somehow, if you send e.g. extruder 3 first,
-        # then CuraEngine can slice with the wrong settings. This I think should be fixed in CuraEngine as well.
-        extruder_stack_list = sorted(
-            list(global_stack.extruders.items()), key=lambda item: int(item[0]))
-        for _, extruder_stack in extruder_stack_list:
-            self._buildExtruderMessage(extruder_stack)
-
-        for group in filtered_object_groups:
-            group_message = self._slice_message.addRepeatedMessage(
-                "object_lists")
-            if group[0].getParent() is not None and group[0].getParent().callDecoration("isGroup"):
-                self._handlePerObjectSettings(
-                    group[0].getParent(), group_message)
-            for object in group:
-                mesh_data = object.getMeshData()
-                rot_scale = object.getWorldTransformation().getTransposed().getData()[
-                    0:3, 0:3]
-                translate = object.getWorldTransformation().getData()[:3, 3]
-
-                # This effectively performs a limited form of MeshData.getTransformed that ignores normals.
-                verts = mesh_data.getVertices()
-                verts = verts.dot(rot_scale)
-                if printing_mode == "classic":
-                    verts += translate
-
-                # Convert from Y up axes to Z up axes. Equals a 90 degree rotation.
-                verts[:, [1, 2]] = verts[:, [2, 1]]
-                verts[:, 1] *= -1
-
-                obj = group_message.addRepeatedMessage("objects")
-                obj.id = id(object)
-                obj.name = object.getName()
-                indices = mesh_data.getIndices()
-                if indices is not None:
-                    flat_verts = numpy.take(verts, indices.flatten(), axis=0)
-                else:
-                    flat_verts = numpy.array(verts)
+                    if cutting_node is not None:
+                        cutting_node.setName("cut_" + node.getName())
+                        cutting_node.setMeshData(data)
+                        cut_list.append(cutting_node)
+                        support_enable_top_support = stack.getProperty(
+                            "support_enable_top_support", "value")
+                        support_enable = stack.getProperty(
+                            "support_enable", "value")
+                        if support_enable and support_enable_top_support:
+                            try:
+                                height = node.getBoundingBox().height
+                                offset = stack.getProperty("support_offset_cylindrical", "value")
+                                cutting_mesh.apply_transform(trimesh.transformations.scale_matrix((height+offset)/height, [0, 0, 0], [0, 1, 0]))
+                                cutting_support = cutting_mesh.difference(cutting_result, engine="scad")
+                                cutting_support.fill_holes()
+                                cutting_support.fix_normals()
+                                cutting_support_data = MeshData.MeshData(vertices=cutting_support.vertices.astype('float32'),
+                                                                         normals=cutting_support.face_normals.astype(
+                                    'float32'),
+                                    indices=cutting_support.faces.astype('int64'))
+                                cutting_support_node = SteSlicerSceneNode(
+                                    node.getParent(), no_setting_override=True)
+                                cutting_support_stack = cutting_support_node.callDecoration(
+                                    "getStack")
+                                if not cutting_support_stack:
+                                    cutting_support_node.addDecorator(
+                                        SettingOverrideDecorator())
+                                    cutting_support_stack = cutting_support_node.callDecoration(
+                                        "getStack")
+                                settings = cutting_support_stack.getTop()
+                                if not (settings.getInstance("support_mesh") and settings.getProperty("support_mesh", "value")):
+                                    definition = cutting_support_stack.getSettingDefinition(
+                                        "support_mesh")
+                                    new_instance = SettingInstance(
+                                        definition, settings)
+                                    new_instance.setProperty(
+                                        "value", True, emit_signals=False)
+                                    # Ensure that the state is not seen as a user state.
+                                    new_instance.resetState()
+                                    settings.addInstance(new_instance)
+                                cutting_support_node.setName(
+                                    "cut_support_" + node.getName())
+                                cutting_support_node.setMeshData(
+                                    cutting_support_data)
+                                cut_list.append(cutting_support_node)
+                            except Exception as e:
+                                Logger.log("e", "Failed to intersect model! %s", e)
+
+                object_groups.append(cut_list)
+
+            global_stack = SteSlicerApplication.getInstance().getGlobalContainerStack()
+            if not global_stack:
+                return
+            extruders_enabled = {
+                position: stack.isEnabled for position, stack in global_stack.extruders.items()}
+            filtered_object_groups = []
+            has_model_with_disabled_extruders = False
+            associated_disabled_extruders = set()
+            for group in object_groups:
+                stack = global_stack
+                skip_group = False
+                for node in group:
+                    # Only check if the printing extruder is enabled for printing meshes
+                    is_non_printing_mesh = node.callDecoration(
+                        "evaluateIsNonPrintingMesh")
+                    extruder_position = node.callDecoration(
+                        "getActiveExtruderPosition")
+                    if not is_non_printing_mesh and not extruders_enabled[extruder_position]:
+                        skip_group = True
+                        has_model_with_disabled_extruders = True
+                        associated_disabled_extruders.add(extruder_position)
+                if not skip_group:
+                    filtered_object_groups.append(group)
+
+            if has_model_with_disabled_extruders:
+                self.setResult(StartJobResult.ObjectsWithDisabledExtruder)
+                associated_disabled_extruders = {str(c) for c in sorted(
+                    [int(p) + 1 for p in associated_disabled_extruders])}
+                self.setMessage(", ".join(associated_disabled_extruders))
+                return
 
-                obj.vertices = flat_verts
+            # There are cases when there is nothing to slice. This can happen due to one at a time slicing not being
+            # able to find a possible sequence or because there are no objects on the build plate (or they are outside
+            # the build volume)
+            if not filtered_object_groups:
+                self.setResult(StartJobResult.NothingToSlice)
+                return
 
-                self._handlePerObjectSettings(object, obj)
+            self._buildGlobalSettingsMessage(stack)
+            self._buildGlobalInheritsStackMessage(stack)
+
+            # Build messages for extruder stacks
+            # Send the extruder settings in the order of extruder positions. Somehow, if you send e.g. extruder 3 first,
+            # then CuraEngine can slice with the wrong settings. This I think should be fixed in CuraEngine as well.
+            extruder_stack_list = sorted(
+                list(global_stack.extruders.items()), key=lambda item: int(item[0]))
+            for _, extruder_stack in extruder_stack_list:
+                self._buildExtruderMessage(extruder_stack)
+
+            for group in filtered_object_groups:
+                group_message = self._slice_message.addRepeatedMessage(
+                    "object_lists")
+                if group[0].getParent() is not None and group[0].getParent().callDecoration("isGroup"):
+                    self._handlePerObjectSettings(
+                        group[0].getParent(), group_message)
+                for object in group:
+                    mesh_data = object.getMeshData()
+                    rot_scale = object.getWorldTransformation().getTransposed().getData()[
+                        0:3, 0:3]
+                    translate = object.getWorldTransformation().getData()[:3, 3]
+
+                    # This effectively performs a limited form of MeshData.getTransformed that ignores normals.
+                    verts = mesh_data.getVertices()
+                    verts = verts.dot(rot_scale)
+                    if printing_mode == "classic":
+                        verts += translate
+
+                    # Convert from Y up axes to Z up axes. Equals a 90 degree rotation.
+                    verts[:, [1, 2]] = verts[:, [2, 1]]
+                    verts[:, 1] *= -1
+
+                    obj = group_message.addRepeatedMessage("objects")
+                    obj.id = id(object)
+                    obj.name = object.getName()
+                    setObjectMesh(obj, verts, mesh_data, self._indexed_meshes)
+
+                    self._handlePerObjectSettings(object, obj)
 
-                Job.yieldThread()
+                    Job.yieldThread()
 
-        self.setResult(StartJobResult.Finished)
+            self.setResult(StartJobResult.Finished)
 
     def cancel(self) -> None:
         super().cancel()
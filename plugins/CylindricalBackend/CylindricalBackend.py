@@ -22,11 +22,14 @@ from UM.Settings.SettingInstance import SettingInstance
 from UM.Signal import Signal
 from UM.Tool import Tool
 
+from steslicer.Utils.GCodeList import GCodeList
 from steslicer.Utils.GenerateBasementJob import GenerateBasementJob
 from steslicer.Utils.ProcessCliJob import ProcessCliJob
 from steslicer.Utils.ProcessSlicedLayersJob import ProcessSlicedLayersJob
+from steslicer.Utils.Tracer import Tracer
 from .StartSliceJob import StartSliceJob, StartJobResult
 from steslicer.MultiBackend import MultiBackend
+from steslicer.LayerDataStore import LayerDataStore
 from steslicer.Settings.ExtruderManager import ExtruderManager
 from steslicer.SteSlicerApplication import SteSlicerApplication
 from steslicer.BackendManager.BackendManager import BackendManager
@@ -59,7 +62,9 @@ class CylindricalBackend(QObject, MultiBackend):
         self._onActiveViewChanged()
 
         self._stored_layer_data = []
-        self._stored_optimized_layer_data = {}
+        # The layers of each build plate are stored until they go to the ProcessSlicesLayersJob.
+        self._application.getPreferences().addPreference("backend/layer_data_memory_budget", LayerDataStore.DefaultMemoryBudget // (1024 * 1024))  # In MiB.
+        self._stored_optimized_layer_data = LayerDataStore(self._getLayerDataMemoryBudget())  # type: LayerDataStore
 
         self._scene = self._application.getController().getScene()  # type: Scene
         self._scene.sceneChanged.connect(self._onSceneChanged)
@@ -90,6 +95,10 @@ class CylindricalBackend(QObject, MultiBackend):
         self._slice_start_time = None  # type: Optional[float]
         self._is_disabled = False  # type: bool
 
+        self._tracer = Tracer.getInstance()
+        self._slice_span = None  # Traces slicing a build plate, from start to end.
+        self._engine_span = None  # Traces waiting for one of the engines.
+
         self._material_amounts = []
         self._times = {}
 
@@ -157,6 +166,7 @@ class CylindricalBackend(QObject, MultiBackend):
     @pyqtSlot()
     def stopSlicing(self) -> None:
         self.backendStateChange.emit(BackendState.NotStarted)
+        self._endTraceSpans(cancelled = True)
         if self._slicing:
             self.close()
 
@@ -173,6 +183,7 @@ class CylindricalBackend(QObject, MultiBackend):
         if self._process_layers_job is not None:
             Logger.log("d", "Aborting process layers job...")
             self._process_layers_job.abort()
+            self._stored_optimized_layer_data.unpin(self._process_layers_job.getBuildPlate())
             self._process_layers_job = None
 
         if self._error_message:
@@ -207,10 +218,10 @@ class CylindricalBackend(QObject, MultiBackend):
         num_objects = self._numObjectsPerBuildPlate()
 
         self._stored_layer_data = []
-        self._stored_optimized_layer_data[build_plate_to_be_sliced] = []
+        self._stored_optimized_layer_data.startBuildPlate(build_plate_to_be_sliced)
 
         if build_plate_to_be_sliced not in num_objects or num_objects[build_plate_to_be_sliced] == 0:
-            self._scene.gcode_dict[build_plate_to_be_sliced] = []
+            self._scene.gcode_dict[build_plate_to_be_sliced] = GCodeList()
             Logger.log("d", "Build plate %s has no objects to be sliced, skipping", build_plate_to_be_sliced)
             if self._build_plates_to_be_sliced:
                 self.slice()
@@ -220,11 +231,12 @@ class CylindricalBackend(QObject, MultiBackend):
             self._application.getPrintInformation().setToZeroPrintInformation(build_plate_to_be_sliced)
 
         self.stopSlicing()
+        self._slice_span = self._tracer.startSpan("slice", build_plate = build_plate_to_be_sliced)
 
         self.processingProgress.emit(0.0)
         self.backendStateChange.emit(BackendState.Processing)
 
-        self._scene.gcode_dict[build_plate_to_be_sliced] = []
+        self._scene.gcode_dict[build_plate_to_be_sliced] = GCodeList()
         self._slicing = True
         self.slicingStarted.emit()
 
@@ -243,6 +255,10 @@ class CylindricalBackend(QObject, MultiBackend):
         if self._start_slice_job is job:
             self._start_slice_job = None
 
+        if job.isCancelled() or job.getError() or job.getResult() in (StartJobResult.Error, StartJobResult.MaterialIncompatible,
+                                                                      StartJobResult.ObjectsWithDisabledExtruder, StartJobResult.NothingToSlice):
+            self._endTraceSpans(result = str(job.getResult()))
+
         if job.isCancelled() or job.getError() or job.getResult() == StartJobResult.Error:
             self.backendStateChange.emit(BackendState.Error)
             self.backendError.emit(job)
@@ -314,16 +330,13 @@ class CylindricalBackend(QObject, MultiBackend):
 
     def _onGenerateBasementJobFinished(self, job: GenerateBasementJob):
         if not self._scene.gcode_dict:
-            self._scene.gcode_dict = {0: []}
+            self._scene.gcode_dict = {0: GCodeList()}
         if not self._scene.gcode_dict[self._start_slice_job_build_plate]:
-            self._scene.gcode_dict[self._start_slice_job_build_plate] = []
+            self._scene.gcode_dict[self._start_slice_job_build_plate] = GCodeList()
         self._scene.gcode_dict[self._start_slice_job_build_plate].extend(job.getGCodeList())
 
-        if self._start_slice_job_build_plate is not None:
-            if self._start_slice_job_build_plate not in self._stored_optimized_layer_data:
-                self._stored_optimized_layer_data[self._start_slice_job_build_plate] = []
-        self._stored_optimized_layer_data[self._start_slice_job_build_plate].extend(job.getLayersData())
-        self._layers_size = len(self._stored_optimized_layer_data[self._start_slice_job_build_plate])
+        self._stored_optimized_layer_data.extend(self._start_slice_job_build_plate, job.getLayersData())
+        self._layers_size = len(self._stored_optimized_layer_data.getLayers(self._start_slice_job_build_plate))
         #self._layers_size = self._classic_layers_size
         if self._generate_basement_job is job:
             self._generate_basement_job = None
@@ -346,6 +359,8 @@ class CylindricalBackend(QObject, MultiBackend):
                 "cura.proto.PrintTimeMaterialEstimates"] = self._onPrintTimeMaterialEstimates
             self._backends["CuraEngineBackend"]._message_handlers[
                 "cura.proto.SlicingFinished"] = self._onSlicingFinishedMessage
+            self._engine_span = self._tracer.startSpan("engine", backend = "CuraEngineBackend",
+                                                       build_plate = self._start_slice_job_build_plate)
             self._backends["CuraEngineBackend"]._socket.sendMessage(slice_message)
 
     def _sendGlicerSliceMessage(self, slice_message):
@@ -364,18 +379,14 @@ class CylindricalBackend(QObject, MultiBackend):
 
     def _onOptimizedLayerMessage(self, message: Arcus.PythonMessage) -> None:
         if self._start_slice_job_build_plate is not None:
-            if self._start_slice_job_build_plate not in self._stored_optimized_layer_data:
-                self._stored_optimized_layer_data[self._start_slice_job_build_plate] = []
-            self._stored_optimized_layer_data[self._start_slice_job_build_plate].append(message)
+            self._stored_optimized_layer_data.append(self._start_slice_job_build_plate, message)
             if message.id >= 0:
                 self._classic_layers_size += 1
 
     def _onCliOptimizedLayerMessage(self, message: Arcus.PythonMessage) -> None:
         if self._start_slice_job_build_plate is not None:
-            if self._start_slice_job_build_plate not in self._stored_optimized_layer_data:
-                self._stored_optimized_layer_data[self._start_slice_job_build_plate] = []
             message.id += self._classic_layers_size
-            self._stored_optimized_layer_data[self._start_slice_job_build_plate].append(message)
+            self._stored_optimized_layer_data.append(self._start_slice_job_build_plate, message)
 
     def _onProgressMessage(self, message: Arcus.PythonMessage) -> None:
         self.processingProgress.emit(0.1 + message.amount / 2.5)
@@ -387,23 +398,22 @@ class CylindricalBackend(QObject, MultiBackend):
 
     def _onGCodeLayerMessage(self, message: Arcus.PythonMessage) -> None:
         if not self._scene.gcode_dict:
-            self._scene.gcode_dict = {0: []}
+            self._scene.gcode_dict = {0: GCodeList()}
         if not self._scene.gcode_dict[self._start_slice_job_build_plate]:
-            self._scene.gcode_dict[self._start_slice_job_build_plate] = []
-        msg = message.data.decode("utf-8", "replace") # type: str
+            self._scene.gcode_dict[self._start_slice_job_build_plate] = GCodeList()
+        msg = message.data # type: bytes
         #TODO: Remove this since new basement will have start and end gcode
-        if msg.startswith(";Generated with Cura_SteamEngine"):
+        if msg.startswith(b";Generated with Cura_SteamEngine"):
             self._scene.gcode_dict[self._start_slice_job_build_plate].insert(0, msg)
         else:
             self._scene.gcode_dict[self._start_slice_job_build_plate].append(msg) #type: ignore #Because we generate this attribute dynamically.
 
     def _onGCodePrefixMessage(self, message: Arcus.PythonMessage) -> None:
         if not self._scene.gcode_dict:
-            self._scene.gcode_dict = {0: []}
+            self._scene.gcode_dict = {0: GCodeList()}
         if not self._scene.gcode_dict[self._start_slice_job_build_plate]:
-            self._scene.gcode_dict[self._start_slice_job_build_plate] = []
-        self._scene.gcode_dict[self._start_slice_job_build_plate].insert(0, message.data.decode("utf-8",
-                                                                                                "replace"))  # type: ignore #Because we generate this attribute dynamically.
+            self._scene.gcode_dict[self._start_slice_job_build_plate] = GCodeList()
+        self._scene.gcode_dict[self._start_slice_job_build_plate].insert(0, message.data)  # type: ignore #Because we generate this attribute dynamically.
 
     def _onPrintTimeMaterialEstimates(self, message: Arcus.PythonMessage) -> None:
         material_amounts = []
@@ -444,16 +454,18 @@ class CylindricalBackend(QObject, MultiBackend):
         self.processingProgress.emit(0.5)
 
         self._backends["CuraEngineBackend"]._message_handlers = {}
+        self._endEngineSpan()
 
         gcode_list = self._scene.gcode_dict[self._start_slice_job_build_plate] #type: ignore #Because we generate this attribute dynamically.
-        for index, line in enumerate(gcode_list):
-            replaced = line.replace("{print_time}", str(self._application.getPrintInformation().currentPrintTime.getDisplayString(DurationFormat.Format.ISO8601)))
-            replaced = replaced.replace("{filament_amount}", str(self._application.getPrintInformation().materialLengths))
-            replaced = replaced.replace("{filament_weight}", str(self._application.getPrintInformation().materialWeights))
-            replaced = replaced.replace("{filament_cost}", str(self._application.getPrintInformation().materialCosts))
-            replaced = replaced.replace("{jobname}", str(self._application.getPrintInformation().jobName))
-
-            gcode_list[index] = replaced
+        with self._tracer.span("g-code post-processing", build_plate = self._start_slice_job_build_plate, lines = len(gcode_list)):
+            print_information = self._application.getPrintInformation()
+            gcode_list.replaceTokens({
+                "{print_time}": str(print_information.currentPrintTime.getDisplayString(DurationFormat.Format.ISO8601)),
+                "{filament_amount}": str(print_information.materialLengths),
+                "{filament_weight}": str(print_information.materialWeights),
+                "{filament_cost}": str(print_information.materialCosts),
+                "{jobname}": str(print_information.jobName)
+            })
 
         # Launch GlicerBackend here
         slice_message = self._slice_messages[1]
@@ -500,6 +512,8 @@ class CylindricalBackend(QObject, MultiBackend):
         if self._process_cli_job is job:
             self._process_cli_job = None
 
+        self._engine_span = self._tracer.startSpan("engine", backend = "CLIParserBackend",
+                                                   build_plate = self._start_slice_job_build_plate)
         self._backends["CLIParserBackend"]._socket.sendMessage(job.getSliceMessage())
 
         self.backendStateChange.emit(BackendState.Processing)
@@ -514,22 +528,21 @@ class CylindricalBackend(QObject, MultiBackend):
         self._layers_size = 0
         self.backendStateChange.emit(BackendState.Done)
         self.processingProgress.emit(1.0)
+        self._endEngineSpan()
 
         gcode_list = self._scene.gcode_dict[
             self._start_slice_job_build_plate]  # type: ignore #Because we generate this attribute dynamically.
-        for index, line in enumerate(gcode_list):
-            replaced = line.replace("{print_time}", str(
-                self._application.getPrintInformation().currentPrintTime.getDisplayString(
-                    DurationFormat.Format.ISO8601)))
-            replaced = replaced.replace("{filament_amount}",
-                                        str(self._application.getPrintInformation().materialLengths))
-            replaced = replaced.replace("{filament_weight}",
-                                        str(self._application.getPrintInformation().materialWeights))
-            replaced = replaced.replace("{filament_cost}", str(self._application.getPrintInformation().materialCosts))
-            replaced = replaced.replace("{jobname}", str(self._application.getPrintInformation().jobName))
-
-            gcode_list[index] = replaced
-
+        with self._tracer.span("g-code post-processing", build_plate = self._start_slice_job_build_plate, lines = len(gcode_list)):
+            print_information = self._application.getPrintInformation()
+            gcode_list.replaceTokens({
+                "{print_time}": str(print_information.currentPrintTime.getDisplayString(DurationFormat.Format.ISO8601)),
+                "{filament_amount}": str(print_information.materialLengths),
+                "{filament_weight}": str(print_information.materialWeights),
+                "{filament_cost}": str(print_information.materialCosts),
+                "{jobname}": str(print_information.jobName)
+            })
+
+        self._endTraceSpans()
         if self._slice_start_time:
             Logger.log("d", "Slicing took %s seconds", time() - self._slice_start_time)
         Logger.log("d", "Number of models per buildplate: %s", dict(self._numObjectsPerBuildPlate()))
@@ -555,14 +568,29 @@ class CylindricalBackend(QObject, MultiBackend):
         self._backends["CLIParserBackend"]._message_handlers = {}
         self._slicing = False
 
+    def _endEngineSpan(self) -> None:
+        if self._engine_span is not None:
+            self._engine_span.end()
+            self._engine_span = None
+
+    ##  Ends the traced spans of the current slice, if any.
+    #   \param args Extra information to store with the spans.
+    def _endTraceSpans(self, **args: Any) -> None:
+        for span in (self._engine_span, self._slice_span):
+            if span is not None:
+                span.end(**args)
+        self._engine_span = None
+        self._slice_span = None
+
     def _startProcessSlicedLayersJob(self, build_plate_number: int) -> None:
-        self._process_layers_job = ProcessSlicedLayersJob(self._stored_optimized_layer_data[build_plate_number])
+        self._process_layers_job = ProcessSlicedLayersJob(self._stored_optimized_layer_data.getLayers(build_plate_number))
+        self._stored_optimized_layer_data.pin(build_plate_number)  # The job holds on to the layers until it's finished.
         self._process_layers_job.setBuildPlate(build_plate_number)
         self._process_layers_job.finished.connect(self._onProcessLayersFinished)
         self._process_layers_job.start()
 
     def _onProcessLayersFinished(self, job: ProcessSlicedLayersJob):
-        del self._stored_optimized_layer_data[job.getBuildPlate()]
+        self._stored_optimized_layer_data.remove(job.getBuildPlate())
         self._process_layers_job = None
         Logger.log("d", "See if there is more to slice(2)...")
         self._invokeSlice()
@@ -570,8 +598,8 @@ class CylindricalBackend(QObject, MultiBackend):
     def _terminate(self) -> None:
         self._slicing = False
         self._stored_layer_data = []
-        if self._start_slice_job_build_plate in self._stored_optimized_layer_data:
-            del self._stored_optimized_layer_data[self._start_slice_job_build_plate]
+        if self._start_slice_job_build_plate is not None:
+            self._stored_optimized_layer_data.remove(self._start_slice_job_build_plate)
         if self._start_slice_job is not None:
             self._start_slice_job.cancel()
         if self._application.getUseExternalBackend():
@@ -599,17 +627,24 @@ class CylindricalBackend(QObject, MultiBackend):
                     active_build_plate not in self._build_plates_to_be_sliced):
 
                     self._startProcessSlicedLayersJob(active_build_plate)
+                elif (self._stored_optimized_layer_data.isEvicted(active_build_plate) and
+                    active_build_plate not in self._build_plates_to_be_sliced):
+                    # The layers of this build plate were removed to stay within the memory budget, slice it again.
+                    self._build_plates_to_be_sliced.append(active_build_plate)
+                    self.backendStateChange.emit(BackendState.NotStarted)
+                    self._invokeSlice()
             else:
                 self._layer_view_active = False
 
     def _onSceneChanged(self, source: SceneNode) -> None:
         if not isinstance(source, SceneNode):
             return
-        if source.callDecoration("isBlockSlicing") and source.callDecoration("getLayerData"):
-            self._stored_optimized_layer_data = {}
-
         build_plate_changed = set()
         source_build_plate_number = source.callDecoration("getBuildPlateNumber")
+
+        if source.callDecoration("isBlockSlicing") and source.callDecoration("getLayerData"):
+            self._stored_optimized_layer_data.invalidate([source_build_plate_number] if source_build_plate_number is not None else None)
+
         if source == self._scene.getRoot():
             num_objects = self._numObjectsPerBuildPlate()
             for build_plate_number in list(self._last_num_objects.keys()) + list(num_objects.keys()):
@@ -644,6 +679,7 @@ class CylindricalBackend(QObject, MultiBackend):
         # if not self._use_timer:
         # With manually having to slice, we want to clear the old invalid layer data.
         self._clearLayerData(build_plate_changed)
+        self._stored_optimized_layer_data.invalidate(build_plate_changed)
 
         self._invokeSlice()
 
@@ -674,7 +710,13 @@ class CylindricalBackend(QObject, MultiBackend):
             self.disableTimer()
             return False
 
+    def _getLayerDataMemoryBudget(self) -> int:
+        return int(self._application.getPreferences().getValue("backend/layer_data_memory_budget")) * 1024 * 1024
+
     def _onPreferencesChanged(self, preference: str) -> None:
+        if preference == "backend/layer_data_memory_budget":
+            self._stored_optimized_layer_data.setMemoryBudget(self._getLayerDataMemoryBudget())
+            return
         if preference != "general/auto_slice":
             return
         auto_slice = self.determineAutoSlicing()
@@ -750,6 +792,7 @@ class CylindricalBackend(QObject, MultiBackend):
     def needsSlicing(self) -> None:
         self.stopSlicing()
         self.markSliceAll()
+        self._stored_optimized_layer_data.invalidate()
         self.processingProgress.emit(0.0)
         self.backendStateChange.emit(BackendState.NotStarted)
         if not self._use_timer:
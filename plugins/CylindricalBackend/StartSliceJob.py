@@ -32,6 +32,7 @@ from steslicer.Scene.SteSlicerSceneNode import SteSlicerSceneNode
 from steslicer.OneAtATimeIterator import OneAtATimeIterator
 from steslicer.Settings.ExtruderManager import ExtruderManager
 from steslicer.GcodeStartEndFormatter import GcodeStartEndFormatter
+from steslicer.Utils.Tracer import Tracer
 
 class StartJobResult(IntEnum):
     Finished = 1
@@ -72,38 +73,40 @@ class StartSliceJob(Job):
         self._is_cancelled = value
 
     def run(self):
-        if self._classic_start_slice_job:
+        with Tracer.getInstance().span("start job", build_plate = self._start_slice_job_build_plate):
+            if self._classic_start_slice_job:
+                self._classic_start_slice_job = None
+            self._slice_messages = []
+            self._job_results = []
+            classic_backend = self._backends["CuraEngineBackend"]
+            slice_message = classic_backend._socket.createMessage("cura.proto.Slice")
+            self._classic_start_slice_job = CuraEngineBackend.StartSliceJob(slice_message)
+            self._classic_start_slice_job.setBuildPlate(self._start_slice_job_build_plate)
+            self._classic_start_slice_job.setIndexedMeshes(SteSlicerApplication.getInstance().getPreferences().getValue("backend/indexed_meshes"))
+            self._classic_start_slice_job.start()
+            while not self._classic_start_slice_job.isFinished():
+                Job.yieldThread()
+            Logger.log("d", "Classic start job finished with result: %s", self._classic_start_slice_job.getResult())
+            self._job_results.append(self._classic_start_slice_job.getResult())
+            if self._job_results[0] == StartJobResult.Finished:
+                self._slice_messages.append(self._classic_start_slice_job.getSliceMessage())
             self._classic_start_slice_job = None
-        self._slice_messages = []
-        self._job_results = []
-        classic_backend = self._backends["CuraEngineBackend"]
-        slice_message = classic_backend._socket.createMessage("cura.proto.Slice")
-        self._classic_start_slice_job = CuraEngineBackend.StartSliceJob(slice_message)
-        self._classic_start_slice_job.setBuildPlate(self._start_slice_job_build_plate)
-        self._classic_start_slice_job.start()
-        while not self._classic_start_slice_job.isFinished():
-            Job.yieldThread()
-        Logger.log("d", "Classic start job finished with result: %s", self._classic_start_slice_job.getResult())
-        self._job_results.append(self._classic_start_slice_job.getResult())
-        if self._job_results[0] == StartJobResult.Finished:
-            self._slice_messages.append(self._classic_start_slice_job.getSliceMessage())
-        self._classic_start_slice_job = None
 
-        cylindrical_backend = self._backends["CLIParserBackend"] #type: CliParserBackend.CliParserBackend
-        slice_message = cylindrical_backend.getGlicerEngineCommand()
-        arcus_message = cylindrical_backend._socket.createMessage("cliparser.proto.Process")
-        self._cylindrical_start_slice_job = CliParserBackend.StartSliceJob(slice_message, arcus_message)
-        self._cylindrical_start_slice_job.setBuildPlate(self._start_slice_job_build_plate)
-        self._cylindrical_start_slice_job.start()
-        while not self._cylindrical_start_slice_job.isFinished():
-            Job.yieldThread()
-        Logger.log("d", "Cylindrical start job finished with result: %s", self._cylindrical_start_slice_job.getResult())
-        self._job_results.append(self._cylindrical_start_slice_job.getResult())
-        if self._job_results[1] == StartJobResult.Finished:
-            self._slice_messages.append(self._cylindrical_start_slice_job.getSliceMessage())
-            self._slice_messages.append(self._cylindrical_start_slice_job.getArcusMessage())
-        self._cylindrical_start_slice_job = None
-        if any(result > 1 for result in self._job_results):
-            self.setResult(max(self._job_results))
-        else:
-            self.setResult(StartJobResult.Finished)
+            cylindrical_backend = self._backends["CLIParserBackend"] #type: CliParserBackend.CliParserBackend
+            slice_message = cylindrical_backend.getGlicerEngineCommand()
+            arcus_message = cylindrical_backend._socket.createMessage("cliparser.proto.Process")
+            self._cylindrical_start_slice_job = CliParserBackend.StartSliceJob(slice_message, arcus_message)
+            self._cylindrical_start_slice_job.setBuildPlate(self._start_slice_job_build_plate)
+            self._cylindrical_start_slice_job.start()
+            while not self._cylindrical_start_slice_job.isFinished():
+                Job.yieldThread()
+            Logger.log("d", "Cylindrical start job finished with result: %s", self._cylindrical_start_slice_job.getResult())
+            self._job_results.append(self._cylindrical_start_slice_job.getResult())
+            if self._job_results[1] == StartJobResult.Finished:
+                self._slice_messages.append(self._cylindrical_start_slice_job.getSliceMessage())
+                self._slice_messages.append(self._cylindrical_start_slice_job.getArcusMessage())
+            self._cylindrical_start_slice_job = None
+            if any(result > 1 for result in self._job_results):
+                self.setResult(max(self._job_results))
+            else:
+                self.setResult(StartJobResult.Finished)
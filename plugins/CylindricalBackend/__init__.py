@@ -1,6 +1,8 @@
-from . import CylindricalBackend
 
 from UM.i18n import i18nCatalog
+
+from steslicer.LazyPluginObject import LazyPluginObject
+
 catalog = i18nCatalog("steslicer")
 
 def getMetaData():
@@ -15,4 +17,9 @@ def getMetaData():
     }
 
 def register(app):
-    return { "backend": CylindricalBackend.CylindricalBackend() }
\ No newline at end of file
+    return { "backend": LazyPluginObject(_createBackend) }
+
+
+def _createBackend():
+    from . import CylindricalBackend
+    return CylindricalBackend.CylindricalBackend()
@@ -22,8 +22,11 @@ from UM.Tool import Tool #For typing.
 from UM.Mesh.MeshData import MeshData #For typing.
 
 from steslicer.SteSlicerApplication import SteSlicerApplication
+from steslicer.LayerDataStore import LayerDataStore
 from steslicer.Settings.ExtruderManager import ExtruderManager
+from steslicer.Utils.GCodeList import GCodeList
 from steslicer.Utils.GenerateBasementJob import GenerateBasementJob
+from steslicer.Utils.Tracer import Tracer
 from steslicer.Utils.ProcessSlicedLayersJob import ProcessSlicedLayersJob
 from .StartSliceJob import StartSliceJob, StartJobResult
 
@@ -73,13 +76,17 @@ class DescreteSlicerBackend(QObject, Backend):
 
         default_engine_location = os.path.abspath(default_engine_location)
         self._application.getPreferences().addPreference("discrete_backend/location", default_engine_location)
+        # Send every vertex of a mesh once, with the faces as indices. Only for a build of the engine that reads the indices.
+        self._application.getPreferences().addPreference("discrete_backend/indexed_meshes", False)
 
         # Workaround to disable layer view processing if layer view is not active.
         self._layer_view_active = False #type: bool
         self._onActiveViewChanged()
 
         self._stored_layer_data = [] #type: List[Arcus.PythonMessage]
-        self._stored_optimized_layer_data = {} #type: Dict[int, List[Arcus.PythonMessage]] # key is build plate number, then arrays are stored until they go to the ProcessSlicesLayersJob
+        # The layers of each build plate are stored until they go to the ProcessSlicesLayersJob.
+        self._application.getPreferences().addPreference("backend/layer_data_memory_budget", LayerDataStore.DefaultMemoryBudget // (1024 * 1024))  # In MiB.
+        self._stored_optimized_layer_data = LayerDataStore(self._getLayerDataMemoryBudget()) #type: LayerDataStore
 
         self._scene = self._application.getController().getScene() #type: Scene
         self._scene.sceneChanged.connect(self._onSceneChanged)
@@ -111,6 +118,9 @@ class DescreteSlicerBackend(QObject, Backend):
         self._postponed_scene_change_sources = [] #type: List[SceneNode] # scene change is postponed (by a tool)
 
         self._slice_start_time = None #type: Optional[float]
+        self._tracer = Tracer.getInstance()
+        self._slice_span = None  # Traces slicing a build plate, from start to end.
+        self._engine_span = None  # Traces waiting for the engine.
         self._is_disabled = False #type: bool
 
         self._application.getPreferences().addPreference("general/auto_slice", False)
@@ -189,6 +199,7 @@ class DescreteSlicerBackend(QObject, Backend):
     @pyqtSlot()
     def stopSlicing(self) -> None:
         self.backendStateChange.emit(BackendState.NotStarted)
+        self._endTraceSpans(cancelled = True)
         if self._slicing:  # We were already slicing. Stop the old job.
             self._terminate()
             self._createSocket()
@@ -201,6 +212,7 @@ class DescreteSlicerBackend(QObject, Backend):
         if self._process_layers_job is not None:  # We were processing layers. Stop that, the layers are going to change soon.
             Logger.log("d", "Aborting process layers job...")
             self._process_layers_job.abort()
+            self._stored_optimized_layer_data.unpin(self._process_layers_job.getBuildPlate())
             self._process_layers_job = None
 
         if self._error_message:
@@ -244,10 +256,10 @@ class DescreteSlicerBackend(QObject, Backend):
         num_objects = self._numObjectsPerBuildPlate()
 
         self._stored_layer_data = []
-        self._stored_optimized_layer_data[build_plate_to_be_sliced] = []
+        self._stored_optimized_layer_data.startBuildPlate(build_plate_to_be_sliced)
 
         if build_plate_to_be_sliced not in num_objects or num_objects[build_plate_to_be_sliced] == 0:
-            self._scene.gcode_dict[build_plate_to_be_sliced] = [] #type: ignore #Because we created this attribute above.
+            self._scene.gcode_dict[build_plate_to_be_sliced] = GCodeList() #type: ignore #Because we created this attribute above.
             Logger.log("d", "Build plate %s has no objects to be sliced, skipping", build_plate_to_be_sliced)
             if self._build_plates_to_be_sliced:
                 self.slice()
@@ -259,12 +271,13 @@ class DescreteSlicerBackend(QObject, Backend):
         if self._process is None: # type: ignore
             self._createSocket()
         self.stopSlicing()
+        self._slice_span = self._tracer.startSpan("slice", build_plate = build_plate_to_be_sliced)
         self._engine_is_fresh = False  # Yes we're going to use the engine
 
         self.processingProgress.emit(0.0)
         self.backendStateChange.emit(BackendState.NotStarted)
 
-        self._scene.gcode_dict[build_plate_to_be_sliced] = [] #type: ignore #[] indexed by build plate number
+        self._scene.gcode_dict[build_plate_to_be_sliced] = GCodeList() #type: ignore #[] indexed by build plate number
         self._slicing = True
         self.slicingStarted.emit()
 
@@ -274,6 +287,7 @@ class DescreteSlicerBackend(QObject, Backend):
         self._start_slice_job = StartSliceJob(slice_message)
         self._start_slice_job_build_plate = build_plate_to_be_sliced
         self._start_slice_job.setBuildPlate(self._start_slice_job_build_plate)
+        self._start_slice_job.setIndexedMeshes(self._application.getPreferences().getValue("discrete_backend/indexed_meshes"))
         self._start_slice_job.start()
         self._start_slice_job.finished.connect(self._onStartSliceCompleted)
 
@@ -282,8 +296,8 @@ class DescreteSlicerBackend(QObject, Backend):
     def _terminate(self) -> None:
         self._slicing = False
         self._stored_layer_data = []
-        if self._start_slice_job_build_plate in self._stored_optimized_layer_data:
-            del self._stored_optimized_layer_data[self._start_slice_job_build_plate]
+        if self._start_slice_job_build_plate is not None:
+            self._stored_optimized_layer_data.remove(self._start_slice_job_build_plate)
         if self._start_slice_job is not None:
             self._start_slice_job.cancel()
 
@@ -320,6 +334,9 @@ class DescreteSlicerBackend(QObject, Backend):
         if self._start_slice_job is job:
             self._start_slice_job = None
 
+        if job.isCancelled() or job.getError() or job.getResult() not in (StartJobResult.Finished, StartJobResult.BuildPlateError):
+            self._endTraceSpans(result = str(job.getResult()))
+
         if job.isCancelled() or job.getError() or job.getResult() == StartJobResult.Error:
             self.backendStateChange.emit(BackendState.Error)
             self.backendError.emit(job)
@@ -433,21 +450,20 @@ class DescreteSlicerBackend(QObject, Backend):
         # Preparation completed, send it to the backend.
     def _onGenerateBasementJobFinished(self, job: GenerateBasementJob):
         if not self._scene.gcode_dict:
-            self._scene.gcode_dict = {0: []}
+            self._scene.gcode_dict = {0: GCodeList()}
         if not self._scene.gcode_dict[self._start_slice_job_build_plate]:
-            self._scene.gcode_dict[self._start_slice_job_build_plate] = []
+            self._scene.gcode_dict[self._start_slice_job_build_plate] = GCodeList()
         self._scene.gcode_dict[self._start_slice_job_build_plate].extend(job.getGCodeList())
 
-        if self._start_slice_job_build_plate is not None:
-            if self._start_slice_job_build_plate not in self._stored_optimized_layer_data:
-                self._stored_optimized_layer_data[self._start_slice_job_build_plate] = []
-        self._stored_optimized_layer_data[self._start_slice_job_build_plate].extend(job.getLayersData())
-        self._classic_layers_size = len(self._stored_optimized_layer_data[self._start_slice_job_build_plate])
+        self._stored_optimized_layer_data.extend(self._start_slice_job_build_plate, job.getLayersData())
+        self._classic_layers_size = len(self._stored_optimized_layer_data.getLayers(self._start_slice_job_build_plate))
         self._layers_size = self._classic_layers_size
         if self._generate_basement_job is job:
             self._generate_basement_job = None
 
         # Preparation completed, send it to the backend.
+        self._engine_span = self._tracer.startSpan("engine", backend = "DescreteSlicerBackend",
+                                                   build_plate = self._start_slice_job_build_plate)
         self._socket.sendMessage(self._slice_message)
         self._slice_message = None
 
@@ -505,13 +521,14 @@ class DescreteSlicerBackend(QObject, Backend):
         if not isinstance(source, SceneNode):
             return
 
+        build_plate_changed = set()
+        source_build_plate_number = source.callDecoration("getBuildPlateNumber")
+
         # This case checks if the source node is a node that contains GCode. In this case the
-        # current layer data is removed so the previous data is not rendered - CURA-4821
+        # current layer data of its build plate is removed so the previous data is not rendered - CURA-4821
         if source.callDecoration("isBlockSlicing") and source.callDecoration("getLayerData"):
-            self._stored_optimized_layer_data = {}
+            self._stored_optimized_layer_data.invalidate([source_build_plate_number] if source_build_plate_number is not None else None)
 
-        build_plate_changed = set()
-        source_build_plate_number = source.callDecoration("getBuildPlateNumber")
         if source == self._scene.getRoot():
             # we got the root node
             num_objects = self._numObjectsPerBuildPlate()
@@ -549,6 +566,7 @@ class DescreteSlicerBackend(QObject, Backend):
         # if not self._use_timer:
             # With manually having to slice, we want to clear the old invalid layer data.
         self._clearLayerData(build_plate_changed)
+        self._stored_optimized_layer_data.invalidate(build_plate_changed)
 
         self._invokeSlice()
 
@@ -593,6 +611,7 @@ class DescreteSlicerBackend(QObject, Backend):
     def needsSlicing(self) -> None:
         self.stopSlicing()
         self.markSliceAll()
+        self._stored_optimized_layer_data.invalidate()
         self.processingProgress.emit(0.0)
         self.backendStateChange.emit(BackendState.NotStarted)
         if not self._use_timer:
@@ -634,9 +653,7 @@ class DescreteSlicerBackend(QObject, Backend):
     #   \param message The protobuf message containing sliced layer data.
     def _onOptimizedLayerMessage(self, message: Arcus.PythonMessage) -> None:
         if self._start_slice_job_build_plate is not None:
-            if self._start_slice_job_build_plate not in self._stored_optimized_layer_data:
-                self._stored_optimized_layer_data[self._start_slice_job_build_plate] = []
-            self._stored_optimized_layer_data[self._start_slice_job_build_plate].append(message)
+            self._stored_optimized_layer_data.append(self._start_slice_job_build_plate, message)
 
     ##  Called when a progress message is received from the engine.
     #
@@ -664,16 +681,20 @@ class DescreteSlicerBackend(QObject, Backend):
     def _onSlicingFinishedMessage(self, message: Arcus.PythonMessage) -> None:
         self.backendStateChange.emit(BackendState.Done)
         self.processingProgress.emit(1.0)
+        self._endEngineSpan()
 
         gcode_list = self._scene.gcode_dict[self._start_slice_job_build_plate] #type: ignore #Because we generate this attribute dynamically.
-        for index, line in enumerate(gcode_list):
-            replaced = line.replace("{print_time}", str(self._application.getPrintInformation().currentPrintTime.getDisplayString(DurationFormat.Format.ISO8601)))
-            replaced = replaced.replace("{filament_amount}", str(self._application.getPrintInformation().materialLengths))
-            replaced = replaced.replace("{filament_weight}", str(self._application.getPrintInformation().materialWeights))
-            replaced = replaced.replace("{filament_cost}", str(self._application.getPrintInformation().materialCosts))
-            replaced = replaced.replace("{jobname}", str(self._application.getPrintInformation().jobName))
+        with self._tracer.span("g-code post-processing", build_plate = self._start_slice_job_build_plate, lines = len(gcode_list)):
+            print_information = self._application.getPrintInformation()
+            gcode_list.replaceTokens({
+                "{print_time}": str(print_information.currentPrintTime.getDisplayString(DurationFormat.Format.ISO8601)),
+                "{filament_amount}": str(print_information.materialLengths),
+                "{filament_weight}": str(print_information.materialWeights),
+                "{filament_cost}": str(print_information.materialCosts),
+                "{jobname}": str(print_information.jobName)
+            })
 
-            gcode_list[index] = replaced
+        self._endTraceSpans()
 
 
         if self._slice_start_time:
@@ -707,12 +728,12 @@ class DescreteSlicerBackend(QObject, Backend):
     #   \param message The protobuf message containing g-code, encoded as UTF-8.
     def _onGCodeLayerMessage(self, message: Arcus.PythonMessage) -> None:
         if not self._scene.gcode_dict:
-            self._scene.gcode_dict = {0: []}
+            self._scene.gcode_dict = {0: GCodeList()}
         if not self._scene.gcode_dict[self._start_slice_job_build_plate]:
-            self._scene.gcode_dict[self._start_slice_job_build_plate] = []
-        msg = message.data.decode("utf-8", "replace")  # type: str
+            self._scene.gcode_dict[self._start_slice_job_build_plate] = GCodeList()
+        msg = message.data  # type: bytes
         # TODO: Remove this since new basement will have start and end gcode
-        if msg.startswith(";Generated with DiscreteSlicer_SteamEngine"):
+        if msg.startswith(b";Generated with DiscreteSlicer_SteamEngine"):
             self._scene.gcode_dict[self._start_slice_job_build_plate].insert(0, msg)
         else:
             self._scene.gcode_dict[self._start_slice_job_build_plate].append(
@@ -723,7 +744,7 @@ class DescreteSlicerBackend(QObject, Backend):
     #   \param message The protobuf message containing the g-code prefix,
     #   encoded as UTF-8.
     def _onGCodePrefixMessage(self, message: Arcus.PythonMessage) -> None:
-        self._scene.gcode_dict[self._start_slice_job_build_plate].insert(0, message.data.decode("utf-8", "replace")) #type: ignore #Because we generate this attribute dynamically.
+        self._scene.gcode_dict[self._start_slice_job_build_plate].insert(0, message.data) #type: ignore #Because we generate this attribute dynamically.
 
     ##  Creates a new socket connection.
     def _createSocket(self, protocol_file: str = None) -> None:
@@ -819,8 +840,23 @@ class DescreteSlicerBackend(QObject, Backend):
             source = self._postponed_scene_change_sources.pop(0)
             self._onSceneChanged(source)
 
+    def _endEngineSpan(self) -> None:
+        if self._engine_span is not None:
+            self._engine_span.end()
+            self._engine_span = None
+
+    ##  Ends the traced spans of the current slice, if any.
+    #   \param args Extra information to store with the spans.
+    def _endTraceSpans(self, **args: Any) -> None:
+        for span in (self._engine_span, self._slice_span):
+            if span is not None:
+                span.end(**args)
+        self._engine_span = None
+        self._slice_span = None
+
     def _startProcessSlicedLayersJob(self, build_plate_number: int) -> None:
-        self._process_layers_job = ProcessSlicedLayersJob(self._stored_optimized_layer_data[build_plate_number])
+        self._process_layers_job = ProcessSlicedLayersJob(self._stored_optimized_layer_data.getLayers(build_plate_number))
+        self._stored_optimized_layer_data.pin(build_plate_number)  # The job holds on to the layers until it's finished.
         self._process_layers_job.setBuildPlate(build_plate_number)
         self._process_layers_job.finished.connect(self._onProcessLayersFinished)
         self._process_layers_job.start()
@@ -841,6 +877,12 @@ class DescreteSlicerBackend(QObject, Backend):
                     active_build_plate not in self._build_plates_to_be_sliced):
 
                     self._startProcessSlicedLayersJob(active_build_plate)
+                elif (self._stored_optimized_layer_data.isEvicted(active_build_plate) and
+                    active_build_plate not in self._build_plates_to_be_sliced):
+                    # The layers of this build plate were removed to stay within the memory budget, slice it again.
+                    self._build_plates_to_be_sliced.append(active_build_plate)
+                    self.backendStateChange.emit(BackendState.NotStarted)
+                    self._invokeSlice()
             else:
                 self._layer_view_active = False
 
@@ -878,7 +920,7 @@ class DescreteSlicerBackend(QObject, Backend):
             self._onChanged()
 
     def _onProcessLayersFinished(self, job: ProcessSlicedLayersJob) -> None:
-        del self._stored_optimized_layer_data[job.getBuildPlate()]
+        self._stored_optimized_layer_data.remove(job.getBuildPlate())
         self._process_layers_job = None
         Logger.log("d", "See if there is more to slice(2)...")
         self._invokeSlice()
@@ -896,7 +938,13 @@ class DescreteSlicerBackend(QObject, Backend):
             self._use_timer = False
             self._change_timer.timeout.disconnect(self.slice)
 
+    def _getLayerDataMemoryBudget(self) -> int:
+        return int(self._application.getPreferences().getValue("backend/layer_data_memory_budget")) * 1024 * 1024
+
     def _onPreferencesChanged(self, preference: str) -> None:
+        if preference == "backend/layer_data_memory_budget":
+            self._stored_optimized_layer_data.setMemoryBudget(self._getLayerDataMemoryBudget())
+            return
         if preference != "general/auto_slice":
             return
         auto_slice = self.determineAutoSlicing()
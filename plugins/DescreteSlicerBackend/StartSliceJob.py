@@ -36,7 +36,9 @@ from steslicer.Scene.SteSlicerSceneNode import SteSlicerSceneNode
 from steslicer.OneAtATimeIterator import OneAtATimeIterator
 from steslicer.Settings.ExtruderManager import ExtruderManager
 from steslicer.GcodeStartEndFormatter import GcodeStartEndFormatter
-from steslicer.Utils.SplitPlane import SplitByPlane
+from steslicer.Utils.SplitTree import SplitTree
+from steslicer.Utils.MeshTransfer import getFaces, setObjectMesh
+from steslicer.Utils.Tracer import Tracer
 
 NON_PRINTING_MESH_SETTINGS = [
     "anti_overhang_mesh", "infill_mesh", "cutting_mesh"]
@@ -65,6 +67,7 @@ class StartSliceJob(Job):
         self._slice_message = slice_message  # type: Arcus.PythonMessage
         self._is_cancelled = False  # type: bool
         self._build_plate_number = None  # type: Optional[int]
+        self._indexed_meshes = False  # Whether the engine reads the indices of the meshes.
 
         # type: Optional[Dict[str, Any]] # cache for all setting values from all stacks (global & extruder) for the current machine
         self._all_extruders_settings = None
@@ -76,6 +79,11 @@ class StartSliceJob(Job):
     def setBuildPlate(self, build_plate_number: int) -> None:
         self._build_plate_number = build_plate_number
 
+    ##  Sends every vertex of a mesh once with the faces as indices, instead of
+    #   the three corners of every face. Only for engines that read the indices.
+    def setIndexedMeshes(self, indexed_meshes: bool) -> None:
+        self._indexed_meshes = indexed_meshes
+
     # Check if a stack has any errors.
     # returns true if it has errors, false otherwise.
     def _checkStackForErrors(self, stack: ContainerStack) -> bool:
@@ -93,250 +101,251 @@ class StartSliceJob(Job):
 
     # Runs the job that initiates the slicing.
     def run(self) -> None:
-        if self._build_plate_number is None:
-            self.setResult(StartJobResult.Error)
-            return
-
-        stack = SteSlicerApplication.getInstance().getGlobalContainerStack()
-        if not stack:
-            self.setResult(StartJobResult.Error)
-            return
-
-        # Don't slice if there is a setting with an error value.
-        if SteSlicerApplication.getInstance().getMachineManager().stacksHaveErrors:
-            self.setResult(StartJobResult.SettingError)
-            return
-
-        if SteSlicerApplication.getInstance().getBuildVolume().hasErrors():
-            self.setResult(StartJobResult.BuildPlateError)
-            return
+        with Tracer.getInstance().span("start job", build_plate = self._build_plate_number):
+            if self._build_plate_number is None:
+                self.setResult(StartJobResult.Error)
+                return
 
-        # Don't slice if the buildplate or the nozzle type is incompatible with the materials
-        if not SteSlicerApplication.getInstance().getMachineManager().variantBuildplateCompatible and \
-                not SteSlicerApplication.getInstance().getMachineManager().variantBuildplateUsable:
-            self.setResult(StartJobResult.MaterialIncompatible)
-            return
+            stack = SteSlicerApplication.getInstance().getGlobalContainerStack()
+            if not stack:
+                self.setResult(StartJobResult.Error)
+                return
 
-        for position, extruder_stack in stack.extruders.items():
-            material = extruder_stack.findContainer({"type": "material"})
-            if not extruder_stack.isEnabled:
-                continue
-            if material:
-                if material.getMetaDataEntry("compatible") == False:
-                    self.setResult(StartJobResult.MaterialIncompatible)
-                    return
+            # Don't slice if there is a setting with an error value.
+            if SteSlicerApplication.getInstance().getMachineManager().stacksHaveErrors:
+                self.setResult(StartJobResult.SettingError)
+                return
 
-        # Don't slice if there is a per object setting with an error value.
-        # type: ignore #Ignore type error because iter() should get called automatically by Python syntax.
-        for node in DepthFirstIterator(self._scene.getRoot()):
-            if not isinstance(node, SteSlicerSceneNode) or not node.isSelectable():
-                continue
+            if SteSlicerApplication.getInstance().getBuildVolume().hasErrors():
+                self.setResult(StartJobResult.BuildPlateError)
+                return
 
-            if self._checkStackForErrors(node.callDecoration("getStack")):
-                self.setResult(StartJobResult.ObjectSettingError)
+            # Don't slice if the buildplate or the nozzle type is incompatible with the materials
+            if not SteSlicerApplication.getInstance().getMachineManager().variantBuildplateCompatible and \
+                    not SteSlicerApplication.getInstance().getMachineManager().variantBuildplateUsable:
+                self.setResult(StartJobResult.MaterialIncompatible)
                 return
 
-        with self._scene.getSceneLock():
-            # Remove old layer data.
+            for position, extruder_stack in stack.extruders.items():
+                material = extruder_stack.findContainer({"type": "material"})
+                if not extruder_stack.isEnabled:
+                    continue
+                if material:
+                    if material.getMetaDataEntry("compatible") == False:
+                        self.setResult(StartJobResult.MaterialIncompatible)
+                        return
+
+            # Don't slice if there is a per object setting with an error value.
             # type: ignore #Ignore type error because iter() should get called automatically by Python syntax.
             for node in DepthFirstIterator(self._scene.getRoot()):
-                if node.callDecoration("getLayerData") and node.callDecoration(
-                        "getBuildPlateNumber") == self._build_plate_number:
-                    node.getParent().removeChild(node)
-                    break
-
-            # Get the objects in their groups to print.
-            object_groups = []
-            printing_mode = stack.getProperty("printing_mode", "value")
-            if printing_mode == "discrete":
-                if stack.getProperty("print_sequence", "value") == "one_at_a_time":
-                    # type: ignore #Ignore type error because iter() should get called automatically by Python syntax.
-                    for node in OneAtATimeIterator(self._scene.getRoot()):
-                        temp_list = []
+                if not isinstance(node, SteSlicerSceneNode) or not node.isSelectable():
+                    continue
+
+                if self._checkStackForErrors(node.callDecoration("getStack")):
+                    self.setResult(StartJobResult.ObjectSettingError)
+                    return
 
-                        # Node can't be printed, so don't bother sending it.
-                        if getattr(node, "_outside_buildarea", False):
-                            continue
+            with self._scene.getSceneLock():
+                # Remove old layer data.
+                # type: ignore #Ignore type error because iter() should get called automatically by Python syntax.
+                for node in DepthFirstIterator(self._scene.getRoot()):
+                    if node.callDecoration("getLayerData") and node.callDecoration(
+                            "getBuildPlateNumber") == self._build_plate_number:
+                        node.getParent().removeChild(node)
+                        break
+
+                # Get the objects in their groups to print.
+                object_groups = []
+                printing_mode = stack.getProperty("printing_mode", "value")
+                if printing_mode == "discrete":
+                    if stack.getProperty("print_sequence", "value") == "one_at_a_time":
+                        # type: ignore #Ignore type error because iter() should get called automatically by Python syntax.
+                        for node in OneAtATimeIterator(self._scene.getRoot()):
+                            temp_list = []
+
+                            # Node can't be printed, so don't bother sending it.
+                            if getattr(node, "_outside_buildarea", False):
+                                continue
 
-                        # Filter on current build plate
-                        build_plate_number = node.callDecoration(
-                            "getBuildPlateNumber")
-                        if build_plate_number is not None and build_plate_number != self._build_plate_number:
-                            continue
+                            # Filter on current build plate
+                            build_plate_number = node.callDecoration(
+                                "getBuildPlateNumber")
+                            if build_plate_number is not None and build_plate_number != self._build_plate_number:
+                                continue
 
-                        children = node.getAllChildren()
-                        children.append(node)
-                        for child_node in children:
-                            if child_node.getMeshData() and child_node.getMeshData().getVertices() is not None:
-                                temp_list.append(child_node)
+                            children = node.getAllChildren()
+                            children.append(node)
+                            for child_node in children:
+                                if child_node.getMeshData() and child_node.getMeshData().getVertices() is not None:
+                                    temp_list.append(child_node)
+
+                            if temp_list:
+                                object_groups.append(temp_list)
+                            Job.yieldThread()
+                        if len(object_groups) == 0:
+                            Logger.log(
+                                "w", "No objects suitable for one at a time found, or no correct order found")
+                    else:
+                        temp_list = []
+                        has_printing_mesh = False
+                        # type: ignore #Ignore type error because iter() should get called automatically by Python syntax.
+                        for node in DepthFirstIterator(self._scene.getRoot()):
+                            if node.callDecoration(
+                                    "isSliceable") and node.getMeshData() and node.getMeshData().getVertices() is not None:
+                                per_object_stack = node.callDecoration("getStack")
+                                is_non_printing_mesh = False
+                                if per_object_stack:
+                                    is_non_printing_mesh = any(per_object_stack.getProperty(
+                                        key, "value") for key in NON_PRINTING_MESH_SETTINGS)
+
+                                # Find a reason not to add the node
+                                if node.callDecoration("getBuildPlateNumber") != self._build_plate_number:
+                                    continue
+                                if getattr(node, "_outside_buildarea", False) and not is_non_printing_mesh:
+                                    continue
+
+                                temp_list.append(node)
+                                if not is_non_printing_mesh:
+                                    has_printing_mesh = True
+
+                            Job.yieldThread()
+
+                        # If the list doesn't have any model with suitable settings then clean the list
+                        # otherwise CuraEngine will crash
+                        if not has_printing_mesh:
+                            temp_list.clear()
 
                         if temp_list:
                             object_groups.append(temp_list)
-                        Job.yieldThread()
-                    if len(object_groups) == 0:
-                        Logger.log(
-                            "w", "No objects suitable for one at a time found, or no correct order found")
                 else:
-                    temp_list = []
-                    has_printing_mesh = False
-                    # type: ignore #Ignore type error because iter() should get called automatically by Python syntax.
-                    for node in DepthFirstIterator(self._scene.getRoot()):
-                        if node.callDecoration(
-                                "isSliceable") and node.getMeshData() and node.getMeshData().getVertices() is not None:
-                            per_object_stack = node.callDecoration("getStack")
-                            is_non_printing_mesh = False
-                            if per_object_stack:
-                                is_non_printing_mesh = any(per_object_stack.getProperty(
-                                    key, "value") for key in NON_PRINTING_MESH_SETTINGS)
-
-                            # Find a reason not to add the node
-                            if node.callDecoration("getBuildPlateNumber") != self._build_plate_number:
-                                continue
-                            if getattr(node, "_outside_buildarea", False) and not is_non_printing_mesh:
-                                continue
-
-                            temp_list.append(node)
-                            if not is_non_printing_mesh:
-                                has_printing_mesh = True
-
-                        Job.yieldThread()
-
-                    # If the list doesn't have any model with suitable settings then clean the list
-                    # otherwise CuraEngine will crash
-                    if not has_printing_mesh:
-                        temp_list.clear()
+                    self.setResult(StartJobResult.ObjectSettingError)
+                    return
 
-                    if temp_list:
-                        object_groups.append(temp_list)
-            else:
-                self.setResult(StartJobResult.ObjectSettingError)
+            global_stack = SteSlicerApplication.getInstance().getGlobalContainerStack()
+            if not global_stack:
+                return
+            extruders_enabled = {
+                position: stack.isEnabled for position, stack in global_stack.extruders.items()}
+            filtered_object_groups = []
+            has_model_with_disabled_extruders = False
+            associated_disabled_extruders = set()
+            for group in object_groups:
+                stack = global_stack
+                skip_group = False
+                for node in group:
+                    # Only check if the printing extruder is enabled for printing meshes
+                    is_non_printing_mesh = node.callDecoration(
+                        "evaluateIsNonPrintingMesh")
+                    extruder_position = node.callDecoration(
+                        "getActiveExtruderPosition")
+                    if not is_non_printing_mesh and not extruders_enabled[extruder_position]:
+                        skip_group = True
+                        has_model_with_disabled_extruders = True
+                        associated_disabled_extruders.add(extruder_position)
+                if not skip_group:
+                    filtered_object_groups.append(group)
+
+            if has_model_with_disabled_extruders:
+                self.setResult(StartJobResult.ObjectsWithDisabledExtruder)
+                associated_disabled_extruders = {str(c) for c in sorted(
+                    [int(p) + 1 for p in associated_disabled_extruders])}
+                self.setMessage(", ".join(associated_disabled_extruders))
                 return
 
-        global_stack = SteSlicerApplication.getInstance().getGlobalContainerStack()
-        if not global_stack:
-            return
-        extruders_enabled = {
-            position: stack.isEnabled for position, stack in global_stack.extruders.items()}
-        filtered_object_groups = []
-        has_model_with_disabled_extruders = False
-        associated_disabled_extruders = set()
-        for group in object_groups:
-            stack = global_stack
-            skip_group = False
-            for node in group:
-                # Only check if the printing extruder is enabled for printing meshes
-                is_non_printing_mesh = node.callDecoration(
-                    "evaluateIsNonPrintingMesh")
-                extruder_position = node.callDecoration(
-                    "getActiveExtruderPosition")
-                if not is_non_printing_mesh and not extruders_enabled[extruder_position]:
-                    skip_group = True
-                    has_model_with_disabled_extruders = True
-                    associated_disabled_extruders.add(extruder_position)
-            if not skip_group:
-                filtered_object_groups.append(group)
-
-        if has_model_with_disabled_extruders:
-            self.setResult(StartJobResult.ObjectsWithDisabledExtruder)
-            associated_disabled_extruders = {str(c) for c in sorted(
-                [int(p) + 1 for p in associated_disabled_extruders])}
-            self.setMessage(", ".join(associated_disabled_extruders))
-            return
-
-        # There are cases when there is nothing to slice. This can happen due to one at a time slicing not being
-        # able to find a possible sequence or because there are no objects on the build plate (or they are outside
-        # the build volume)
-        if not filtered_object_groups:
-            self.setResult(StartJobResult.NothingToSlice)
-            return
-
-        cancelled = self._is_cancelled
-        self._is_cancelled = False
-
-        processed_object_groups = []
-        for object_group in filtered_object_groups:
-            printable_meshes = []
-            splitting_planes = []
-            for object in object_group:
-                per_object_stack = object.callDecoration("getStack")
-                settings = per_object_stack.getTop()
-                anti_overhang_mesh = settings.getProperty(
-                    "anti_overhang_mesh", "value")
-                splitting_plane = object.callDecoration("isSplittingPlane")
-                if anti_overhang_mesh and splitting_plane:
-                    splitting_planes.append(object)
-                elif not anti_overhang_mesh:
-                    printable_meshes.append(object)
-
-            for mesh in printable_meshes:
-                processed_nodes = self.generateSplitTree(mesh, splitting_planes)
-                for child in reversed(processed_nodes):
-                    processed_object_groups.append([child])
-
-        self._buildGlobalSettingsMessage(stack)
-        self._buildGlobalInheritsStackMessage(stack)
-
-        # Build messages for extruder stacks
-        # Send the extruder settings in the order of extruder positions. Somehow, if you send e.g. extruder 3 first,
-        # then CuraEngine can slice with the wrong settings. This I think should be fixed in CuraEngine as well.
-        extruder_stack_list = sorted(
-            list(global_stack.extruders.items()), key=lambda item: int(item[0]))
-        for _, extruder_stack in extruder_stack_list:
-            self._buildExtruderMessage(extruder_stack)
-
-        for group in processed_object_groups:
-            group_message = self._slice_message.addRepeatedMessage(
-                "object_lists")
-            if group[0].getParent() is not None and group[0].getParent().callDecoration("isGroup"):
-                self._handlePerObjectSettings(
-                    group[0].getParent(), group_message)
-            for object in group:
-                mesh_data = object.getMeshData()
-                rot_scale = object.getWorldTransformation().getTransposed().getData()[
-                            0:3, 0:3]
-                translate = object.getWorldTransformation().getData()[:3, 3]
-
-                # This effectively performs a limited form of MeshData.getTransformed that ignores normals.
-                verts = mesh_data.getVertices()
-                verts = verts.dot(rot_scale)
-                verts += translate
-
-                # Convert from Y up axes to Z up axes. Equals a 90 degree rotation.
-                verts[:, [1, 2]] = verts[:, [2, 1]]
-                verts[:, 1] *= -1
-
-                obj = group_message.addRepeatedMessage("objects")
-                obj.id = id(object)
-                obj.name = object.getName()
-                indices = mesh_data.getIndices()
-                if indices is not None:
-                    flat_verts = numpy.take(verts, indices.flatten(), axis=0)
-                else:
-                    flat_verts = numpy.array(verts)
-
-                obj.vertices = flat_verts
-
-                self._handlePerObjectSettings(object, obj)
-
-                Job.yieldThread()
+            # There are cases when there is nothing to slice. This can happen due to one at a time slicing not being
+            # able to find a possible sequence or because there are no objects on the build plate (or they are outside
+            # the build volume)
+            if not filtered_object_groups:
+                self.setResult(StartJobResult.NothingToSlice)
+                return
 
-        self.setResult(StartJobResult.Finished)
+            cancelled = self._is_cancelled
+            self._is_cancelled = False
+
+            processed_object_groups = []
+            for object_group in filtered_object_groups:
+                printable_meshes = []
+                splitting_planes = []
+                for object in object_group:
+                    per_object_stack = object.callDecoration("getStack")
+                    settings = per_object_stack.getTop()
+                    anti_overhang_mesh = settings.getProperty(
+                        "anti_overhang_mesh", "value")
+                    splitting_plane = object.callDecoration("isSplittingPlane")
+                    if anti_overhang_mesh and splitting_plane:
+                        splitting_planes.append(object)
+                    elif not anti_overhang_mesh:
+                        printable_meshes.append(object)
+
+                for mesh in printable_meshes:
+                    processed_nodes = self.generateSplitTree(mesh, splitting_planes)
+                    for child in reversed(processed_nodes):
+                        processed_object_groups.append([child])
+
+            self._buildGlobalSettingsMessage(stack)
+            self._buildGlobalInheritsStackMessage(stack)
+
+            # Build messages for extruder stacks
+            # Send the extruder settings in the order of extruder positions. Somehow, if you send e.g. extruder 3 first,
+            # then CuraEngine can slice with the wrong settings. This I think should be fixed in CuraEngine as well.
+            extruder_stack_list = sorted(
+                list(global_stack.extruders.items()), key=lambda item: int(item[0]))
+            for _, extruder_stack in extruder_stack_list:
+                self._buildExtruderMessage(extruder_stack)
+
+            for group in processed_object_groups:
+                group_message = self._slice_message.addRepeatedMessage(
+                    "object_lists")
+                if group[0].getParent() is not None and group[0].getParent().callDecoration("isGroup"):
+                    self._handlePerObjectSettings(
+                        group[0].getParent(), group_message)
+                for object in group:
+                    mesh_data = object.getMeshData()
+                    rot_scale = object.getWorldTransformation().getTransposed().getData()[
+                                0:3, 0:3]
+                    translate = object.getWorldTransformation().getData()[:3, 3]
+
+                    # This effectively performs a limited form of MeshData.getTransformed that ignores normals.
+                    verts = mesh_data.getVertices()
+                    verts = verts.dot(rot_scale)
+                    verts += translate
+
+                    # Convert from Y up axes to Z up axes. Equals a 90 degree rotation.
+                    verts[:, [1, 2]] = verts[:, [2, 1]]
+                    verts[:, 1] *= -1
+
+                    obj = group_message.addRepeatedMessage("objects")
+                    obj.id = id(object)
+                    obj.name = object.getName()
+                    setObjectMesh(obj, verts, mesh_data, self._indexed_meshes)
+
+                    self._handlePerObjectSettings(object, obj)
+
+                    Job.yieldThread()
+
+            self.setResult(StartJobResult.Finished)
 
     def generateSplitTree(self, node: SceneNode, planes: List[SceneNode]):
         result = []
-        new_node = copy(node)
-        new_nodes = [new_node]
         global_stack = SteSlicerApplication.getInstance().getGlobalContainerStack()
         if not global_stack:
             return result
         overlap = global_stack.getProperty("descrete_mode_parts_intersection", "value")
         converted_planes = self.convertPlanes(planes)
-        for plane_idx, plane in reversed(list(enumerate(converted_planes))):
-            new_nodes = self.splitNode(new_node, plane, overlap)
-            new_node = new_nodes[0]
-            if len(new_nodes) > 1:
-                result.append(new_nodes[-1])
-        result.append(new_node)
+
+        mesh_data = node.getMeshData()
+        faces = getFaces(mesh_data)
+        mesh_key = SplitTree.createMeshKey(mesh_data.getVertices(), faces, node.getWorldTransformation().getData())
+        create_mesh = lambda: trimesh.Trimesh(vertices = node.getMeshDataTransformed().getVertices(), faces = faces)
+        with Tracer.getInstance().span("split tree", planes = len(converted_planes)):
+            pieces = SplitTree.getInstance().split(mesh_key, create_mesh, converted_planes, overlap)
+
+        for piece_mesh, plane in pieces:
+            result.append(self._createPieceNode(node, piece_mesh, plane))
+        # The children of the node go with the part that is left after all cuts.
+        for child in node.getAllChildren():
+            if not child.getDecorator(SplittingPlaneDecorator):
+                result[-1].addChild(child)
         return result
 
     def convertPlanes(self, planes: List[SceneNode]) -> List[SplitPlane]:
@@ -373,57 +382,26 @@ class StartSliceJob(Job):
             start_origin = plane.origin
         return ret
 
-    def splitNode(self, node: SceneNode, plane: SplitPlane, overlap = 0) -> List[SceneNode]:
-        mesh_data = node.getMeshData()
-        if mesh_data.hasIndices():
-            faces = mesh_data.getIndices()
-        else:
-            num_verts = mesh_data.getVertexCount()
-            faces = numpy.empty((int(num_verts / 3 + 1), 3), numpy.int32)
-            for i in range(0, num_verts - 2, 3):
-                faces[int(i / 3):] = [i, i + 1, i + 2]
-        trmesh = trimesh.Trimesh(vertices=node.getMeshDataTransformed().getVertices(), faces=faces)
-        filled = trmesh.fill_holes()
-        trmesh.fix_normals()
-        trmesh.remove_duplicate_faces()
-        plane_normal = plane.normal
-        plane_origin = plane.origin
-        cut_mesh, start_mesh = SplitByPlane(
-            trmesh, plane_normal, plane_origin, True, overlap=overlap)
-        start_mesh.fill_holes()
-        start_mesh.remove_duplicate_faces()
-        start_mesh.fix_normals()
-        start_node = SteSlicerSceneNode(node.getParent(), no_setting_override=True)
-        if node.hasChildren():
-            for child in node.getAllChildren():
-                if not child.getDecorator(SplittingPlaneDecorator):
-                    start_node.addChild(child)
-        start_node.setMeshData(MeshData.MeshData(vertices=start_mesh.vertices.astype('float32'),
-                                                 normals=start_mesh.face_normals.astype(
-                                                     'float32'),
-                                                 indices=start_mesh.faces.astype('int64')))
-        start_node.addDecorator(node.getDecorator(SettingOverrideDecorator))
-        if cut_mesh:
-            cut_mesh.fill_holes()
-            cut_mesh.fix_normals()
-            cut_mesh.remove_duplicate_faces()
+    ##  Creates the node of a piece of a split mesh.
+    #   \param node The node that was split.
+    #   \param mesh The mesh of the piece, in world coordinates.
+    #   \param plane The plane the piece was cut off by, or None for the part
+    #   that is left after all cuts.
+    def _createPieceNode(self, node: SceneNode, mesh: trimesh.Trimesh, plane: Optional[SplitPlane]) -> SceneNode:
+        piece_node = SteSlicerSceneNode(node.getParent(), no_setting_override=True)
+        piece_node.setMeshData(MeshData.MeshData(vertices=mesh.vertices.astype('float32'),
+                                                 normals=mesh.face_normals.astype('float32'),
+                                                 indices=mesh.faces.astype('int64')))
+        piece_node.addDecorator(node.getDecorator(SettingOverrideDecorator))
+        if plane is not None:
+            plane_normal = plane.normal
             q = Quaternion.rotationTo(Vector(0,0,1), Vector(-plane_normal[0], plane_normal[2], plane_normal[1]))
             plane_matrix = q.toMatrix()
-            cut_node = SteSlicerSceneNode(
-                node.getParent(), no_setting_override=True)
-            cut_node.setMeshData(MeshData.MeshData(vertices=cut_mesh.vertices.astype('float32'),
-                                                   normals=cut_mesh.face_normals.astype(
-                                                       'float32'),
-                                                   indices=cut_mesh.faces.astype('int64')))
-            cut_node.addDecorator(
-                node.getDecorator(SettingOverrideDecorator))
-            self._direction_matrices[id(cut_node)] = (numpy.array2string(
+            self._direction_matrices[id(piece_node)] = (numpy.array2string(
                 plane_matrix.getData()[0:3, 0:3], separator=", ", precision=3, suppress_small=True)).replace('\n',
                                                                                                              ' ').replace(
                 '\r', '')
-
-            return [start_node, cut_node]
-        return [start_node]
+        return piece_node
 
     def cancel(self) -> None:
         super().cancel()
@@ -1,6 +1,8 @@
-from . import DescreteSlicerBackend
 
 from UM.i18n import i18nCatalog
+
+from steslicer.LazyPluginObject import LazyPluginObject
+
 catalog = i18nCatalog("steslicer")
 
 def getMetaData():
@@ -11,4 +13,9 @@ def getMetaData():
     }
 
 def register(app):
-    return { "backend": DescreteSlicerBackend.DescreteSlicerBackend() }
\ No newline at end of file
+    return { "backend": LazyPluginObject(_createBackend) }
+
+
+def _createBackend():
+    from . import DescreteSlicerBackend
+    return DescreteSlicerBackend.DescreteSlicerBackend()
@@ -0,0 +1,91 @@
+import io
+import zlib
+from typing import Callable, List, Optional, Union
+
+from UM.Job import Job
+
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024  # Characters collected before they are written to the output.
+
+
+##  Collects g-code text and writes it to an output stream in large chunks.
+#
+#   Writing many small strings to a (line buffered) text stream results in a
+#   write call for every line, which is slow on network shares. This stream
+#   collects the text in a bounded buffer and writes it to the stream below in
+#   blocks of chunk_size characters, optionally compressing it with gzip on the
+#   fly. Only one chunk is held in memory at any time.
+#
+#   Text streams get the text itself, so they still translate newlines and
+#   encode it as they were opened to. Binary streams get the encoded text.
+#   Compressed g-code is binary, so it's written to the binary buffer of a text
+#   stream.
+class ChunkedGCodeStream:
+    ##  \param stream The stream to write to.
+    #   \param chunk_size Number of characters that are collected before writing.
+    #   \param compress Whether to write a gzip stream.
+    #   \param progress_callback Called with the fraction of total_size that is written.
+    #   \param total_size Expected number of characters, used for the progress.
+    #   \param encoding The encoding for binary streams.
+    def __init__(self, stream: Union[io.IOBase, io.TextIOBase], chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 compress: bool = False, progress_callback: Optional[Callable[[float], None]] = None,
+                 total_size: int = 0, encoding: str = "utf-8") -> None:
+        self._stream = stream
+        self._is_text = isinstance(stream, io.TextIOBase)
+        if self._is_text and compress:
+            binary = getattr(stream, "buffer", None)
+            if binary is None:
+                raise ValueError("Can't write compressed g-code to a text stream.")
+            # Anything that was written as text before must come first.
+            stream.flush()
+            self._stream = binary
+            self._is_text = False
+        self._chunk_size = max(int(chunk_size), 1)
+        self._encoding = encoding
+        self._progress_callback = progress_callback
+        self._total_size = total_size
+        self._written_size = 0
+
+        self._buffer = []  # type: List[str]
+        self._buffered_size = 0
+        self._compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if compress else None
+        self._closed = False
+
+    def write(self, data: str) -> None:
+        if self._closed:
+            raise ValueError("Write to a closed g-code stream.")
+        self._written_size += len(data)
+        self._buffer.append(data)
+        self._buffered_size += len(data)
+        if self._buffered_size >= self._chunk_size:
+            self._flushBuffer()
+
+    ##  Writes everything that is left and finishes the gzip stream.
+    #
+    #   The underlying stream is flushed, but not closed.
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._flushBuffer()
+        if self._compressor is not None:
+            self._stream.write(self._compressor.flush())
+        self._stream.flush()
+        self._closed = True
+
+    def _flushBuffer(self) -> None:
+        if not self._buffer:
+            return
+        text = "".join(self._buffer)
+        self._buffer = []
+        self._buffered_size = 0
+        if self._is_text:
+            self._stream.write(text)
+        else:
+            data = text.encode(self._encoding)
+            if self._compressor is not None:
+                data = self._compressor.compress(data)
+            if data:
+                self._stream.write(data)
+
+        if self._progress_callback is not None and self._total_size > 0:
+            self._progress_callback(min(self._written_size / self._total_size, 1.0))
+        Job.yieldThread()
@@ -7,13 +7,18 @@ import copy
 from UM.Math.AxisAlignedBox import AxisAlignedBox
 from UM.Mesh.MeshWriter import MeshWriter
 from UM.Logger import Logger
+from UM.Signal import Signal
 from UM.Application import Application
 from UM.Settings.InstanceContainer import InstanceContainer
 
 from steslicer.Machines.QualityManager import getMachineDefinitionIDForQualitySearch
+from steslicer.Utils.GCodeBufferChecker import GCodeBufferChecker
+from steslicer.Utils.PrintTimeEstimator import PrintTimeEstimator
 from steslicer.Utils.Threading import call_on_qt_thread
 from steslicer.Snapshot import Snapshot
 
+from .ChunkedGCodeStream import ChunkedGCodeStream, DEFAULT_CHUNK_SIZE
+
 
 from PyQt5.QtCore import QBuffer
 from UM.i18n import i18nCatalog
@@ -52,10 +57,15 @@ class GCodeWriter(MeshWriter):
 
     _setting_keyword = ";SETTING_"
 
+    ##  Emitted with the fraction of the g-code that is written.
+    writeProgress = Signal()
+
     def __init__(self):
         super().__init__(add_to_recent_files = False)
 
         self._application = Application.getInstance()
+        self._application.getPreferences().addPreference("gcodewriter/check_buffer", False)
+        self._application.getPreferences().addPreference("gcodewriter/chunk_size", DEFAULT_CHUNK_SIZE)
 
     ##  Writes the g-code for the entire scene to a stream.
     #
@@ -66,13 +76,10 @@ class GCodeWriter(MeshWriter):
     #   \param stream The stream to write the g-code to.
     #   \param nodes This is ignored.
     #   \param mode Additional information on how to format the g-code in the
-    #   file. This must always be text mode.
+    #   file. Text mode writes plain g-code, binary mode writes gzip compressed
+    #   g-code.
     def write(self, stream, nodes, mode = MeshWriter.OutputMode.TextMode):
-
-        if mode != MeshWriter.OutputMode.TextMode:
-            Logger.log("e", "GCodeWriter does not support non-text mode.")
-            self.setInformation(catalog.i18nc("@error:not supported", "GCodeWriter does not support non-text mode."))
-            return False
+        compress = mode == MeshWriter.OutputMode.BinaryMode
 
         active_build_plate = Application.getInstance().getMultiBuildPlateModel().activeBuildPlate
         scene = Application.getInstance().getController().getScene()
@@ -82,30 +89,60 @@ class GCodeWriter(MeshWriter):
         gcode_dict = getattr(scene, "gcode_dict")
         gcode_list = gcode_dict.get(active_build_plate, None)
         if gcode_list is not None:
+            if self._application.getPreferences().getValue("gcodewriter/check_buffer"):
+                self._checkBuffer(gcode_list)
+            gcode_stream = ChunkedGCodeStream(stream,
+                                              chunk_size = self._application.getPreferences().getValue("gcodewriter/chunk_size"),
+                                              compress = compress,
+                                              progress_callback = self.writeProgress.emit,
+                                              total_size = self._getGCodeSize(gcode_list))
             has_settings = False
             preview_image = self._getPreviewImage()
             if preview_image:
-                stream.write(preview_image)
+                gcode_stream.write(preview_image)
             slicer_version = self._getSlicerVersion()
-            stream.write(slicer_version)
+            gcode_stream.write(slicer_version)
             printing_mode = self._getPrintingMode()
-            stream.write(printing_mode)
+            gcode_stream.write(printing_mode)
             scene_size = self._getSerializedBounding()
-            stream.write(scene_size)
+            gcode_stream.write(scene_size)
             for gcode in gcode_list:
                 if gcode[:len(self._setting_keyword)] == self._setting_keyword:
                     has_settings = True
-                stream.write(gcode)
+                gcode_stream.write(gcode)
             # Serialise the current container stack and put it at the end of the file.
             if not has_settings:
-                settings = self._serialiseSettings(Application.getInstance().getGlobalContainerStack())
-                stream.write(settings)
+                for line in self._serialiseSettings(Application.getInstance().getGlobalContainerStack()):
+                    gcode_stream.write(line)
+            gcode_stream.close()
             return True
 
         self.setInformation(catalog.i18nc("@warning:status", "Please prepare G-code before exporting."))
 
         return False
 
+    ##  \return The size of the g-code, for the progress. G-code from the
+    #   engine knows its size without being decoded.
+    def _getGCodeSize(self, gcode_list):
+        if hasattr(gcode_list, "getSize"):
+            return gcode_list.getSize()
+        return sum(len(gcode) for gcode in gcode_list)
+
+    ##  Checks the g-code for potential buffer underruns before it is written.
+    #
+    #   Problems are reported to the user, the g-code is written regardless.
+    def _checkBuffer(self, gcode_list):
+        global_stack = self._application.getGlobalContainerStack()
+        estimator = PrintTimeEstimator.fromStack(global_stack) if global_stack else None
+        checker = GCodeBufferChecker(estimator)
+        checker.process(line for gcode in gcode_list for line in gcode.split("\n"))
+        if checker.hasBufferUnderruns():
+            for line in checker.getReport():
+                Logger.log("w", line)
+            self.setInformation(catalog.i18nc("@warning:status", "The g-code may cause {0} buffer underruns on the printer.").format(len(checker.getBadFrameRanges())))
+        else:
+            Logger.log("d", "No buffer underruns predicted, estimated print time is %s seconds.", checker.getTotalTime())
+
     ##  Create a new container with container 2 as base and container 1 written over it.
     def _createFlattenedContainerInstance(self, instance_container1, instance_container2):
         flat_container = InstanceContainer(instance_container2.getName())
@@ -131,7 +168,7 @@ class GCodeWriter(MeshWriter):
     #   are escaped.
     #
     #   \param settings A container stack to serialise.
-    #   \return A serialised string of the settings.
+    #   \return A generator of the serialised lines of the settings.
     def _serialiseSettings(self, stack):
         container_registry = self._application.getContainerRegistry()
         quality_manager = self._application.getQualityManager()
@@ -194,7 +231,7 @@ class GCodeWriter(MeshWriter):
         # Check if there is any profiles
         if not all_setting_keys:
             Logger.log("i", "No custom settings found, not writing settings to g-code.")
-            return ""
+            return
 
         json_string = json.dumps(data)
 
@@ -205,12 +242,9 @@ class GCodeWriter(MeshWriter):
         escaped_string = pattern.sub(lambda m: GCodeWriter.escape_characters[re.escape(m.group(0))], json_string)
 
         # Introduce line breaks so that each comment is no longer than 80 characters. Prepend each line with the prefix.
-        result = ""
-
         # Lines have 80 characters, so the payload of each line is 80 - prefix.
         for pos in range(0, len(escaped_string), 80 - prefix_length):
-            result += prefix + escaped_string[pos: pos + 80 - prefix_length] + "\n"
-        return result
+            yield prefix + escaped_string[pos: pos + 80 - prefix_length] + "\n"
 
     def _getSerializedBounding(self):
         aabb = self._application.getSceneBoundingBox() #type: AxisAlignedBox
@@ -15,6 +15,11 @@ def getMetaData():
                 "description": catalog.i18nc("@item:inlistbox", "G-code File"),
                 "mime_type": "text/x-gcode",
                 "mode": GCodeWriter.GCodeWriter.OutputMode.TextMode
+            }, {
+                "extension": "gcode.gz",
+                "description": catalog.i18nc("@item:inlistbox", "Compressed G-code File"),
+                "mime_type": "application/gzip",
+                "mode": GCodeWriter.GCodeWriter.OutputMode.BinaryMode
             }]
         }
     }
@@ -2,7 +2,7 @@
 
 import numpy
 
-from PyQt5.QtGui import QImage, qRed, qGreen, qBlue
+from PyQt5.QtGui import QImage
 from PyQt5.QtCore import Qt
 
 from UM.Mesh.MeshReader import MeshReader
@@ -15,6 +15,61 @@ from .ImageReaderUI import ImageReaderUI
 from steslicer.Scene.SteSlicerSceneNode import SteSlicerSceneNode as SceneNode
 
 
+##  Converts an image to heights between 0 and 1, the average of the red,
+#   green and blue channels of every pixel.
+#   \return The heights as an array of height by width.
+def _imageToHeightData(img: QImage) -> numpy.ndarray:
+    img = img.convertToFormat(QImage.Format_RGB32)
+    width = img.width()
+    height = img.height()
+    bits = img.constBits()
+    bits.setsize(img.bytesPerLine() * height)
+    # Every pixel is 0xffRRGGBB, and lines may have padding at the end.
+    pixels = numpy.frombuffer(bits, dtype = numpy.uint32).reshape((height, img.bytesPerLine() // 4))[:, :width]
+    channel_sum = ((pixels >> 16) & 0xff) + ((pixels >> 8) & 0xff) + (pixels & 0xff)
+    return channel_sum.astype(numpy.float32) / (3 * 255)
+
+
+##  Blurs heights with a 3x3 box filter, as a horizontal and a vertical pass.
+#   Heights at the edge are repeated beyond it.
+def _blurHeightData(height_data: numpy.ndarray) -> numpy.ndarray:
+    padded = numpy.pad(height_data, ((1, 1), (1, 1)), mode = "edge")
+    rows = padded[:, :-2] + padded[:, 1:-1] + padded[:, 2:]
+    return (rows[:-2] + rows[1:-1] + rows[2:]) / 9
+
+
+##  \return The vertices of the faces of the two sides of a wall: from the
+#   bottom points up to the heights, for each segment between two points.
+def _createWallVertices(bottom: numpy.ndarray, heights: numpy.ndarray) -> numpy.ndarray:
+    top = bottom.copy()
+    top[:, 1] = heights
+    return numpy.stack([bottom[:-1], bottom[1:], top[1:],
+                        top[1:], top[:-1], bottom[:-1]], axis = 1).reshape(-1, 3)
+
+
+##  \return The vertices of the faces of the bottom and the four walls under
+#   the edges of a heightmap.
+def _createBaseVertices(height_data: numpy.ndarray, texel_width: float, texel_height: float) -> numpy.ndarray:
+    height, width = height_data.shape
+    geo_width = (width - 1) * texel_width
+    geo_height = (height - 1) * texel_height
+
+    xs = numpy.arange(width, dtype = numpy.float32) * texel_width
+    zs = numpy.arange(height, dtype = numpy.float32) * texel_height
+    north = numpy.stack([xs, numpy.zeros_like(xs), numpy.zeros_like(xs)], axis = 1)
+    west = numpy.stack([numpy.zeros_like(zs), numpy.zeros_like(zs), zs], axis = 1)
+    south = north + numpy.array([0, 0, geo_height], dtype = numpy.float32)
+    east = west + numpy.array([geo_width, 0, 0], dtype = numpy.float32)
+
+    bottom = numpy.array([[0, 0, 0], [0, 0, geo_height], [geo_width, 0, geo_height],
+                          [geo_width, 0, geo_height], [geo_width, 0, 0], [0, 0, 0]], dtype = numpy.float32)
+    return numpy.concatenate([bottom,
+                              _createWallVertices(north, height_data[0, :]),
+                              _createWallVertices(south, height_data[-1, :]),
+                              _createWallVertices(west, height_data[:, 0]),
+                              _createWallVertices(east, height_data[:, -1])]).astype(numpy.float32)
+
+
 class ImageReader(MeshReader):
     def __init__(self) -> None:
         super().__init__()
@@ -93,13 +148,7 @@ class ImageReader(MeshReader):
         texel_width = 1.0 / (width_minus_one) * scale_vector.x
         texel_height = 1.0 / (height_minus_one) * scale_vector.z
 
-        height_data = numpy.zeros((height, width), dtype=numpy.float32)
-
-        for x in range(0, width):
-            for y in range(0, height):
-                qrgb = img.pixel(x, y)
-                avg = float(qRed(qrgb) + qGreen(qrgb) + qBlue(qrgb)) / (3 * 255)
-                height_data[y, x] = avg
+        height_data = _imageToHeightData(img)
 
         Job.yieldThread()
 
@@ -107,19 +156,7 @@ class ImageReader(MeshReader):
             height_data = 1 - height_data
 
         for _ in range(0, blur_iterations):
-            copy = numpy.pad(height_data, ((1, 1), (1, 1)), mode= "edge")
-
-            height_data += copy[1:-1, 2:]
-            height_data += copy[1:-1, :-2]
-            height_data += copy[2:, 1:-1]
-            height_data += copy[:-2, 1:-1]
-
-            height_data += copy[2:, 2:]
-            height_data += copy[:-2, 2:]
-            height_data += copy[2:, :-2]
-            height_data += copy[:-2, :-2]
-
-            height_data /= 9
+            height_data = _blurHeightData(height_data)
 
             Job.yieldThread()
 
@@ -127,7 +164,7 @@ class ImageReader(MeshReader):
         height_data += base_height
 
         heightmap_face_count = 2 * height_minus_one * width_minus_one
-        total_face_count = heightmap_face_count + (width_minus_one * 2) * (height_minus_one * 2) + 2
+        total_face_count = heightmap_face_count + 4 * width_minus_one + 4 * height_minus_one + 2
 
         mesh.reserveFaceCount(total_face_count)
 
@@ -157,54 +194,14 @@ class ImageReader(MeshReader):
         heightmap_vertices[:, 2, 1] = heightmap_vertices[:, 3, 1] = height_data[1:, 1:].reshape(-1)
         heightmap_vertices[:, 4, 1] = height_data[:-1, 1:].reshape(-1)
 
-        heightmap_indices = numpy.array(numpy.mgrid[0:heightmap_face_count * 3], dtype=numpy.int32).reshape(-1, 3)
-
-        mesh._vertices[0:(heightmap_vertices.size // 3), :] = heightmap_vertices.reshape(-1, 3)
-        mesh._indices[0:(heightmap_indices.size // 3), :] = heightmap_indices
-
-        mesh._vertex_count = heightmap_vertices.size // 3
-        mesh._face_count = heightmap_indices.size // 3
-
-        geo_width = width_minus_one * texel_width
-        geo_height = height_minus_one * texel_height
-
-        # bottom
-        mesh.addFaceByPoints(0, 0, 0, 0, 0, geo_height, geo_width, 0, geo_height)
-        mesh.addFaceByPoints(geo_width, 0, geo_height, geo_width, 0, 0, 0, 0, 0)
-
-        # north and south walls
-        for n in range(0, width_minus_one):
-            x = n * texel_width
-            nx = (n + 1) * texel_width
-
-            hn0 = height_data[0, n]
-            hn1 = height_data[0, n + 1]
-
-            hs0 = height_data[height_minus_one, n]
-            hs1 = height_data[height_minus_one, n + 1]
-
-            mesh.addFaceByPoints(x, 0, 0, nx, 0, 0, nx, hn1, 0)
-            mesh.addFaceByPoints(nx, hn1, 0, x, hn0, 0, x, 0, 0)
-
-            mesh.addFaceByPoints(x, 0, geo_height, nx, 0, geo_height, nx, hs1, geo_height)
-            mesh.addFaceByPoints(nx, hs1, geo_height, x, hs0, geo_height, x, 0, geo_height)
-
-        # west and east walls
-        for n in range(0, height_minus_one):
-            y = n * texel_height
-            ny = (n + 1) * texel_height
-
-            hw0 = height_data[n, 0]
-            hw1 = height_data[n + 1, 0]
-
-            he0 = height_data[n, width_minus_one]
-            he1 = height_data[n + 1, width_minus_one]
+        vertices = numpy.concatenate([heightmap_vertices.reshape(-1, 3), _createBaseVertices(height_data, texel_width, texel_height)])
+        indices = numpy.arange(total_face_count * 3, dtype = numpy.int32).reshape(-1, 3)
 
-            mesh.addFaceByPoints(0, 0, y, 0, 0, ny, 0, hw1, ny)
-            mesh.addFaceByPoints(0, hw1, ny, 0, hw0, y, 0, 0, y)
+        mesh._vertices[0:vertices.shape[0], :] = vertices
+        mesh._indices[0:indices.shape[0], :] = indices
 
-            mesh.addFaceByPoints(geo_width, 0, y, geo_width, 0, ny, geo_width, he1, ny)
-            mesh.addFaceByPoints(geo_width, he1, ny, geo_width, he0, y, geo_width, 0, y)
+        mesh._vertex_count = vertices.shape[0]
+        mesh._face_count = indices.shape[0]
 
         mesh.calculateNormals(fast=True)
 
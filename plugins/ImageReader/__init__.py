@@ -1,8 +1,9 @@
 
 
-from . import ImageReader
-
 from UM.i18n import i18nCatalog
+
+from steslicer.ReaderWriters.LazyMeshReader import LazyMeshReader
+
 i18n_catalog = i18nCatalog("steslicer")
 
 def getMetaData():
@@ -33,4 +34,9 @@ def getMetaData():
 
 
 def register(app):
-    return {"mesh_reader": ImageReader.ImageReader()}
+    return {"mesh_reader": LazyMeshReader(_createReader, getMetaData()["mesh_reader"])}
+
+
+def _createReader():
+    from . import ImageReader
+    return ImageReader.ImageReader()
@@ -2,7 +2,7 @@
 
 import os
 
-from PyQt5.QtCore import QObject, pyqtSlot, pyqtSignal, pyqtProperty
+from PyQt5.QtCore import QObject, QTimer, pyqtSlot, pyqtSignal, pyqtProperty
 
 from UM.Application import Application
 from UM.Extension import Extension
@@ -15,10 +15,24 @@ from UM.Scene.Iterator.DepthFirstIterator import DepthFirstIterator
 catalog = i18nCatalog("steslicer")
 
 
+##  Warns about models that may not print well with the materials they use.
+#
+#   The checks are kept per node and are only redone for the nodes that a
+#   scene change is about, so moving a model doesn't check the whole scene.
+#   Changes of other nodes, like convex hulls or the camera, are ignored. The
+#   scene is only walked again when models are added or removed, which is
+#   noticed by comparing the children of the root and of groups.
+#   The shrinkage of the materials is kept per extruder and is only read
+#   again when the materials or the printer change. hasWarnings returns what
+#   was found the last time, so reading it doesn't check anything.
 class ModelChecker(QObject, Extension):
     ##  Signal that gets emitted when anything changed that we need to check.
     onChanged = pyqtSignal()
 
+    ShrinkageThreshold = 0.5 #From what shrinkage percentage a warning will be issued about the model size.
+    WarningSizeXY = 150 #The horizontal size of a model that would be too large when dealing with shrinking materials.
+    WarningSizeZ = 100 #The vertical size of a model that would be too large when dealing with shrinking materials.
+
     def __init__(self):
         super().__init__()
 
@@ -28,51 +42,138 @@ class ModelChecker(QObject, Extension):
             lifetime = 0,
             title = catalog.i18nc("@info:title", "3D Model Assistant"))
 
-        Application.getInstance().initializationFinished.connect(self._pluginsInitialized)
-        Application.getInstance().getController().getScene().sceneChanged.connect(self._onChanged)
-        Application.getInstance().globalContainerStackChanged.connect(self._onChanged)
+        self._update_timer = QTimer()
+        self._update_timer.setInterval(100)
+        self._update_timer.setSingleShot(True)
+        self._update_timer.timeout.connect(self._update)
 
-    ##  Pass-through to allow UM.Signal to connect with a pyqtSignal.
-    def _onChanged(self, *args, **kwargs):
-        self.onChanged.emit()
+        self._has_warnings = False
+        self._node_checks = {}  # (node, extruder position, whether it is too large for shrinking materials) of each checked node, by id of the node.
+        self._changed_nodes = {}  # Nodes that changed since the last update, by id of the node.
+        self._needs_full_update = True  # Whether nodes may have been added or removed.
+        self._tracked_children = {}  # Ids of the sliceable nodes and groups in the root and in each group that contains any, by id of the parent.
+        self._material_shrinkage = None  # Shrinkage of the material of each extruder, None if it needs to be read again.
+
+        Application.getInstance().initializationFinished.connect(self._pluginsInitialized)
+        Application.getInstance().getController().getScene().sceneChanged.connect(self._onSceneChanged)
+        Application.getInstance().globalContainerStackChanged.connect(self._onGlobalContainerStackChanged)
+
+    def _onSceneChanged(self, source = None):
+        if self._needs_full_update:
+            pass
+        elif source is None:
+            self._needs_full_update = True
+        elif id(source) in self._tracked_children:
+            if self._getTrackedChildren(source) != self._tracked_children[id(source)]:
+                self._needs_full_update = True  # A model was added to or removed from the scene or a group.
+            elif source.callDecoration("isGroup"):
+                # Changing a group changes the models in it.
+                for node in DepthFirstIterator(source):
+                    if id(node) in self._node_checks:
+                        self._changed_nodes[id(node)] = node
+            else:
+                return  # Something that isn't a model was added to or removed from the root, like a convex hull.
+        elif source.callDecoration("isSliceable"):
+            node_check = self._node_checks.get(id(source))
+            if node_check is None or node_check[0] is not source or source.getParent() is None:
+                self._needs_full_update = True  # A model that wasn't checked yet, or one that was removed.
+            else:
+                self._changed_nodes[id(source)] = source
+        elif source.callDecoration("isGroup"):
+            self._needs_full_update = True  # A new group.
+        else:
+            return  # Convex hulls, the camera and the like don't change the checks.
+        self._update_timer.start()
+
+    ##  The sliceable nodes and groups among the children of a node.
+    @staticmethod
+    def _getTrackedChildren(parent):
+        return {id(child) for child in parent.getChildren() if child.callDecoration("isSliceable") or child.callDecoration("isGroup")}
+
+    ##  The signal doesn't tell which node it is about, so all of them are
+    #   checked again.
+    def _onActiveExtruderChanged(self):
+        self._needs_full_update = True
+        self._update_timer.start()
+
+    def _onGlobalContainerStackChanged(self):
+        self._material_shrinkage = None
+        self._needs_full_update = True
+        self._update_timer.start()
+
+    def _onMaterialChanged(self):
+        self._material_shrinkage = None
+        self._update_timer.start()
 
     ##  Called when plug-ins are initialized.
     #
     #   This makes sure that we listen to changes of the material and that the
     #   button is created that indicates warnings with the current set-up.
     def _pluginsInitialized(self):
-        Application.getInstance().getMachineManager().rootMaterialChanged.connect(self.onChanged)
+        Application.getInstance().getMachineManager().rootMaterialChanged.connect(self._onMaterialChanged)
         self._createView()
+        self._update_timer.start()
 
-    def checkObjectsForShrinkage(self):
-        shrinkage_threshold = 0.5 #From what shrinkage percentage a warning will be issued about the model size.
-        warning_size_xy = 150 #The horizontal size of a model that would be too large when dealing with shrinking materials.
-        warning_size_z = 100 #The vertical size of a model that would be too large when dealing with shrinking materials.
-
+    ##  Checks the nodes that changed and emits onChanged if that changed
+    #   whether there are warnings.
+    def _update(self):
         # This function can be triggered in the middle of a machine change, so do not proceed if the machine change
         # has not done yet.
         global_container_stack = Application.getInstance().getGlobalContainerStack()
         if global_container_stack is None:
-            return False
-
-        material_shrinkage = self._getMaterialShrinkage()
-
-        warning_nodes = []
-
-        # Check node material shrinkage and bounding box size
-        for node in self.sliceableNodes():
-            node_extruder_position = node.callDecoration("getActiveExtruderPosition")
-
+            return
+
+        if self._needs_full_update:
+            self._needs_full_update = False
+            previous_node_checks = self._node_checks
+            self._node_checks = {}
+            scene_root = Application.getInstance().getController().getScene().getRoot()
+            self._tracked_children = {id(scene_root): self._getTrackedChildren(scene_root)}
+            for node in self.sliceableNodes():
+                parent = node.getParent()
+                while parent is not None and id(parent) not in self._tracked_children:
+                    self._tracked_children[id(parent)] = self._getTrackedChildren(parent)
+                    parent = parent.getParent()
+                if id(node) not in previous_node_checks:
+                    active_extruder_changed = node.callDecoration("getActiveExtruderChangedSignal")
+                    if active_extruder_changed is not None:
+                        active_extruder_changed.connect(self._onActiveExtruderChanged)
+                self._checkNode(node)
+        else:
+            for node in self._changed_nodes.values():
+                self._checkNode(node)
+        self._changed_nodes = {}
+
+        for _, node_extruder_position, _ in self._node_checks.values():
             # This function can be triggered in the middle of a machine change, so do not proceed if the machine change
             # has not done yet.
             if str(node_extruder_position) not in global_container_stack.extruders:
-                Application.getInstance().callLater(lambda: self.onChanged.emit())
-                return False
-
-            if material_shrinkage[node_extruder_position] > shrinkage_threshold:
-                bbox = node.getBoundingBox()
-                if bbox.width >= warning_size_xy or bbox.depth >= warning_size_xy or bbox.height >= warning_size_z:
-                    warning_nodes.append(node)
+                self._needs_full_update = True
+                self._material_shrinkage = None
+                self._update_timer.start()
+                return
+
+        if self._material_shrinkage is None:
+            self._material_shrinkage = self._getMaterialShrinkage()
+        self._setHasWarnings(self.checkObjectsForShrinkage())
+
+    ##  Checks the size of a node, which doesn't depend on the material.
+    def _checkNode(self, node):
+        bbox = node.getBoundingBox()
+        is_large = bbox.width >= self.WarningSizeXY or bbox.depth >= self.WarningSizeXY or bbox.height >= self.WarningSizeZ
+        self._node_checks[id(node)] = (node, node.callDecoration("getActiveExtruderPosition"), is_large)
+
+    def _setHasWarnings(self, has_warnings):
+        if has_warnings != self._has_warnings:
+            self._has_warnings = has_warnings
+            self.onChanged.emit()
+
+    ##  Combines the checks of the nodes with the shrinkage of their materials.
+    #
+    #   \return Whether any node may not print well because of shrinkage.
+    def checkObjectsForShrinkage(self):
+        warning_nodes = [node for node, node_extruder_position, is_large in self._node_checks.values()
+                         if is_large and self._material_shrinkage.get(node_extruder_position, 0) > self.ShrinkageThreshold]
 
         self._caution_message.setText(catalog.i18nc(
             "@info:status",
@@ -105,8 +206,7 @@ class ModelChecker(QObject, Extension):
 
     @pyqtProperty(bool, notify = onChanged)
     def hasWarnings(self):
-        danger_shrinkage = self.checkObjectsForShrinkage()
-        return any((danger_shrinkage, )) #If any of the checks fail, show the warning button.
+        return self._has_warnings
 
     @pyqtSlot()
     def showWarnings(self):
@@ -3,6 +3,7 @@
 
 from math import pi, sin, cos, sqrt
 from typing import Dict
+import warnings
 
 import numpy
 
@@ -26,6 +27,13 @@ except ImportError:
 
 DEFAULT_SUBDIV = 16 # Default subdivision factor for spheres, cones, and cylinders
 EPSILON = 0.000001
+CONVEX_SINE = 0.001 # Smallest sine of a corner for a quad to count as convex
+PLANAR_COSINE = 0.999 # Smallest cosine between the normals of the corners for a quad to count as flat
+
+# For a quad with its first ear at the corner in the row, the corners of the ear
+# and of the triangle that remains; see X3DReader.addFace
+QUAD_EARS = numpy.array(((3, 0, 1), (0, 1, 2), (1, 2, 3), (2, 3, 0)))
+QUAD_REMAINDERS = numpy.array(((1, 2, 3), (0, 2, 3), (0, 1, 3), (0, 1, 2)))
 
 
 class Shape:
@@ -356,7 +364,7 @@ class X3DReader(MeshReader):
         dz = readFloat(node, "zSpacing", 1)
         nx = readInt(node, "xDimension", 0)
         nz = readInt(node, "zDimension", 0)
-        height = readFloatArray(node, "height", False)
+        height = readFloatNumpyArray(node, "height")
         ccw = readBoolean(node, "ccw", True)
 
         if nx <= 0 or nz <= 0 or len(height) < nx*nz:
@@ -364,14 +372,17 @@ class X3DReader(MeshReader):
 
         self.reserveFaceAndVertexCount(2*(nx-1)*(nz-1), nx*nz)
 
-        for z in range(nz):
-            for x in range(nx):
-                self.addVertex(x * dx, height[z*nx + x], z * dz)
+        # Vertices go by row along z, then along x
+        self.verts[0] = numpy.tile(numpy.arange(nx), nz) * dx
+        self.verts[1] = height[:nx*nz]
+        self.verts[2] = numpy.repeat(numpy.arange(nz), nx) * dz
+        self.num_verts = nx*nz
 
-        for z in range(1, nz):
-            for x in range(1, nx):
-                self.addTriFlip((z - 1)*nx + x - 1, z*nx + x, (z - 1)*nx + x, ccw)
-                self.addTriFlip((z - 1)*nx + x - 1, z*nx + x - 1, z*nx + x, ccw)
+        # The vertex at the -x, -z corner of every cell
+        corners = (numpy.arange(nz - 1)[:, None] * nx + numpy.arange(nx - 1)).reshape(-1)
+        cells = numpy.stack((corners, corners + nx + 1, corners + 1,
+                             corners, corners + nx, corners + nx + 1), axis = 1).reshape(-1, 3)
+        self.addTris(flipTris(cells, not ccw))
 
     def processGeometryExtrusion(self, node):
         ccw = readBoolean(node, "ccw", True)
@@ -549,72 +560,56 @@ class X3DReader(MeshReader):
 
 
     def processGeometryIndexedTriangleSet(self, node):
-        index = readIntArray(node, "index", [])
+        index = readIntNumpyArray(node, "index")
         num_faces = len(index) // 3
-        ccw = int(self.startCoordMesh(node, num_faces))
+        ccw = self.startCoordMesh(node, num_faces)
 
-        for i in range(0, num_faces*3, 3):
-            self.addTri(index[i + 1 - ccw], index[i + ccw], index[i+2])
+        self.addTris(flipTris(index[:num_faces*3].reshape(-1, 3), not ccw))
 
     def processGeometryIndexedTriangleStripSet(self, node):
-        strips = readIndex(node, "index")
-        ccw = int(self.startCoordMesh(node, sum([len(strip) - 2 for strip in strips])))
+        index, counts = readIndexRuns(node, "index")
+        ccw = self.startCoordMesh(node, countTriangles(counts))
 
-        for strip in strips:
-            sccw = ccw # Running CCW value, reset for each strip
-            for i in range(len(strip) - 2):
-                self.addTri(strip[i + 1 - sccw], strip[i + sccw], strip[i+2])
-                sccw = 1 - sccw
+        self.addTris(triangulateStrips(index, counts, ccw))
 
     def processGeometryIndexedTriangleFanSet(self, node):
-        fans = readIndex(node, "index")
-        ccw = int(self.startCoordMesh(node, sum([len(fan) - 2 for fan in fans])))
+        index, counts = readIndexRuns(node, "index")
+        ccw = self.startCoordMesh(node, countTriangles(counts))
 
-        for fan in fans:
-            for i in range(1, len(fan) - 1):
-                self.addTri(fan[0], fan[i + 1 - ccw], fan[i + ccw])
+        self.addTris(triangulateFans(index, counts, ccw))
 
     def processGeometryTriangleSet(self, node):
-        ccw = int(self.startCoordMesh(node, lambda num_vert: num_vert // 3))
-        for i in range(0, self.getVertexCount(), 3):
-            self.addTri(i + 1 - ccw, i + ccw, i+2)
+        ccw = self.startCoordMesh(node, lambda num_vert: num_vert // 3)
+        num_faces = self.getVertexCount() // 3
+
+        self.addTris(flipTris(numpy.arange(num_faces*3).reshape(-1, 3), not ccw))
 
     def processGeometryTriangleStripSet(self, node):
-        strips = readIntArray(node, "stripCount", [])
-        ccw = int(self.startCoordMesh(node, sum([n-2 for n in strips])))
+        counts = readIntNumpyArray(node, "stripCount")
+        ccw = self.startCoordMesh(node, countTriangles(counts))
 
-        vb = 0
-        for n in strips:
-            sccw = ccw
-            for i in range(n-2):
-                self.addTri(vb + i + 1 - sccw, vb + i + sccw, vb + i + 2)
-                sccw = 1 - sccw
-            vb += n
+        self.addTris(triangulateStrips(numpy.arange(counts.sum()), counts, ccw))
 
     def processGeometryTriangleFanSet(self, node):
-        fans = readIntArray(node, "fanCount", [])
-        ccw = int(self.startCoordMesh(node, sum([n-2 for n in fans])))
+        counts = readIntNumpyArray(node, "fanCount")
+        ccw = self.startCoordMesh(node, countTriangles(counts))
 
-        vb = 0
-        for n in fans:
-            for i in range(1, n-1):
-                self.addTri(vb, vb + i + 1 - ccw, vb + i + ccw)
-            vb += n
+        self.addTris(triangulateFans(numpy.arange(counts.sum()), counts, ccw))
 
     # Quad geometries from the CAD module, might be relevant for printing
 
     def processGeometryQuadSet(self, node):
         ccw = self.startCoordMesh(node, lambda num_vert: 2*(num_vert // 4))
-        for i in range(0, self.getVertexCount(), 4):
-            self.addQuadFlip(i, i+1, i+2, i+3, ccw)
+        num_quads = self.getVertexCount() // 4
+
+        self.addTris(triangulateQuads(numpy.arange(num_quads*4).reshape(-1, 4), ccw))
 
     def processGeometryIndexedQuadSet(self, node):
-        index = readIntArray(node, "index", [])
+        index = readIntNumpyArray(node, "index")
         num_quads = len(index) // 4
         ccw = self.startCoordMesh(node, num_quads*2)
 
-        for i in range(0, num_quads*4, 4):
-            self.addQuadFlip(index[i], index[i+1], index[i+2], index[i+3], ccw)
+        self.addTris(triangulateQuads(index[:num_quads*4].reshape(-1, 4), ccw))
 
     # 2D polygon geometries
     # Won't work for now, since Cura expects every mesh to have a nontrivial convex hull
@@ -667,15 +662,23 @@ class X3DReader(MeshReader):
 
     # General purpose polygon mesh
 
+    # Triangles and convex quads are done all at once, other polygons one by one
     def processGeometryIndexedFaceSet(self, node):
-        faces = readIndex(node, "coordIndex")
-        ccw = self.startCoordMesh(node, sum([len(face) - 2 for face in faces]))
+        index, counts = readIndexRuns(node, "coordIndex")
+        ccw = self.startCoordMesh(node, countTriangles(counts))
+        starts = numpy.cumsum(counts) - counts
 
-        for face in faces:
-            if len(face) == 3:
-                self.addTriFlip(face[0], face[1], face[2], ccw)
-            elif len(face) > 3:
-                self.addFace(face, ccw)
+        tris = index[starts[counts == 3][:, None] + numpy.arange(3)]
+        self.addTris(flipTris(tris, not ccw))
+
+        quads = index[starts[counts == 4][:, None] + numpy.arange(4)]
+        convex, quad_tris = triangulateConvexQuads(self.verts[:3].transpose(), quads)
+        self.addTris(flipTris(quad_tris, not ccw))
+
+        for face in quads[~convex].tolist():
+            self.addFace(face, ccw)
+        for start, count in zip(starts[counts > 4].tolist(), counts[counts > 4].tolist()):
+            self.addFace(index[start:start + count].tolist(), ccw)
 
     geometry_importers = {
         "IndexedFaceSet": processGeometryIndexedFaceSet,
@@ -710,13 +713,12 @@ class X3DReader(MeshReader):
                         # be separated by commas or whitespace as per spec of
                         # XML encoding of X3D
                         # Ref  ISO/IEC 19776-1:2015 : Section 5.1.2
-                        co = [float(x) for vec in pt.split(',') for x in vec.split()]
+                        co = parseNumpyArray(pt.replace(",", " "), numpy.float32, float)
                         num_verts = len(co) // 3
                         self.verts = numpy.empty((4, num_verts), dtype=numpy.float32)
                         self.verts[3,:] = numpy.ones((num_verts), dtype=numpy.float32)
                         # Group by three
-                        for i in range(num_verts):
-                            self.verts[:3,i] = co[3*i:3*i+3]
+                        self.verts[:3,:] = co[:num_verts*3].reshape(-1, 3).transpose()
 
     # Mesh builder helpers
 
@@ -747,6 +749,12 @@ class X3DReader(MeshReader):
         self.faces[self.num_faces, 2] = self.index_base + c
         self.num_faces += 1
 
+    # Adds many triangles at once, as an n by 3 array
+    def addTris(self, tris):
+        num_tris = len(tris)
+        self.faces[self.num_faces:self.num_faces + num_tris] = self.index_base + tris
+        self.num_faces += num_tris
+
     def addTriFlip(self, a, b, c, ccw):
         if ccw:
             self.addTri(a, b, c)
@@ -861,21 +869,99 @@ def readRotation(node, attr, default):
     v = readFloatArray(node, attr, default)
     return (v[3], Vector(v[0], v[1], v[2]))
 
-# Returns the -1-separated runs
-def readIndex(node, attr):
-    v = readIntArray(node, attr, [])
-    chunks = []
-    chunk = []
-    for i in range(len(v)):
-        if v[i] == -1:
-            if chunk:
-                chunks.append(chunk)
-                chunk = []
-        else:
-            chunk.append(v[i])
-    if chunk:
-        chunks.append(chunk)
-    return chunks
+# Parses whitespace separated numbers in one go. Falls back to parsing them
+# one by one for what numpy doesn't read, like hexadecimal integers.
+def parseNumpyArray(s, dtype, parse):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning) # Raised by numpy for data it can't read
+        try:
+            return numpy.fromstring(s, dtype=dtype, sep=" ")
+        except (DeprecationWarning, ValueError):
+            pass
+    return numpy.array([parse(x) for x in s.split()], dtype=dtype)
+
+def readFloatNumpyArray(node, attr):
+    return parseNumpyArray(node.attrib.get(attr, ""), numpy.float32, float)
+
+def readIntNumpyArray(node, attr):
+    return parseNumpyArray(node.attrib.get(attr, ""), numpy.int64, lambda x: int(x, 0))
+
+# Returns the -1-separated runs, as the indices without the -1s and the
+# lengths of the runs
+def readIndexRuns(node, attr):
+    v = readIntNumpyArray(node, attr)
+    separators = v == -1
+    run_ids = numpy.cumsum(separators)[~separators]
+    counts = numpy.bincount(run_ids) if len(run_ids) else numpy.zeros(0, dtype=numpy.int64)
+    return v[~separators], counts[counts > 0]
+
+# ------------------------------------------------------------
+# Triangulation of index arrays
+# ------------------------------------------------------------
+
+# The number of triangles in strips, fans or polygons of the given lengths
+def countTriangles(counts):
+    return int(numpy.maximum(counts - 2, 0).sum())
+
+# Swaps the first two vertices of the triangles where flip is set, like addTriFlip
+def flipTris(tris, flip):
+    tris = numpy.array(tris, dtype=numpy.int64).reshape(-1, 3)
+    flip = numpy.broadcast_to(flip, (len(tris),))
+    tris[flip, :2] = tris[flip, 1::-1]
+    return tris
+
+# For runs of the given lengths stored back to back, returns where the first
+# vertex of every triangle is and its position within its run
+def runTriangleStarts(counts):
+    num_tris = numpy.maximum(counts - 2, 0)
+    run_starts = numpy.cumsum(counts) - counts
+    local = numpy.arange(num_tris.sum()) - numpy.repeat(numpy.cumsum(num_tris) - num_tris, num_tris)
+    return numpy.repeat(run_starts, num_tris) + local, local
+
+# Every other triangle in a strip is flipped, starting from the ccw setting for each strip
+def triangulateStrips(index, counts, ccw):
+    starts, local = runTriangleStarts(counts)
+    tris = index[starts[:, None] + numpy.arange(3)]
+    return flipTris(tris, local % 2 == int(ccw))
+
+def triangulateFans(index, counts, ccw):
+    starts, local = runTriangleStarts(counts)
+    tris = index[numpy.stack((starts - local, starts + 1, starts + 2), axis=1)]
+    if not ccw:
+        tris[:, 1:] = tris[:, :0:-1]
+    return tris
+
+# Cut along the ac diagonal, like addQuadFlip
+def triangulateQuads(quads, ccw):
+    if ccw:
+        order = (0, 1, 2, 2, 3, 0)
+    else:
+        order = (0, 2, 1, 2, 0, 3)
+    return quads[:, order].reshape(-1, 3)
+
+# Triangulates the quads that are clearly convex, with the same triangles as
+# X3DReader.addFace: the corner with the smallest angle under 90 degrees is cut
+# off first, and the first corner if there's no such angle.
+# Returns which quads are convex, and the triangles of those
+def triangulateConvexQuads(coords, quads):
+    corners = coords[quads].astype(numpy.float64)
+    next = numpy.roll(corners, -1, axis=1) - corners
+    prev = numpy.roll(corners, 1, axis=1) - corners
+    crosses = numpy.cross(next, prev)
+    normals = crosses.sum(axis=1, keepdims=True)
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        lengths = numpy.linalg.norm(next, axis=2) * numpy.linalg.norm(prev, axis=2)
+        cross_lengths = numpy.linalg.norm(crosses, axis=2)
+        alignments = (crosses * normals).sum(axis=2) / (cross_lengths * numpy.linalg.norm(normals, axis=2))
+        cosines = (next * prev).sum(axis=2) / lengths
+    # Every corner turns the same way, sharply enough, in about the same plane
+    convex = numpy.all((cross_lengths > CONVEX_SINE * lengths) & (alignments > PLANAR_COSINE), axis=1)
+
+    ears = numpy.argmax(numpy.where(cosines > EPSILON, cosines, EPSILON)[convex], axis=1)
+    quads = quads[convex]
+    tris = numpy.stack((numpy.take_along_axis(quads, QUAD_EARS[ears], axis=1),
+                        numpy.take_along_axis(quads, QUAD_REMAINDERS[ears], axis=1)), axis=1)
+    return convex, tris.reshape(-1, 3)
 
 # Given a face as a sequence of vectors, returns a normal to the polygon place that forms a right triple
 # with a vector along the polygon sequence and a vector backwards
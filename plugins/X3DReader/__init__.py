@@ -1,8 +1,9 @@
 # Seva Alekseyev with National Institutes of Health, 2016
 
-from . import X3DReader
-
 from UM.i18n import i18nCatalog
+
+from steslicer.ReaderWriters.LazyMeshReader import LazyMeshReader
+
 catalog = i18nCatalog("steslicer")
 
 def getMetaData():
@@ -17,4 +18,9 @@ def getMetaData():
 
 
 def register(app):
-    return {"mesh_reader": X3DReader.X3DReader()}
+    return {"mesh_reader": LazyMeshReader(_createReader, getMetaData()["mesh_reader"])}
+
+
+def _createReader():
+    from . import X3DReader
+    return X3DReader.X3DReader()
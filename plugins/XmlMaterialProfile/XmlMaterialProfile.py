@@ -5,7 +5,7 @@ import io
 import json #To parse the product-to-id mapping file.
 import os.path #To find the product-to-id mapping.
 import sys
-from typing import Any, Dict, List, Optional, Tuple, cast
+from typing import Any, Callable, Dict, List, Optional, Tuple, cast
 import xml.etree.ElementTree as ET
 
 from UM.Resources import Resources
@@ -17,6 +17,7 @@ from UM.ConfigurationErrorMessage import ConfigurationErrorMessage
 
 from steslicer.SteSlicerApplication import SteSlicerApplication
 from steslicer.Machines.VariantType import VariantType
+from steslicer.Settings.MaterialCache import MaterialCache
 
 from .XmlMaterialValidator import XmlMaterialValidator
 
@@ -26,6 +27,9 @@ class XmlMaterialProfile(InstanceContainer):
     CurrentFdmMaterialVersion = "1.3"
     Version = 1
 
+    _material_cache = None  # type: Optional[MaterialCache]
+    _product_id_map = None  # type: Optional[Dict[str, List[str]]]
+
     def __init__(self, container_id, *args, **kwargs):
         super().__init__(container_id, *args, **kwargs)
         self._inherited_files = []
@@ -476,171 +480,44 @@ class XmlMaterialProfile(InstanceContainer):
         from UM.Settings.Interfaces import ContainerInterface
         serialized = ContainerInterface.deserialize(self, serialized, file_name)
 
-        try:
-            data = ET.fromstring(serialized)
-        except:
-            Logger.logException("e", "An exception occurred while parsing the material profile")
+        parsed = self._getParsed("profile", self.getId(), serialized, self._parseProfile)
+        if parsed is None:
             return
 
         # Reset previous metadata
         old_id = self.getId()
         self.clearData() # Ensure any previous data is gone.
-        meta_data = {}
-        meta_data["type"] = "material"
+        meta_data = parsed["metadata"]
         meta_data["base_file"] = self.getId()
-        meta_data["status"] = "unknown"  # TODO: Add material verification
         meta_data["id"] = old_id
         meta_data["container_type"] = XmlMaterialProfile
 
-        common_setting_values = {}
-
-        inherits = data.find("./um:inherits", self.__namespaces)
-        if inherits is not None:
-            inherited = self._resolveInheritance(inherits.text)
-            data = self._mergeXML(inherited, data)
-
-        # set setting_version in metadata
-        if "version" in data.attrib:
-            meta_data["setting_version"] = self.xmlVersionToSettingVersion(data.attrib["version"])
-        else:
-            meta_data["setting_version"] = self.xmlVersionToSettingVersion("1.2") #1.2 and lower didn't have that version number there yet.
-
-        meta_data["name"] = "Unknown Material" #In case the name tag is missing.
-        for entry in data.iterfind("./um:metadata/*", self.__namespaces):
-            tag_name = _tag_without_namespace(entry)
-
-            if tag_name == "name":
-                brand = entry.find("./um:brand", self.__namespaces)
-                material = entry.find("./um:material", self.__namespaces)
-                color = entry.find("./um:color", self.__namespaces)
-                label = entry.find("./um:label", self.__namespaces)
-
-                if label is not None and label.text is not None:
-                    meta_data["name"] = label.text
-                else:
-                    meta_data["name"] = self._profile_name(material.text, color.text)
-
-                meta_data["brand"] = brand.text if brand.text is not None else "Unknown Brand"
-                meta_data["material"] = material.text if material.text is not None else "Unknown Type"
-                meta_data["color_name"] = color.text if color.text is not None else "Unknown Color"
-                continue
-
-            # setting_version is derived from the "version" tag in the schema earlier, so don't set it here
-            if tag_name == "setting_version":
-                continue
-
-            meta_data[tag_name] = entry.text
-
-            if tag_name in self.__material_metadata_setting_map:
-                common_setting_values[self.__material_metadata_setting_map[tag_name]] = entry.text
-
-        if "description" not in meta_data:
-            meta_data["description"] = ""
-
-        if "adhesion_info" not in meta_data:
-            meta_data["adhesion_info"] = ""
-
-        validation_message = XmlMaterialValidator.validateMaterialMetaData(meta_data)
-        if validation_message is not None:
+        if parsed["validation_message"] is not None:
             ConfigurationErrorMessage.getInstance().addFaultyContainers(self.getId())
-            Logger.log("e", "Not a valid material profile: {message}".format(message = validation_message))
+            Logger.log("e", "Not a valid material profile: {message}".format(message = parsed["validation_message"]))
             return
 
-        property_values = {}
-        properties = data.iterfind("./um:properties/*", self.__namespaces)
-        for entry in properties:
-            tag_name = _tag_without_namespace(entry)
-            property_values[tag_name] = entry.text
-
-            if tag_name in self.__material_properties_setting_map:
-                common_setting_values[self.__material_properties_setting_map[tag_name]] = entry.text
-
-        meta_data["approximate_diameter"] = str(round(float(property_values.get("diameter", 2.85)))) # In mm
-        meta_data["properties"] = property_values
-        meta_data["definition"] = "fdmprinter"
-
-        common_compatibility = True
-        settings = data.iterfind("./um:settings/um:setting", self.__namespaces)
-        for entry in settings:
-            key = entry.get("key")
-            if key in self.__material_settings_setting_map:
-                if key == "processing temperature graph": #This setting has no setting text but subtags.
-                    graph_nodes = entry.iterfind("./um:point", self.__namespaces)
-                    graph_points = []
-                    for graph_node in graph_nodes:
-                        flow = float(graph_node.get("flow"))
-                        temperature = float(graph_node.get("temperature"))
-                        graph_points.append([flow, temperature])
-                    common_setting_values[self.__material_settings_setting_map[key]] = str(graph_points)
-                else:
-                    common_setting_values[self.__material_settings_setting_map[key]] = entry.text
-            elif key in self.__unmapped_settings:
-                if key == "hardware compatible":
-                    common_compatibility = self._parseCompatibleValue(entry.text)
-
-        # Add namespaced Cura-specific settings
-        settings = data.iterfind("./um:settings/cura:setting", self.__namespaces)
-        for entry in settings:
-            value = entry.text
-            if value.lower() == "yes":
-                value = True
-            elif value.lower() == "no":
-                value = False
-            key = entry.get("key")
-            common_setting_values[key] = value
+        common_setting_values = parsed["common_setting_values"]
+        common_compatibility = meta_data["compatible"]
 
         self._cached_values = common_setting_values # from InstanceContainer ancestor
 
-        meta_data["compatible"] = common_compatibility
         self.setMetaData(meta_data)
         self._dirty = False
 
         # Map machine human-readable names to IDs
         product_id_map = self.getProductIdMap()
 
-        machines = data.iterfind("./um:settings/um:machine", self.__namespaces)
-        for machine in machines:
-            machine_compatibility = common_compatibility
-            machine_setting_values = {}
-            settings = machine.iterfind("./um:setting", self.__namespaces)
-            for entry in settings:
-                key = entry.get("key")
-                if key in self.__material_settings_setting_map:
-                    if key == "processing temperature graph": #This setting has no setting text but subtags.
-                        graph_nodes = entry.iterfind("./um:point", self.__namespaces)
-                        graph_points = []
-                        for graph_node in graph_nodes:
-                            flow = float(graph_node.get("flow"))
-                            temperature = float(graph_node.get("temperature"))
-                            graph_points.append([flow, temperature])
-                        machine_setting_values[self.__material_settings_setting_map[key]] = str(graph_points)
-                    else:
-                        machine_setting_values[self.__material_settings_setting_map[key]] = entry.text
-                elif key in self.__unmapped_settings:
-                    if key == "hardware compatible":
-                        machine_compatibility = self._parseCompatibleValue(entry.text)
-                else:
-                    Logger.log("d", "Unsupported material setting %s", key)
-
-            # Add namespaced Cura-specific settings
-            settings = machine.iterfind("./cura:setting", self.__namespaces)
-            for entry in settings:
-                value = entry.text
-                if value.lower() == "yes":
-                    value = True
-                elif value.lower() == "no":
-                    value = False
-                key = entry.get("key")
-                machine_setting_values[key] = value
+        for machine in parsed["machines"]:
+            machine_compatibility = machine["compatibility"]
 
             cached_machine_setting_properties = common_setting_values.copy()
-            cached_machine_setting_properties.update(machine_setting_values)
+            cached_machine_setting_properties.update(machine["setting_values"])
 
-            identifiers = machine.iterfind("./um:machine_identifier", self.__namespaces)
-            for identifier in identifiers:
-                machine_id_list = product_id_map.get(identifier.get("product"), [])
+            for product, manufacturer in machine["identifiers"]:
+                machine_id_list = product_id_map.get(product, [])
                 if not machine_id_list:
-                    machine_id_list = self.getPossibleDefinitionIDsFromName(identifier.get("product"))
+                    machine_id_list = self.getPossibleDefinitionIDsFromName(product)
 
                 for machine_id in machine_id_list:
                     definitions = ContainerRegistry.getInstance().findDefinitionContainersMetadata(id = machine_id)
@@ -649,7 +526,7 @@ class XmlMaterialProfile(InstanceContainer):
 
                     definition = definitions[0]
 
-                    machine_manufacturer = identifier.get("manufacturer", definition.get("manufacturer", "Unknown")) #If the XML material doesn't specify a manufacturer, use the one in the actual printer definition.
+                    machine_manufacturer = manufacturer if manufacturer is not None else definition.get("manufacturer", "Unknown") #If the XML material doesn't specify a manufacturer, use the one in the actual printer definition.
 
                     # Always create the instance of the material even if it is not compatible, otherwise it will never
                     # show as incompatible if the material profile doesn't define hotends in the machine - CURA-5444
@@ -683,23 +560,16 @@ class XmlMaterialProfile(InstanceContainer):
                         containers_to_add.append(new_material)
 
                     # Find the buildplates compatibility
-                    buildplates = machine.iterfind("./um:buildplate", self.__namespaces)
                     buildplate_map = {}
                     buildplate_map["buildplate_compatible"] = {}
                     buildplate_map["buildplate_recommended"] = {}
-                    for buildplate in buildplates:
-                        buildplate_id = buildplate.get("id")
-                        if buildplate_id is None:
-                            continue
-
+                    for buildplate_id, buildplate_unmapped_settings_dict in machine["buildplates"]:
                         variant_manager = SteSlicerApplication.getInstance().getVariantManager()
                         variant_node = variant_manager.getVariantNode(machine_id, buildplate_id,
                                                                       variant_type = VariantType.BUILD_PLATE)
                         if not variant_node:
                             continue
 
-                        _, buildplate_unmapped_settings_dict = self._getSettingsDictForNode(buildplate)
-
                         buildplate_compatibility = buildplate_unmapped_settings_dict.get("hardware compatible",
                                                                                          machine_compatibility)
                         buildplate_recommended = buildplate_unmapped_settings_dict.get("hardware recommended",
@@ -708,19 +578,12 @@ class XmlMaterialProfile(InstanceContainer):
                         buildplate_map["buildplate_compatible"][buildplate_id] = buildplate_compatibility
                         buildplate_map["buildplate_recommended"][buildplate_id] = buildplate_recommended
 
-                    hotends = machine.iterfind("./um:hotend", self.__namespaces)
-                    for hotend in hotends:
-                        # The "id" field for hotends in material profiles is actually name
-                        hotend_name = hotend.get("id")
-                        if hotend_name is None:
-                            continue
-
+                    for hotend_name, hotend_mapped_settings, hotend_unmapped_settings, hotend_buildplates in machine["hotends"]:
                         variant_manager = SteSlicerApplication.getInstance().getVariantManager()
                         variant_node = variant_manager.getVariantNode(machine_id, hotend_name, VariantType.NOZZLE)
                         if not variant_node:
                             continue
 
-                        hotend_mapped_settings, hotend_unmapped_settings = self._getSettingsDictForNode(hotend)
                         hotend_compatibility = hotend_unmapped_settings.get("hardware compatible", machine_compatibility)
 
                         # Generate container ID for the hotend-specific material container
@@ -760,19 +623,12 @@ class XmlMaterialProfile(InstanceContainer):
                         #
                         # Build plates in hotend
                         #
-                        buildplates = hotend.iterfind("./um:buildplate", self.__namespaces)
-                        for buildplate in buildplates:
-                            # The "id" field for buildplate in material profiles is actually name
-                            buildplate_name = buildplate.get("id")
-                            if buildplate_name is None:
-                                continue
-
+                        for buildplate_name, buildplate_mapped_settings, buildplate_unmapped_settings in hotend_buildplates:
                             variant_manager = SteSlicerApplication.getInstance().getVariantManager()
                             variant_node = variant_manager.getVariantNode(machine_id, buildplate_name, VariantType.BUILD_PLATE)
                             if not variant_node:
                                 continue
 
-                            buildplate_mapped_settings, buildplate_unmapped_settings = self._getSettingsDictForNode(buildplate)
                             buildplate_compatibility = buildplate_unmapped_settings.get("hardware compatible",
                                                                                         buildplate_map["buildplate_compatible"])
                             buildplate_recommended = buildplate_unmapped_settings.get("hardware recommended",
@@ -819,6 +675,221 @@ class XmlMaterialProfile(InstanceContainer):
         for container_to_add in containers_to_add:
             ContainerRegistry.getInstance().addContainer(container_to_add)
 
+    ##  Parses the parts of a material profile that deserialize needs and that
+    #   don't depend on the printers that are installed, with the inherited
+    #   profiles merged in.
+    #   \return The metadata of the material without its ID, the common setting
+    #   values, and for each machine its setting values, compatibility,
+    #   (product, manufacturer) identifiers, buildplates and hotends. None if
+    #   the profile can't be parsed.
+    def _parseProfile(self, serialized: str) -> Optional[Dict[str, Any]]:
+        try:
+            data = ET.fromstring(serialized)
+        except:
+            Logger.logException("e", "An exception occurred while parsing the material profile")
+            return None
+
+        meta_data = {}
+        meta_data["type"] = "material"
+        meta_data["status"] = "unknown"  # TODO: Add material verification
+
+        common_setting_values = {}
+
+        inherits = data.find("./um:inherits", self.__namespaces)
+        if inherits is not None:
+            inherited = self._resolveInheritance(inherits.text)
+            data = self._mergeXML(inherited, data)
+
+        # set setting_version in metadata
+        if "version" in data.attrib:
+            meta_data["setting_version"] = self.xmlVersionToSettingVersion(data.attrib["version"])
+        else:
+            meta_data["setting_version"] = self.xmlVersionToSettingVersion("1.2") #1.2 and lower didn't have that version number there yet.
+
+        meta_data["name"] = "Unknown Material" #In case the name tag is missing.
+        for entry in data.iterfind("./um:metadata/*", self.__namespaces):
+            tag_name = _tag_without_namespace(entry)
+
+            if tag_name == "name":
+                brand = entry.find("./um:brand", self.__namespaces)
+                material = entry.find("./um:material", self.__namespaces)
+                color = entry.find("./um:color", self.__namespaces)
+                label = entry.find("./um:label", self.__namespaces)
+
+                if label is not None and label.text is not None:
+                    meta_data["name"] = label.text
+                else:
+                    meta_data["name"] = self._profile_name(material.text, color.text)
+
+                meta_data["brand"] = brand.text if brand.text is not None else "Unknown Brand"
+                meta_data["material"] = material.text if material.text is not None else "Unknown Type"
+                meta_data["color_name"] = color.text if color.text is not None else "Unknown Color"
+                continue
+
+            # setting_version is derived from the "version" tag in the schema earlier, so don't set it here
+            if tag_name == "setting_version":
+                continue
+
+            meta_data[tag_name] = entry.text
+
+            if tag_name in self.__material_metadata_setting_map:
+                common_setting_values[self.__material_metadata_setting_map[tag_name]] = entry.text
+
+        if "description" not in meta_data:
+            meta_data["description"] = ""
+
+        if "adhesion_info" not in meta_data:
+            meta_data["adhesion_info"] = ""
+
+        # Materials that inherit depend on other files, which the material cache doesn't check.
+        parsed = {"metadata": meta_data, "validation_message": None, "cacheable": inherits is None}
+
+        validation_message = XmlMaterialValidator.validateMaterialMetaData(meta_data)
+        if validation_message is not None:
+            parsed["validation_message"] = validation_message
+            return parsed
+
+        property_values = {}
+        properties = data.iterfind("./um:properties/*", self.__namespaces)
+        for entry in properties:
+            tag_name = _tag_without_namespace(entry)
+            property_values[tag_name] = entry.text
+
+            if tag_name in self.__material_properties_setting_map:
+                common_setting_values[self.__material_properties_setting_map[tag_name]] = entry.text
+
+        meta_data["approximate_diameter"] = str(round(float(property_values.get("diameter", 2.85)))) # In mm
+        meta_data["properties"] = property_values
+        meta_data["definition"] = "fdmprinter"
+
+        common_compatibility = True
+        settings = data.iterfind("./um:settings/um:setting", self.__namespaces)
+        for entry in settings:
+            key = entry.get("key")
+            if key in self.__material_settings_setting_map:
+                if key == "processing temperature graph": #This setting has no setting text but subtags.
+                    graph_nodes = entry.iterfind("./um:point", self.__namespaces)
+                    graph_points = []
+                    for graph_node in graph_nodes:
+                        flow = float(graph_node.get("flow"))
+                        temperature = float(graph_node.get("temperature"))
+                        graph_points.append([flow, temperature])
+                    common_setting_values[self.__material_settings_setting_map[key]] = str(graph_points)
+                else:
+                    common_setting_values[self.__material_settings_setting_map[key]] = entry.text
+            elif key in self.__unmapped_settings:
+                if key == "hardware compatible":
+                    common_compatibility = self._parseCompatibleValue(entry.text)
+
+        # Add namespaced Cura-specific settings
+        settings = data.iterfind("./um:settings/cura:setting", self.__namespaces)
+        for entry in settings:
+            value = entry.text
+            if value.lower() == "yes":
+                value = True
+            elif value.lower() == "no":
+                value = False
+            key = entry.get("key")
+            common_setting_values[key] = value
+
+        meta_data["compatible"] = common_compatibility
+        parsed["common_setting_values"] = common_setting_values
+
+        machines = []
+        for machine in data.iterfind("./um:settings/um:machine", self.__namespaces):
+            machine_compatibility = common_compatibility
+            machine_setting_values = {}
+            settings = machine.iterfind("./um:setting", self.__namespaces)
+            for entry in settings:
+                key = entry.get("key")
+                if key in self.__material_settings_setting_map:
+                    if key == "processing temperature graph": #This setting has no setting text but subtags.
+                        graph_nodes = entry.iterfind("./um:point", self.__namespaces)
+                        graph_points = []
+                        for graph_node in graph_nodes:
+                            flow = float(graph_node.get("flow"))
+                            temperature = float(graph_node.get("temperature"))
+                            graph_points.append([flow, temperature])
+                        machine_setting_values[self.__material_settings_setting_map[key]] = str(graph_points)
+                    else:
+                        machine_setting_values[self.__material_settings_setting_map[key]] = entry.text
+                elif key in self.__unmapped_settings:
+                    if key == "hardware compatible":
+                        machine_compatibility = self._parseCompatibleValue(entry.text)
+                else:
+                    Logger.log("d", "Unsupported material setting %s", key)
+
+            # Add namespaced Cura-specific settings
+            settings = machine.iterfind("./cura:setting", self.__namespaces)
+            for entry in settings:
+                value = entry.text
+                if value.lower() == "yes":
+                    value = True
+                elif value.lower() == "no":
+                    value = False
+                key = entry.get("key")
+                machine_setting_values[key] = value
+
+            identifiers = [(identifier.get("product"), identifier.get("manufacturer"))
+                           for identifier in machine.iterfind("./um:machine_identifier", self.__namespaces)]
+
+            buildplates = []
+            for buildplate in machine.iterfind("./um:buildplate", self.__namespaces):
+                buildplate_id = buildplate.get("id")
+                if buildplate_id is None:
+                    continue
+
+                _, buildplate_unmapped_settings_dict = self._getSettingsDictForNode(buildplate)
+                buildplates.append((buildplate_id, buildplate_unmapped_settings_dict))
+
+            hotends = []
+            for hotend in machine.iterfind("./um:hotend", self.__namespaces):
+                # The "id" field for hotends in material profiles is actually name
+                hotend_name = hotend.get("id")
+                if hotend_name is None:
+                    continue
+
+                hotend_mapped_settings, hotend_unmapped_settings = self._getSettingsDictForNode(hotend)
+
+                hotend_buildplates = []
+                for buildplate in hotend.iterfind("./um:buildplate", self.__namespaces):
+                    # The "id" field for buildplate in material profiles is actually name
+                    buildplate_name = buildplate.get("id")
+                    if buildplate_name is None:
+                        continue
+
+                    buildplate_mapped_settings, buildplate_unmapped_settings = self._getSettingsDictForNode(buildplate)
+                    hotend_buildplates.append((buildplate_name, buildplate_mapped_settings, buildplate_unmapped_settings))
+                hotends.append((hotend_name, hotend_mapped_settings, hotend_unmapped_settings, hotend_buildplates))
+
+            machines.append({"compatibility": machine_compatibility, "setting_values": machine_setting_values,
+                             "identifiers": identifiers, "buildplates": buildplates, "hotends": hotends})
+        parsed["machines"] = machines
+
+        return parsed
+
+    ##  Parses a material profile, or gets what was parsed from the material
+    #   cache if the profile didn't change since it was parsed before.
+    #   \param kind What is parsed, "metadata" or "profile".
+    #   \param parse The function that parses the profile.
+    @classmethod
+    def _getParsed(cls, kind: str, material_id: str, serialized: str, parse: Callable[[str], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        cache = cls._material_cache
+        if cache is not None:
+            parsed = cache.get(kind, material_id, serialized)
+            if parsed is not None:
+                return parsed
+
+        parsed = parse(serialized)
+        if cache is not None and parsed is not None and parsed.get("cacheable", True):
+            cache.put(kind, material_id, serialized, parsed)
+        return parsed
+
+    ##  Start using a cache of parsed material profiles.
+    @classmethod
+    def setMaterialCache(cls, cache: Optional[MaterialCache]) -> None:
+        cls._material_cache = cache
+
     @classmethod
     def _getSettingsDictForNode(cls, node) -> Tuple[dict, dict]:
         node_mapped_settings_dict = dict()
@@ -869,98 +940,29 @@ class XmlMaterialProfile(InstanceContainer):
 
     @classmethod
     def deserializeMetadata(cls, serialized: str, container_id: str) -> List[Dict[str, Any]]:
-        result_metadata = [] #All the metadata that we found except the base (because the base is returned).
-
         #Update the serialized data to the latest version.
         serialized = cls._updateSerialized(serialized)
 
-        base_metadata = {
-            "type": "material",
-            "status": "unknown", #TODO: Add material verification.
-            "container_type": XmlMaterialProfile,
-            "id": container_id,
-            "base_file": container_id
-        }
-
-        try:
-            data = ET.fromstring(serialized)
-        except:
-            Logger.logException("e", "An exception occurred while parsing the material profile")
+        parsed = cls._getParsed("metadata", container_id, serialized, cls._parseMetadata)
+        if parsed is None:
             return []
 
-        #TODO: Implement the <inherits> tag. It's unused at the moment though.
-
-        if "version" in data.attrib:
-            base_metadata["setting_version"] = cls.xmlVersionToSettingVersion(data.attrib["version"])
-        else:
-            base_metadata["setting_version"] = cls.xmlVersionToSettingVersion("1.2") #1.2 and lower didn't have that version number there yet.
-
-        for entry in data.iterfind("./um:metadata/*", cls.__namespaces):
-            tag_name = _tag_without_namespace(entry)
-
-            if tag_name == "name":
-                brand = entry.find("./um:brand", cls.__namespaces)
-                material = entry.find("./um:material", cls.__namespaces)
-                color = entry.find("./um:color", cls.__namespaces)
-                label = entry.find("./um:label", cls.__namespaces)
-
-                if label is not None and label.text is not None:
-                    base_metadata["name"] = label.text
-                else:
-                    if material is not None and color is not None:
-                        base_metadata["name"] = cls._profile_name(material.text, color.text)
-                    else:
-                        base_metadata["name"] = "Unknown Material"
-
-                base_metadata["brand"] = brand.text if brand is not None and brand.text is not None else "Unknown Brand"
-                base_metadata["material"] = material.text if material is not None and material.text is not None else "Unknown Type"
-                base_metadata["color_name"] = color.text if color is not None and color.text is not None else "Unknown Color"
-                continue
-
-            #Setting_version is derived from the "version" tag in the schema earlier, so don't set it here.
-            if tag_name == "setting_version":
-                continue
-
-            base_metadata[tag_name] = entry.text
-
-        if "description" not in base_metadata:
-            base_metadata["description"] = ""
-        if "adhesion_info" not in base_metadata:
-            base_metadata["adhesion_info"] = ""
-
-        property_values = {}
-        properties = data.iterfind("./um:properties/*", cls.__namespaces)
-        for entry in properties:
-            tag_name = _tag_without_namespace(entry)
-            property_values[tag_name] = entry.text
-
-        base_metadata["approximate_diameter"] = str(round(float(cast(float, property_values.get("diameter", 2.85))))) # In mm
-        base_metadata["properties"] = property_values
-        base_metadata["definition"] = "fdmprinter"
-
-        compatible_entries = data.iterfind("./um:settings/um:setting[@key='hardware compatible']", cls.__namespaces)
-        try:
-            common_compatibility = cls._parseCompatibleValue(next(compatible_entries).text) # type: ignore
-        except StopIteration: #No 'hardware compatible' setting.
-            common_compatibility = True
-        base_metadata["compatible"] = common_compatibility
-        result_metadata.append(base_metadata)
+        base_metadata = parsed["metadata"]
+        base_metadata["container_type"] = XmlMaterialProfile
+        base_metadata["id"] = container_id
+        base_metadata["base_file"] = container_id
+        result_metadata = [base_metadata]
 
         # Map machine human-readable names to IDs
         product_id_map = cls.getProductIdMap()
 
-        for machine in data.iterfind("./um:settings/um:machine", cls.__namespaces):
-            machine_compatibility = common_compatibility
-            for entry in machine.iterfind("./um:setting", cls.__namespaces):
-                key = entry.get("key")
-                if key == "hardware compatible":
-                    if entry.text is not None:
-                        machine_compatibility = cls._parseCompatibleValue(entry.text)
+        for machine in parsed["machines"]:
+            machine_compatibility = machine["compatibility"]
 
-            for identifier in machine.iterfind("./um:machine_identifier", cls.__namespaces):
-                machine_id_list = product_id_map.get(identifier.get("product"), [])
+            for product, manufacturer in machine["identifiers"]:
+                machine_id_list = product_id_map.get(product, [])
                 if not machine_id_list:
-                    machine_id_list = cls.getPossibleDefinitionIDsFromName(identifier.get("product"))
+                    machine_id_list = cls.getPossibleDefinitionIDsFromName(product)
 
                 for machine_id in machine_id_list:
                     definition_metadatas = ContainerRegistry.getInstance().findDefinitionContainersMetadata(id = machine_id)
@@ -969,7 +971,7 @@ class XmlMaterialProfile(InstanceContainer):
 
                     definition_metadata = definition_metadatas[0]
 
-                    machine_manufacturer = identifier.get("manufacturer", definition_metadata.get("manufacturer", "Unknown")) #If the XML material doesn't specify a manufacturer, use the one in the actual printer definition.
+                    machine_manufacturer = manufacturer if manufacturer is not None else definition_metadata.get("manufacturer", "Unknown") #If the XML material doesn't specify a manufacturer, use the one in the actual printer definition.
 
                     # Always create the instance of the material even if it is not compatible, otherwise it will never
                     # show as incompatible if the material profile doesn't define hotends in the machine - CURA-5444
@@ -989,15 +991,10 @@ class XmlMaterialProfile(InstanceContainer):
 
                     result_metadata.append(new_material_metadata)
 
-                    buildplates = machine.iterfind("./um:buildplate", cls.__namespaces)
                     buildplate_map = {} # type: Dict[str, Dict[str, bool]]
                     buildplate_map["buildplate_compatible"] = {}
                     buildplate_map["buildplate_recommended"] = {}
-                    for buildplate in buildplates:
-                        buildplate_id = buildplate.get("id")
-                        if buildplate_id is None:
-                            continue
-
+                    for buildplate_id, buildplate_compatibility, buildplate_recommended in machine["buildplates"]:
                         variant_metadata = ContainerRegistry.getInstance().findInstanceContainersMetadata(id = buildplate_id)
                         if not variant_metadata:
                             # It is not really properly defined what "ID" is so also search for variants by name.
@@ -1006,32 +1003,10 @@ class XmlMaterialProfile(InstanceContainer):
                         if not variant_metadata:
                             continue
 
-                        settings = buildplate.iterfind("./um:setting", cls.__namespaces)
-                        buildplate_compatibility = True
-                        buildplate_recommended = True
-                        for entry in settings:
-                            key = entry.get("key")
-                            if entry.text is not None:
-                                if key == "hardware compatible":
-                                    buildplate_compatibility = cls._parseCompatibleValue(entry.text)
-                                elif key == "hardware recommended":
-                                    buildplate_recommended = cls._parseCompatibleValue(entry.text)
-
                         buildplate_map["buildplate_compatible"][buildplate_id] = buildplate_compatibility
                         buildplate_map["buildplate_recommended"][buildplate_id] = buildplate_recommended
 
-                    for hotend in machine.iterfind("./um:hotend", cls.__namespaces):
-                        hotend_name = hotend.get("id")
-                        if hotend_name is None:
-                            continue
-
-                        hotend_compatibility = machine_compatibility
-                        for entry in hotend.iterfind("./um:setting", cls.__namespaces):
-                            key = entry.get("key")
-                            if key == "hardware compatible":
-                                if entry.text is not None:
-                                    hotend_compatibility = cls._parseCompatibleValue(entry.text)
-
+                    for hotend_name, hotend_compatibility, hotend_buildplates in machine["hotends"]:
                         new_hotend_specific_material_id = container_id + "_" + machine_id + "_" + hotend_name.replace(" ", "_")
 
                         # Same as above, do not overwrite existing metadata.
@@ -1052,14 +1027,7 @@ class XmlMaterialProfile(InstanceContainer):
                         #
                         # Buildplates in Hotends
                         #
-                        buildplates = hotend.iterfind("./um:buildplate", cls.__namespaces)
-                        for buildplate in buildplates:
-                            # The "id" field for buildplate in material profiles is actually name
-                            buildplate_name = buildplate.get("id")
-                            if buildplate_name is None:
-                                continue
-
-                            buildplate_mapped_settings, buildplate_unmapped_settings = cls._getSettingsDictForNode(buildplate)
+                        for buildplate_name, buildplate_unmapped_settings in hotend_buildplates:
                             buildplate_compatibility = buildplate_unmapped_settings.get("hardware compatible",
                                                                                         buildplate_map["buildplate_compatible"])
                             buildplate_recommended = buildplate_unmapped_settings.get("hardware recommended",
@@ -1085,6 +1053,140 @@ class XmlMaterialProfile(InstanceContainer):
 
         return result_metadata
 
+    ##  Parses the parts of a material profile that deserializeMetadata needs
+    #   and that don't depend on the printers that are installed.
+    #   \return The metadata of the base material without its ID, and for each
+    #   machine its compatibility, (product, manufacturer) identifiers,
+    #   buildplates and hotends. None if the profile can't be parsed.
+    @classmethod
+    def _parseMetadata(cls, serialized: str) -> Optional[Dict[str, Any]]:
+        base_metadata = {
+            "type": "material",
+            "status": "unknown", #TODO: Add material verification.
+        }
+
+        try:
+            data = ET.fromstring(serialized)
+        except:
+            Logger.logException("e", "An exception occurred while parsing the material profile")
+            return None
+
+        #TODO: Implement the <inherits> tag. It's unused at the moment though.
+
+        if "version" in data.attrib:
+            base_metadata["setting_version"] = cls.xmlVersionToSettingVersion(data.attrib["version"])
+        else:
+            base_metadata["setting_version"] = cls.xmlVersionToSettingVersion("1.2") #1.2 and lower didn't have that version number there yet.
+
+        for entry in data.iterfind("./um:metadata/*", cls.__namespaces):
+            tag_name = _tag_without_namespace(entry)
+
+            if tag_name == "name":
+                brand = entry.find("./um:brand", cls.__namespaces)
+                material = entry.find("./um:material", cls.__namespaces)
+                color = entry.find("./um:color", cls.__namespaces)
+                label = entry.find("./um:label", cls.__namespaces)
+
+                if label is not None and label.text is not None:
+                    base_metadata["name"] = label.text
+                else:
+                    if material is not None and color is not None:
+                        base_metadata["name"] = cls._profile_name(material.text, color.text)
+                    else:
+                        base_metadata["name"] = "Unknown Material"
+
+                base_metadata["brand"] = brand.text if brand is not None and brand.text is not None else "Unknown Brand"
+                base_metadata["material"] = material.text if material is not None and material.text is not None else "Unknown Type"
+                base_metadata["color_name"] = color.text if color is not None and color.text is not None else "Unknown Color"
+                continue
+
+            #Setting_version is derived from the "version" tag in the schema earlier, so don't set it here.
+            if tag_name == "setting_version":
+                continue
+
+            base_metadata[tag_name] = entry.text
+
+        if "description" not in base_metadata:
+            base_metadata["description"] = ""
+        if "adhesion_info" not in base_metadata:
+            base_metadata["adhesion_info"] = ""
+
+        property_values = {}
+        properties = data.iterfind("./um:properties/*", cls.__namespaces)
+        for entry in properties:
+            tag_name = _tag_without_namespace(entry)
+            property_values[tag_name] = entry.text
+
+        base_metadata["approximate_diameter"] = str(round(float(cast(float, property_values.get("diameter", 2.85))))) # In mm
+        base_metadata["properties"] = property_values
+        base_metadata["definition"] = "fdmprinter"
+
+        compatible_entries = data.iterfind("./um:settings/um:setting[@key='hardware compatible']", cls.__namespaces)
+        try:
+            common_compatibility = cls._parseCompatibleValue(next(compatible_entries).text) # type: ignore
+        except StopIteration: #No 'hardware compatible' setting.
+            common_compatibility = True
+        base_metadata["compatible"] = common_compatibility
+
+        machines = []
+        for machine in data.iterfind("./um:settings/um:machine", cls.__namespaces):
+            machine_compatibility = common_compatibility
+            for entry in machine.iterfind("./um:setting", cls.__namespaces):
+                key = entry.get("key")
+                if key == "hardware compatible":
+                    if entry.text is not None:
+                        machine_compatibility = cls._parseCompatibleValue(entry.text)
+
+            identifiers = [(identifier.get("product"), identifier.get("manufacturer"))
+                           for identifier in machine.iterfind("./um:machine_identifier", cls.__namespaces)]
+
+            buildplates = []
+            for buildplate in machine.iterfind("./um:buildplate", cls.__namespaces):
+                buildplate_id = buildplate.get("id")
+                if buildplate_id is None:
+                    continue
+
+                settings = buildplate.iterfind("./um:setting", cls.__namespaces)
+                buildplate_compatibility = True
+                buildplate_recommended = True
+                for entry in settings:
+                    key = entry.get("key")
+                    if entry.text is not None:
+                        if key == "hardware compatible":
+                            buildplate_compatibility = cls._parseCompatibleValue(entry.text)
+                        elif key == "hardware recommended":
+                            buildplate_recommended = cls._parseCompatibleValue(entry.text)
+                buildplates.append((buildplate_id, buildplate_compatibility, buildplate_recommended))
+
+            hotends = []
+            for hotend in machine.iterfind("./um:hotend", cls.__namespaces):
+                hotend_name = hotend.get("id")
+                if hotend_name is None:
+                    continue
+
+                hotend_compatibility = machine_compatibility
+                for entry in hotend.iterfind("./um:setting", cls.__namespaces):
+                    key = entry.get("key")
+                    if key == "hardware compatible":
+                        if entry.text is not None:
+                            hotend_compatibility = cls._parseCompatibleValue(entry.text)
+
+                hotend_buildplates = []
+                for buildplate in hotend.iterfind("./um:buildplate", cls.__namespaces):
+                    # The "id" field for buildplate in material profiles is actually name
+                    buildplate_name = buildplate.get("id")
+                    if buildplate_name is None:
+                        continue
+
+                    _, buildplate_unmapped_settings = cls._getSettingsDictForNode(buildplate)
+                    hotend_buildplates.append((buildplate_name, buildplate_unmapped_settings))
+                hotends.append((hotend_name, hotend_compatibility, hotend_buildplates))
+
+            machines.append({"compatibility": machine_compatibility, "identifiers": identifiers,
+                             "buildplates": buildplates, "hotends": hotends})
+
+        return {"metadata": base_metadata, "machines": machines}
+
     def _addSettingElement(self, builder, instance):
         key = instance.definition.key
         if key in self.__material_settings_setting_map.values():
@@ -1160,10 +1262,13 @@ class XmlMaterialProfile(InstanceContainer):
     #   This loads the mapping from a file.
     @classmethod
     def getProductIdMap(cls) -> Dict[str, List[str]]:
+        if cls._product_id_map is not None: # The file is read once and not for every material.
+            return cls._product_id_map
         product_to_id_file = os.path.join(os.path.dirname(sys.modules[cls.__module__].__file__), "product_to_id.json")
         with open(product_to_id_file, encoding = "utf-8") as f:
             product_to_id_map = json.load(f)
         product_to_id_map = {key: [value] for key, value in product_to_id_map.items()}
+        cls._product_id_map = product_to_id_map
         return product_to_id_map
 
     ##  Parse the value of the "material compatible" property.
@@ -1,9 +1,14 @@
 
 
+import os
+
 from . import XmlMaterialProfile
 from . import XmlMaterialUpgrader
 
 from UM.MimeTypeDatabase import MimeType, MimeTypeDatabase
+from UM.Resources import Resources
+
+from steslicer.Settings.MaterialCache import MaterialCache
 
 upgrader = XmlMaterialUpgrader.XmlMaterialUpgrader()
 
@@ -43,6 +48,13 @@ def register(app):
         (SteSlicerApplication.ResourceTypes.MaterialInstanceContainer, "application/x-ultimaker-material-profile")
     )
 
+    # Materials that didn't change since the previous start don't need to be parsed again.
+    material_cache = MaterialCache(os.path.join(Resources.getCacheStoragePath(), "materials.cache"),
+                                   MaterialCache.makeKey(app.getVersion(), SteSlicerApplication.SettingVersion, XmlMaterialProfile.XmlMaterialProfile.Version))
+    XmlMaterialProfile.XmlMaterialProfile.setMaterialCache(material_cache)
+    app.initializationFinished.connect(material_cache.save)
+    app.applicationShuttingDown.connect(material_cache.save)
+
     return {"version_upgrade": upgrader,
             "settings_container": XmlMaterialProfile.XmlMaterialProfile("default_xml_material_profile"),
             }
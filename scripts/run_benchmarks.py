@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+
+##  Benchmarks the slicing hot paths on generated fixtures.
+#
+#   Usage: run_benchmarks.py [patterns] [--save-baseline] [--threshold 0.2]
+#
+#   The fixtures are generated from a fixed seed into benchmarks/fixtures the
+#   first time. Without --save-baseline the results are compared with
+#   benchmarks/baseline.json and the exit code is 1 when a benchmark got
+#   slower than the threshold allows. Baselines only compare on the machine
+#   that made them. The benchmarks live in benchmarks.Benchmarks.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchmarks.BenchmarkRunner import main
+
+
+if __name__ == "__main__":
+    sys.exit(main())
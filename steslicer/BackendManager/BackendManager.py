@@ -7,11 +7,18 @@ from UM.Settings.ContainerRegistry import ContainerRegistry
 from UM.Settings.SettingInstance import SettingInstance
 from UM.Signal import Signal
 
+from steslicer.LazyPluginObject import LazyPluginObject
+
 backend_types = ["classic", "cylindrical", "cylindrical_full", "spherical", "spherical_full", "discrete", "conical", "conical_full"]
 
 class BackendAlreadyAdded(Exception):
     pass
 
+##  Keeps track of the backends and selects the one for the printing mode.
+#
+#   Backend plug-ins may register a LazyPluginObject. Such a backend is only
+#   loaded when it is requested by ID or type, which normally happens when its
+#   printing mode is selected.
 class BackendManager:
     __instance = None #type: BackendManager
     currendBackendChanged = Signal()
@@ -51,14 +58,15 @@ class BackendManager:
     def addBackendEngine(self, backend: "Backend") -> None:
         if backend.getPluginId() not in self._backends_by_id:
             self._backends_by_id[backend.getPluginId()] = backend
-            backend.printDurationMessage.connect(self._onPrintDurationMessage)
+            if not isinstance(backend, LazyPluginObject):
+                backend.printDurationMessage.connect(self._onPrintDurationMessage)
             metadata = PluginRegistry.getInstance().getMetaData(backend.getPluginId())
             backend_type = metadata["backend_engine"].get("type", "")
             if backend_type in backend_types:
                 self._backends_by_type[backend_type] = backend
                 self._backends_id_to_type_map[backend.getPluginId()] = backend_type
             if self._current_backend is None:
-                self._current_backend = self._backends_by_id[backend.getPluginId()]
+                self._current_backend = self._getLoadedBackend(backend.getPluginId())
                 self._current_backend.setCurrent(True)
                 self.currendBackendChanged.emit()
             metadata_types = metadata["backend_engine"].get("types", [])
@@ -67,27 +75,46 @@ class BackendManager:
                     self._backends_by_type[metadata_type] = backend
                     self._backends_id_to_type_map[backend.getPluginId()] = metadata_type
                 if self._current_backend is None:
-                    self._current_backend = self._backends_by_id[backend.getPluginId()]
+                    self._current_backend = self._getLoadedBackend(backend.getPluginId())
                     self._current_backend.setCurrent(True)
                     self.currendBackendChanged.emit()
         else:
             raise BackendAlreadyAdded("Backend with id %s was already added. Backends must have unique ids.", backend.getPluginId())
 
+    ##  Gets all backends by ID. Backends that weren't used yet may still be a
+    #   LazyPluginObject.
     def getBackends(self) -> Dict[str, "Backend"]:
         return self._backends_by_id
 
     def getBackendById(self, key: str) -> Optional["Backend"]:
         if key in self._backends_by_id:
-            return self._backends_by_id[key]
+            return self._getLoadedBackend(key)
         else:
             return None
 
     def getBackendByType(self, backend_type: str) -> Optional["Backend"]:
         if backend_type in self._backends_by_type:
-            return self._backends_by_type[backend_type]
+            return self._getLoadedBackend(self._backends_by_type[backend_type].getPluginId())
         else:
             return None
 
+    ##  Gets a backend, loading it first if it was registered lazily.
+    def _getLoadedBackend(self, plugin_id: str) -> "Backend":
+        backend = self._backends_by_id[plugin_id]
+        if not isinstance(backend, LazyPluginObject):
+            return backend
+
+        lazy_backend = backend
+        backend = lazy_backend.getPluginObject()
+        # Loading a backend may request it again, for instance when it initializes.
+        if self._backends_by_id[plugin_id] is lazy_backend:
+            self._backends_by_id[plugin_id] = backend
+            for backend_type, type_backend in self._backends_by_type.items():
+                if type_backend is lazy_backend:
+                    self._backends_by_type[backend_type] = backend
+            backend.printDurationMessage.connect(self._onPrintDurationMessage)
+        return backend
+
     def getCurrentBackend(self) -> Optional[Backend]:
         return self._current_backend
 
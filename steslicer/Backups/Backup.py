@@ -5,7 +5,7 @@ import os
 import re
 import shutil
 from zipfile import ZipFile, ZIP_DEFLATED, BadZipfile
-from typing import Dict, Optional, TYPE_CHECKING
+from typing import Dict, List, Optional, TYPE_CHECKING
 
 from UM import i18nCatalog
 from UM.Logger import Logger
@@ -13,6 +13,8 @@ from UM.Message import Message
 from UM.Platform import Platform
 from UM.Resources import Resources
 
+from steslicer.Backups.IncrementalBackupStore import IncrementalBackupStore
+
 if TYPE_CHECKING:
     from steslicer.SteSlicerApplication import SteSlicerApplication
 
@@ -32,6 +34,7 @@ class Backup:
         self._application = application
         self.zip_file = zip_file  # type: Optional[bytes]
         self.meta_data = meta_data  # type: Optional[Dict[str, str]]
+        self.snapshot_id = None  # type: Optional[str]
 
     ##  Create a back-up from the current user config folder.
     def makeFromCurrent(self) -> None:
@@ -39,8 +42,47 @@ class Backup:
         version_data_dir = Resources.getDataStoragePath()
 
         Logger.log("d", "Creating backup for STE Slicer %s, using folder %s", steslicer_release, version_data_dir)
+        self._prepareDataFolder(version_data_dir)
+
+        # Create an empty buffer and write the archive to it.
+        buffer = io.BytesIO()
+        archive = self._makeArchive(buffer, version_data_dir)
+        if archive is None:
+            return
+
+        # Store the archive and metadata so the BackupManager can fetch them when needed.
+        self.zip_file = buffer.getvalue()
+        self.meta_data = self._makeMetaData(archive.namelist())
+
+    ##  Create an incremental back-up of the current user config folder.
+    #
+    #   Only files that changed since the previous snapshot in the store are
+    #   compressed and stored, and nothing is held in memory.
+    #   \param store The store to add the snapshot to.
+    def makeSnapshotFromCurrent(self, store: IncrementalBackupStore) -> None:
+        version_data_dir = Resources.getDataStoragePath()
+
+        Logger.log("d", "Creating incremental backup for STE Slicer %s, using folder %s", self._application.getVersion(), version_data_dir)
+        self._prepareDataFolder(version_data_dir)
+
+        ignore_string = re.compile("|".join(self.IGNORED_FILES))
+        try:
+            manifest = store.createSnapshot(version_data_dir, ignore_string)
+        except (IOError, OSError) as error:
+            Logger.log("e", "Could not create snapshot from user data directory: %s", error)
+            self._showMessage(
+                self.catalog.i18nc("@info:backup_failed",
+                                   "Could not create archive from user data directory: {}".format(error)))
+            return
+
+        # Use the same archive names as the zip file to count the metadata items.
+        names = [name.replace(os.sep, "/") + "/" for name in manifest["folders"]] + [name.replace(os.sep, "/") for name in manifest["files"]]
+        self.snapshot_id = manifest["id"]
+        self.meta_data = self._makeMetaData(names)
+        store.updateMetaData(self.snapshot_id, self.meta_data)
 
-        # Ensure all current settings are saved.
+    ##  Ensure all current settings are saved and are in the data folder.
+    def _prepareDataFolder(self, version_data_dir: str) -> None:
         self._application.saveSettings()
 
         # We copy the preferences file to the user data directory in Linux as it's in a different location there.
@@ -52,23 +94,15 @@ class Backup:
             Logger.log("d", "Copying preferences file from %s to %s", preferences_file, backup_preferences_file)
             shutil.copyfile(preferences_file, backup_preferences_file)
 
-        # Create an empty buffer and write the archive to it.
-        buffer = io.BytesIO()
-        archive = self._makeArchive(buffer, version_data_dir)
-        if archive is None:
-            return
-        files = archive.namelist()
-
+    def _makeMetaData(self, files: List[str]) -> Dict[str, str]:
         # Count the metadata items. We do this in a rather naive way at the moment.
         machine_count = len([s for s in files if "machine_instances/" in s]) - 1
         material_count = len([s for s in files if "materials/" in s]) - 1
         profile_count = len([s for s in files if "quality_changes/" in s]) - 1
         plugin_count = len([s for s in files if "plugin.json" in s])
-        
-        # Store the archive and metadata so the BackupManager can fetch them when needed.
-        self.zip_file = buffer.getvalue()
-        self.meta_data = {
-            "steslicer_release": steslicer_release,
+
+        return {
+            "steslicer_release": self._application.getVersion(),
             "machine_count": str(machine_count),
             "material_count": str(material_count),
             "profile_count": str(profile_count),
@@ -104,7 +138,42 @@ class Backup:
     ##  Restore this back-up.
     #   \return Whether we had success or not.
     def restore(self) -> bool:
-        if not self.zip_file or not self.meta_data or not self.meta_data.get("steslicer_release", None):
+        if not self.zip_file or not self._canRestore():
+            return False
+
+        version_data_dir = Resources.getDataStoragePath()
+        archive = ZipFile(io.BytesIO(self.zip_file), "r")
+        extracted = self._extractArchive(archive, version_data_dir)
+        self._restorePreferences(version_data_dir)
+        return extracted
+
+    ##  Restore this back-up from an incremental back-up store.
+    #
+    #   Only the files that differ from the current user config folder are
+    #   written.
+    #   \return Whether we had success or not.
+    def restoreSnapshot(self, store: IncrementalBackupStore) -> bool:
+        if not self.snapshot_id or not self._canRestore():
+            return False
+
+        version_data_dir = Resources.getDataStoragePath()
+        Logger.log("d", "Restoring backup snapshot %s to location: %s", self.snapshot_id, version_data_dir)
+        ignore_string = re.compile("|".join(self.IGNORED_FILES))
+        try:
+            restored = store.restoreSnapshot(self.snapshot_id, version_data_dir, ignore_string)
+        except (IOError, OSError) as error:
+            Logger.log("e", "Could not restore backup snapshot %s: %s", self.snapshot_id, error)
+            restored = False
+        if not restored:
+            self._showMessage(
+                self.catalog.i18nc("@info:backup_failed",
+                                   "Tried to restore a STE Slicer backup without having proper data or meta data."))
+            return False
+        self._restorePreferences(version_data_dir)
+        return True
+
+    def _canRestore(self) -> bool:
+        if not self.meta_data or not self.meta_data.get("steslicer_release", None):
             # We can restore without the minimum required information.
             Logger.log("w", "Tried to restore a STE Slicer backup without having proper data or meta data.")
             self._showMessage(
@@ -121,11 +190,9 @@ class Backup:
                 self.catalog.i18nc("@info:backup_failed",
                                    "Tried to restore a STE Slicer backup that does not match your current version."))
             return False
+        return True
 
-        version_data_dir = Resources.getDataStoragePath()
-        archive = ZipFile(io.BytesIO(self.zip_file), "r")
-        extracted = self._extractArchive(archive, version_data_dir)
-
+    def _restorePreferences(self, version_data_dir: str) -> None:
         # Under Linux, preferences are stored elsewhere, so we copy the file to there.
         if Platform.isLinux():
             preferences_file_name = self._application.getApplicationName()
@@ -134,8 +201,6 @@ class Backup:
             Logger.log("d", "Moving preferences file from %s to %s", backup_preferences_file, preferences_file)
             shutil.move(backup_preferences_file, preferences_file)
 
-        return extracted
-
     ##  Extract the whole archive to the given target path.
     #   \param archive The archive as ZipFile.
     #   \param target_path The target path.
@@ -1,9 +1,12 @@
 
 
-from typing import Dict, Optional, Tuple, TYPE_CHECKING
+import os
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
 
 from UM.Logger import Logger
+from UM.Resources import Resources
 from steslicer.Backups.Backup import Backup
+from steslicer.Backups.IncrementalBackupStore import IncrementalBackupStore
 
 if TYPE_CHECKING:
     from steslicer.SteSlicerApplication import SteSlicerApplication
@@ -16,6 +19,7 @@ if TYPE_CHECKING:
 class BackupsManager:
     def __init__(self, application: "SteSlicerApplication") -> None:
         self._application = application
+        self._incremental_store = None  # type: Optional[IncrementalBackupStore]
 
     ##  Get a back-up of the current configuration.
     #   \return A tuple containing a ZipFile (the actual back-up) and a dict
@@ -47,6 +51,51 @@ class BackupsManager:
             # We don't want to store the data at this point as that would override the just-restored backup.
             self._application.windowClosed(save_data = False)
 
+    ##  Get the store for incremental back-ups.
+    #
+    #   It lives next to the versioned data folders, so it's not backed up itself
+    #   and can hold snapshots of several versions.
+    def getIncrementalBackupStore(self) -> IncrementalBackupStore:
+        if self._incremental_store is None:
+            store_path = os.path.join(os.path.dirname(Resources.getDataStoragePath()), "backups")
+            self._incremental_store = IncrementalBackupStore(store_path)
+        return self._incremental_store
+
+    ##  Make an incremental back-up of the current configuration.
+    #   \return A tuple containing the snapshot id and a dict containing some
+    #   metadata (like version).
+    def createIncrementalBackup(self) -> Tuple[Optional[str], Optional[Dict[str, str]]]:
+        self._disableAutoSave()
+        backup = Backup(self._application)
+        backup.makeSnapshotFromCurrent(self.getIncrementalBackupStore())
+        self._enableAutoSave()
+        return backup.snapshot_id, backup.meta_data
+
+    ##  Get the snapshots in the incremental back-up store, oldest first.
+    def getIncrementalBackups(self) -> List[Dict[str, Any]]:
+        return self.getIncrementalBackupStore().getSnapshots()
+
+    ##  Restore an incremental back-up.
+    #   \param snapshot_id The id of the snapshot to restore.
+    def restoreIncrementalBackup(self, snapshot_id: str) -> None:
+        store = self.getIncrementalBackupStore()
+        snapshot = store.getSnapshot(snapshot_id)
+        if snapshot is None or not snapshot["meta_data"].get("steslicer_release", None):
+            Logger.log("w", "Tried to restore a backup snapshot that doesn't exist or has no STE Slicer version number.")
+            return
+
+        self._disableAutoSave()
+
+        backup = Backup(self._application, meta_data = snapshot["meta_data"])
+        backup.snapshot_id = snapshot_id
+        restored = backup.restoreSnapshot(store)
+        if restored:
+            # At this point, STE Slicer will need to restart for the changes to take effect.
+            # We don't want to store the data at this point as that would override the just-restored backup.
+            self._application.windowClosed(save_data = False)
+        else:
+            self._enableAutoSave()
+
     ##  Here we try to disable the auto-save plug-in as it might interfere with
     #   restoring a back-up.
     def _disableAutoSave(self) -> None:
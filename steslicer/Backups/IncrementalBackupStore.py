@@ -0,0 +1,260 @@
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Pattern
+from zipfile import ZipFile, ZIP_DEFLATED
+
+from UM.Logger import Logger
+
+BLOCK_SIZE = 1024 * 1024  # Files are read in blocks of this size, so they never have to fit in memory.
+
+
+##  A content-addressed store of configuration back-ups.
+#
+#   Every file is stored once as a gzip compressed object named after the
+#   SHA-256 hash of its content. A snapshot is a JSON manifest that maps the
+#   relative paths of the backed up folder to those objects. Taking a new
+#   snapshot only hashes files whose size or modification time changed since the
+#   previous snapshot, and only compresses files whose content isn't stored yet.
+#
+#   The store lays out its files as:
+#       objects/<first two hash characters>/<hash>
+#       snapshots/<snapshot id>.json
+class IncrementalBackupStore:
+    manifest_version = 1
+
+    def __init__(self, store_path: str) -> None:
+        self._store_path = store_path
+        self._objects_path = os.path.join(store_path, "objects")
+        self._snapshots_path = os.path.join(store_path, "snapshots")
+
+    def getStorePath(self) -> str:
+        return self._store_path
+
+    ##  Stores the current content of root_path as a new snapshot.
+    #   \param root_path The directory to back up recursively.
+    #   \param ignore_pattern Paths matching this pattern are not backed up.
+    #   \param meta_data Information to store with the snapshot.
+    #   \return The manifest of the new snapshot.
+    def createSnapshot(self, root_path: str, ignore_pattern: Optional[Pattern] = None,
+                       meta_data: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        os.makedirs(self._objects_path, exist_ok = True)
+        os.makedirs(self._snapshots_path, exist_ok = True)
+
+        previous = self.getLatestSnapshot()
+        previous_files = previous["files"] if previous else {}  # type: Dict[str, Dict[str, Any]]
+
+        files = {}  # type: Dict[str, Dict[str, Any]]
+        folders = []  # type: List[str]
+        hashed_count = 0
+        stored_count = 0
+        for relative_path, absolute_path, is_folder in self._walk(root_path, ignore_pattern):
+            if is_folder:
+                folders.append(relative_path)
+                continue
+            stat = os.stat(absolute_path)
+            entry = previous_files.get(relative_path)
+            if entry is None or entry["size"] != stat.st_size or entry["mtime_ns"] != stat.st_mtime_ns or not self._hasObject(entry["hash"]):
+                file_hash = self._hashFile(absolute_path)
+                hashed_count += 1
+                if not self._hasObject(file_hash):
+                    self._storeObject(absolute_path, file_hash)
+                    stored_count += 1
+                entry = {"hash": file_hash, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+            files[relative_path] = entry
+
+        manifest = {
+            "version": self.manifest_version,
+            "id": time.strftime("%Y%m%dT%H%M%S") + "-" + uuid.uuid4().hex[:8],
+            "created": time.time(),
+            "meta_data": meta_data or {},
+            "folders": folders,
+            "files": files
+        }
+        self._writeJson(os.path.join(self._snapshots_path, manifest["id"] + ".json"), manifest)
+        Logger.log("d", "Created backup snapshot %s: %s files, %s hashed, %s stored.", manifest["id"], len(files), hashed_count, stored_count)
+        return manifest
+
+    ##  Lists the snapshots in the store, oldest first.
+    #   \return The manifests without their file lists.
+    def getSnapshots(self) -> List[Dict[str, Any]]:
+        result = []
+        for manifest in self._readManifests():
+            result.append({key: value for key, value in manifest.items() if key not in ("files", "folders")})
+        return result
+
+    def getSnapshot(self, snapshot_id: str) -> Optional[Dict[str, Any]]:
+        path = os.path.join(self._snapshots_path, snapshot_id + ".json")
+        if not os.path.isfile(path):
+            return None
+        return self._readJson(path)
+
+    def getLatestSnapshot(self) -> Optional[Dict[str, Any]]:
+        manifests = self._readManifests()
+        return manifests[-1] if manifests else None
+
+    ##  Restores a snapshot to the target path.
+    #
+    #   Files that already have the right content are left alone. Files that are
+    #   not in the snapshot are removed, unless they match the ignore pattern.
+    #   \return Whether the snapshot could be restored.
+    def restoreSnapshot(self, snapshot_id: str, target_path: str, ignore_pattern: Optional[Pattern] = None) -> bool:
+        manifest = self.getSnapshot(snapshot_id)
+        if manifest is None:
+            Logger.log("w", "Backup snapshot %s doesn't exist.", snapshot_id)
+            return False
+        missing = [path for path, entry in manifest["files"].items() if not self._hasObject(entry["hash"])]
+        if missing:
+            Logger.log("e", "Backup snapshot %s is incomplete, %s files are missing.", snapshot_id, len(missing))
+            return False
+
+        os.makedirs(target_path, exist_ok = True)
+        for relative_path in manifest["folders"]:
+            os.makedirs(os.path.join(target_path, relative_path), exist_ok = True)
+
+        written_count = 0
+        for relative_path, entry in manifest["files"].items():
+            absolute_path = os.path.join(target_path, relative_path)
+            if os.path.isfile(absolute_path) and os.path.getsize(absolute_path) == entry["size"] and self._hashFile(absolute_path) == entry["hash"]:
+                continue
+            self._restoreObject(entry["hash"], absolute_path)
+            written_count += 1
+
+        # Remove what was added after the snapshot was taken.
+        removed_count = 0
+        for relative_path, absolute_path, is_folder in reversed(list(self._walk(target_path, ignore_pattern))):
+            if is_folder:
+                if relative_path not in manifest["folders"] and not os.listdir(absolute_path):
+                    os.rmdir(absolute_path)
+            elif relative_path not in manifest["files"]:
+                os.remove(absolute_path)
+                removed_count += 1
+
+        Logger.log("d", "Restored backup snapshot %s: %s files written, %s removed.", snapshot_id, written_count, removed_count)
+        return True
+
+    ##  Writes a snapshot as a regular zip file, streaming from the store to disk.
+    def exportSnapshot(self, snapshot_id: str, zip_path: str) -> bool:
+        manifest = self.getSnapshot(snapshot_id)
+        if manifest is None:
+            return False
+        with ZipFile(zip_path, "w", ZIP_DEFLATED) as archive:
+            for relative_path in manifest["folders"]:
+                archive.writestr(relative_path.replace(os.sep, "/") + "/", b"")
+            for relative_path, entry in manifest["files"].items():
+                with gzip.open(self._objectPath(entry["hash"]), "rb") as source, archive.open(relative_path.replace(os.sep, "/"), "w") as target:
+                    shutil.copyfileobj(source, target, BLOCK_SIZE)
+        return True
+
+    def updateMetaData(self, snapshot_id: str, meta_data: Dict[str, str]) -> None:
+        manifest = self.getSnapshot(snapshot_id)
+        if manifest is None:
+            return
+        manifest["meta_data"] = meta_data
+        self._writeJson(os.path.join(self._snapshots_path, snapshot_id + ".json"), manifest)
+
+    def removeSnapshot(self, snapshot_id: str) -> None:
+        path = os.path.join(self._snapshots_path, snapshot_id + ".json")
+        if os.path.isfile(path):
+            os.remove(path)
+
+    ##  Removes the objects that no snapshot refers to anymore.
+    #   \return The number of removed objects.
+    def collectGarbage(self) -> int:
+        referenced = set()
+        for manifest in self._readManifests():
+            referenced.update(entry["hash"] for entry in manifest["files"].values())
+        removed_count = 0
+        if not os.path.isdir(self._objects_path):
+            return removed_count
+        for folder in os.listdir(self._objects_path):
+            folder_path = os.path.join(self._objects_path, folder)
+            for object_name in os.listdir(folder_path):
+                if object_name not in referenced:
+                    os.remove(os.path.join(folder_path, object_name))
+                    removed_count += 1
+        return removed_count
+
+    @staticmethod
+    def _walk(root_path: str, ignore_pattern: Optional[Pattern]):
+        for root, folders, files in os.walk(root_path):
+            for item_name in sorted(folders) + sorted(files):
+                absolute_path = os.path.join(root, item_name)
+                if ignore_pattern is not None and ignore_pattern.search(absolute_path):
+                    continue
+                yield absolute_path[len(root_path) + len(os.sep):], absolute_path, item_name in folders
+
+    @staticmethod
+    def _hashFile(path: str) -> str:
+        file_hash = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(BLOCK_SIZE), b""):
+                file_hash.update(block)
+        return file_hash.hexdigest()
+
+    def _objectPath(self, file_hash: str) -> str:
+        return os.path.join(self._objects_path, file_hash[:2], file_hash)
+
+    def _hasObject(self, file_hash: str) -> bool:
+        return os.path.isfile(self._objectPath(file_hash))
+
+    def _storeObject(self, source_path: str, file_hash: str) -> None:
+        object_path = self._objectPath(file_hash)
+        os.makedirs(os.path.dirname(object_path), exist_ok = True)
+        # Write to a temporary file first, so an interrupted backup never leaves a broken object behind.
+        handle, temporary_path = tempfile.mkstemp(dir = os.path.dirname(object_path))
+        try:
+            with open(source_path, "rb") as source, os.fdopen(handle, "wb") as raw_target:
+                with gzip.GzipFile(fileobj = raw_target, mode = "wb", compresslevel = 6, mtime = 0) as target:
+                    shutil.copyfileobj(source, target, BLOCK_SIZE)
+            os.replace(temporary_path, object_path)
+        except:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+
+    def _restoreObject(self, file_hash: str, target_path: str) -> None:
+        os.makedirs(os.path.dirname(target_path), exist_ok = True)
+        handle, temporary_path = tempfile.mkstemp(dir = os.path.dirname(target_path))
+        try:
+            with gzip.open(self._objectPath(file_hash), "rb") as source, os.fdopen(handle, "wb") as target:
+                shutil.copyfileobj(source, target, BLOCK_SIZE)
+            os.replace(temporary_path, target_path)
+        except:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+
+    def _readManifests(self) -> List[Dict[str, Any]]:
+        if not os.path.isdir(self._snapshots_path):
+            return []
+        manifests = []
+        for file_name in os.listdir(self._snapshots_path):
+            if not file_name.endswith(".json"):
+                continue
+            manifest = self._readJson(os.path.join(self._snapshots_path, file_name))
+            if manifest is not None and manifest.get("version") == self.manifest_version:
+                manifests.append(manifest)
+        manifests.sort(key = lambda manifest: manifest["created"])
+        return manifests
+
+    @staticmethod
+    def _readJson(path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, "r", encoding = "utf-8") as f:
+                return json.load(f)
+        except (IOError, OSError, ValueError) as error:
+            Logger.log("w", "Could not read backup manifest %s: %s", path, error)
+            return None
+
+    @staticmethod
+    def _writeJson(path: str, data: Dict[str, Any]) -> None:
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "w", encoding = "utf-8") as f:
+            json.dump(data, f)
+        os.replace(temporary_path, path)
@@ -0,0 +1,278 @@
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, TYPE_CHECKING
+
+from PyQt5.QtCore import QObject, QTimer, QUrl
+
+from UM.Backend.Backend import BackendState
+from UM.Logger import Logger
+from UM.Mesh.MeshWriter import MeshWriter
+from UM.PluginRegistry import PluginRegistry
+from UM.Scene.Iterator.DepthFirstIterator import DepthFirstIterator
+
+from steslicer.BatchSlicing.BatchSlicingPool import writeBatchReport
+
+if TYPE_CHECKING:
+    from steslicer.SteSlicerApplication import SteSlicerApplication
+
+
+class BatchJobError(Exception):
+    pass
+
+
+##  Slices a list of jobs one after the other in a running (headless) application.
+#
+#   Each job goes through these stages, which are timed separately:
+#       setup:    activate the machine, profile, materials and settings.
+#       load:     read the model files and put them on the build plate.
+#       validate: wait for the setting error check.
+#       slice:    run the backend that is selected by the printing mode.
+#       write:    write the g-code file.
+#   See loadBatchJobs for the format of a job. progress_callback is called with
+#   the stage and the progress of the backend while slicing. When all jobs are
+#   done, the report is written and finished_callback is called.
+class BatchSlicer(QObject):
+    def __init__(self, application: "SteSlicerApplication", jobs: List[Dict[str, Any]], report_file: Optional[str] = None,
+                 finished_callback: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+                 progress_callback: Optional[Callable[[str, float], None]] = None, parent = None) -> None:
+        super().__init__(parent)
+        self._application = application
+        self._jobs = list(jobs)
+        self._report_file = report_file
+        self._finished_callback = finished_callback
+        self._progress_callback = progress_callback
+
+        self._job_index = -1
+        self._job = None  # type: Optional[Dict[str, Any]]
+        self._job_result = None  # type: Optional[Dict[str, Any]]
+        self._stage = ""  # The stage the current job is in, callbacks of other stages are ignored.
+        self._job_results = []  # type: List[Dict[str, Any]]
+        self._job_start_time = 0.0
+        self._stage_start_time = 0.0
+        self._files_loading = set()  # type: Set[str]
+        self._backend = None
+        self._start_time = 0.0
+
+        # Fails the job when one of its stages doesn't finish, for instance because a model is too small to load.
+        self._timeout_timer = QTimer(self)
+        self._timeout_timer.setSingleShot(True)
+        self._timeout_timer.timeout.connect(self._onTimeout)
+
+    def getJobResults(self) -> List[Dict[str, Any]]:
+        return self._job_results
+
+    def start(self) -> None:
+        self._start_time = time.time()
+        self._application.fileCompleted.connect(self._onFileCompleted)
+        self._application.callLater(self._startNextJob)
+
+    def _startNextJob(self) -> None:
+        self._job_index += 1
+        if self._job_index >= len(self._jobs):
+            self._finish()
+            return
+
+        self._job = self._jobs[self._job_index]
+        self._job_result = {
+            "index": self._job.get("index", self._job_index),
+            "name": self._job["name"],
+            "output": self._job["output"],
+            "status": "running",
+            "timings": {}
+        }
+        Logger.log("i", "Starting batch job %s (%s of %s)", self._job["name"], self._job_index + 1, len(self._jobs))
+        self._setStage("setup")
+        self._job_start_time = time.time()
+        self._stage_start_time = self._job_start_time
+        self._timeout_timer.start(int(float(self._job.get("timeout", 3600)) * 1000))
+
+        try:
+            self._setUpJob()
+            self._endStage("setup")
+            self._loadModels()
+        except BatchJobError as e:
+            self._failJob(str(e))
+
+    def _setUpJob(self) -> None:
+        machine_manager = self._application.getMachineManager()
+        self._application.deleteAll(only_selectable = False)
+
+        machine_id = self._job["machine"]
+        machine = machine_manager.getMachine(machine_id)
+        if machine is None:
+            machine_manager.addMachine(machine_id, machine_id)
+        else:
+            machine_manager.setActiveMachine(machine.getId())
+        global_stack = machine_manager.activeMachine
+        if global_stack is None or global_stack.definition.getId() != machine_id:
+            raise BatchJobError("Could not activate machine {machine_id}".format(machine_id = machine_id))
+
+        # Start every job from the profile, without the changes of the previous job.
+        global_stack.userChanges.clear()
+        for extruder_stack in global_stack.extruders.values():
+            extruder_stack.userChanges.clear()
+
+        for position, root_material_id in self._job.get("materials", {}).items():
+            if str(position) not in global_stack.extruders:
+                raise BatchJobError("Machine {machine_id} has no extruder {position}".format(machine_id = machine_id, position = position))
+            machine_manager.setMaterialById(str(position), root_material_id)
+
+        quality_manager = self._application.getQualityManager()
+        if self._job.get("quality_changes"):
+            quality_changes_group = quality_manager.getQualityChangesGroups(global_stack).get(self._job["quality_changes"])
+            if quality_changes_group is None:
+                raise BatchJobError("Unknown profile {name}".format(name = self._job["quality_changes"]))
+            machine_manager.setQualityChangesGroup(quality_changes_group, no_dialog = True)
+        elif self._job.get("quality_type"):
+            quality_group = quality_manager.getQualityGroups(global_stack).get(self._job["quality_type"])
+            if quality_group is None or not quality_group.is_available:
+                raise BatchJobError("Quality type {quality_type} is not available".format(quality_type = self._job["quality_type"]))
+            machine_manager.setQualityGroup(quality_group, no_dialog = True)
+
+        for key, value in self._job.get("settings", {}).items():
+            global_stack.userChanges.setProperty(key, "value", value)
+        for position, settings in self._job.get("extruder_settings", {}).items():
+            extruder_stack = global_stack.extruders.get(str(position))
+            if extruder_stack is None:
+                raise BatchJobError("Machine {machine_id} has no extruder {position}".format(machine_id = machine_id, position = position))
+            for key, value in settings.items():
+                extruder_stack.userChanges.setProperty(key, "value", value)
+
+    def _loadModels(self) -> None:
+        missing = [model for model in self._job["models"] if not os.path.isfile(model)]
+        if missing:
+            raise BatchJobError("Model file {file_name} doesn't exist".format(file_name = missing[0]))
+        self._setStage("load")
+        self._files_loading = {os.path.normpath(model) for model in self._job["models"]}
+        for model in self._job["models"]:
+            self._application.readLocalFile(QUrl.fromLocalFile(model), skip_project_file_check = True)
+
+    def _onFileCompleted(self, file_name: str) -> None:
+        file_name = os.path.normpath(file_name)
+        if self._stage != "load" or file_name not in self._files_loading:
+            return
+        self._files_loading.discard(file_name)
+        if self._files_loading:
+            return
+
+        scene_root = self._application.getController().getScene().getRoot()
+        if not any(node.callDecoration("isSliceable") for node in DepthFirstIterator(scene_root)):
+            self._failJob("The models could not be loaded")
+            return
+        self._endStage("load")
+        self._setStage("validate")
+
+        # The backends don't slice while the settings are being checked.
+        error_checker = self._application.getMachineErrorChecker()
+        if error_checker.needToWaitForResult:
+            error_checker.errorCheckFinished.connect(self._onErrorCheckFinished)
+        else:
+            self._application.callLater(self._onErrorCheckFinished)
+
+    def _onErrorCheckFinished(self) -> None:
+        error_checker = self._application.getMachineErrorChecker()
+        try:
+            error_checker.errorCheckFinished.disconnect(self._onErrorCheckFinished)
+        except TypeError:  # Wasn't connected.
+            pass
+        if self._stage != "validate":
+            return
+        if error_checker.hasError:
+            self._failJob("The settings contain errors: {keys}".format(keys = ", ".join(sorted(key for _, key in error_checker.getErrorKeys()))))
+            return
+        self._endStage("validate")
+        self._setStage("slice")
+
+        self._backend = self._application.getBackend()
+        self._backend.backendStateChange.connect(self._onBackendStateChanged)
+        self._backend.processingProgress.connect(self._onBackendProgress)
+        self._backend.forceSlice()
+
+    def _onBackendStateChanged(self, state: "BackendState") -> None:
+        if state == BackendState.Done:
+            self._disconnectBackend()
+            self._endStage("slice")
+            self._setStage("write")
+            # Let the backend finish handling its messages first.
+            self._application.callLater(self._writeGCode)
+        elif state == BackendState.Error:
+            self._disconnectBackend()
+            self._failJob("The backend could not slice the job")
+
+    def _onBackendProgress(self, amount: float) -> None:
+        if self._stage == "slice" and self._progress_callback is not None:
+            self._progress_callback(self._stage, amount)
+
+    def _writeGCode(self) -> None:
+        if self._stage != "write":
+            return
+        output = self._job["output"]
+        writer = PluginRegistry.getInstance().getPluginObject("GCodeWriter")
+        scene_root = self._application.getController().getScene().getRoot()
+        nodes = [node for node in DepthFirstIterator(scene_root) if node.callDecoration("isSliceable")]
+        try:
+            os.makedirs(os.path.dirname(output), exist_ok = True)
+            if output.lower().endswith(".gz"):
+                with open(output, "wb") as stream:
+                    success = writer.write(stream, nodes, MeshWriter.OutputMode.BinaryMode)
+            else:
+                with open(output, "wt", encoding = "utf-8") as stream:
+                    success = writer.write(stream, nodes)
+        except EnvironmentError as e:
+            self._failJob("Could not write {output}: {error}".format(output = output, error = e))
+            return
+        if not success:
+            self._failJob("Could not write {output}: {error}".format(output = output, error = writer.getInformation()))
+            return
+        self._endStage("write")
+        self._finishJob("succeeded")
+
+    def _onTimeout(self) -> None:
+        self._disconnectBackend()
+        if self._backend is not None:
+            self._backend.stopSlicing()
+        self._failJob("The job timed out")
+
+    def _disconnectBackend(self) -> None:
+        if self._backend is not None:
+            self._backend.backendStateChange.disconnect(self._onBackendStateChanged)
+            self._backend.processingProgress.disconnect(self._onBackendProgress)
+            self._backend = None
+
+    def _setStage(self, stage: str) -> None:
+        self._stage = stage
+        if self._progress_callback is not None:
+            self._progress_callback(stage, 0.0)
+
+    def _endStage(self, stage: str) -> None:
+        now = time.time()
+        self._job_result["timings"][stage] = now - self._stage_start_time
+        self._stage_start_time = now
+
+    def _failJob(self, error: str) -> None:
+        Logger.log("w", "Batch job %s failed: %s", self._job["name"], error)
+        self._job_result["error"] = error
+        self._finishJob("failed")
+
+    def _finishJob(self, status: str) -> None:
+        self._timeout_timer.stop()
+        self._job_result["status"] = status
+        self._job_result["timings"]["total"] = time.time() - self._job_start_time
+        self._job_results.append(self._job_result)
+        Logger.log("i", "Batch job %s %s in %0.1fs", self._job["name"], status, self._job_result["timings"]["total"])
+        self._stage = ""
+        self._job = None
+        self._job_result = None
+        self._application.callLater(self._startNextJob)
+
+    def _finish(self) -> None:
+        self._application.fileCompleted.disconnect(self._onFileCompleted)
+        total_time = time.time() - self._start_time
+        if self._report_file:
+            try:
+                writeBatchReport(self._report_file, self._job_results, total_time, 1)
+            except EnvironmentError as e:
+                Logger.log("e", "Could not write batch report %s: %s", self._report_file, e)
+        Logger.log("i", "Batch of %s jobs finished in %0.1fs", len(self._job_results), total_time)
+        if self._finished_callback is not None:
+            self._finished_callback(self._job_results)
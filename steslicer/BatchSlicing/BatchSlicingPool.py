@@ -0,0 +1,185 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+ReportVersion = 1
+
+
+##  Reads a batch file and returns its jobs.
+#
+#   A batch file is a JSON file with a list of jobs, or an object with such a
+#   list in "jobs". A job looks like:
+#       {
+#           "name": "bracket",
+#           "models": ["models/bracket.stl"],
+#           "machine": "ste320",                  # Definition ID of the machine.
+#           "quality_type": "normal",             # Optional.
+#           "quality_changes": "My profile",      # Optional, name of a custom profile.
+#           "materials": {"0": "generic_pla"},    # Optional, root material ID per extruder.
+#           "settings": {"printing_mode": "classic", "layer_height": 0.2},  # Optional, user settings.
+#           "extruder_settings": {"0": {"material_print_temperature": 210}},  # Optional.
+#           "output": "out/bracket.gcode",        # Optional, .gcode.gz is written compressed.
+#           "timeout": 3600                       # Optional, in seconds.
+#       }
+#   Relative paths are relative to the batch file.
+#   \raise ValueError If the file doesn't contain valid jobs.
+def loadBatchJobs(file_name: str) -> List[Dict[str, Any]]:
+    with open(file_name, "r", encoding = "utf-8") as f:
+        data = json.load(f)
+    jobs = data.get("jobs") if isinstance(data, dict) else data
+    if not isinstance(jobs, list):
+        raise ValueError("Batch file {file_name} contains no list of jobs.".format(file_name = file_name))
+
+    base_path = os.path.dirname(os.path.abspath(file_name))
+    result = []
+    for index, job in enumerate(jobs):
+        try:
+            result.append(normalizeBatchJob(job, base_path))
+        except ValueError as e:
+            raise ValueError("Job {index} in {file_name}: {error}".format(index = index, file_name = file_name, error = e))
+    return result
+
+
+##  Checks a job and makes its paths absolute.
+#   \param base_path The path that relative paths in the job are relative to.
+#   \param confine_to_base_path Whether the models and the output of the job
+#   have to be in the base path, for jobs from untrusted sources.
+#   \return A copy of the job, with a name and an output file.
+#   \raise ValueError If the job has no models or machine, or if it has paths
+#   outside the base path that it is confined to.
+def normalizeBatchJob(job: Dict[str, Any], base_path: str, confine_to_base_path: bool = False) -> Dict[str, Any]:
+    if not isinstance(job, dict) or not job.get("models") or not job.get("machine"):
+        raise ValueError("A job needs at least models and a machine.")
+    if not isinstance(job["models"], list) or not all(isinstance(model, str) for model in job["models"]):
+        raise ValueError("The models of a job must be a list of file names.")
+    job = dict(job)
+    job["models"] = [os.path.normpath(os.path.join(base_path, model)) for model in job["models"]]
+    job.setdefault("name", os.path.splitext(os.path.basename(job["models"][0]))[0])
+    if job.get("output"):
+        job["output"] = os.path.normpath(os.path.join(base_path, job["output"]))
+    else:
+        job["output"] = os.path.join(os.path.dirname(job["models"][0]), job["name"] + ".gcode")
+    if confine_to_base_path:
+        for path in job["models"] + [job["output"]]:
+            if not _isInFolder(path, base_path):
+                raise ValueError("The path {path} is outside of {base_path}.".format(path = path, base_path = base_path))
+    return job
+
+
+##  Whether a path is in a folder, after resolving symbolic links.
+def _isInFolder(path: str, folder: str) -> bool:
+    folder = os.path.realpath(folder)
+    return os.path.commonpath([os.path.realpath(path), folder]) == folder
+
+
+def writeBatchReport(file_name: str, job_results: List[Dict[str, Any]], total_time: float, workers: int) -> None:
+    report = {
+        "version": ReportVersion,
+        "workers": workers,
+        "total_time": total_time,
+        "succeeded": len([job for job in job_results if job["status"] == "succeeded"]),
+        "failed": len([job for job in job_results if job["status"] != "succeeded"]),
+        "jobs": job_results
+    }
+    directory = os.path.dirname(os.path.abspath(file_name))
+    os.makedirs(directory, exist_ok = True)
+    with open(file_name, "w", encoding = "utf-8") as f:
+        json.dump(report, f, indent = 4)
+
+
+##  Slices the jobs of a batch file with several headless STE Slicer processes.
+#
+#   Every worker is a separate application instance that slices its share of the
+#   jobs one after the other and writes a report. The jobs are divided by the
+#   size of their model files, largest first, so all workers finish at about the
+#   same time. The reports of the workers are merged into one report.
+class BatchSlicingPool:
+    def __init__(self, batch_file: str, workers: int, report_file: Optional[str] = None, extra_arguments: Optional[List[str]] = None) -> None:
+        self._batch_file = batch_file
+        self._workers = max(1, workers)
+        self._report_file = report_file
+        self._extra_arguments = extra_arguments or []
+
+    ##  Runs all jobs and waits for them to finish.
+    #   \return The exit code, 0 if all jobs succeeded.
+    def run(self) -> int:
+        start_time = time.time()
+        try:
+            jobs = loadBatchJobs(self._batch_file)
+        except (EnvironmentError, ValueError) as e:
+            print("Could not read batch file: {error}".format(error = e), file = sys.stderr)
+            return 2
+
+        shares = self.divideJobs(jobs, self._workers)
+        temporary_path = tempfile.mkdtemp(prefix = "steslicer-batch-")
+        try:
+            with ThreadPoolExecutor(max_workers = len(shares)) as executor:
+                worker_results = list(executor.map(lambda args: self._runWorker(*args), [(index, share, temporary_path) for index, share in enumerate(shares)]))
+        finally:
+            shutil.rmtree(temporary_path, ignore_errors = True)
+
+        # Report the jobs in the order of the batch file.
+        job_results = sorted([result for results in worker_results for result in results], key = lambda result: result["index"])
+        total_time = time.time() - start_time
+        if self._report_file:
+            writeBatchReport(self._report_file, job_results, total_time, len(shares))
+
+        failed = [result for result in job_results if result["status"] != "succeeded"]
+        print("Sliced {succeeded} of {total} jobs with {workers} workers in {time:.1f}s.".format(
+            succeeded = len(job_results) - len(failed), total = len(job_results), workers = len(shares), time = total_time))
+        for result in failed:
+            print("Job {name} failed: {error}".format(name = result["name"], error = result.get("error")), file = sys.stderr)
+        return 1 if failed else 0
+
+    ##  Divides jobs over the workers, balancing the size of the model files.
+    #   \return A list of jobs per worker, without empty lists. The jobs get
+    #   their index in the original list in "index".
+    @staticmethod
+    def divideJobs(jobs: List[Dict[str, Any]], workers: int) -> List[List[Dict[str, Any]]]:
+        def jobSize(job: Dict[str, Any]) -> int:
+            return sum(os.path.getsize(model) for model in job["models"] if os.path.isfile(model))
+
+        shares = [[] for _ in range(max(1, min(workers, len(jobs))))]  # type: List[List[Dict[str, Any]]]
+        share_sizes = [0] * len(shares)
+        indexed_jobs = [dict(job, index = index) for index, job in enumerate(jobs)]
+        for job in sorted(indexed_jobs, key = jobSize, reverse = True):
+            smallest = share_sizes.index(min(share_sizes))
+            shares[smallest].append(job)
+            share_sizes[smallest] += jobSize(job)
+        return [share for share in shares if share]
+
+    def _runWorker(self, worker_index: int, jobs: List[Dict[str, Any]], temporary_path: str) -> List[Dict[str, Any]]:
+        batch_file = os.path.join(temporary_path, "worker{index}.json".format(index = worker_index))
+        report_file = os.path.join(temporary_path, "worker{index}-report.json".format(index = worker_index))
+        with open(batch_file, "w", encoding = "utf-8") as f:
+            json.dump({"jobs": jobs}, f)
+
+        command = self._getApplicationCommand() + ["--headless", "--batch", batch_file, "--batch-report", report_file] + self._extra_arguments
+        exit_code = subprocess.call(command)
+
+        try:
+            with open(report_file, "r", encoding = "utf-8") as f:
+                results = json.load(f)["jobs"]
+        except (EnvironmentError, ValueError, KeyError):
+            results = []
+        # Jobs that have no result were lost when the worker crashed.
+        reported = {result["index"] for result in results}
+        for job in jobs:
+            if job["index"] not in reported:
+                results.append({"index": job["index"], "name": job["name"], "output": job["output"], "status": "failed",
+                                "error": "Worker exited with code {code}".format(code = exit_code), "timings": {}})
+        for result in results:
+            result["worker"] = worker_index
+        return results
+
+    @staticmethod
+    def _getApplicationCommand() -> List[str]:
+        if hasattr(sys, "frozen"):
+            return [sys.executable]
+        return [sys.executable, os.path.abspath(sys.argv[0])]
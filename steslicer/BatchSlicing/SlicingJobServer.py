@@ -0,0 +1,490 @@
+import hmac
+import json
+import os
+import queue
+import re
+import secrets
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import parse_qs, quote, urlparse
+from urllib.request import Request, urlopen
+
+from steslicer.BatchSlicing.BatchSlicingPool import normalizeBatchJob
+
+DEFAULT_PORT = 8765
+CHUNK_SIZE = 1024 * 1024  # G-code is sent to clients in chunks of this size.
+JOB_RETENTION = 60 * 60  # Finished jobs whose g-code isn't fetched are removed after this many seconds.
+# The environment variable in which workers get the secret they have to send when they connect.
+WORKER_SECRET_VARIABLE = "STESLICER_SLICING_WORKER_SECRET"
+
+
+##  A long running service that slices jobs with warm STE Slicer workers.
+#
+#   The server starts a number of headless STE Slicer processes that connect
+#   back to it and then wait for jobs (see SlicingWorker), so the application is
+#   only booted once per worker instead of once per job. Jobs are queued and
+#   given to the first worker that is free. Workers get a secret in their
+#   environment and are only given jobs if they send it back when they connect.
+#
+#   Clients use a small HTTP API, that only listens on localhost. Every request
+#   needs the token of the server in an "Authorization: Bearer <token>" header,
+#   and it only accepts requests for its own address, so web pages in a browser
+#   can't use it. Jobs can only use models and write g-code in the spool folder.
+#   A finished job and its g-code are removed once the g-code was fetched, or
+#   when it wasn't fetched within the retention time.
+#       POST /models?name=cube.stl      Upload a model as application/octet-stream, returns {"path": ...}.
+#       POST /jobs                      Queue a job (see loadBatchJobs) as application/json, returns the job.
+#       GET  /jobs                      All jobs.
+#       GET  /jobs/<id>                 The status, stage, progress and timings of a job.
+#       GET  /jobs/<id>/events          Streams a line of JSON every time the job changes, until it's done.
+#       GET  /jobs/<id>/gcode           The g-code of a job that succeeded.
+#       GET  /workers                   The number of running and ready workers.
+class SlicingJobServer:
+    def __init__(self, port: int = DEFAULT_PORT, workers: int = 2, spool_path: Optional[str] = None,
+                 worker_command: Optional[List[str]] = None, token: Optional[str] = None, job_retention: float = JOB_RETENTION) -> None:
+        self._port = port
+        self._token = token or secrets.token_urlsafe(32)
+        self._worker_secret = secrets.token_urlsafe(32)
+        self._job_retention = job_retention
+        self._worker_count = max(1, workers)
+        self._spool_path = spool_path
+        self._remove_spool_path = spool_path is None
+        # The command to start a worker, the address of the server is added to it.
+        self._worker_command = worker_command or self._getApplicationCommand() + ["--headless"]
+
+        self._jobs = {}  # type: Dict[str, Dict[str, Any]]
+        self._jobs_changed = threading.Condition()
+        self._queue = queue.Queue()  # type: queue.Queue
+        self._worker_processes = []  # type: List[subprocess.Popen]
+        self._ready_workers = 0
+        self._ready_workers_lock = threading.Lock()
+        self._running = False
+
+        self._worker_listener = None  # type: Optional[socket.socket]
+        self._http_server = None  # type: Optional[HTTPServer]
+
+    def getPort(self) -> int:
+        return self._http_server.server_address[1] if self._http_server else self._port
+
+    ##  The token that clients need to send with every request.
+    def getToken(self) -> str:
+        return self._token
+
+    ##  Whether a request came with the token of the server.
+    def isAuthorized(self, authorization: Optional[str]) -> bool:
+        expected = "Bearer " + self._token
+        return authorization is not None and hmac.compare_digest(authorization.encode("utf-8"), expected.encode("utf-8"))
+
+    ##  Whether a worker sent the secret that the server gave its workers.
+    def isWorkerSecret(self, secret: Any) -> bool:
+        return isinstance(secret, str) and hmac.compare_digest(secret.encode("utf-8"), self._worker_secret.encode("utf-8"))
+
+    ##  Whether a Host or Origin header names this server.
+    def isOwnAddress(self, address: str) -> bool:
+        address = urlparse(address).netloc if "//" in address else address
+        return address in ("127.0.0.1:{port}".format(port = self.getPort()), "localhost:{port}".format(port = self.getPort()))
+
+    ##  Starts the workers and the HTTP API, without blocking.
+    def start(self) -> None:
+        if self._spool_path is None:
+            self._spool_path = tempfile.mkdtemp(prefix = "steslicer-jobs-")
+        os.makedirs(os.path.join(self._spool_path, "models"), exist_ok = True)
+        self._running = True
+
+        self._worker_listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._worker_listener.bind(("127.0.0.1", 0))
+        self._worker_listener.listen(self._worker_count)
+        threading.Thread(target = self._acceptWorkers, daemon = True).start()
+        for _ in range(self._worker_count):
+            self._startWorkerProcess()
+
+        self._http_server = _ThreadingHTTPServer(("127.0.0.1", self._port), _RequestHandler)
+        self._http_server.job_server = self
+        threading.Thread(target = self._http_server.serve_forever, daemon = True).start()
+
+    ##  Runs until interrupted.
+    def serveForever(self) -> None:
+        self.start()
+        print("Slicing job server listening on http://127.0.0.1:{port} with {workers} workers.".format(port = self.getPort(), workers = self._worker_count))
+        print("Token: {token}".format(token = self._token))
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        self._running = False
+        if self._http_server:
+            self._http_server.shutdown()
+            self._http_server.server_close()
+        # Every waiting worker connection takes one of these and tells its worker to quit.
+        for _ in range(len(self._worker_processes)):
+            self._queue.put(None)
+        if self._worker_listener:
+            self._worker_listener.close()
+        for process in self._worker_processes:
+            try:
+                process.wait(timeout = 10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        if self._remove_spool_path and self._spool_path:
+            shutil.rmtree(self._spool_path, ignore_errors = True)
+
+    ##  Queues a job.
+    #   \raise ValueError If the job is not valid or uses paths outside the
+    #   spool folder.
+    #   \return The queued job.
+    def submitJob(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        job_id = uuid.uuid4().hex
+        if isinstance(job, dict) and not job.get("output"):
+            job = dict(job, output = os.path.join(self._spool_path, job_id + (".gcode.gz" if job.get("compress") else ".gcode")))
+        # Relative paths are relative to the spool folder, so uploaded models can be used as "models/<name>".
+        job = normalizeBatchJob(job, self._spool_path, confine_to_base_path = True)
+        job["id"] = job_id
+
+        self._removeExpiredJobs()
+        with self._jobs_changed:
+            self._jobs[job_id] = {
+                "id": job_id,
+                "name": job["name"],
+                "status": "queued",
+                "stage": "",
+                "progress": 0.0,
+                "timings": {},
+                "submitted": time.time(),
+                "version": 0,
+                "job": job
+            }
+            self._jobs_changed.notify_all()
+        self._queue.put(job_id)
+        return self.getJob(job_id)
+
+    def getJob(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._jobs_changed:
+            record = self._jobs.get(job_id)
+            return self._publicRecord(record) if record else None
+
+    def getJobs(self) -> List[Dict[str, Any]]:
+        self._removeExpiredJobs()
+        with self._jobs_changed:
+            return [self._publicRecord(record) for record in self._jobs.values()]
+
+    def getWorkers(self) -> Dict[str, int]:
+        with self._ready_workers_lock:
+            ready_workers = self._ready_workers
+        return {"processes": len([process for process in self._worker_processes if process.poll() is None]), "ready": ready_workers}
+
+    ##  Waits until a job changed after the given version.
+    #   \return The job, or None if it doesn't exist.
+    def waitForJobChange(self, job_id: str, version: int, timeout: float = 30) -> Optional[Dict[str, Any]]:
+        with self._jobs_changed:
+            self._jobs_changed.wait_for(lambda: job_id not in self._jobs or self._jobs[job_id]["version"] > version, timeout = timeout)
+            record = self._jobs.get(job_id)
+            return self._publicRecord(record) if record else None
+
+    def getGCodePath(self, job_id: str) -> Optional[str]:
+        with self._jobs_changed:
+            record = self._jobs.get(job_id)
+            if record is None or record["status"] != "succeeded":
+                return None
+            return record["job"]["output"]
+
+    ##  Removes a finished job and its g-code.
+    def removeJob(self, job_id: str) -> None:
+        with self._jobs_changed:
+            record = self._jobs.get(job_id)
+            if record is None or record["status"] not in ("succeeded", "failed"):
+                return
+            del self._jobs[job_id]
+            self._jobs_changed.notify_all()
+        try:
+            os.remove(record["job"]["output"])
+        except EnvironmentError:
+            pass  # The job failed before it wrote any g-code.
+
+    ##  Removes the jobs that finished longer than the retention time ago.
+    def _removeExpiredJobs(self) -> None:
+        expiry_time = time.time() - self._job_retention
+        with self._jobs_changed:
+            expired_job_ids = [job_id for job_id, record in self._jobs.items() if record.get("finished", expiry_time) < expiry_time]
+        for job_id in expired_job_ids:
+            self.removeJob(job_id)
+
+    ##  Stores an uploaded model in the spool folder.
+    #   \return The path of the stored model.
+    def storeModel(self, name: str, stream: Any, length: int) -> str:
+        file_name = uuid.uuid4().hex[:8] + "-" + re.sub(r"[^\w.\-]", "_", os.path.basename(name))
+        path = os.path.join(self._spool_path, "models", file_name)
+        with open(path, "wb") as f:
+            while length > 0:
+                data = stream.read(min(length, CHUNK_SIZE))
+                if not data:
+                    break
+                f.write(data)
+                length -= len(data)
+        return path
+
+    def _updateJob(self, job_id: str, **values: Any) -> None:
+        with self._jobs_changed:
+            record = self._jobs.get(job_id)
+            if record is None:
+                return
+            record.update(values)
+            record["version"] += 1
+            self._jobs_changed.notify_all()
+
+    @staticmethod
+    def _publicRecord(record: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in record.items() if key != "job"}
+
+    def _startWorkerProcess(self) -> None:
+        address = "127.0.0.1:{port}".format(port = self._worker_listener.getsockname()[1])
+        # The application logs to the console, keep that out of the output of the server.
+        # The secret is not passed as an argument, since other users can see those.
+        environment = dict(os.environ)
+        environment[WORKER_SECRET_VARIABLE] = self._worker_secret
+        process = subprocess.Popen(self._worker_command + ["--slicing-worker", address], stdout = subprocess.DEVNULL, env = environment)
+        self._worker_processes.append(process)
+
+    def _acceptWorkers(self) -> None:
+        while self._running:
+            try:
+                connection, _ = self._worker_listener.accept()
+            except OSError:  # The listener was closed.
+                return
+            threading.Thread(target = self._serveWorker, args = (connection, ), daemon = True).start()
+
+    ##  Gives jobs to a single worker, until the server stops or the worker dies.
+    def _serveWorker(self, connection: socket.socket) -> None:
+        stream = connection.makefile("rwb")
+        job_id = None
+        job_started = False
+        is_ready = False
+        try:
+            message = self._readMessage(stream)
+            if message is None or message.get("event") != "ready" or not self.isWorkerSecret(message.get("secret")):
+                return  # Not one of our workers, it doesn't get any jobs.
+            is_ready = True
+            with self._ready_workers_lock:
+                self._ready_workers += 1
+            while self._running:
+                job_id = self._queue.get()
+                if job_id is None:
+                    self._writeMessage(stream, {"command": "quit"})
+                    return
+                with self._jobs_changed:
+                    job = self._jobs[job_id]["job"]
+                self._updateJob(job_id, status = "running", started = time.time())
+                self._writeMessage(stream, {"command": "slice", "job": job})
+                job_started = False
+
+                while True:
+                    message = self._readMessage(stream)
+                    if message is None:
+                        raise ConnectionError("The worker stopped")
+                    if message.get("job_id") != job_id:
+                        continue
+                    job_started = True
+                    if message.get("event") == "progress":
+                        self._updateJob(job_id, stage = message["stage"], progress = message["progress"])
+                    elif message.get("event") == "finished":
+                        result = message["result"]
+                        self._updateJob(job_id, status = result["status"], error = result.get("error"), timings = result.get("timings", {}),
+                                        stage = "", progress = 1.0, finished = time.time())
+                        job_id = None
+                        break
+        except (ConnectionError, OSError, ValueError) as e:
+            if job_id is not None and not job_started:
+                # The worker died before it got the job, give it to another worker.
+                self._updateJob(job_id, status = "queued")
+                self._queue.put(job_id)
+            elif job_id is not None:
+                self._updateJob(job_id, status = "failed", error = str(e), finished = time.time())
+            # Replace the worker that died.
+            if self._running:
+                self._startWorkerProcess()
+        finally:
+            if is_ready:
+                with self._ready_workers_lock:
+                    self._ready_workers -= 1
+            connection.close()
+
+    @staticmethod
+    def _readMessage(stream: Any) -> Optional[Dict[str, Any]]:
+        line = stream.readline()
+        if not line:
+            return None
+        return json.loads(line.decode("utf-8"))
+
+    @staticmethod
+    def _writeMessage(stream: Any, message: Dict[str, Any]) -> None:
+        stream.write(bytes(json.dumps(message) + "\n", encoding = "utf-8"))
+        stream.flush()
+
+    @staticmethod
+    def _getApplicationCommand() -> List[str]:
+        if hasattr(sys, "frozen"):
+            return [sys.executable]
+        return [sys.executable, os.path.abspath(sys.argv[0])]
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    job_server = None  # type: SlicingJobServer
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if not self._checkRequest():
+            return
+        job_server = self.server.job_server
+        parts = [part for part in urlparse(self.path).path.split("/") if part]
+        if parts == ["jobs"]:
+            self._sendJson(200, job_server.getJobs())
+        elif parts == ["workers"]:
+            self._sendJson(200, job_server.getWorkers())
+        elif len(parts) == 2 and parts[0] == "jobs":
+            job = job_server.getJob(parts[1])
+            if job is None:
+                self._sendError(404, "Unknown job")
+            else:
+                self._sendJson(200, job)
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "events":
+            self._streamEvents(parts[1])
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "gcode":
+            self._sendGCode(parts[1])
+        else:
+            self._sendError(404, "Not found")
+
+    def do_POST(self) -> None:
+        if not self._checkRequest():
+            return
+        job_server = self.server.job_server
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length", 0))
+        content_type = self.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        if url.path in ("/models", "/jobs") and content_type != ("application/octet-stream" if url.path == "/models" else "application/json"):
+            self._sendError(415, "Unsupported content type")
+        elif url.path == "/models":
+            name = parse_qs(url.query).get("name", ["model.stl"])[0]
+            self._sendJson(201, {"path": job_server.storeModel(name, self.rfile, length)})
+        elif url.path == "/jobs":
+            try:
+                job = json.loads(self.rfile.read(length).decode("utf-8"))
+                self._sendJson(201, job_server.submitJob(job))
+            except ValueError as e:
+                self._sendError(400, str(e))
+        else:
+            self._sendError(404, "Not found")
+
+    ##  Sends an error if the request is not from a client of this server.
+    #   \return Whether the request can be handled.
+    def _checkRequest(self) -> bool:
+        job_server = self.server.job_server
+        origin = self.headers.get("Origin")
+        if not job_server.isOwnAddress(self.headers.get("Host", "")) or (origin is not None and not job_server.isOwnAddress(origin)):
+            self._sendError(403, "Forbidden")
+            return False
+        if not job_server.isAuthorized(self.headers.get("Authorization")):
+            self._sendError(401, "Unauthorized")
+            return False
+        return True
+
+    def _streamEvents(self, job_id: str) -> None:
+        job_server = self.server.job_server
+        job = job_server.getJob(job_id)
+        if job is None:
+            self._sendError(404, "Unknown job")
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        # Without content length, the end of the stream is when the connection closes.
+        self.close_connection = True
+        while True:
+            self.wfile.write(bytes(json.dumps(job) + "\n", encoding = "utf-8"))
+            self.wfile.flush()
+            if job["status"] in ("succeeded", "failed"):
+                return
+            job = job_server.waitForJobChange(job_id, job["version"])
+            if job is None:
+                return
+
+    def _sendGCode(self, job_id: str) -> None:
+        path = self.server.job_server.getGCodePath(job_id)
+        if path is None or not os.path.isfile(path):
+            self._sendError(409, "The job has no g-code")
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/gzip" if path.endswith(".gz") else "text/x-gcode")
+        self.send_header("Content-Length", str(os.path.getsize(path)))
+        self.end_headers()
+        with open(path, "rb") as f:
+            shutil.copyfileobj(f, self.wfile, CHUNK_SIZE)
+        self.server.job_server.removeJob(job_id)
+
+    def _sendJson(self, code: int, data: Any) -> None:
+        body = bytes(json.dumps(data), encoding = "utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _sendError(self, code: int, message: str) -> None:
+        self._sendJson(code, {"error": message})
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass  # Don't log every request to stderr.
+
+
+##  A client for the HTTP API of the slicing job server.
+class SlicingJobClient:
+    ##  \param token The token that the server printed when it started.
+    def __init__(self, token: str, port: int = DEFAULT_PORT) -> None:
+        self._url = "http://127.0.0.1:{port}".format(port = port)
+        self._token = token
+
+    def uploadModel(self, file_name: str) -> str:
+        with open(file_name, "rb") as f:
+            return self._request("POST", "/models?name=" + quote(os.path.basename(file_name)), f.read(), "application/octet-stream")["path"]
+
+    def submitJob(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        return self._request("POST", "/jobs", bytes(json.dumps(job), encoding = "utf-8"), "application/json")
+
+    def getJob(self, job_id: str) -> Dict[str, Any]:
+        return self._request("GET", "/jobs/" + job_id)
+
+    ##  Yields the job every time it changes, until it succeeded or failed.
+    def watchJob(self, job_id: str) -> Iterator[Dict[str, Any]]:
+        with urlopen(self._createRequest("GET", "/jobs/" + job_id + "/events")) as response:
+            for line in response:
+                yield json.loads(line.decode("utf-8"))
+
+    ##  Writes the g-code of a job to a stream, chunk by chunk.
+    def downloadGCode(self, job_id: str, stream: Any) -> None:
+        with urlopen(self._createRequest("GET", "/jobs/" + job_id + "/gcode")) as response:
+            shutil.copyfileobj(response, stream, CHUNK_SIZE)
+
+    def _request(self, method: str, path: str, data: Optional[bytes] = None, content_type: Optional[str] = None) -> Any:
+        with urlopen(self._createRequest(method, path, data, content_type)) as response:
+            return json.loads(response.read().decode("utf-8"))
+
+    def _createRequest(self, method: str, path: str, data: Optional[bytes] = None, content_type: Optional[str] = None) -> Request:
+        request = Request(self._url + path, data = data, method = method)
+        request.add_header("Authorization", "Bearer " + self._token)
+        if content_type is not None:
+            request.add_header("Content-Type", content_type)
+        return request
@@ -0,0 +1,107 @@
+import json
+import os
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+
+from PyQt5.QtCore import QObject
+from PyQt5.QtNetwork import QAbstractSocket, QTcpSocket
+
+from UM.Logger import Logger
+
+from steslicer.BatchSlicing.BatchSlicer import BatchSlicer
+from steslicer.BatchSlicing.SlicingJobServer import WORKER_SECRET_VARIABLE
+
+if TYPE_CHECKING:
+    from steslicer.SteSlicerApplication import SteSlicerApplication
+
+
+##  Slices the jobs it receives from a slicing job server.
+#
+#   The worker stays running between jobs, so the registries, materials and
+#   qualities are only loaded once. It talks to the server with one line of JSON
+#   per message over a local TCP connection:
+#       worker -> server: {"event": "ready", "secret": ...}
+#                         {"event": "progress", "job_id": ..., "stage": ..., "progress": ...}
+#                         {"event": "finished", "job_id": ..., "result": {...}}
+#       server -> worker: {"command": "slice", "job": {...}}
+#                         {"command": "quit"}
+#   The secret is the one the server put in the environment of the worker.
+#   The application quits when the connection is closed.
+class SlicingWorker(QObject):
+    def __init__(self, application: "SteSlicerApplication", server_address: str, parent = None) -> None:
+        super().__init__(parent)
+        self._application = application
+        host, _, port = server_address.rpartition(":")
+        self._host = host or "127.0.0.1"
+        self._port = int(port)
+        self._secret = os.environ.get(WORKER_SECRET_VARIABLE, "")
+
+        self._socket = None  # type: Optional[QTcpSocket]
+        self._batch_slicer = None  # type: Optional[BatchSlicer]
+        self._job_id = None  # type: Optional[str]
+
+    def start(self) -> None:
+        self._socket = QTcpSocket(self)
+        self._socket.connected.connect(self._onConnected)
+        self._socket.readyRead.connect(self._readCommands)
+        self._socket.disconnected.connect(self._onDisconnected)
+        self._socket.error.connect(self._onError)
+        self._socket.connectToHost(self._host, self._port)
+
+    def _onConnected(self) -> None:
+        Logger.log("i", "Connected to slicing job server %s:%s", self._host, self._port)
+        self._send({"event": "ready", "secret": self._secret})
+
+    def _onDisconnected(self) -> None:
+        Logger.log("i", "Slicing job server closed the connection, quitting.")
+        self._application.exit(0)
+
+    def _onError(self, error: QAbstractSocket.SocketError) -> None:
+        if error == QAbstractSocket.RemoteHostClosedError:
+            return  # Handled by _onDisconnected.
+        Logger.log("e", "Connection to slicing job server failed: %s", self._socket.errorString())
+        self._application.exit(1)
+
+    def _readCommands(self) -> None:
+        while self._socket.canReadLine():
+            line = bytes(self._socket.readLine()).decode("utf-8")
+            try:
+                payload = json.loads(line)
+                command = payload["command"]
+            except (ValueError, KeyError) as e:
+                Logger.log("w", "Unable to parse command '%s': %s", line, repr(e))
+                continue
+
+            if command == "slice":
+                self._startJob(payload["job"])
+            elif command == "quit":
+                self._socket.disconnectFromHost()
+            else:
+                Logger.log("w", "Received an unrecognized command %s", command)
+
+    def _startJob(self, job: Dict[str, Any]) -> None:
+        if self._batch_slicer is not None:
+            Logger.log("e", "Received job %s while job %s is still running.", job.get("id"), self._job_id)
+            self._send({"event": "finished", "job_id": job.get("id"),
+                        "result": {"status": "failed", "error": "The worker is busy", "timings": {}}})
+            return
+        self._job_id = job.get("id")
+        self._batch_slicer = BatchSlicer(self._application, [job],
+                                         finished_callback = self._onJobFinished,
+                                         progress_callback = self._onJobProgress,
+                                         parent = self)
+        self._batch_slicer.start()
+
+    def _onJobProgress(self, stage: str, progress: float) -> None:
+        self._send({"event": "progress", "job_id": self._job_id, "stage": stage, "progress": progress})
+
+    def _onJobFinished(self, results: List[Dict[str, Any]]) -> None:
+        self._send({"event": "finished", "job_id": self._job_id, "result": results[0]})
+        self._batch_slicer.deleteLater()
+        self._batch_slicer = None
+        self._job_id = None
+
+    def _send(self, message: Dict[str, Any]) -> None:
+        if self._socket is None or self._socket.state() != QAbstractSocket.ConnectedState:
+            return
+        self._socket.write(bytes(json.dumps(message) + "\n", encoding = "utf-8"))
+        self._socket.flush()
@@ -0,0 +1,135 @@
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from UM.Logger import Logger
+
+# The fields of a path segment message that hold the bulk of its data.
+_path_segment_fields = ("points", "line_type", "line_width", "line_thickness", "line_feedrate")
+
+
+##  Estimates how much memory the data of a sliced layer takes.
+#   \param layer A layer message from the engine, or a Layer.
+#   \return The size in bytes.
+def estimateLayerSize(layer: Any) -> int:
+    size = 0
+    if hasattr(layer, "repeatedMessageCount"):
+        for index in range(layer.repeatedMessageCount("path_segment")):
+            path_segment = layer.getRepeatedMessage("path_segment", index)
+            for field in _path_segment_fields:
+                size += len(getattr(path_segment, field, b"") or b"")
+    else:
+        for polygon in getattr(layer, "polygons", []):
+            data = getattr(polygon, "data", None)
+            size += getattr(data, "nbytes", 0)
+    return size
+
+
+##  Keeps the sliced layers of every build plate until they are processed
+#   into layer data for the layer view.
+#
+#   Only the layers of the build plates that changed are thrown away. The
+#   layers of all build plates together are kept within a memory budget: when
+#   they take more, the layers of the build plates that were used the longest
+#   ago are thrown away. Those build plates are remembered as evicted, so they
+#   can be sliced again when they are needed. The layers of build plates that
+#   are pinned, because a job is processing them, are never thrown away.
+class LayerDataStore:
+    DefaultMemoryBudget = 512 * 1024 * 1024  # In bytes.
+
+    def __init__(self, memory_budget: int = DefaultMemoryBudget) -> None:
+        self._memory_budget = memory_budget
+        # The layers by build plate number, the build plate used longest ago first.
+        self._layers = OrderedDict()  # type: OrderedDict
+        self._sizes = {}  # type: Dict[int, int]
+        self._evicted = set()  # type: Set[int]
+        self._pinned = set()  # type: Set[int]
+
+    def getMemoryBudget(self) -> int:
+        return self._memory_budget
+
+    def setMemoryBudget(self, memory_budget: int) -> None:
+        self._memory_budget = memory_budget
+        self._evict()
+
+    ##  \return The estimated size of all layers that are kept, in bytes.
+    def getMemoryUsage(self) -> int:
+        return sum(self._sizes.values())
+
+    def __contains__(self, build_plate_number: int) -> bool:
+        return build_plate_number in self._layers
+
+    def getBuildPlates(self) -> List[int]:
+        return list(self._layers.keys())
+
+    ##  \return The layers of a build plate. This counts as a use of the build
+    #   plate.
+    def getLayers(self, build_plate_number: int) -> List[Any]:
+        self._layers.move_to_end(build_plate_number)
+        return self._layers[build_plate_number]
+
+    ##  Starts over with no layers for a build plate, before it is sliced.
+    def startBuildPlate(self, build_plate_number: int) -> None:
+        self._layers[build_plate_number] = []
+        self._layers.move_to_end(build_plate_number)
+        self._sizes[build_plate_number] = 0
+        self._evicted.discard(build_plate_number)
+
+    def append(self, build_plate_number: int, layer: Any) -> None:
+        self.extend(build_plate_number, [layer])
+
+    def extend(self, build_plate_number: int, layers: Iterable[Any]) -> None:
+        if build_plate_number not in self._layers:
+            self.startBuildPlate(build_plate_number)
+        layers = list(layers)
+        self._layers[build_plate_number].extend(layers)
+        self._sizes[build_plate_number] += sum(estimateLayerSize(layer) for layer in layers)
+        self._evict(keep = build_plate_number)
+
+    ##  Throws the layers of a build plate away, for instance when they are
+    #   processed.
+    def remove(self, build_plate_number: int) -> None:
+        self._layers.pop(build_plate_number, None)
+        self._sizes.pop(build_plate_number, None)
+        self._evicted.discard(build_plate_number)
+        self._pinned.discard(build_plate_number)
+
+    ##  Keeps the layers of a build plate until they are removed or unpinned,
+    #   however much memory they take. A job that processes the layers holds on
+    #   to them anyway, so throwing them away would free nothing and only make
+    #   the build plate be sliced again.
+    def pin(self, build_plate_number: int) -> None:
+        self._pinned.add(build_plate_number)
+
+    def unpin(self, build_plate_number: int) -> None:
+        self._pinned.discard(build_plate_number)
+        self._evict()
+
+    ##  Throws the layers of build plates away because they are no longer valid.
+    #   \param build_plate_numbers The build plates that changed, or None for
+    #   all of them.
+    def invalidate(self, build_plate_numbers: Optional[Iterable[int]] = None) -> None:
+        if build_plate_numbers is None:
+            build_plate_numbers = list(self._layers.keys()) + list(self._evicted)
+        for build_plate_number in list(build_plate_numbers):
+            self.remove(build_plate_number)
+
+    ##  \return Whether the layers of a build plate were thrown away to stay
+    #   within the memory budget, and the build plate wasn't sliced since.
+    def isEvicted(self, build_plate_number: int) -> bool:
+        return build_plate_number in self._evicted
+
+    ##  Throws away the layers of the build plates used longest ago until the
+    #   layers fit in the memory budget.
+    #   \param keep A build plate whose layers are not thrown away either, like
+    #   the build plate that is being sliced.
+    def _evict(self, keep: Optional[int] = None) -> None:
+        memory_usage = self.getMemoryUsage()
+        for build_plate_number in list(self._layers.keys()):
+            if memory_usage <= self._memory_budget:
+                return
+            if build_plate_number == keep or build_plate_number in self._pinned:
+                continue
+            memory_usage -= self._sizes[build_plate_number]
+            self.remove(build_plate_number)
+            self._evicted.add(build_plate_number)
+            Logger.log("d", "Layers of build plate %s exceed the memory budget of %s bytes, removed them.", build_plate_number, self._memory_budget)
@@ -0,0 +1,61 @@
+import time
+from typing import Any, Callable, Dict, Optional
+
+from UM.Application import Application
+from UM.Logger import Logger
+from UM.PluginObject import PluginObject
+
+
+##  Stands in for the object of a plug-in until the object is used.
+#
+#   Registering a plug-in normally imports its module, with everything that
+#   module imports, and creates its object while the application starts, even
+#   if the object is never used in that session. A plug-in can return a
+#   LazyPluginObject from register() instead, with a function that imports the
+#   module and creates the real object. What the plug-in can do (the file types
+#   of a reader, the printing modes of a backend) is still declared by
+#   getMetaData() in the __init__ of the plug-in, so it is known without
+#   importing anything.
+#
+#   The real object is created the first time one of its attributes is used, or
+#   explicitly with getPluginObject(). If the application has already started
+#   by then, its initialize() is called, because it missed the
+#   initializationFinished signal.
+class LazyPluginObject(PluginObject):
+    __load_times = {}  # type: Dict[str, float]
+
+    def __init__(self, factory: Callable[[], PluginObject]) -> None:
+        super().__init__()
+        self._factory = factory
+        self._plugin_object = None  # type: Optional[PluginObject]
+
+    ##  The time it took to load each lazily loaded plug-in, by plug-in ID.
+    @classmethod
+    def getLoadTimes(cls) -> Dict[str, float]:
+        return dict(cls.__load_times)
+
+    def isLoaded(self) -> bool:
+        return self._plugin_object is not None
+
+    ##  Gets the real object of the plug-in, loading it if needed.
+    def getPluginObject(self) -> PluginObject:
+        if self._plugin_object is not None:
+            return self._plugin_object
+
+        start_time = time.time()
+        plugin_object = self._factory()
+        plugin_object.setPluginId(self.getPluginId())
+        self._plugin_object = plugin_object
+        application = Application.getInstance()
+        if getattr(application, "started", False) and hasattr(plugin_object, "initialize"):
+            plugin_object.initialize()
+        load_time = time.time() - start_time
+        LazyPluginObject.__load_times[self.getPluginId()] = load_time
+        Logger.log("i", "Loaded plug-in %s on first use in %0.3f s", self.getPluginId(), load_time)
+        return plugin_object
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes this object doesn't have itself.
+        if name.startswith("__") or name in ("_factory", "_plugin_object"):
+            raise AttributeError(name)
+        return getattr(self.getPluginObject(), name)
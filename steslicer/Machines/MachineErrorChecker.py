@@ -1,38 +1,51 @@
-
-
 import time
 
 from collections import deque
+from typing import Deque, Dict, Optional, Set, Tuple, TYPE_CHECKING
 
 from PyQt5.QtCore import QObject, QTimer, pyqtSignal, pyqtProperty
 
 from UM.Application import Application
 from UM.Logger import Logger
 from UM.Settings.SettingDefinition import SettingDefinition
+from UM.Settings.SettingRelation import RelationType
 from UM.Settings.Validator import ValidatorState
 
+if TYPE_CHECKING:
+    from UM.Settings.ContainerStack import ContainerStack
+
 
 #
 # This class performs setting error checks for the currently active machine.
 #
 # The whole error checking process is pretty heavy which can take ~0.5 secs, so it can cause GUI to lag.
 # The idea here is to split the whole error check into small tasks, each of which only checks a single setting key
-# in a stack. According to my profiling results, the maximal runtime for such a sub-task is <0.03 secs, which should
-# be good enough. Moreover, if any changes happened to the machine, we can cancel the check in progress without wait
-# for it to finish the complete work.
+# in a stack. These tasks are run in batches: every event loop iteration checks as many keys as fit in BATCH_TIME,
+# so the GUI stays responsive without spending thousands of event loop iterations on a full check. Moreover, if any
+# changes happened to the machine, we can cancel the check in progress without wait for it to finish the complete
+# work.
+#
+# The result of every (stack, key) is kept. When only a setting value changed, only that setting and the settings that
+# depend on it (according to the setting relations) are checked again. Switching machines or containers still
+# triggers a check of all settings.
 #
 class MachineErrorChecker(QObject):
 
+    BATCH_TIME = 0.02  # Maximum time in seconds that a single batch of checks may take.
+
     def __init__(self, parent = None):
         super().__init__(parent)
 
         self._global_stack = None
 
         self._has_errors = True  # Result of the error check, indicating whether there are errors in the stack
-        self._error_keys = set()  # A set of settings keys that have errors
-        self._error_keys_in_progress = set()  # The variable that stores the results of the currently in progress check
+        self._error_keys = set()  # type: Set[Tuple[str, str]] # The (stack id, key) pairs that have errors
+
+        self._stacks_and_keys_to_check = None  # type: Optional[Deque[Tuple[ContainerStack, str]]] # a FIFO queue of tuples (stack, key) to check for errors
 
-        self._stacks_and_keys_to_check = None  # a FIFO queue of tuples (stack, key) to check for errors
+        # The keys that need to be checked in the next check. None means that all keys need to be checked.
+        self._keys_to_check = None  # type: Optional[Set[str]]
+        self._affected_keys_cache = {}  # type: Dict[str, Set[str]]
 
         self._need_to_check = False  # Whether we need to schedule a new check or not. This flag is set when a new
                                      # error check needs to take place while there is already one running at the moment.
@@ -42,6 +55,10 @@ class MachineErrorChecker(QObject):
         self._machine_manager = self._application.getMachineManager()
 
         self._start_time = 0  # measure checking time
+        self._full_check = False  # Whether the check in progress checks all settings.
+        self._checked_count = 0
+        self._batch_count = 0
+        self._last_check_statistics = {}  # type: Dict[str, float]
 
         # This timer delays the starting of error check so we can react less frequently if the user is frequently
         # changing settings.
@@ -63,21 +80,22 @@ class MachineErrorChecker(QObject):
 
     def _onMachineChanged(self) -> None:
         if self._global_stack:
-            self._global_stack.propertyChanged.disconnect(self.startErrorCheck)
+            self._global_stack.propertyChanged.disconnect(self._onPropertyChanged)
             self._global_stack.containersChanged.disconnect(self.startErrorCheck)
 
             for extruder in self._global_stack.extruders.values():
-                extruder.propertyChanged.disconnect(self.startErrorCheck)
+                extruder.propertyChanged.disconnect(self._onPropertyChanged)
                 extruder.containersChanged.disconnect(self.startErrorCheck)
 
         self._global_stack = self._machine_manager.activeMachine
+        self._affected_keys_cache = {}
 
         if self._global_stack:
-            self._global_stack.propertyChanged.connect(self.startErrorCheck)
+            self._global_stack.propertyChanged.connect(self._onPropertyChanged)
             self._global_stack.containersChanged.connect(self.startErrorCheck)
 
             for extruder in self._global_stack.extruders.values():
-                extruder.propertyChanged.connect(self.startErrorCheck)
+                extruder.propertyChanged.connect(self._onPropertyChanged)
                 extruder.containersChanged.connect(self.startErrorCheck)
 
     hasErrorUpdated = pyqtSignal()
@@ -92,13 +110,58 @@ class MachineErrorChecker(QObject):
     def needToWaitForResult(self) -> bool:
         return self._need_to_check or self._check_in_progress
 
-    # Starts the error check timer to schedule a new error check.
+    ##  The (stack id, key) pairs that had errors in the last finished check.
+    def getErrorKeys(self) -> Set[Tuple[str, str]]:
+        return set(self._error_keys)
+
+    ##  Timing of the last finished check: the number of checked settings, the
+    #   number of batches, the time it took in seconds and whether all settings
+    #   were checked.
+    def getLastCheckStatistics(self) -> Dict[str, float]:
+        return dict(self._last_check_statistics)
+
+    # Starts the error check timer to schedule a new error check of all settings.
     def startErrorCheck(self, *args) -> None:
+        self._keys_to_check = None
+        self._scheduleCheck()
+
+    # Schedules a check of the setting that changed and the settings that depend on it.
+    def _onPropertyChanged(self, key: str, property_name: str) -> None:
+        if self._keys_to_check is not None:
+            self._keys_to_check |= self._getAffectedKeys(key)
+        self._scheduleCheck()
+
+    def _scheduleCheck(self) -> None:
         if not self._check_in_progress:
             self._need_to_check = True
             self.needToWaitForResultChanged.emit()
         self._error_check_timer.start()
 
+    # Get the setting itself and all settings whose value, enabled state or validation may change with it.
+    def _getAffectedKeys(self, key: str) -> Set[str]:
+        if key in self._affected_keys_cache:
+            return self._affected_keys_cache[key]
+
+        affected_keys = {key}
+        definition = self._global_stack.getSettingDefinition(key) if self._global_stack else None
+        if definition is not None:
+            # Only a changed value propagates further, other properties (enabled, minimum_value, ...) only affect
+            # the setting itself.
+            keys_to_visit = [definition]
+            visited_keys = {key}
+            while keys_to_visit:
+                current = keys_to_visit.pop()
+                for relation in current.relations:
+                    if relation.type == RelationType.RequiresTarget:
+                        continue
+                    target_key = relation.target.key
+                    affected_keys.add(target_key)
+                    if relation.role in ("value", "limit_to_extruder") and target_key not in visited_keys:
+                        visited_keys.add(target_key)
+                        keys_to_visit.append(relation.target)
+        self._affected_keys_cache[key] = affected_keys
+        return affected_keys
+
     # This function is called by the timer to reschedule a new error check.
     # If there is no check in progress, it will start a new one. If there is any, it sets the "_need_to_check" flag
     # to notify the current check to stop and start a new one.
@@ -108,7 +171,6 @@ class MachineErrorChecker(QObject):
             self.needToWaitForResultChanged.emit()
             return
 
-        self._error_keys_in_progress = set()
         self._need_to_check = False
         self.needToWaitForResultChanged.emit()
 
@@ -117,38 +179,71 @@ class MachineErrorChecker(QObject):
             Logger.log("i", "No active machine, nothing to check.")
             return
 
+        keys_to_check = self._keys_to_check
+        # From now on, changes are collected for the next check.
+        self._keys_to_check = set()
+
         # Populate the (stack, key) tuples to check
         self._stacks_and_keys_to_check = deque()
-        for stack in [global_stack] + list(global_stack.extruders.values()):
-            for key in stack.getAllKeys():
+        stacks = [global_stack] + list(global_stack.extruders.values())
+        if keys_to_check is None:
+            self._error_keys = set()
+        else:
+            # Forget the errors of stacks that are not active anymore.
+            stack_ids = {stack.getId() for stack in stacks}
+            self._error_keys = {(stack_id, key) for stack_id, key in self._error_keys if stack_id in stack_ids}
+        for stack in stacks:
+            stack_keys = stack.getAllKeys()
+            if keys_to_check is not None:
+                stack_keys = stack_keys & keys_to_check
+            for key in stack_keys:
                 self._stacks_and_keys_to_check.append((stack, key))
 
-        self._application.callLater(self._checkStack)
         self._start_time = time.time()
-        Logger.log("d", "New error check scheduled.")
+        self._checked_count = 0
+        self._batch_count = 0
+        self._full_check = keys_to_check is None
+        self._application.callLater(self._checkStack)
+        Logger.log("d", "New error check scheduled for %s settings.", len(self._stacks_and_keys_to_check))
 
     def _checkStack(self) -> None:
         if self._need_to_check:
             Logger.log("d", "Need to check for errors again. Discard the current progress and reschedule a check.")
+            # The settings that were not checked yet still need to be checked in the next check.
+            if self._keys_to_check is not None and self._stacks_and_keys_to_check:
+                self._keys_to_check |= {key for _, key in self._stacks_and_keys_to_check}
             self._check_in_progress = False
-            self._application.callLater(self.startErrorCheck)
+            self._application.callLater(self._scheduleCheck)
             return
 
         self._check_in_progress = True
-
-        # If there is nothing to check any more, it means there is no error.
-        if not self._stacks_and_keys_to_check:
-            # Finish
-            self._setResult(False)
+        self._batch_count += 1
+
+        batch_end_time = time.time() + self.BATCH_TIME
+        while self._stacks_and_keys_to_check:
+            # Get the next stack and key to check
+            stack, key = self._stacks_and_keys_to_check.popleft()
+            self._checked_count += 1
+            if self._hasError(stack, key):
+                self._error_keys.add((stack.getId(), key))
+            else:
+                self._error_keys.discard((stack.getId(), key))
+
+            if time.time() >= batch_end_time:
+                break
+
+        if self._stacks_and_keys_to_check:
+            # Schedule the next batch
+            self._application.callLater(self._checkStack)
             return
 
-        # Get the next stack and key to check
-        stack, key = self._stacks_and_keys_to_check.popleft()
+        # Finish
+        self._setResult(bool(self._error_keys))
 
+    def _hasError(self, stack: "ContainerStack", key: str) -> bool:
         enabled = stack.getProperty(key, "enabled")
         if not enabled:
-            self._application.callLater(self._checkStack)
-            return
+            return False
 
         validation_state = stack.getProperty(key, "validationState")
         if validation_state is None:
@@ -160,13 +255,7 @@ class MachineErrorChecker(QObject):
             if validator_type:
                 validator = validator_type(key)
                 validation_state = validator(stack)
-        if validation_state in (ValidatorState.Exception, ValidatorState.MaximumError, ValidatorState.MinimumError):
-            # Finish
-            self._setResult(True)
-            return
-
-        # Schedule the check for the next key
-        self._application.callLater(self._checkStack)
+        return validation_state in (ValidatorState.Exception, ValidatorState.MaximumError, ValidatorState.MinimumError)
 
     def _setResult(self, result: bool) -> None:
         if result != self._has_errors:
@@ -177,4 +266,9 @@ class MachineErrorChecker(QObject):
         self._check_in_progress = False
         self.needToWaitForResultChanged.emit()
         self.errorCheckFinished.emit()
-        Logger.log("i", "Error check finished, result = %s, time = %0.1fs", result, time.time() - self._start_time)
+
+        check_time = time.time() - self._start_time
+        self._last_check_statistics = {"checked": self._checked_count, "batches": self._batch_count, "time": check_time,
+                                       "full_check": self._full_check}
+        Logger.log("i", "Error check finished, result = %s, checked %s settings in %s batches, time = %0.3fs",
+                   result, self._checked_count, self._batch_count, check_time)
@@ -30,10 +30,9 @@ if TYPE_CHECKING:
 # The models GUI and QML use are now only dependent on the MaterialManager. That means as long as the data in
 # MaterialManager gets updated correctly, the GUI models should be updated correctly too, and the same goes for GUI.
 #
-# For now, updating the lookup maps and trees here is very simple: we discard the old data completely and recreate them
-# again. This means the update is exactly the same as initialization. There are performance concerns about this approach
-# but so far the creation of the tables and maps is very fast and there is no noticeable slowness, we keep it like this
-# because it's simple.
+# The maps and trees are created from all materials on initialization. After that, only the entries of the root
+# materials that were added, removed or changed are updated, together with the entries that depend on them (the fallback
+# material of their material type and the diameter maps of materials with the same name, material, brand and color).
 #
 class MaterialManager(QObject):
 
@@ -67,6 +66,24 @@ class MaterialManager(QObject):
         # GUID -> a list of material_groups
         self._guid_material_groups_map = defaultdict(list)  # type: Dict[str, List[MaterialGroup]]
 
+        # Indices to update the maps above for only the materials that changed:
+        # Material ID -> material metadata, for all materials with a GUID
+        self._material_metadatas = dict()  # type: Dict[str, Dict[str, Any]]
+        # Material ID -> root material ID it was indexed with
+        self._material_root_ids = dict()  # type: Dict[str, str]
+        # Root material ID -> IDs of the root material and the materials derived from it
+        self._root_material_members = dict()  # type: Dict[str, Set[str]]
+        # Root material ID -> (GUID, material type, key of Map #3) it was indexed with
+        self._root_material_index_keys = dict()  # type: Dict[str, Tuple[str, str, Tuple[Any, ...]]]
+        # Material type -> root material IDs
+        self._material_type_root_ids = defaultdict(set)  # type: Dict[str, Set[str]]
+        # Key of Map #3 -> root material IDs
+        self._material_key_root_ids = defaultdict(set)  # type: Dict[Tuple[Any, ...], Set[str]]
+        # Root material ID -> (approximate diameter, machine, variant names) of the tree nodes its materials are in
+        self._material_tree_paths = dict()  # type: Dict[str, List[Tuple[str, str, List[str]]]]
+        # IDs of the materials that were added, removed or changed since the maps were updated.
+        self._changed_material_ids = set()  # type: Set[str]
+
         # The machine definition ID for the non-machine-specific materials.
         # This is used as the last fallback option if the given machine-specific material(s) cannot be found.
         self._default_machine_definition_id = "fdmprinter"
@@ -92,122 +109,190 @@ class MaterialManager(QObject):
                               self._container_registry.findContainersMetadata(type = "material") if
                               metadata.get("GUID")} # type: Dict[str, Dict[str, Any]]
 
-        self._material_group_map = dict()  # type: Dict[str, MaterialGroup]
-                
-        # Map #1
-        #    root_material_id -> MaterialGroup
-        for material_id, material_metadata in material_metadatas.items():
-            # We don't store empty material in the lookup tables
-            if material_id == "empty_material":
-                continue
+        self._material_metadatas = dict()
+        self._material_root_ids = dict()
+        self._root_material_members = dict()
+        self._root_material_index_keys = dict()
+        self._material_type_root_ids = defaultdict(set)
+        self._material_key_root_ids = defaultdict(set)
+        self._material_tree_paths = dict()
+        self._changed_material_ids = set()
+
+        self._material_group_map = OrderedDict()
+        self._guid_material_groups_map = defaultdict(list)
+        self._fallback_materials_map = dict()
+        self._material_diameter_map = defaultdict(dict)
+        self._diameter_material_map = dict()
+        self._diameter_machine_nozzle_buildplate_material_map = dict()
 
-            root_material_id = material_metadata.get("base_file", "")
-            if root_material_id not in self._material_group_map:
-                self._material_group_map[root_material_id] = MaterialGroup(root_material_id, MaterialNode(material_metadatas[root_material_id]))
-                self._material_group_map[root_material_id].is_read_only = self._container_registry.isReadOnly(root_material_id)
-            group = self._material_group_map[root_material_id]
+        for material_metadata in material_metadatas.values():
+            self.__addMaterialMetadata(material_metadata)
+        self.__updateRootMaterials(set(self._root_material_members.keys()))
 
-            # Store this material in the group of the appropriate root material.
-            if material_id != root_material_id:
-                new_node = MaterialNode(material_metadata)
-                group.derived_material_node_list.append(new_node)
+        favorites = self._application.getPreferences().getValue("steslicer/favorite_materials")
+        for item in favorites.split(";"):
+            self._favorites.add(item)
 
-        # Order this map alphabetically so it's easier to navigate in a debugger
-        self._material_group_map = OrderedDict(sorted(self._material_group_map.items(), key = lambda x: x[0]))
+        self.materialsUpdated.emit()
 
-        # Map #1.5
-        #    GUID -> material group list
-        self._guid_material_groups_map = defaultdict(list)  # type: Dict[str, List[MaterialGroup]]
-        for root_material_id, material_group in self._material_group_map.items():
-            guid = material_group.root_material_node.getMetaDataEntry("GUID", "")
+    # Adds the metadata of a material to the materials that are indexed. The lookup tables are only updated by
+    # __updateRootMaterials().
+    def __addMaterialMetadata(self, material_metadata: Dict[str, Any]) -> str:
+        material_id = material_metadata["id"]
+        root_material_id = material_metadata.get("base_file", "")
+        self._material_metadatas[material_id] = material_metadata
+        self._material_root_ids[material_id] = root_material_id
+        self._root_material_members.setdefault(root_material_id, set()).add(material_id)
+        return root_material_id
+
+    # Removes a material from the materials that are indexed, see __addMaterialMetadata().
+    def __removeMaterialMetadata(self, material_id: str) -> Optional[str]:
+        root_material_id = self._material_root_ids.pop(material_id, None)
+        if root_material_id is None:
+            return None
+        del self._material_metadatas[material_id]
+        members = self._root_material_members[root_material_id]
+        members.discard(material_id)
+        if not members:
+            del self._root_material_members[root_material_id]
+        return root_material_id
+
+    # Updates the lookup tables for the given root materials, after their materials have been added or removed with
+    # __addMaterialMetadata() and __removeMaterialMetadata(). The entries of other materials are only touched if they
+    # depend on these root materials, such as the fallback material of the same material type.
+    def __updateRootMaterials(self, root_material_ids: Set[str]) -> None:
+        affected_material_types = set()  # type: Set[str]
+        affected_keys = set()  # type: Set[Tuple[Any, ...]]
+        affected_guids = set()  # type: Set[str]
+        groups_added = False
+
+        # Take out the old entries of the root materials. The metadata may have been changed in place, so the keys
+        # they were indexed with are remembered separately.
+        for root_material_id in root_material_ids:
+            old_group = self._material_group_map.pop(root_material_id, None)
+            old_index_keys = self._root_material_index_keys.pop(root_material_id, None)
+            if old_group is not None and old_index_keys is not None:
+                guid, material_type, key_data = old_index_keys
+                material_groups = self._guid_material_groups_map[guid]
+                if old_group in material_groups:
+                    material_groups.remove(old_group)
+                if not material_groups:
+                    del self._guid_material_groups_map[guid]
+                self._material_type_root_ids[material_type].discard(root_material_id)
+                self._material_key_root_ids[key_data].discard(root_material_id)
+                affected_material_types.add(material_type)
+                affected_keys.add(key_data)
+            self._material_diameter_map.pop(root_material_id, None)
+            self._diameter_material_map.pop(root_material_id, None)
+            self.__removeRootMaterialFromLookupTree(root_material_id)
+
+        for root_material_id in sorted(root_material_ids):
+            # We don't store empty material in the lookup tables
+            member_ids = sorted(self._root_material_members.get(root_material_id, set()) - {"empty_material"})
+            if not member_ids:
+                continue
+            root_material_metadata = self._material_metadatas.get(root_material_id)
+            if root_material_metadata is None:
+                Logger.log("w", "Materials %s are based on material [%s], which doesn't exist.", member_ids, root_material_id)
+                continue
+
+            # Map #1
+            #    root_material_id -> MaterialGroup
+            material_group = MaterialGroup(root_material_id, MaterialNode(root_material_metadata))
+            material_group.is_read_only = self._container_registry.isReadOnly(root_material_id)
+            for material_id in member_ids:
+                # Store this material in the group of the appropriate root material.
+                if material_id != root_material_id:
+                    material_group.derived_material_node_list.append(MaterialNode(self._material_metadatas[material_id]))
+            self._material_group_map[root_material_id] = material_group
+            groups_added = True
+
+            guid = root_material_metadata.get("GUID", "")
+            material_type = root_material_metadata.get("material", "")
+            key_data = tuple(root_material_metadata.get(key) for key in ("name", "material", "brand", "color"))
+            self._root_material_index_keys[root_material_id] = (guid, material_type, key_data)
+
+            # Map #1.5
+            #    GUID -> material group list
             self._guid_material_groups_map[guid].append(material_group)
+            affected_guids.add(guid)
+            self._material_type_root_ids[material_type].add(root_material_id)
+            affected_material_types.add(material_type)
+            self._material_key_root_ids[key_data].add(root_material_id)
+            affected_keys.add(key_data)
+
+            # Map #4
+            # "machine" -> "nozzle name" -> "buildplate name" -> "root material ID" -> specific material InstanceContainer
+            for material_id in member_ids:
+                self.__addMaterialMetadataIntoLookupTree(self._material_metadatas[material_id])
+
+        if groups_added:
+            # Order this map alphabetically so it's easier to navigate in a debugger
+            self._material_group_map = OrderedDict(sorted(self._material_group_map.items(), key = lambda x: x[0]))
+        for guid in affected_guids:
+            self._guid_material_groups_map[guid].sort(key = lambda group: group.name)
+        for material_type in affected_material_types:
+            self.__updateFallbackMaterial(material_type)
+        for key_data in affected_keys:
+            self.__updateDiameterMaps(key_data)
+
+    # Map #2
+    # Lookup table for material type -> fallback material metadata, only for read-only materials. The fallback of a
+    # material type is the first generic material with the default diameter.
+    def __updateFallbackMaterial(self, material_type: str) -> None:
+        root_material_ids = self._material_type_root_ids.get(material_type)
+        if not root_material_ids:
+            self._material_type_root_ids.pop(material_type, None)
+            self._fallback_materials_map.pop(material_type, None)
+            return
 
-        # Map #2
-        # Lookup table for material type -> fallback material metadata, only for read-only materials
-        grouped_by_type_dict = dict()  # type: Dict[str, Any]
-        material_types_without_fallback = set()
-        for root_material_id, material_node in self._material_group_map.items():
-            material_type = material_node.root_material_node.getMetaDataEntry("material", "")
-            if material_type not in grouped_by_type_dict:
-                grouped_by_type_dict[material_type] = {"generic": None,
-                                                       "others": []}
-                material_types_without_fallback.add(material_type)
-            brand = material_node.root_material_node.getMetaDataEntry("brand", "")
-            if brand.lower() == "generic":
-                to_add = True
-                if material_type in grouped_by_type_dict:
-                    diameter = material_node.root_material_node.getMetaDataEntry("approximate_diameter", "")
-                    if diameter != self._default_approximate_diameter_for_quality_search:
-                        to_add = False  # don't add if it's not the default diameter
-
-                if to_add:
-                    # Checking this first allow us to differentiate between not read only materials:
-                    #  - if it's in the list, it means that is a new material without fallback
-                    #  - if it is not, then it is a custom material with a fallback material (parent)
-                    if material_type in material_types_without_fallback:
-                        grouped_by_type_dict[material_type] = material_node.root_material_node._metadata
-                        material_types_without_fallback.remove(material_type)
+        for root_material_id in sorted(root_material_ids):
+            root_material_node = self._material_group_map[root_material_id].root_material_node
+            if root_material_node.getMetaDataEntry("brand", "").lower() != "generic":
+                continue
+            if root_material_node.getMetaDataEntry("approximate_diameter", "") != self._default_approximate_diameter_for_quality_search:
+                continue  # don't add if it's not the default diameter
+            self._fallback_materials_map[material_type] = root_material_node._metadata
+            return
 
         # Remove the materials that have no fallback materials
-        for material_type in material_types_without_fallback:
-            del grouped_by_type_dict[material_type]
-        self._fallback_materials_map = grouped_by_type_dict
-
-        # Map #3
-        # There can be multiple material profiles for the same material with different diameters, such as "generic_pla"
-        # and "generic_pla_175". This is inconvenient when we do material-specific quality lookup because a quality can
-        # be for either "generic_pla" or "generic_pla_175", but not both. This map helps to get the correct material ID
-        # for quality search.
-        self._material_diameter_map = defaultdict(dict)
-        self._diameter_material_map = dict()
+        self._fallback_materials_map.pop(material_type, None)
 
-        # Group the material IDs by the same name, material, brand, and color but with different diameters.
-        material_group_dict = dict()  # type: Dict[Tuple[Any], Dict[str, str]]
-        keys_to_fetch = ("name", "material", "brand", "color")
-        for root_material_id, machine_node in self._material_group_map.items():
-            root_material_metadata = machine_node.root_material_node._metadata
-
-            key_data_list = []  # type: List[Any]
-            for key in keys_to_fetch:
-                key_data_list.append(machine_node.root_material_node.getMetaDataEntry(key))
-            key_data = cast(Tuple[Any], tuple(key_data_list))  # type: Tuple[Any]
+    # Map #3
+    # There can be multiple material profiles for the same material with different diameters, such as "generic_pla"
+    # and "generic_pla_175". This is inconvenient when we do material-specific quality lookup because a quality can
+    # be for either "generic_pla" or "generic_pla_175", but not both. This map helps to get the correct material ID
+    # for quality search.
+    #
+    # The material IDs are grouped by the same name, material, brand, and color but with different diameters. This
+    # updates the maps for one such group.
+    def __updateDiameterMaps(self, key_data: Tuple[Any, ...]) -> None:
+        root_material_ids = sorted(self._material_key_root_ids.get(key_data, set()))
+        for root_material_id in root_material_ids:
+            self._material_diameter_map.pop(root_material_id, None)
+            self._diameter_material_map.pop(root_material_id, None)
+        if not root_material_ids:
+            self._material_key_root_ids.pop(key_data, None)
+            return
 
-            # If the key_data doesn't exist, it doesn't matter if the material is read only...
-            if key_data not in material_group_dict:
-                material_group_dict[key_data] = dict()
-            else:
-                # ...but if key_data exists, we just overwrite it if the material is read only, otherwise we skip it
-                if not machine_node.is_read_only:
-                    continue
-            approximate_diameter = machine_node.root_material_node.getMetaDataEntry("approximate_diameter", "")
-            material_group_dict[key_data][approximate_diameter] = machine_node.root_material_node.getMetaDataEntry("id", "")
+        data_dict = dict()  # type: Dict[str, str]
+        for index, root_material_id in enumerate(root_material_ids):
+            root_material_node = self._material_group_map[root_material_id].root_material_node
+            # The first material is always added, the other ones only overwrite it if they are read only.
+            if index > 0 and not self._material_group_map[root_material_id].is_read_only:
+                continue
+            approximate_diameter = root_material_node.getMetaDataEntry("approximate_diameter", "")
+            data_dict[approximate_diameter] = root_material_node.getMetaDataEntry("id", "")
 
         # Map [root_material_id][diameter] -> root_material_id for this diameter
-        for data_dict in material_group_dict.values():
-            for root_material_id1 in data_dict.values():
-                if root_material_id1 in self._material_diameter_map:
-                    continue
-                diameter_map = data_dict
-                for root_material_id2 in data_dict.values():
-                    self._material_diameter_map[root_material_id2] = diameter_map
-
-            default_root_material_id = data_dict.get(self._default_approximate_diameter_for_quality_search)
-            if default_root_material_id is None:
-                default_root_material_id = list(data_dict.values())[0]  # no default diameter present, just take "the" only one
-            for root_material_id in data_dict.values():
-                self._diameter_material_map[root_material_id] = default_root_material_id
-
-        # Map #4
-        # "machine" -> "nozzle name" -> "buildplate name" -> "root material ID" -> specific material InstanceContainer
-        self._diameter_machine_nozzle_buildplate_material_map = dict()  # type: Dict[str, Dict[str, MaterialNode]]
-        for material_metadata in material_metadatas.values():
-            self.__addMaterialMetadataIntoLookupTree(material_metadata)
-
-        favorites = self._application.getPreferences().getValue("steslicer/favorite_materials")
-        for item in favorites.split(";"):
-            self._favorites.add(item)
+        for root_material_id in data_dict.values():
+            self._material_diameter_map[root_material_id] = data_dict
 
-        self.materialsUpdated.emit()
+        default_root_material_id = data_dict.get(self._default_approximate_diameter_for_quality_search)
+        if default_root_material_id is None:
+            default_root_material_id = list(data_dict.values())[0]  # no default diameter present, just take "the" only one
+        for root_material_id in data_dict.values():
+            self._diameter_material_map[root_material_id] = default_root_material_id
 
     def __addMaterialMetadataIntoLookupTree(self, material_metadata: Dict[str, Any]) -> None:
         material_id = material_metadata["id"]
@@ -220,14 +305,6 @@ class MaterialManager(QObject):
         definition = material_metadata["definition"]
         approximate_diameter = material_metadata["approximate_diameter"]
 
-        if approximate_diameter not in self._diameter_machine_nozzle_buildplate_material_map:
-            self._diameter_machine_nozzle_buildplate_material_map[approximate_diameter] = {}
-
-        machine_nozzle_buildplate_material_map = self._diameter_machine_nozzle_buildplate_material_map[
-            approximate_diameter]
-        if definition not in machine_nozzle_buildplate_material_map:
-            machine_nozzle_buildplate_material_map[definition] = MaterialNode()
-
         # This is a list of information regarding the intermediate nodes:
         #    nozzle -> buildplate
         nozzle_name = material_metadata.get("variant_name")
@@ -238,31 +315,36 @@ class MaterialManager(QObject):
 
         variant_manager = self._application.getVariantManager()
 
-        machine_node = machine_nozzle_buildplate_material_map[definition]
-        current_node = machine_node
-        current_intermediate_node_info_idx = 0
-        error_message = None  # type: Optional[str]
-        while current_intermediate_node_info_idx < len(intermediate_node_info_list):
-            variant_name, variant_type = intermediate_node_info_list[current_intermediate_node_info_idx]
-            if variant_name is not None:
-                # The new material has a specific variant, so it needs to be added to that specific branch in the tree.
-                variant = variant_manager.getVariantNode(definition, variant_name, variant_type)
-                if variant is None:
-                    error_message = "Material {id} contains a variant {name} that does not exist.".format(
-                        id = material_metadata["id"], name = variant_name)
-                    break
+        # Check the variants before creating any branches, so a broken material leaves no empty branches behind.
+        variant_names = []  # type: List[str]
+        for variant_name, variant_type in intermediate_node_info_list:
+            if variant_name is None:
+                continue
+            # The new material has a specific variant, so it needs to be added to that specific branch in the tree.
+            variant = variant_manager.getVariantNode(definition, variant_name, variant_type)
+            if variant is None:
+                error_message = "Material {id} contains a variant {name} that does not exist.".format(
+                    id = material_metadata["id"], name = variant_name)
+                Logger.log("e", "%s It will not be added into the material lookup tree.", error_message)
+                self._container_registry.addWrongContainerId(material_metadata["id"])
+                return
+            variant_names.append(variant_name)
 
-                # Update the current node to advance to a more specific branch
-                if variant_name not in current_node.children_map:
-                    current_node.children_map[variant_name] = MaterialNode()
-                current_node = current_node.children_map[variant_name]
+        if approximate_diameter not in self._diameter_machine_nozzle_buildplate_material_map:
+            self._diameter_machine_nozzle_buildplate_material_map[approximate_diameter] = {}
 
-            current_intermediate_node_info_idx += 1
+        machine_nozzle_buildplate_material_map = self._diameter_machine_nozzle_buildplate_material_map[
+            approximate_diameter]
+        if definition not in machine_nozzle_buildplate_material_map:
+            machine_nozzle_buildplate_material_map[definition] = MaterialNode()
 
-        if error_message is not None:
-            Logger.log("e", "%s It will not be added into the material lookup tree.", error_message)
-            self._container_registry.addWrongContainerId(material_metadata["id"])
-            return
+        current_node = machine_nozzle_buildplate_material_map[definition]
+        for variant_name in variant_names:
+            # Update the current node to advance to a more specific branch
+            if variant_name not in current_node.children_map:
+                current_node.children_map[variant_name] = MaterialNode()
+            current_node = current_node.children_map[variant_name]
+        self._material_tree_paths.setdefault(root_material_id, []).append((approximate_diameter, definition, variant_names))
 
         # Add the material to the current tree node, which is the deepest (the most specific) branch we can find.
         # Sanity check: Make sure that there is no duplicated materials.
@@ -274,9 +356,48 @@ class MaterialManager(QObject):
 
         current_node.material_map[root_material_id] = MaterialNode(material_metadata)
 
+    # Removes all materials of a root material from the lookup tree, and the branches that become empty by that. An
+    # empty machine branch would stop getMaterialNode() from falling back to the materials for fdmprinter.
+    def __removeRootMaterialFromLookupTree(self, root_material_id: str) -> None:
+        for approximate_diameter, definition, variant_names in self._material_tree_paths.pop(root_material_id, []):
+            # Several materials of the root material can share a branch, so it may be gone already.
+            machine_nozzle_buildplate_material_map = self._diameter_machine_nozzle_buildplate_material_map.get(approximate_diameter, {})
+            node_path = [machine_nozzle_buildplate_material_map.get(definition)]
+            for variant_name in variant_names:
+                if node_path[-1] is None:
+                    break
+                node_path.append(node_path[-1].getChildNode(variant_name))
+            if node_path[-1] is None:
+                continue
+            node_path[-1].material_map.pop(root_material_id, None)
+
+            for depth in range(len(node_path) - 1, 0, -1):
+                if node_path[depth].material_map or node_path[depth].children_map:
+                    break
+                del node_path[depth - 1].children_map[variant_names[depth - 1]]
+            if not node_path[0].material_map and not node_path[0].children_map:
+                del machine_nozzle_buildplate_material_map[definition]
+            if not machine_nozzle_buildplate_material_map:
+                del self._diameter_machine_nozzle_buildplate_material_map[approximate_diameter]
+
     def _updateMaps(self):
-        Logger.log("i", "Updating material lookup data ...")
-        self.initialize()
+        changed_material_ids = self._changed_material_ids
+        self._changed_material_ids = set()
+        Logger.log("i", "Updating material lookup data for %s changed materials ...", len(changed_material_ids))
+
+        # Only the root materials of the changed materials need to be updated, both the ones they were based on and
+        # the ones they are based on now.
+        root_material_ids = set()  # type: Set[str]
+        for material_id in changed_material_ids:
+            old_root_material_id = self.__removeMaterialMetadata(material_id)
+            if old_root_material_id is not None:
+                root_material_ids.add(old_root_material_id)
+            metadata_list = self._container_registry.findContainersMetadata(id = material_id)
+            if metadata_list and metadata_list[0].get("GUID"):
+                root_material_ids.add(self.__addMaterialMetadata(metadata_list[0]))
+
+        self.__updateRootMaterials(root_material_ids)
+        self.materialsUpdated.emit()
 
     def _onContainerMetadataChanged(self, container):
         self._onContainerChanged(container)
@@ -287,6 +408,7 @@ class MaterialManager(QObject):
             return
 
         # update the maps
+        self._changed_material_ids.add(container.getId())
         self._update_timer.start()
 
     def getMaterialGroup(self, root_material_id: str) -> Optional[MaterialGroup]:
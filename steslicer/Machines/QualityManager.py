@@ -1,6 +1,7 @@
 
 
-from typing import TYPE_CHECKING, Optional, cast, Dict, List, Set
+from collections import OrderedDict
+from typing import Any, TYPE_CHECKING, Optional, cast, Dict, List, Set, Tuple
 
 from PyQt5.QtCore import QObject, QTimer, pyqtSignal, pyqtSlot
 
@@ -26,10 +27,12 @@ if TYPE_CHECKING:
 # The models GUI and QML use are now only dependent on the QualityManager. That means as long as the data in
 # QualityManager gets updated correctly, the GUI models should be updated correctly too, and the same goes for GUI.
 #
-# For now, updating the lookup maps and trees here is very simple: we discard the old data completely and recreate them
-# again. This means the update is exactly the same as initialization. There are performance concerns about this approach
-# but so far the creation of the tables and maps is very fast and there is no noticeable slowness, we keep it like this
-# because it's simple.
+# The trees are created from all profiles on initialization. After that, only the branches of the profiles that were
+# added, removed or changed are updated.
+#
+# When several quality profiles have the same quality type for the same machine, nozzle, build plate and material,
+# only the one with the lowest ID is used. Before the incremental updates, the first one in the container registry was
+# used, which depended on the order in which the profiles were loaded.
 #
 class QualityManager(QObject):
 
@@ -50,6 +53,14 @@ class QualityManager(QObject):
         # For quality_changes lookup
         self._machine_quality_type_to_quality_changes_dict = {}  # type: Dict[str, QualityNode]
 
+        # Profiles that end up in the same place in the lookup trees, see __indexQualityMetadata()
+        # bucket key -> container ID -> metadata
+        self._quality_buckets = {}  # type: Dict[Tuple[Any, ...], Dict[str, Dict[str, Any]]]
+        # container ID -> key of the bucket it was indexed in
+        self._quality_index_keys = {}  # type: Dict[str, Tuple[Any, ...]]
+        # IDs of the profiles that were added, removed or changed since the lookup trees were updated.
+        self._changed_quality_ids = set()  # type: Set[str]
+
         self._default_machine_definition_id = "fdmprinter"
 
         self._container_registry.containerMetaDataChanged.connect(self._onContainerMetadataChanged)
@@ -68,18 +79,40 @@ class QualityManager(QObject):
         # Initialize the lookup tree for quality profiles with following structure:
         # <machine> -> <nozzle> -> <buildplate> -> <material>
         # <machine> -> <material>
+        # and the lookup tree for quality_changes profiles with following structure:
+        # <machine> -> <quality_type> -> <name>
 
         self._machine_nozzle_buildplate_material_quality_type_to_quality_dict = {}  # for quality lookup
         self._machine_quality_type_to_quality_changes_dict = {}  # for quality_changes lookup
+        self._quality_index_keys = {}
+        self._quality_buckets = {}
+        self._changed_quality_ids = set()
+
+        bucket_keys = OrderedDict()  # type: Dict[Tuple[Any, ...], None] # Keeps the order of the registry.
+        for container_type in ("quality", "quality_changes"):
+            for metadata in self._container_registry.findContainersMetadata(type = container_type):
+                bucket_key = self.__indexQualityMetadata(metadata)
+                if bucket_key is not None:
+                    bucket_keys[bucket_key] = None
+        for bucket_key in bucket_keys:
+            self.__updateQualityBucket(bucket_key)
 
-        quality_metadata_list = self._container_registry.findContainersMetadata(type = "quality")
-        for metadata in quality_metadata_list:
-            if metadata["id"] == "empty_quality":
-                continue
-
-            definition_id = metadata["definition"]
-            quality_type = metadata["quality_type"]
+        Logger.log("d", "Lookup tables updated.")
+        self.qualitiesUpdated.emit()
 
+    # Adds a quality or quality_changes profile to the bucket of profiles that end up in the same place in the lookup
+    # trees. If profiles in a bucket conflict, the one with the lowest ID is used, so the result doesn't depend on the
+    # order in which they were added. The others take its place when it's removed.
+    # Returns the key of the bucket, or None if the profile can't be used.
+    def __indexQualityMetadata(self, metadata: Dict[str, Any]) -> Optional[Tuple[Any, ...]]:
+        if metadata["id"] in ("empty_quality", "empty_quality_changes"):
+            return None
+
+        definition_id = metadata["definition"]
+        quality_type = metadata["quality_type"]
+        if metadata["type"] == "quality_changes":
+            bucket_key = ("quality_changes", definition_id, quality_type, metadata["name"])  # type: Tuple[Any, ...]
+        else:
             root_material_id = metadata.get("material")
             nozzle_name = metadata.get("variant")
             buildplate_name = metadata.get("buildplate")
@@ -89,54 +122,103 @@ class QualityManager(QObject):
             # Sanity check: material+variant and is_global_quality cannot be present at the same time
             if is_global_quality and (root_material_id or nozzle_name):
                 ConfigurationErrorMessage.getInstance().addFaultyContainers(metadata["id"])
-                continue
-
-            if definition_id not in self._machine_nozzle_buildplate_material_quality_type_to_quality_dict:
-                self._machine_nozzle_buildplate_material_quality_type_to_quality_dict[definition_id] = QualityNode()
-            machine_node = cast(QualityNode, self._machine_nozzle_buildplate_material_quality_type_to_quality_dict[definition_id])
-
-            if is_global_quality:
-                # For global qualities, save data in the machine node
-                machine_node.addQualityMetadata(quality_type, metadata)
-                continue
-
-            current_node = machine_node
-            intermediate_node_info_list = [nozzle_name, buildplate_name, root_material_id]
-            current_intermediate_node_info_idx = 0
-
-            while current_intermediate_node_info_idx < len(intermediate_node_info_list):
-                node_name = intermediate_node_info_list[current_intermediate_node_info_idx]
-                if node_name is not None:
-                    # There is specific information, update the current node to go deeper so we can add this quality
-                    # at the most specific branch in the lookup tree.
-                    if node_name not in current_node.children_map:
-                        current_node.children_map[node_name] = QualityNode()
-                    current_node = cast(QualityNode, current_node.children_map[node_name])
-
-                current_intermediate_node_info_idx += 1
-
-            current_node.addQualityMetadata(quality_type, metadata)
-
-        # Initialize the lookup tree for quality_changes profiles with following structure:
-        # <machine> -> <quality_type> -> <name>
-        quality_changes_metadata_list = self._container_registry.findContainersMetadata(type = "quality_changes")
-        for metadata in quality_changes_metadata_list:
-            if metadata["id"] == "empty_quality_changes":
-                continue
-
-            machine_definition_id = metadata["definition"]
-            quality_type = metadata["quality_type"]
+                return None
+
+            # For global qualities, save data in the machine node. Other qualities are added at the most specific
+            # branch in the lookup tree.
+            node_names = () if is_global_quality else tuple(name for name in (nozzle_name, buildplate_name, root_material_id) if name is not None)
+            bucket_key = ("quality", definition_id, node_names, quality_type)
+
+        self._quality_index_keys[metadata["id"]] = bucket_key
+        self._quality_buckets.setdefault(bucket_key, {})[metadata["id"]] = metadata
+        return bucket_key
+
+    # Removes a profile from its bucket, see __indexQualityMetadata().
+    def __removeQualityMetadata(self, container_id: str) -> Optional[Tuple[Any, ...]]:
+        bucket_key = self._quality_index_keys.pop(container_id, None)
+        if bucket_key is None:
+            return None
+        bucket = self._quality_buckets[bucket_key]
+        del bucket[container_id]
+        if not bucket:
+            del self._quality_buckets[bucket_key]
+        return bucket_key
+
+    # Puts the profiles of a bucket in the lookup trees, replacing what was there, and removes the branches that become
+    # empty. An empty branch would still make a machine look like it has extruder-specific qualities.
+    def __updateQualityBucket(self, bucket_key: Tuple[Any, ...]) -> None:
+        bucket = self._quality_buckets.get(bucket_key)
+
+        if bucket_key[0] == "quality_changes":
+            _, definition_id, quality_type, name = bucket_key
+            machine_node = self._machine_quality_type_to_quality_changes_dict.get(definition_id)
+            if machine_node is not None and quality_type in machine_node.quality_type_map:
+                quality_type_node = machine_node.quality_type_map[quality_type]
+                quality_type_node.children_map.pop(name, None)
+                if not quality_type_node.children_map:
+                    del machine_node.quality_type_map[quality_type]
+                if not machine_node.quality_type_map:
+                    del self._machine_quality_type_to_quality_changes_dict[definition_id]
+            if not bucket:
+                return
+
+            if definition_id not in self._machine_quality_type_to_quality_changes_dict:
+                self._machine_quality_type_to_quality_changes_dict[definition_id] = QualityNode()
+            machine_node = self._machine_quality_type_to_quality_changes_dict[definition_id]
+            for container_id in sorted(bucket):
+                machine_node.addQualityChangesMetadata(quality_type, bucket[container_id])
+            return
 
-            if machine_definition_id not in self._machine_quality_type_to_quality_changes_dict:
-                self._machine_quality_type_to_quality_changes_dict[machine_definition_id] = QualityNode()
-            machine_node = self._machine_quality_type_to_quality_changes_dict[machine_definition_id]
-            machine_node.addQualityChangesMetadata(quality_type, metadata)
+        _, definition_id, node_names, quality_type = bucket_key
+        machine_node = self._machine_nozzle_buildplate_material_quality_type_to_quality_dict.get(definition_id)
+        if machine_node is not None:
+            node_path = [machine_node]
+            for node_name in node_names:
+                child_node = node_path[-1].getChildNode(node_name)
+                if child_node is None:
+                    break
+                node_path.append(child_node)
+            else:
+                node_path[-1].quality_type_map.pop(quality_type, None)
+                for depth in range(len(node_path) - 1, 0, -1):
+                    if node_path[depth].quality_type_map or node_path[depth].children_map:
+                        break
+                    del node_path[depth - 1].children_map[node_names[depth - 1]]
+                if not machine_node.quality_type_map and not machine_node.children_map:
+                    del self._machine_nozzle_buildplate_material_quality_type_to_quality_dict[definition_id]
+        if not bucket:
+            return
 
-        Logger.log("d", "Lookup tables updated.")
-        self.qualitiesUpdated.emit()
+        if definition_id not in self._machine_nozzle_buildplate_material_quality_type_to_quality_dict:
+            self._machine_nozzle_buildplate_material_quality_type_to_quality_dict[definition_id] = QualityNode()
+        current_node = cast(QualityNode, self._machine_nozzle_buildplate_material_quality_type_to_quality_dict[definition_id])
+        for node_name in node_names:
+            # There is specific information, update the current node to go deeper so we can add this quality
+            # at the most specific branch in the lookup tree.
+            if node_name not in current_node.children_map:
+                current_node.children_map[node_name] = QualityNode()
+            current_node = cast(QualityNode, current_node.children_map[node_name])
+        current_node.addQualityMetadata(quality_type, bucket[min(bucket)])
 
     def _updateMaps(self) -> None:
-        self.initialize()
+        changed_quality_ids = self._changed_quality_ids
+        self._changed_quality_ids = set()
+
+        bucket_keys = set()  # type: Set[Tuple[Any, ...]]
+        for container_id in changed_quality_ids:
+            old_bucket_key = self.__removeQualityMetadata(container_id)
+            if old_bucket_key is not None:
+                bucket_keys.add(old_bucket_key)
+            metadata_list = self._container_registry.findContainersMetadata(id = container_id)
+            if metadata_list and metadata_list[0].get("type") in ("quality", "quality_changes"):
+                new_bucket_key = self.__indexQualityMetadata(metadata_list[0])
+                if new_bucket_key is not None:
+                    bucket_keys.add(new_bucket_key)
+        for bucket_key in bucket_keys:
+            self.__updateQualityBucket(bucket_key)
+
+        Logger.log("d", "Lookup tables updated for %s changed profiles.", len(changed_quality_ids))
+        self.qualitiesUpdated.emit()
 
     def _onContainerMetadataChanged(self, container: InstanceContainer) -> None:
         self._onContainerChanged(container)
@@ -147,6 +229,7 @@ class QualityManager(QObject):
             return
 
         # update the cache table
+        self._changed_quality_ids.add(container.getId())
         self._update_timer.start()
 
     # Updates the given quality groups' availabilities according to which extruders are being used/ enabled.
@@ -1,6 +1,6 @@
 
 
-from PyQt5.QtCore import QTimer
+from PyQt5.QtCore import QTimer, Qt
 
 from UM.Application import Application
 from UM.Qt.ListModel import ListModel
@@ -14,12 +14,31 @@ catalog = i18nCatalog("steslicer")
 
 
 ##  Keep track of all objects in the project
+#
+#   The rows are keyed by the id of their scene node and are updated in place.
+#   Moving an object or changing the selection only changes the flags of the
+#   rows involved. Adding, removing or renaming objects recomputes the list of
+#   objects, after which only the rows that differ are inserted, removed or
+#   changed, so the views don't have to recreate every row.
 class ObjectsModel(ListModel):
+    NameRole = Qt.UserRole + 1
+    IsSelectedRole = Qt.UserRole + 2
+    IsOutsideBuildAreaRole = Qt.UserRole + 3
+    BuildPlateNumberRole = Qt.UserRole + 4
+    NodeRole = Qt.UserRole + 5
+
     def __init__(self):
         super().__init__()
 
-        Application.getInstance().getController().getScene().sceneChanged.connect(self._updateDelayed)
+        self.addRoleName(self.NameRole, "name")
+        self.addRoleName(self.IsSelectedRole, "isSelected")
+        self.addRoleName(self.IsOutsideBuildAreaRole, "isOutsideBuildArea")
+        self.addRoleName(self.BuildPlateNumberRole, "buildPlateNumber")
+        self.addRoleName(self.NodeRole, "node")
+
+        Application.getInstance().getController().getScene().sceneChanged.connect(self._onSceneChanged)
         Application.getInstance().getPreferences().preferenceChanged.connect(self._updateDelayed)
+        Selection.selectionChanged.connect(self._onSelectionChanged)
 
         self._update_timer = QTimer()
         self._update_timer.setInterval(100)
@@ -28,45 +47,112 @@ class ObjectsModel(ListModel):
 
         self._build_plate_number = -1
 
+        self._rows = {}  # Row of each item, by id of its node.
+        self._changed_nodes = {}  # Nodes of items that changed since the last update, by id of the node.
+        self._needs_full_update = True  # Whether the list of objects itself may have changed.
+
     def setActiveBuildPlate(self, nr):
         self._build_plate_number = nr
+        self._needs_full_update = True
         self._update()
 
     def _updateDelayed(self, *args):
+        self._needs_full_update = True
         self._update_timer.start()
 
+    def _onSceneChanged(self, source = None):
+        # A change of a grouped node changes its group, which is the node that is listed.
+        node = source
+        while isinstance(node, SceneNode) and id(node) not in self._rows:
+            node = node.getParent()
+        if node is None or node.getParent() is None:
+            # Something was added to or removed from the scene.
+            self._needs_full_update = True
+        else:
+            self._changed_nodes[id(node)] = node
+        self._update_timer.start()
+
+    def _onSelectionChanged(self):
+        for row, item in enumerate(self._items):
+            is_selected = Selection.isSelected(item["node"])
+            if item["isSelected"] != is_selected:
+                self.setProperty(row, "isSelected", is_selected)
+
+    ##  Whether a scene node is listed, given the build plate filter.
+    def _isListed(self, node, filter_current_build_plate):
+        if not isinstance(node, SceneNode):
+            return False
+        if (not node.getMeshData() and not node.callDecoration("getLayerData")) and not node.callDecoration("isGroup"):
+            return False
+        if node.getParent() and node.getParent().callDecoration("isGroup"):
+            return False  # Grouped nodes don't need resetting as their parent (the group) is resetted)
+        if not node.callDecoration("isSliceable") and not node.callDecoration("isGroup"):
+            return False
+        if filter_current_build_plate and node.callDecoration("getBuildPlateNumber") != self._build_plate_number:
+            return False
+        return True
+
+    @staticmethod
+    def _isOutsideBuildArea(node):
+        if hasattr(node, "isOutsideBuildArea"):
+            return node.isOutsideBuildArea()
+        return False
+
     def _update(self, *args):
-        nodes = []
         filter_current_build_plate = Application.getInstance().getPreferences().getValue("view/filter_current_build_plate")
-        active_build_plate_number = self._build_plate_number
+
+        if not self._needs_full_update:
+            self._needs_full_update = not self._updateChangedNodes(filter_current_build_plate)
+        self._changed_nodes = {}
+        if not self._needs_full_update:
+            return
+        self._needs_full_update = False
+
+        self._applyItems(self._createItems(filter_current_build_plate))
+        self.itemsChanged.emit()
+
+    ##  Updates the rows of the nodes that changed.
+    #
+    #   \return False if the list of objects needs to be recomputed instead,
+    #   because a node isn't listed anymore or was renamed.
+    def _updateChangedNodes(self, filter_current_build_plate):
+        for node_id, node in self._changed_nodes.items():
+            row = self._rows.get(node_id)
+            if row is None:
+                return False
+            item = self._items[row]
+            if item["node"] is not node:
+                return False  # A new node that got the id of a deleted node.
+            if not self._isListed(node, filter_current_build_plate):
+                return False
+            if not node.callDecoration("isGroup") and node.getName() != item["name"]:
+                return False  # The order and the numbering of duplicate names may change.
+            if node.callDecoration("getBuildPlateNumber") != item["buildPlateNumber"]:
+                return False
+
+            is_outside_build_area = self._isOutsideBuildArea(node)
+            if item["isOutsideBuildArea"] != is_outside_build_area:
+                self.setProperty(row, "isOutsideBuildArea", is_outside_build_area)
+            is_selected = Selection.isSelected(node)
+            if item["isSelected"] != is_selected:
+                self.setProperty(row, "isSelected", is_selected)
+        return True
+
+    def _createItems(self, filter_current_build_plate):
+        nodes = []
         group_nr = 1
         name_count_dict = defaultdict(int)
 
         for node in DepthFirstIterator(Application.getInstance().getController().getScene().getRoot()):
-            if not isinstance(node, SceneNode):
-                continue
-            if (not node.getMeshData() and not node.callDecoration("getLayerData")) and not node.callDecoration("isGroup"):
-                continue
-            if node.getParent() and node.getParent().callDecoration("isGroup"):
-                continue  # Grouped nodes don't need resetting as their parent (the group) is resetted)
-            if not node.callDecoration("isSliceable") and not node.callDecoration("isGroup"):
-                continue
-            node_build_plate_number = node.callDecoration("getBuildPlateNumber")
-            if filter_current_build_plate and node_build_plate_number != active_build_plate_number:
+            if not self._isListed(node, filter_current_build_plate):
                 continue
 
             if not node.callDecoration("isGroup"):
                 name = node.getName()
-                
             else:
                 name = catalog.i18nc("@label", "Group #{group_nr}").format(group_nr = str(group_nr))
                 group_nr += 1
 
-            if hasattr(node, "isOutsideBuildArea"):
-                is_outside_build_area = node.isOutsideBuildArea()
-            else:
-                is_outside_build_area = False
-                
             #check if we already have an instance of the object based on name
             name_count_dict[name] += 1
             name_count = name_count_dict[name]
@@ -78,15 +164,37 @@ class ObjectsModel(ListModel):
             nodes.append({
                 "name": name,
                 "isSelected": Selection.isSelected(node),
-                "isOutsideBuildArea": is_outside_build_area,
-                "buildPlateNumber": node_build_plate_number,
+                "isOutsideBuildArea": self._isOutsideBuildArea(node),
+                "buildPlateNumber": node.callDecoration("getBuildPlateNumber"),
                 "node": node
             })
-       
-        nodes = sorted(nodes, key=lambda n: n["name"])
-        self.setItems(nodes)
 
-        self.itemsChanged.emit()
+        return sorted(nodes, key=lambda n: n["name"])
+
+    ##  Changes the rows into the given items, keeping the rows of nodes that
+    #   are still listed.
+    def _applyItems(self, items):
+        node_ids = {id(item["node"]) for item in items}
+        for row in reversed(range(len(self._items))):
+            if id(self._items[row]["node"]) not in node_ids:
+                self.removeItem(row)
+
+        for row, item in enumerate(items):
+            node_id = id(item["node"])
+            if row < len(self._items) and id(self._items[row]["node"]) == node_id:
+                for key, value in item.items():
+                    if self._items[row][key] != value:
+                        self.setProperty(row, key, value)
+                continue
+
+            # The node is new here, or its row moved.
+            for old_row in range(row + 1, len(self._items)):
+                if id(self._items[old_row]["node"]) == node_id:
+                    self.removeItem(old_row)
+                    break
+            self.insertItem(row, item)
+
+        self._rows = {id(item["node"]): row for row, item in enumerate(self._items)}
 
     @staticmethod
     def createObjectsModel():
@@ -1,14 +1,48 @@
-
-
 import sys
+from typing import List, Optional, Tuple
 
-from shapely import affinity
-from shapely.geometry import Polygon
+import numpy
 
+from UM.Math.Polygon import Polygon
 from UM.Scene.Iterator.Iterator import Iterator
 from UM.Scene.SceneNode import SceneNode
 
 
+##  Finds the pairs of different nodes of which the bounding box of the first
+#   may intersect the head hull of the second, by comparing the boxes around
+#   them. Only these pairs need to be checked with the actual polygons.
+#
+#   \param bounding_boxes The bounding box of each node, as rows of
+#   [min x, min y, max x, max y].
+#   \param head_boxes The box around the head hull of each node, in the same
+#   format.
+#   \return The pairs as rows of [node index, other node index].
+def _findCandidatePairs(bounding_boxes: numpy.ndarray, head_boxes: numpy.ndarray) -> numpy.ndarray:
+    # Touching boxes are included, the polygon test decides whether touching counts.
+    overlaps = (bounding_boxes[:, numpy.newaxis, 0] <= head_boxes[numpy.newaxis, :, 2]) & \
+               (head_boxes[numpy.newaxis, :, 0] <= bounding_boxes[:, numpy.newaxis, 2]) & \
+               (bounding_boxes[:, numpy.newaxis, 1] <= head_boxes[numpy.newaxis, :, 3]) & \
+               (head_boxes[numpy.newaxis, :, 1] <= bounding_boxes[:, numpy.newaxis, 3])
+    numpy.fill_diagonal(overlaps, False)
+    return numpy.argwhere(overlaps)
+
+
+##  Sorts nodes by the corner of their convex hull that is nearest to the
+#   corner of the build plate where printing starts.
+#
+#   \param hull_boxes The box around the convex hull of each node, as rows of
+#   [min x, min y, max x, max y].
+#   \param machine_size The width and depth of the build plate.
+#   \param flip_x Whether printing starts on the high x side.
+#   \param flip_y Whether printing starts on the high y side.
+#   \return The indices of the nodes in print order.
+def _getPrintOrder(hull_boxes: numpy.ndarray, machine_size: List[float], flip_x: bool, flip_y: bool) -> numpy.ndarray:
+    # Mirroring the build plate turns the maximum into the minimum.
+    min_x = machine_size[0] - hull_boxes[:, 2] if flip_x else hull_boxes[:, 0]
+    min_y = machine_size[1] - hull_boxes[:, 3] if flip_y else hull_boxes[:, 1]
+    return numpy.lexsort((min_y, min_x))
+
+
 # Iterator that determines the object print order when one-at a time mode is enabled.
 #
 # In one-at-a-time mode, only one extruder can be enabled to print. In order to maximize the number of objects we can
@@ -30,7 +64,11 @@ from UM.Scene.SceneNode import SceneNode
 #
 # This iterator determines the print order following the rules above.
 #
+# The order only depends on the hulls and the bounding boxes of the objects and on the size of the build plate, so
+# the last one is kept and reused as long as these didn't change, for instance when only settings were changed.
+#
 class OneAtATimeIterator(Iterator):
+    _last_order = None  # type: Optional[Tuple[tuple, List[int]]] # The geometry that was ordered last and the indices of its nodes in print order.
 
     def __init__(self, scene_node):
         from steslicer.SteSlicerApplication import SteSlicerApplication
@@ -65,8 +103,9 @@ class OneAtATimeIterator(Iterator):
 
         return min_coord
 
-    def _checkForCollisions(self) -> bool:
-        all_nodes = []
+    ##  Collects the head hulls and bounding boxes of the nodes.
+    def _getCollisionShapes(self) -> List[Tuple[Polygon, List[float]]]:
+        shapes = []
         for node in self._scene_node.getChildren():
             if not issubclass(type(node), SceneNode):
                 continue
@@ -77,29 +116,29 @@ class OneAtATimeIterator(Iterator):
             bounding_box = node.getBoundingBox()
             if not bounding_box:
                 continue
-            from UM.Math.Polygon import Polygon
-            bounding_box_polygon = Polygon([[bounding_box.left, bounding_box.front],
-                                            [bounding_box.left, bounding_box.back],
-                                            [bounding_box.right, bounding_box.back],
-                                            [bounding_box.right, bounding_box.front]])
-
-            all_nodes.append({"node": node,
-                              "bounding_box": bounding_box_polygon,
-                              "convex_hull": convex_hull})
-
-        has_collisions = False
-        for i, node_dict in enumerate(all_nodes):
-            for j, other_node_dict in enumerate(all_nodes):
-                if i == j:
-                    continue
-                if node_dict["bounding_box"].intersectsPolygon(other_node_dict["convex_hull"]):
-                    has_collisions = True
-                    break
-
-            if has_collisions:
-                break
 
-        return has_collisions
+            shapes.append((convex_hull, [bounding_box.left, bounding_box.front, bounding_box.right, bounding_box.back]))
+        return shapes
+
+    ##  Whether the print head would hit another node while printing a node.
+    #
+    #   The boxes around all nodes are compared at once, the polygons are only
+    #   compared for the pairs of which the boxes overlap.
+    def _checkForCollisions(self, shapes: List[Tuple[Polygon, List[float]]]) -> bool:
+        if len(shapes) < 2:
+            return False
+
+        corners = numpy.array([bounding_box for _, bounding_box in shapes], dtype = numpy.float64).reshape((-1, 2, 2))
+        bounding_boxes = numpy.concatenate((corners.min(axis = 1), corners.max(axis = 1)), axis = 1)
+        head_points = [convex_hull.getPoints() for convex_hull, _ in shapes]
+        head_boxes = numpy.array([numpy.concatenate((points.min(axis = 0), points.max(axis = 0))) for points in head_points], dtype = numpy.float64)
+
+        for i, j in _findCandidatePairs(bounding_boxes, head_boxes):
+            left, front, right, back = shapes[i][1]
+            bounding_box_polygon = Polygon([[left, front], [left, back], [right, back], [right, front]])
+            if bounding_box_polygon.intersectsPolygon(shapes[j][0]):
+                return True
+        return False
 
     def _fillStack(self):
         min_coord = self.getMachineNearestCornerToExtruder(self._global_stack)
@@ -109,40 +148,34 @@ class OneAtATimeIterator(Iterator):
         machine_size = [self._global_stack.getProperty("machine_width", "value"),
                         self._global_stack.getProperty("machine_depth", "value")]
 
-        def flip_x(polygon):
-            tm2 = [-1, 0, 0, 1, 0, 0]
-            return affinity.affine_transform(affinity.translate(polygon, xoff = -machine_size[0]), tm2)
-
-        def flip_y(polygon):
-            tm2 = [1, 0, 0, -1, 0, 0]
-            return affinity.affine_transform(affinity.translate(polygon, yoff = -machine_size[1]), tm2)
-
-        if self._checkForCollisions():
-            self._node_stack = []
-            return
+        collision_shapes = self._getCollisionShapes()
 
-        node_list = []
+        nodes = []
+        hull_boxes = []
         for node in self._scene_node.getChildren():
             if not issubclass(type(node), SceneNode):
                 continue
 
             convex_hull = node.callDecoration("getConvexHull")
             if convex_hull:
-                xmin = min(x for x, _ in convex_hull._points)
-                xmax = max(x for x, _ in convex_hull._points)
-                ymin = min(y for _, y in convex_hull._points)
-                ymax = max(y for _, y in convex_hull._points)
-
-                convex_hull_polygon = Polygon.from_bounds(xmin, ymin, xmax, ymax)
-                if transform_x < 0:
-                    convex_hull_polygon = flip_x(convex_hull_polygon)
-                if transform_y < 0:
-                    convex_hull_polygon = flip_y(convex_hull_polygon)
-
-                node_list.append({"node": node,
-                                  "min_coord": [convex_hull_polygon.bounds[0], convex_hull_polygon.bounds[1]],
-                                  })
+                points = convex_hull.getPoints()
+                nodes.append(node)
+                hull_boxes.append(numpy.concatenate((points.min(axis = 0), points.max(axis = 0))))
+
+        geometry = (transform_x, transform_y, tuple(machine_size),
+                    tuple((convex_hull.getPoints().tobytes(), tuple(bounding_box)) for convex_hull, bounding_box in collision_shapes),
+                    tuple((id(node), hull_box.tobytes()) for node, hull_box in zip(nodes, hull_boxes)))
+        last_order = OneAtATimeIterator._last_order
+        if last_order is not None and last_order[0] == geometry:
+            self._node_stack = [nodes[index] for index in last_order[1]]
+            return
 
-        node_list = sorted(node_list, key = lambda d: d["min_coord"])
+        if self._checkForCollisions(collision_shapes):
+            order = []  # type: List[int]
+        elif nodes:
+            order = _getPrintOrder(numpy.array(hull_boxes, dtype = numpy.float64), machine_size, transform_x < 0, transform_y < 0).tolist()
+        else:
+            order = []
 
-        self._node_stack = [d["node"] for d in node_list]
+        OneAtATimeIterator._last_order = (geometry, order)
+        self._node_stack = [nodes[index] for index in order]
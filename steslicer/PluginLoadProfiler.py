@@ -0,0 +1,62 @@
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from UM.Logger import Logger
+
+from steslicer.LazyPluginObject import LazyPluginObject
+
+
+##  Measures how long loading each plug-in takes while the application starts.
+#
+#   While profiling, every call to loadPlugin() of the plug-in registry is timed,
+#   including the calls loadPlugins() makes. The time includes importing the
+#   plug-in and creating its objects. Plug-ins that registered a
+#   LazyPluginObject are cheap to load and report the time of their first use
+#   separately.
+class PluginLoadProfiler:
+    def __init__(self, plugin_registry: Any) -> None:
+        self._plugin_registry = plugin_registry
+        self._load_times = {}  # type: Dict[str, float]
+        self._total_time = 0.0
+        self._start_time = None  # type: Optional[float]
+
+    def start(self) -> None:
+        self._start_time = time.time()
+        load_plugin = self._plugin_registry.loadPlugin
+
+        def timedLoadPlugin(plugin_id: str, *args, **kwargs) -> None:
+            start_time = time.time()
+            try:
+                load_plugin(plugin_id, *args, **kwargs)
+            finally:
+                # Loading plug-ins can be nested, only count the first attempt.
+                self._load_times.setdefault(plugin_id, time.time() - start_time)
+
+        # loadPlugins() calls self.loadPlugin(), so this catches those calls as well.
+        self._plugin_registry.loadPlugin = timedLoadPlugin
+
+    def stop(self) -> None:
+        if self._start_time is None:
+            return
+        del self._plugin_registry.loadPlugin  # Back to the method of the class.
+        self._total_time += time.time() - self._start_time
+        self._start_time = None
+
+    ##  \return The time it took to load each plug-in, slowest first.
+    def getLoadTimes(self) -> List[Tuple[str, float]]:
+        return sorted(self._load_times.items(), key = lambda item: item[1], reverse = True)
+
+    ##  \return The plug-ins that were loaded on first use and the time that took.
+    @staticmethod
+    def getLazyLoadTimes() -> List[Tuple[str, float]]:
+        return sorted(LazyPluginObject.getLoadTimes().items(), key = lambda item: item[1], reverse = True)
+
+    def logReport(self) -> None:
+        Logger.log("d", "Loading %s plug-ins took %0.2f s:", len(self._load_times), self._total_time)
+        for plugin_id, load_time in self.getLoadTimes():
+            Logger.log("d", "    %-32s %0.3f s", plugin_id, load_time)
+        lazy_load_times = self.getLazyLoadTimes()
+        if lazy_load_times:
+            Logger.log("d", "Plug-ins loaded on first use:")
+            for plugin_id, load_time in lazy_load_times:
+                Logger.log("d", "    %-32s %0.3f s", plugin_id, load_time)
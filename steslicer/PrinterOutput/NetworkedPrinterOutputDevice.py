@@ -6,6 +6,7 @@ from UM.Scene.SceneNode import SceneNode #For typing.
 from steslicer.SteSlicerApplication import SteSlicerApplication
 
 from steslicer.PrinterOutputDevice import PrinterOutputDevice, ConnectionState
+from steslicer.PrinterOutput.ParallelGzipCompressor import ParallelGzipCompressor
 
 from PyQt5.QtNetwork import QHttpMultiPart, QHttpPart, QNetworkRequest, QNetworkAccessManager, QNetworkReply, QAuthenticator
 from PyQt5.QtCore import pyqtProperty, pyqtSignal, pyqtSlot, QObject, QUrl, QCoreApplication
@@ -14,7 +15,6 @@ from typing import Any, Callable, Dict, List, Optional
 from enum import IntEnum
 
 import os  # To get the username
-import gzip
 
 class AuthState(IntEnum):
     NotAuthenticated = 1
@@ -51,6 +51,7 @@ class NetworkedPrinterOutputDevice(PrinterOutputDevice):
 
         self._sending_gcode = False
         self._compressing_gcode = False
+        self._gcode_compressor = None       # type: Optional[ParallelGzipCompressor]
         self._gcode = []                    # type: List[str]
         self._connection_state_before_timeout = None    # type: Optional[ConnectionState]
 
@@ -66,46 +67,41 @@ class NetworkedPrinterOutputDevice(PrinterOutputDevice):
     def authenticationState(self) -> AuthState:
         return self._authentication_state
 
-    def _compressDataAndNotifyQt(self, data_to_append: str) -> bytes:
-        compressed_data = gzip.compress(data_to_append.encode("utf-8"))
+    def _notifyQtWhileCompressing(self) -> None:
+        if not self._compressing_gcode and self._gcode_compressor is not None:
+            # Abort was called, stop the threads that are still compressing.
+            self._gcode_compressor.cancel()
         self._progress_message.setProgress(-1)  # Tickle the message so that it's clear that it's still being used.
         QCoreApplication.processEvents()  # Ensure that the GUI does not freeze.
 
         # Pretend that this is a response, as zipping might take a bit of time.
         # If we don't do this, the device might trigger a timeout.
         self._last_response_time = time()
-        return compressed_data
 
+    ##  Compresses the g-code on a thread pool.
+    #
+    #   The g-code is compressed in batches, each into its own gzip member.
+    #   Joined together they form one (multi-member) gzip file.
     def _compressGCode(self) -> Optional[bytes]:
         self._compressing_gcode = True
+        compressor = ParallelGzipCompressor()
+        self._gcode_compressor = compressor
 
-        ## Mash the data into single string
-        max_chars_per_line = int(1024 * 1024 / 4)  # 1/4 MB per line.
+        # if the gcode was read from a gcode file, self._gcode will be a list of all lines in that file.
+        # The compressor batches them, as compressing line by line is extremely slow.
         file_data_bytes_list = []
-        batched_lines = []
-        batched_lines_count = 0
-
-        for line in self._gcode:
+        for member in compressor.compress(self._gcode, wait_callback = self._notifyQtWhileCompressing):
             if not self._compressing_gcode:
-                self._progress_message.hide()
-                # Stop trying to zip / send as abort was called.
-                return None
-
-            # if the gcode was read from a gcode file, self._gcode will be a list of all lines in that file.
-            # Compressing line by line in this case is extremely slow, so we need to batch them.
-            batched_lines.append(line)
-            batched_lines_count += len(line)
-
-            if batched_lines_count >= max_chars_per_line:
-                file_data_bytes_list.append(self._compressDataAndNotifyQt("".join(batched_lines)))
-                batched_lines = []
-                batched_lines_count = 0
-
-        # Don't miss the last batch (If any)
-        if len(batched_lines) != 0:
-            file_data_bytes_list.append(self._compressDataAndNotifyQt("".join(batched_lines)))
+                compressor.cancel()
+                break
+            self._notifyQtWhileCompressing()
+            file_data_bytes_list.append(member)
 
         self._compressing_gcode = False
+        if compressor.isCancelled():
+            self._progress_message.hide()
+            # Stop trying to zip / send as abort was called.
+            return None
         return b"".join(file_data_bytes_list)
 
     def _update(self) -> None:
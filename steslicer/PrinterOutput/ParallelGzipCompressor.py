@@ -0,0 +1,86 @@
+import gzip
+import os
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+from typing import Callable, Deque, Iterable, Iterator, Optional
+
+
+##  Compresses text with gzip on several threads at once.
+#
+#   The text is cut into batches of about batch_size characters and every batch
+#   is compressed into its own gzip member. A concatenation of gzip members is a
+#   valid gzip stream, so the members can be sent one after the other as soon as
+#   they are ready. zlib releases the GIL while compressing, so the threads
+#   really run in parallel.
+class ParallelGzipCompressor:
+    def __init__(self, max_workers: Optional[int] = None, batch_size: int = 1024 * 1024 // 4,
+                 compress_level: int = 9) -> None:
+        self._max_workers = max_workers or min(8, os.cpu_count() or 1)
+        self._batch_size = batch_size
+        self._compress_level = compress_level
+        self._cancelled = False
+
+    ##  Stops compressing, members that are not yet returned are discarded.
+    def cancel(self) -> None:
+        self._cancelled = True
+
+    def isCancelled(self) -> bool:
+        return self._cancelled
+
+    ##  Compresses the chunks of text.
+    #
+    #   \param chunks The text to compress, for instance a list of g-code lines or layers.
+    #   \param wait_callback Called regularly while waiting for the next member,
+    #   for instance to keep the GUI responsive.
+    #   \return The gzip members, in order of the text.
+    def compress(self, chunks: Iterable[str], wait_callback: Optional[Callable[[], None]] = None) -> Iterator[bytes]:
+        self._cancelled = False
+        # Limit the number of batches in flight, so the memory use is bounded.
+        max_pending = self._max_workers * 2
+        pending = deque()  # type: Deque[Future]
+        with ThreadPoolExecutor(max_workers = self._max_workers) as executor:
+            try:
+                for batch in self._batches(chunks):
+                    if self._cancelled:
+                        return
+                    pending.append(executor.submit(self._compressBatch, batch))
+                    while len(pending) >= max_pending:
+                        member = self._waitFor(pending.popleft(), wait_callback)
+                        if member is None:
+                            return
+                        yield member
+                while pending:
+                    member = self._waitFor(pending.popleft(), wait_callback)
+                    if member is None:
+                        return
+                    yield member
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _batches(self, chunks: Iterable[str]) -> Iterator[str]:
+        batched_chunks = []
+        batched_chunks_count = 0
+        for chunk in chunks:
+            batched_chunks.append(chunk)
+            batched_chunks_count += len(chunk)
+            if batched_chunks_count >= self._batch_size:
+                yield "".join(batched_chunks)
+                batched_chunks = []
+                batched_chunks_count = 0
+        # Don't miss the last batch (If any)
+        if batched_chunks:
+            yield "".join(batched_chunks)
+
+    def _compressBatch(self, batch: str) -> bytes:
+        return gzip.compress(batch.encode("utf-8"), compresslevel = self._compress_level)
+
+    def _waitFor(self, future: Future, wait_callback: Optional[Callable[[], None]]) -> Optional[bytes]:
+        while True:
+            if self._cancelled:
+                return None
+            try:
+                return future.result(timeout = 0.05)
+            except TimeoutError:
+                if wait_callback is not None:
+                    wait_callback()
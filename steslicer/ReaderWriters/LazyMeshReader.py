@@ -0,0 +1,22 @@
+from typing import Any, Callable, Dict, List
+
+from UM.Mesh.MeshReader import MeshReader
+
+from steslicer.LazyPluginObject import LazyPluginObject
+
+
+##  A mesh reader that imports the real reader when the first file is read.
+#
+#   The supported extensions come from the "mesh_reader" entries of the
+#   metadata of the plug-in, so the file dialogs and the file handler know the
+#   reader without loading it.
+class LazyMeshReader(LazyPluginObject, MeshReader):
+    def __init__(self, factory: Callable[[], MeshReader], mesh_reader_metadata: List[Dict[str, Any]]) -> None:
+        super().__init__(factory)
+        self._supported_extensions = ["." + entry["extension"].lower() for entry in mesh_reader_metadata]
+
+    def preRead(self, file_name, *args, **kwargs):
+        return self.getPluginObject().preRead(file_name, *args, **kwargs)
+
+    def _read(self, file_name):
+        return self.getPluginObject()._read(file_name)
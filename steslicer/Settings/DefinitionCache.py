@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+import pickle
+from typing import Any, Dict, List, Optional, Tuple
+
+from UM.Logger import Logger
+from UM.Settings.SettingDefinition import SettingDefinition
+
+
+##  A persistent cache of fully loaded definition containers.
+#
+#   Loading a machine definition parses its JSON file and all the files it
+#   inherits from (fdmprinter.def.json for every machine) and builds the setting
+#   tree. This cache keeps the pickled result of every loaded definition in a
+#   single file, so the next start needs only one read. Each entry remembers the
+#   modification time and size of the files it was loaded from and is ignored as
+#   soon as one of them changes. The whole cache is ignored when its key changes,
+#   for instance because the application was updated or a plug-in registered
+#   other setting properties.
+#
+#   Uranium's local container provider keeps a cache of loaded definitions as
+#   well, but that one has a file per definition and is only keyed by the
+#   application version. It would keep serving definitions without the setting
+#   properties that plug-ins registered since, and it is read one definition at
+#   a time while the registry is being queried. The definitions in this cache
+#   are added to the registry at once, right after the metadata is loaded, so
+#   the provider's cache is only used for definitions that aren't in here.
+class DefinitionCache:
+    Version = 1
+
+    ##  \param cache_file The file to store the cache in.
+    #   \param key Identifies everything apart from the definition files that
+    #   the loaded definitions depend on, see makeKey.
+    def __init__(self, cache_file: str, key: str) -> None:
+        self._cache_file = cache_file
+        self._key = key
+        self._entries = None  # type: Optional[Dict[str, Tuple[List[Tuple[str, int, int]], bytes]]]
+        self._changed = False
+
+    ##  Creates a cache key from the application version and the registered
+    #   setting properties.
+    @classmethod
+    def makeKey(cls, *versions: Any) -> str:
+        properties = []
+        for property_name in sorted(SettingDefinition.getPropertyNames()):
+            properties.append([property_name, SettingDefinition.isReadOnlyProperty(property_name), SettingDefinition.dependsOnProperty(property_name)])
+        key_data = json.dumps([cls.Version, pickle.HIGHEST_PROTOCOL, [str(version) for version in versions], properties])
+        return hashlib.sha256(key_data.encode("utf-8")).hexdigest()
+
+    ##  Gets the IDs of all definitions in the cache, including the ones of
+    #   which the files changed.
+    def getDefinitionIds(self) -> List[str]:
+        return list(self._getEntries())
+
+    ##  Gets a definition from the cache.
+    #   \return The definition, or None if it's not in the cache or its files changed.
+    def get(self, definition_id: str) -> Optional[Any]:
+        entries = self._getEntries()
+        if definition_id not in entries:
+            return None
+        file_stats, data = entries[definition_id]
+        if self._getFileStats([path for path, _, _ in file_stats]) != file_stats:
+            del entries[definition_id]
+            self._changed = True
+            return None
+        try:
+            return pickle.loads(data)
+        except Exception as e:
+            Logger.log("w", "Could not load definition %s from the cache: %s", definition_id, e)
+            del entries[definition_id]
+            self._changed = True
+            return None
+
+    ##  Adds a definition to the cache.
+    #   \param file_paths The files the definition was loaded from.
+    def put(self, definition_id: str, definition: Any, file_paths: List[str]) -> None:
+        file_stats = self._getFileStats(file_paths)
+        if file_stats is None:
+            return
+        try:
+            data = pickle.dumps(definition, pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            Logger.log("w", "Could not add definition %s to the cache: %s", definition_id, e)
+            return
+        self._getEntries()[definition_id] = (file_stats, data)
+        self._changed = True
+
+    ##  Writes the cache to disk if anything changed.
+    def save(self) -> None:
+        if not self._changed:
+            return
+        temporary_file = self._cache_file + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self._cache_file), exist_ok = True)
+            with open(temporary_file, "wb") as f:
+                pickle.dump({"key": self._key, "entries": self._entries}, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_file, self._cache_file)
+            self._changed = False
+        except EnvironmentError as e:
+            Logger.log("w", "Could not save the definition cache to %s: %s", self._cache_file, e)
+
+    def _getEntries(self) -> Dict[str, Tuple[List[Tuple[str, int, int]], bytes]]:
+        if self._entries is not None:
+            return self._entries
+        self._entries = {}
+        if not os.path.isfile(self._cache_file):
+            return self._entries
+        try:
+            with open(self._cache_file, "rb") as f:
+                cache = pickle.load(f)
+        except Exception as e:
+            Logger.log("w", "Could not read the definition cache %s: %s", self._cache_file, e)
+            return self._entries
+        if not isinstance(cache, dict) or cache.get("key") != self._key:
+            Logger.log("i", "The definition cache is outdated, definitions will be loaded from their files.")
+            self._changed = True
+            return self._entries
+        self._entries = cache["entries"]
+        return self._entries
+
+    @staticmethod
+    def _getFileStats(file_paths: List[str]) -> Optional[List[Tuple[str, int, int]]]:
+        file_stats = []
+        for path in file_paths:
+            try:
+                stat = os.stat(path)
+            except EnvironmentError:
+                return None
+            file_stats.append((path, stat.st_mtime_ns, stat.st_size))
+        return file_stats
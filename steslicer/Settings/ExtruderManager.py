@@ -1,5 +1,7 @@
 
 
+import weakref
+
 from PyQt5.QtCore import pyqtSignal, pyqtProperty, QObject, QVariant  # For communicating data and events to Qt.
 from UM.FlameProfiler import pyqtSlot
 
@@ -13,7 +15,7 @@ from UM.Scene.Iterator.BreadthFirstIterator import BreadthFirstIterator
 from UM.Settings.ContainerRegistry import ContainerRegistry  # Finding containers by ID.
 from UM.Settings.ContainerStack import ContainerStack
 
-from typing import Any, cast, Dict, List, Optional, TYPE_CHECKING, Union
+from typing import Any, cast, Dict, List, Optional, Tuple, TYPE_CHECKING, Union
 
 if TYPE_CHECKING:
     from steslicer.Settings.ExtruderStack import ExtruderStack
@@ -41,9 +43,21 @@ class ExtruderManager(QObject):
         # TODO; I have no idea why this is a union of ID's and extruder stacks. This needs to be fixed at some point.
         self._selected_object_extruders = []  # type: List[Union[str, "ExtruderStack"]]
 
+        # The result of getUsedExtruderStacks() with the generation it was computed in. It's only used while the
+        # generation is the same.
+        self._used_extruder_stacks = None  # type: Optional[Tuple[int, List["ContainerStack"]]]
+        self._used_extruder_stacks_generation = 0  # Increased on every change that the result depends on.
+        self._used_extruder_stacks_hits = 0
+        self._used_extruder_stacks_misses = 0
+        self._watched_scene = None
+        self._watched_machine_manager = None
+        self._watched_stacks = weakref.WeakSet()  # type: weakref.WeakSet
+
         self._addCurrentMachineExtruders()
 
         Selection.selectionChanged.connect(self.resetSelectedObjectExtruders)
+        self.extrudersChanged.connect(self._invalidateUsedExtruderStacks)
+        self._application.globalContainerStackChanged.connect(self._invalidateUsedExtruderStacks)
 
     ##  Signal to notify other components when the list of extruders for a machine definition changes.
     extrudersChanged = pyqtSignal(QVariant)
@@ -203,7 +217,59 @@ class ExtruderManager(QObject):
     #   list.
     #
     #   \return A list of extruder stacks.
+    #
+    #   The result is cached until the scene, the per-object settings of a node or
+    #   a setting of the machine or its extruders changes.
     def getUsedExtruderStacks(self) -> List["ContainerStack"]:
+        generation = self._used_extruder_stacks_generation
+        cached_result = self._used_extruder_stacks
+        if cached_result is not None and cached_result[0] == generation:
+            self._used_extruder_stacks_hits += 1
+            return list(cached_result[1])
+
+        self._used_extruder_stacks_misses += 1
+        used_extruder_stacks = self._findUsedExtruderStacks()
+        # This may run in a slicing thread. If something changed while it was computed, the result is stored under the
+        # generation it was computed in, so it's never used.
+        self._used_extruder_stacks = (generation, used_extruder_stacks)
+        return list(used_extruder_stacks)
+
+    ##  Gets how often getUsedExtruderStacks() could use its cached result.
+    def getUsedExtruderStacksStatistics(self) -> Dict[str, int]:
+        return {"hits": self._used_extruder_stacks_hits, "misses": self._used_extruder_stacks_misses}
+
+    def _invalidateUsedExtruderStacks(self, *args, **kwargs) -> None:
+        self._used_extruder_stacks_generation += 1
+
+    def _onUsedExtruderStackPropertyChanged(self, key: str, property_name: str) -> None:
+        if property_name == "value":
+            self._invalidateUsedExtruderStacks()
+
+    ##  Invalidates the cache of getUsedExtruderStacks() when a stack changes.
+    #
+    #   Switching a profile, material or variant replaces a container in the
+    #   stack, which only emits containersChanged and not propertyChanged.
+    def _watchStackForUsedExtruders(self, stack: "ContainerStack") -> None:
+        if stack in self._watched_stacks:
+            return
+        self._watched_stacks.add(stack)
+        stack.propertyChanged.connect(self._onUsedExtruderStackPropertyChanged)
+        stack.containersChanged.connect(self._invalidateUsedExtruderStacks)
+
+    ##  Invalidates the cache of getUsedExtruderStacks() when the scene or the
+    #   enabled extruders change. The default extruder is used for adhesion.
+    def _watchApplicationForUsedExtruders(self) -> None:
+        scene = self._application.getController().getScene()
+        if self._watched_scene is not scene:
+            self._watched_scene = scene
+            scene.sceneChanged.connect(self._invalidateUsedExtruderStacks)
+        machine_manager = self._application.getMachineManager()
+        if self._watched_machine_manager is not machine_manager:
+            self._watched_machine_manager = machine_manager
+            machine_manager.extruderChanged.connect(self._invalidateUsedExtruderStacks)
+            machine_manager.numberExtrudersEnabledChanged.connect(self._invalidateUsedExtruderStacks)
+
+    def _findUsedExtruderStacks(self) -> List["ContainerStack"]:
         global_stack = self._application.getGlobalContainerStack()
         container_registry = ContainerRegistry.getInstance()
 
@@ -214,12 +280,17 @@ class ExtruderManager(QObject):
         support_bottom_enabled = False
         support_roof_enabled = False
 
+        self._watchApplicationForUsedExtruders()
         scene_root = self._application.getController().getScene().getRoot()
 
         # If no extruders are registered in the extruder manager yet, return an empty array
         if len(self.extruderIds) == 0:
             return []
 
+        self._watchStackForUsedExtruders(global_stack)
+        for extruder_stack in global_stack.extruders.values():
+            self._watchStackForUsedExtruders(extruder_stack)
+
         # Get the extruders of all printable meshes in the scene
         meshes = [node for node in DepthFirstIterator(scene_root) if isinstance(node, SceneNode) and node.isSelectable()] #type: ignore #Ignore type error because iter() should get called automatically by Python syntax.
         for mesh in meshes:
@@ -231,7 +302,11 @@ class ExtruderManager(QObject):
 
             # Get whether any of them use support.
             stack_to_use = mesh.callDecoration("getStack")  # if there is a per-mesh stack, we use it
-            if not stack_to_use:
+            if stack_to_use:
+                if stack_to_use not in self._watched_stacks:
+                    mesh.callDecoration("getActiveExtruderChangedSignal").connect(self._invalidateUsedExtruderStacks)
+                self._watchStackForUsedExtruders(stack_to_use)
+            else:
                 # if there is no per-mesh stack, we use the build extruder for this mesh
                 stack_to_use = container_registry.findContainerStacks(id = extruder_stack_id)[0]
 
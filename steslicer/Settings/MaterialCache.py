@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+import pickle
+from typing import Any, Dict, Optional, Set, Tuple
+
+from UM.Logger import Logger
+
+
+##  A persistent cache of parsed material profiles.
+#
+#   Every start, the metadata of all material profiles is read, which means
+#   parsing every XML file. This cache keeps what was parsed from each file in
+#   a single pickled file, so unchanged materials don't need to be parsed
+#   again. Each entry is stored under the ID of its material and a kind, like
+#   "metadata", and remembers a hash of the file contents it was parsed from.
+#   It is ignored as soon as the contents differ. The whole cache is ignored
+#   when its key changes, for instance because the plug-in was updated.
+#   Entries of materials that were removed, or of contents that changed, are
+#   dropped when the cache is saved.
+class MaterialCache:
+    Version = 1
+
+    ##  \param cache_file The file to store the cache in.
+    #   \param key Identifies everything apart from the file contents that the
+    #   parsed materials depend on, see makeKey.
+    def __init__(self, cache_file: str, key: str) -> None:
+        self._cache_file = cache_file
+        self._key = key
+        self._entries = None  # type: Optional[Dict[Tuple[str, str], Tuple[str, bytes]]]
+        self._changed = False
+        # Hashes of the file contents that were looked up or added since the start, by material ID.
+        self._used_digests = {}  # type: Dict[str, Set[str]]
+
+    ##  Creates a cache key from the versions the parsing depends on.
+    @classmethod
+    def makeKey(cls, *versions: Any) -> str:
+        key_data = json.dumps([cls.Version, pickle.HIGHEST_PROTOCOL, [str(version) for version in versions]])
+        return hashlib.sha256(key_data.encode("utf-8")).hexdigest()
+
+    ##  Gets what was parsed from a material file.
+    #   \param kind What was parsed from the file.
+    #   \param material_id The ID of the material.
+    #   \param serialized The contents of the file.
+    #   \return What was parsed, or None if it's not in the cache or the file
+    #   changed.
+    def get(self, kind: str, material_id: str, serialized: str) -> Optional[Any]:
+        entries = self._getEntries()
+        digest = self._getDigest(serialized)
+        self._used_digests.setdefault(material_id, set()).add(digest)
+        entry = entries.get((kind, material_id))
+        if entry is None:
+            return None
+        cached_digest, data = entry
+        if cached_digest != digest:
+            return None
+        try:
+            return pickle.loads(data)
+        except Exception as e:
+            Logger.log("w", "Could not load %s of material %s from the cache: %s", kind, material_id, e)
+            del entries[(kind, material_id)]
+            self._changed = True
+            return None
+
+    ##  Adds what was parsed from a material file to the cache.
+    def put(self, kind: str, material_id: str, serialized: str, parsed: Any) -> None:
+        try:
+            data = pickle.dumps(parsed, pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            Logger.log("w", "Could not add %s of material %s to the cache: %s", kind, material_id, e)
+            return
+        digest = self._getDigest(serialized)
+        self._used_digests.setdefault(material_id, set()).add(digest)
+        self._getEntries()[(kind, material_id)] = (digest, data)
+        self._changed = True
+
+    ##  Writes the cache to disk if anything changed.
+    #
+    #   Entries are dropped if their material wasn't looked up since the start
+    #   or if it was, but with other contents.
+    def save(self) -> None:
+        if self._entries is None:
+            return  # Nothing was looked up, so nothing is known to be outdated either.
+        for kind, material_id in list(self._entries):
+            if self._entries[(kind, material_id)][0] not in self._used_digests.get(material_id, ()):
+                del self._entries[(kind, material_id)]
+                self._changed = True
+        if not self._changed:
+            return
+        temporary_file = self._cache_file + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self._cache_file), exist_ok = True)
+            with open(temporary_file, "wb") as f:
+                pickle.dump({"key": self._key, "entries": self._entries}, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_file, self._cache_file)
+            self._changed = False
+        except EnvironmentError as e:
+            Logger.log("w", "Could not save the material cache to %s: %s", self._cache_file, e)
+
+    def _getEntries(self) -> Dict[Tuple[str, str], Tuple[str, bytes]]:
+        if self._entries is not None:
+            return self._entries
+        self._entries = {}
+        if not os.path.isfile(self._cache_file):
+            return self._entries
+        try:
+            with open(self._cache_file, "rb") as f:
+                cache = pickle.load(f)
+        except Exception as e:
+            Logger.log("w", "Could not read the material cache %s: %s", self._cache_file, e)
+            return self._entries
+        if not isinstance(cache, dict) or cache.get("key") != self._key:
+            Logger.log("i", "The material cache is outdated, materials will be parsed from their files.")
+            self._changed = True
+            return self._entries
+        self._entries = cache["entries"]
+        return self._entries
+
+    @staticmethod
+    def _getDigest(serialized: str) -> str:
+        return hashlib.sha1(serialized.encode("utf-8")).hexdigest()
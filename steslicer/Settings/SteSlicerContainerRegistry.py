@@ -4,7 +4,7 @@ import os
 import re
 import configparser
 
-from typing import cast, Optional
+from typing import cast, Optional, Set
 
 from PyQt5.QtWidgets import QMessageBox
 
@@ -12,6 +12,7 @@ from UM.Decorators import override
 from UM.Settings.ContainerFormatError import ContainerFormatError
 from UM.Settings.ContainerRegistry import ContainerRegistry
 from UM.Settings.ContainerStack import ContainerStack
+from UM.Settings.DefinitionContainer import DefinitionContainer
 from UM.Settings.InstanceContainer import InstanceContainer
 from UM.Settings.SettingInstance import SettingInstance
 from UM.Application import Application
@@ -24,6 +25,7 @@ from UM.Resources import Resources
 
 from . import ExtruderStack
 from . import GlobalStack
+from .DefinitionCache import DefinitionCache
 
 import steslicer.SteSlicerApplication
 from steslicer.Machines.QualityManager import getMachineDefinitionIDForQualitySearch
@@ -42,6 +44,10 @@ class SteSlicerContainerRegistry(ContainerRegistry):
         # is added, we check to see if an extruder stack needs to be added.
         self.containerAdded.connect(self._onContainerAdded)
 
+        self._definition_cache = None  # type: Optional[DefinitionCache]
+        self._cached_definition_ids = set()  # type: Set[str] # Definitions that were taken from the cache.
+        self.containerLoadComplete.connect(self._onContainerLoadComplete)
+
     ##  Overridden from ContainerRegistry
     #
     #   Adds a container to the registry.
@@ -319,6 +325,53 @@ class SteSlicerContainerRegistry(ContainerRegistry):
         # If it hasn't returned by now, none of the plugins loaded the profile successfully.
         return {"status": "error", "message": catalog.i18nc("@info:status", "Profile {0} has an unknown file type or is corrupted.", file_name)}
 
+    ##  Overridden from ContainerRegistry
+    #
+    #   After the metadata is loaded, the definitions that are in the definition
+    #   cache are added at once, so they don't need to be loaded from their files
+    #   when they are looked up.
+    @override(ContainerRegistry)
+    def loadAllMetadata(self) -> None:
+        super().loadAllMetadata()
+        self._addCachedDefinitions()
+
+    ##  Start using a cache of loaded definitions, stored in the given file.
+    #
+    #   This needs to be called after all setting properties are registered,
+    #   because they are part of the cache key.
+    def setDefinitionCacheFile(self, cache_file: str, application_version: str, setting_version: int) -> None:
+        key = DefinitionCache.makeKey(application_version, setting_version, DefinitionContainer.Version)
+        self._definition_cache = DefinitionCache(cache_file, key)
+
+    ##  Write the loaded definitions to the definition cache, so they load
+    #   faster on the next start.
+    def saveDefinitionCache(self) -> None:
+        if self._definition_cache is not None:
+            self._definition_cache.save()
+
+    def _addCachedDefinitions(self) -> None:
+        if self._definition_cache is None:
+            return
+        for definition_id in self._definition_cache.getDefinitionIds():
+            # Only definitions that are still provided, and not loaded yet.
+            if definition_id not in self.metadata or self.isLoaded(definition_id):
+                continue
+            definition = self._definition_cache.get(definition_id)
+            if definition is None:
+                continue
+            self._cached_definition_ids.add(definition_id)
+            self.addContainer(definition)
+            self.containerLoadComplete.emit(definition_id)
+
+    def _onContainerLoadComplete(self, container_id: str) -> None:
+        if self._definition_cache is None or container_id in self._cached_definition_ids:
+            return
+        containers = self.findContainers(id = container_id)
+        if not containers or not isinstance(containers[0], DefinitionContainer) or not containers[0].getPath():
+            return
+        definition = containers[0]
+        self._definition_cache.put(container_id, definition, [definition.getPath()] + definition.getInheritedFiles())
+
     @override(ContainerRegistry)
     def load(self):
         super().load()
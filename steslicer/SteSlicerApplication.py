@@ -50,6 +50,8 @@ from steslicer.Arranging.ArrangeObjectsJob import ArrangeObjectsJob
 from steslicer.Arranging.ArrangeObjectsAllBuildPlatesJob import ArrangeObjectsAllBuildPlatesJob
 from steslicer.Arranging.ShapeArray import ShapeArray
 from steslicer.MultiplyObjectsJob import MultiplyObjectsJob
+from steslicer.PluginLoadProfiler import PluginLoadProfiler
+from steslicer.Utils.Tracer import Tracer
 from steslicer.Scene.ConvexHullDecorator import ConvexHullDecorator
 from steslicer.Operations.SetParentOperation import SetParentOperation
 from steslicer.Scene.SliceableObjectDecorator import SliceableObjectDecorator
@@ -179,6 +181,12 @@ class SteSlicerApplication(QtApplication):
         # Variables set from CLI
         self._files_to_open = []
         self._use_single_instance = False
+        self._batch_file = None  # type: Optional[str]
+        self._batch_report_file = None  # type: Optional[str]
+        self._batch_slicer = None
+        self._slicing_worker_address = None  # type: Optional[str]
+        self._slicing_worker = None
+        self._trace_file = None  # type: Optional[str]
         self._trigger_early_crash = False  # For debug only
 
         self._single_instance = None
@@ -247,6 +255,7 @@ class SteSlicerApplication(QtApplication):
         self._sidebar_custom_menu_items = []  # type: list # Keeps list of custom menu items for the side bar
 
         self._plugins_loaded = False
+        self._plugin_load_profiler = None  # type: Optional[PluginLoadProfiler]
 
         # Backups
         self._auto_save = None
@@ -278,6 +287,28 @@ class SteSlicerApplication(QtApplication):
                                       action = "store_true",
                                       default = False,
                                       help = "FOR TESTING ONLY. Trigger an early crash to show the crash dialog.")
+        # Batch slicing: slice the jobs in a JSON file without GUI and quit. See BatchSlicing.loadBatchJobs.
+        self._cli_parser.add_argument("--batch",
+                                      dest = "batch_file",
+                                      default = None,
+                                      help = "Slice the jobs in the given JSON file without GUI and exit.")
+        self._cli_parser.add_argument("--batch-report",
+                                      dest = "batch_report",
+                                      default = None,
+                                      help = "Write the result and timings of the batch jobs to this JSON file.")
+        self._cli_parser.add_argument("--batch-workers",
+                                      dest = "batch_workers",
+                                      type = int,
+                                      default = 1,
+                                      help = "Number of STE Slicer processes that slice the batch jobs in parallel.")
+        self._cli_parser.add_argument("--slicing-worker",
+                                      dest = "slicing_worker",
+                                      default = None,
+                                      help = "Slice jobs from the slicing job server at the given address without GUI.")
+        self._cli_parser.add_argument("--trace",
+                                      dest = "trace_file",
+                                      default = None,
+                                      help = "Trace the stages of slicing and write them as a Chrome trace to this JSON file on exit.")
         self._cli_parser.add_argument("file", nargs = "*", help = "Files to load after starting the application.")
 
     def getContainerRegistry(self) -> "SteSlicerContainerRegistry":
@@ -291,6 +322,15 @@ class SteSlicerApplication(QtApplication):
             sys.exit(0)
 
         self._use_single_instance = self._cli_args.single_instance
+        self._batch_file = self._cli_args.batch_file
+        self._batch_report_file = self._cli_args.batch_report
+        self._slicing_worker_address = self._cli_args.slicing_worker
+        if self._batch_file or self._slicing_worker_address:
+            self._is_headless = True
+            self._use_single_instance = False
+        self._trace_file = self._cli_args.trace_file
+        if self._trace_file:
+            Tracer.getInstance().setEnabled(True)
         self._trigger_early_crash = self._cli_args.trigger_early_crash
         for filename in self._cli_args.file:
             self._files_to_open.append(os.path.abspath(filename))
@@ -480,6 +520,8 @@ class SteSlicerApplication(QtApplication):
 
         self.showSplashMessage(self._i18n_catalog.i18nc("@info:progress", "Loading machines..."))
 
+        self._container_registry.setDefinitionCacheFile(os.path.join(Resources.getCacheStoragePath(), "definitions.cache"),
+                                                        self.getVersion(), self.SettingVersion)
         with self._container_registry.lockFile():
             self._container_registry.loadAllMetadata()
 
@@ -655,6 +697,7 @@ class SteSlicerApplication(QtApplication):
             # Do not do saving during application start or when data should not be saved on quit.
             return
         ContainerRegistry.getInstance().saveDirtyContainers()
+        self._container_registry.saveDefinitionCache()
         self.savePreferences()
 
     def saveStack(self, stack):
@@ -681,12 +724,17 @@ class SteSlicerApplication(QtApplication):
             lib_suffixes = {""}
         for suffix in lib_suffixes:
             self._plugin_registry.addPluginLocation(os.path.join(QtApplication.getInstallPrefix(), "lib" + suffix, "steslicer"))
-        if not hasattr(sys, "frozen"):
-            self._plugin_registry.addPluginLocation(os.path.join(os.path.abspath(os.path.dirname(__file__)), "..", "plugins"))
-            self._plugin_registry.loadPlugin("ConsoleLogger")
-            self._plugin_registry.loadPlugin("CuraEngineBackend")
+        self._plugin_load_profiler = PluginLoadProfiler(self._plugin_registry)
+        self._plugin_load_profiler.start()
+        try:
+            if not hasattr(sys, "frozen"):
+                self._plugin_registry.addPluginLocation(os.path.join(os.path.abspath(os.path.dirname(__file__)), "..", "plugins"))
+                self._plugin_registry.loadPlugin("ConsoleLogger")
+                self._plugin_registry.loadPlugin("CuraEngineBackend")
 
-        self._plugin_registry.loadPlugins()
+            self._plugin_registry.loadPlugins()
+        finally:
+            self._plugin_load_profiler.stop()
 
         if self.getBackend() is None:
             raise RuntimeError("Could not load the backend plugin!")
@@ -746,6 +794,10 @@ class SteSlicerApplication(QtApplication):
 
         self.started = True
         self.initializationFinished.emit()
+        # The definitions of the active machine are loaded by now.
+        self._container_registry.saveDefinitionCache()
+        if self._plugin_load_profiler is not None:
+            self._plugin_load_profiler.logReport()
         Logger.log("d", "Booting STE Slicer took %s seconds", time.time() - self._boot_loading_time)
 
         # For now use a timer to postpone some things that need to be done after the application and GUI are
@@ -762,6 +814,9 @@ class SteSlicerApplication(QtApplication):
 
         self.exec_()
 
+        if self._trace_file:
+            Tracer.getInstance().saveChromeTrace(self._trace_file)
+
     def __setUpSingleInstanceServer(self):
         if self._use_single_instance:
             self._single_instance.startServer()
@@ -777,6 +832,31 @@ class SteSlicerApplication(QtApplication):
     ##  Run STE Slicer without GUI elements and interaction (server mode).
     def runWithoutGUI(self):
         self.closeSplash()
+        if self._batch_file:
+            self.__startBatchSlicing()
+        elif self._slicing_worker_address:
+            from steslicer.BatchSlicing.SlicingWorker import SlicingWorker
+            # Jobs change the active machine and settings, that shouldn't end up in the configuration.
+            self.setSaveDataEnabled(False)
+            self._slicing_worker = SlicingWorker(self, self._slicing_worker_address, parent = self)
+            self._slicing_worker.start()
+
+    def __startBatchSlicing(self) -> None:
+        from steslicer.BatchSlicing.BatchSlicer import BatchSlicer
+        from steslicer.BatchSlicing.BatchSlicingPool import loadBatchJobs
+        try:
+            jobs = loadBatchJobs(self._batch_file)
+        except (EnvironmentError, ValueError) as e:
+            Logger.log("e", "Could not read batch file %s: %s", self._batch_file, e)
+            self.callLater(self.exit, 2)
+            return
+
+        # The batch jobs change the active machine and settings, that shouldn't end up in the configuration.
+        self.setSaveDataEnabled(False)
+        self._batch_slicer = BatchSlicer(self, jobs, self._batch_report_file,
+                                         finished_callback = lambda results: self.exit(0 if all(result["status"] == "succeeded" for result in results) else 1),
+                                         parent = self)
+        self._batch_slicer.start()
 
     ##  Run STE Slicer with GUI (desktop mode).
     def runWithGUI(self):
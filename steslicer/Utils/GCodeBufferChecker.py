@@ -0,0 +1,300 @@
+import argparse
+import re
+import sys
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+import numpy
+
+from steslicer.Utils.PrintTimeEstimator import PrintTimeEstimator
+
+DEFAULT_BUFFER_FILLING_RATE_IN_C_PER_S = 50.0  # The buffer filling rate in #commands/s
+DEFAULT_BUFFER_SIZE = 15  # The buffer size in #commands
+
+# Setting values for Ultimaker S5, used when no estimator for a specific machine is given.
+MACHINE_MAX_FEEDRATE_X = 300
+MACHINE_MAX_FEEDRATE_Y = 300
+MACHINE_MAX_FEEDRATE_Z = 40
+MACHINE_MAX_FEEDRATE_E = 45
+MACHINE_MAX_ACCELERATION_X = 9000
+MACHINE_MAX_ACCELERATION_Y = 9000
+MACHINE_MAX_ACCELERATION_Z = 100
+MACHINE_MAX_ACCELERATION_E = 10000
+MACHINE_MAX_JERK_XY = 20
+MACHINE_MAX_JERK_Z = 0.4
+MACHINE_MAX_JERK_E = 5
+MACHINE_MINIMUM_FEEDRATE = 0.001
+MACHINE_ACCELERATION = 3000
+
+# G10 and G11 behave as if it's a retraction of 25mm.
+FIRMWARE_RETRACTION_LENGTH = 25.0
+
+# The parameters that are kept for each command, in column order.
+PARAMETER_LETTERS = "XYZEACFPS"
+_column = {letter: index for index, letter in enumerate(PARAMETER_LETTERS)}
+
+_command_regex = re.compile(r"\s*([GMTgmt])(\d+)([^;]*)")
+_parameter_regex = re.compile(r"([A-Za-z])\s*([-+]?(?:\d+\.?\d*|\.\d+))")
+
+##  The commands of a g-code file as arrays, one row per command line.
+ParsedGCode = NamedTuple("ParsedGCode", [
+    ("line_numbers", numpy.ndarray),  # Index of the line in the file.
+    ("codes", numpy.ndarray),  # Command letter: "G", "M" or "T".
+    ("numbers", numpy.ndarray),  # Command number.
+    ("parameters", numpy.ndarray)  # (N, len(PARAMETER_LETTERS)) array of values, NaN where not given.
+])
+
+
+##  Parses g-code lines into arrays.
+#
+#   Comments and empty lines are skipped. Only the parameters in
+#   PARAMETER_LETTERS are kept.
+def parseGCode(lines: Iterable[str]) -> ParsedGCode:
+    line_numbers = []  # type: List[int]
+    codes = []  # type: List[str]
+    numbers = []  # type: List[int]
+    parameters = []  # type: List[List[float]]
+    empty_row = [numpy.nan] * len(PARAMETER_LETTERS)
+    for line_number, line in enumerate(lines):
+        match = _command_regex.match(line)
+        if match is None:
+            continue
+        code, number, arguments = match.groups()
+        row = empty_row.copy()
+        for letter, value in _parameter_regex.findall(arguments):
+            column = _column.get(letter.upper())
+            if column is not None:
+                row[column] = float(value)
+        line_numbers.append(line_number)
+        codes.append(code.upper())
+        numbers.append(int(number))
+        parameters.append(row)
+
+    return ParsedGCode(
+        numpy.array(line_numbers, dtype = numpy.int64),
+        numpy.array(codes, dtype = "<U1"),
+        numpy.array(numbers, dtype = numpy.int64),
+        numpy.array(parameters, dtype = numpy.float64).reshape(-1, len(PARAMETER_LETTERS))
+    )
+
+
+##  Propagates the last event value forward over all following rows.
+def _fillForward(events: numpy.ndarray, values: numpy.ndarray, initial: float) -> numpy.ndarray:
+    last_event = numpy.maximum.accumulate(numpy.where(events, numpy.arange(len(events)), -1))
+    return numpy.where(last_event >= 0, values[numpy.maximum(last_event, 0)], initial)
+
+
+##  Computes the position of an axis after every row.
+#
+#   Rows that set the position absolutely (absolute moves and G92) restart the
+#   running sum of relative moves.
+def _axisPositions(absolute: numpy.ndarray, relative: numpy.ndarray, values: numpy.ndarray) -> numpy.ndarray:
+    relative_sum = numpy.cumsum(numpy.where(relative, values, 0.0))
+    last_absolute = numpy.maximum.accumulate(numpy.where(absolute, numpy.arange(len(values)), -1))
+    safe_index = numpy.maximum(last_absolute, 0)
+    base = numpy.where(last_absolute >= 0, values[safe_index] - relative_sum[safe_index], 0.0)
+    return base + relative_sum
+
+
+##  Creates an estimator with the limits the buffer checker always simulated,
+#   those of the Ultimaker S5.
+def createDefaultEstimator() -> PrintTimeEstimator:
+    return PrintTimeEstimator(
+        max_feedrate_xyz = (MACHINE_MAX_FEEDRATE_X, MACHINE_MAX_FEEDRATE_Y, MACHINE_MAX_FEEDRATE_Z),
+        max_feedrate_e = MACHINE_MAX_FEEDRATE_E,
+        max_acceleration_xyz = (MACHINE_MAX_ACCELERATION_X, MACHINE_MAX_ACCELERATION_Y, MACHINE_MAX_ACCELERATION_Z),
+        max_acceleration_e = MACHINE_MAX_ACCELERATION_E,
+        acceleration = MACHINE_ACCELERATION,
+        max_jerk_xy = MACHINE_MAX_JERK_XY,
+        max_jerk_z = MACHINE_MAX_JERK_Z,
+        max_jerk_e = MACHINE_MAX_JERK_E,
+        minimum_feedrate = MACHINE_MINIMUM_FEEDRATE)
+
+
+##  Checks whether a g-code file sends commands faster than the printer's
+#   command buffer can be filled.
+#
+#   The execution time of every command is estimated with a PrintTimeEstimator.
+#   A potential buffer underrun is reported wherever more than buffer_size
+#   commands execute within the time it takes to transfer buffer_size commands.
+#
+#   Limits set with M203, M204 and M205 are taken from their first occurrence,
+#   as firmware normally sets them once in the start g-code.
+class GCodeBufferChecker:
+    def __init__(self, estimator: Optional[PrintTimeEstimator] = None,
+                 buffer_filling_rate: float = DEFAULT_BUFFER_FILLING_RATE_IN_C_PER_S,
+                 buffer_size: int = DEFAULT_BUFFER_SIZE) -> None:
+        self._estimator = estimator if estimator is not None else createDefaultEstimator()
+        self._buffer_filling_rate = buffer_filling_rate  # type: float
+        self._buffer_size = buffer_size  # type: int
+
+        # If the buffer depletes in more than this amount of time, it can be filled up in time.
+        self._detection_time_frame = self._buffer_size / self._buffer_filling_rate  # type: float
+
+        self._parsed = None  # type: Optional[ParsedGCode]
+        self._command_times = numpy.zeros(0, dtype = numpy.float64)
+        self._bad_frame_ranges = []  # type: List[Dict[str, Any]]
+
+    def getTotalTime(self) -> float:
+        return float(self._command_times.sum())
+
+    ##  The estimated execution time of every command, in seconds.
+    def getCommandTimes(self) -> numpy.ndarray:
+        return self._command_times
+
+    def getBadFrameRanges(self) -> List[Dict[str, Any]]:
+        return self._bad_frame_ranges
+
+    def hasBufferUnderruns(self) -> bool:
+        return len(self._bad_frame_ranges) > 0
+
+    ##  Parses, times and checks the given g-code lines.
+    def process(self, lines: Iterable[str]) -> None:
+        self._parsed = parseGCode(lines)
+        self._applyFirmwareLimits(self._parsed)
+        self._command_times = self._estimateCommandTimes(self._parsed)
+        self._bad_frame_ranges = self._findBadFrames(self._parsed.line_numbers, self._command_times)
+
+    def _applyFirmwareLimits(self, parsed: ParsedGCode) -> None:
+        limits = {}  # type: Dict[str, float]
+        for number, key, letter in ((203, "max_feedrate_z", "Z"), (204, "acceleration", "S"),
+                                    (205, "max_jerk_xy", "X"), (205, "max_jerk_z", "Z"), (205, "max_jerk_e", "E")):
+            values = parsed.parameters[(parsed.codes == "M") & (parsed.numbers == number), _column[letter]]
+            values = values[numpy.logical_not(numpy.isnan(values))]
+            if len(values) > 0:
+                limits[key] = float(values[0])
+        if limits:
+            self._estimator.updateLimits(**limits)
+
+    def _estimateCommandTimes(self, parsed: ParsedGCode) -> numpy.ndarray:
+        codes, numbers, parameters = parsed.codes, parsed.numbers, parsed.parameters
+        times = numpy.zeros(len(codes), dtype = numpy.float64)
+        if len(codes) == 0:
+            return times
+
+        is_g = codes == "G"
+        is_move = is_g & ((numbers == 0) | (numbers == 1))
+        is_retract = is_g & (numbers == 10)
+        is_unretract = is_g & (numbers == 11)
+        is_set_position = is_g & (numbers == 92)
+
+        relative_positioning = _fillForward(is_g & ((numbers == 90) | (numbers == 91)), (numbers == 91).astype(numpy.float64), 0.0) > 0
+        extrusion_mode_change = (is_g & ((numbers == 90) | (numbers == 91))) | ((codes == "M") & ((numbers == 82) | (numbers == 83)))
+        relative_extrusion = _fillForward(extrusion_mode_change, ((numbers == 91) | (numbers == 83)).astype(numpy.float64), 0.0) > 0
+
+        deltas = numpy.zeros((len(codes), 6), dtype = numpy.float64)
+        for axis, letter in enumerate("XYZACE"):
+            values = parameters[:, _column[letter]]
+            specified = numpy.logical_not(numpy.isnan(values))
+            relative_mode = relative_extrusion if letter == "E" else relative_positioning
+            absolute = specified & ((is_move & numpy.logical_not(relative_mode)) | is_set_position)
+            relative = specified & is_move & relative_mode
+            if letter == "E":
+                values = numpy.where(is_retract, -FIRMWARE_RETRACTION_LENGTH, numpy.where(is_unretract, FIRMWARE_RETRACTION_LENGTH, values))
+                relative = relative | is_retract | is_unretract
+            positions = _axisPositions(absolute, relative, numpy.nan_to_num(values))
+            axis_deltas = numpy.diff(positions, prepend = 0.0)
+            # Setting the position doesn't move the machine.
+            axis_deltas[is_set_position] = 0.0
+            deltas[:, axis] = axis_deltas
+
+        feedrate_given = is_move & numpy.logical_not(numpy.isnan(parameters[:, _column["F"]]))
+        feedrates = _fillForward(feedrate_given, numpy.nan_to_num(parameters[:, _column["F"]]), 0.0) / 60.0
+
+        motion = is_move | is_retract | is_unretract
+        motion_rows = numpy.nonzero(motion)[0]
+        if len(motion_rows) > 0:
+            # Chain the moves from their deltas, so that G92 doesn't break up the path.
+            chained = numpy.zeros((len(motion_rows) + 1, 5), dtype = numpy.float64)
+            numpy.cumsum(deltas[motion_rows, :5], axis = 0, out = chained[1:])
+            times[motion_rows] = self._estimator.estimateSegmentTimes(chained[:, :3], feedrates[motion_rows],
+                                                                      deltas[motion_rows, 5], chained[:, 3:5])
+
+        # G4: Dwell, P is in milliseconds and S in seconds.
+        is_dwell = is_g & (numbers == 4)
+        dwell_ms = numpy.nan_to_num(parameters[:, _column["P"]]) / 1000.0
+        dwell_s = numpy.nan_to_num(parameters[:, _column["S"]])
+        times[is_dwell] = numpy.maximum(dwell_ms, dwell_s)[is_dwell]
+        return times
+
+    def _findBadFrames(self, line_numbers: numpy.ndarray, times: numpy.ndarray) -> List[Dict[str, Any]]:
+        if len(times) == 0:
+            return []
+        cumulative = numpy.zeros(len(times) + 1, dtype = numpy.float64)
+        numpy.cumsum(times, out = cumulative[1:])
+        ends = numpy.arange(len(times))
+        # First command of the window of commands that run within the detection time frame.
+        starts = numpy.searchsorted(cumulative, cumulative[1:] - self._detection_time_frame, side = "left")
+        starts = numpy.minimum(starts, ends)
+        counts = ends - starts + 1
+        bad = numpy.nonzero(counts > self._buffer_size)[0]
+        if len(bad) == 0:
+            return []
+
+        # Merge overlapping windows into ranges.
+        new_range = numpy.ones(len(bad), dtype = bool)
+        new_range[1:] = starts[bad[1:]] > bad[:-1]
+        group_starts = numpy.nonzero(new_range)[0]
+        range_starts = starts[bad][group_starts]
+        range_ends = numpy.maximum.reduceat(bad, group_starts)
+        range_counts = range_ends - range_starts + 1
+        range_times = cumulative[range_ends + 1] - cumulative[range_starts]
+        return [{"start_line": int(line_numbers[start]),
+                 "end_line": int(line_numbers[end]),
+                 "cmd_count": int(count),
+                 "time": float(time)}
+                for start, end, count, time in zip(range_starts, range_ends, range_counts, range_times)]
+
+    ##  Writes the g-code with the estimated execution time of every command.
+    def writeAnnotated(self, lines: List[str], file_name: str) -> None:
+        annotations = {}  # type: Dict[int, float]
+        if self._parsed is not None:
+            annotations = dict(zip(self._parsed.line_numbers.tolist(), self._command_times.tolist()))
+        with open(file_name, "w", encoding = "utf-8") as f:
+            for line_number, line in enumerate(lines):
+                if line_number in annotations:
+                    f.write("%s ; --- t=%s\n" % (line.strip(), annotations[line_number]))
+                else:
+                    f.write(line if line.endswith("\n") else line + "\n")
+            f.write(";---TOTAL ESTIMATED TIME:" + str(self.getTotalTime()))
+
+    def getReport(self) -> List[str]:
+        report = []
+        for item in self._bad_frame_ranges:
+            report.append("Potential buffer underrun from line {start_line} to {end_line}, code count = {code_count}, in {time}s ({speed} cmd/s)".format(
+                start_line = item["start_line"],
+                end_line = item["end_line"],
+                code_count = item["cmd_count"],
+                time = round(item["time"], 4),
+                speed = round(item["cmd_count"] / item["time"], 2) if item["time"] > 0 else float("inf")))
+        report.append("Total predicted number of buffer underruns: %s" % len(self._bad_frame_ranges))
+        return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description = "Predicts buffer underruns in a g-code file.")
+    parser.add_argument("input", help = "The g-code file to check.")
+    parser.add_argument("output", nargs = "?", default = None, help = "Write the g-code annotated with estimated command times to this file.")
+    parser.add_argument("--buffer-size", type = int, default = DEFAULT_BUFFER_SIZE, help = "The buffer size in commands.")
+    parser.add_argument("--filling-rate", type = float, default = DEFAULT_BUFFER_FILLING_RATE_IN_C_PER_S, help = "The buffer filling rate in commands per second.")
+    arguments = parser.parse_args(argv)
+
+    with open(arguments.input, "r", encoding = "utf-8") as f:
+        all_lines = f.readlines()
+
+    print("Command speed: %s" % arguments.filling_rate)
+    print("Code Limit: %s" % arguments.buffer_size)
+
+    checker = GCodeBufferChecker(buffer_filling_rate = arguments.filling_rate, buffer_size = arguments.buffer_size)
+    checker.process(all_lines)
+
+    # Output annotated gcode is optional
+    if arguments.output is not None:
+        checker.writeAnnotated(all_lines, arguments.output)
+
+    for line in checker.getReport():
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
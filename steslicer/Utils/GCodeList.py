@@ -0,0 +1,122 @@
+from collections.abc import MutableSequence
+from typing import Dict, Iterator, List, Union
+
+_encoding = "utf-8"
+
+
+##  The g-code of a build plate, as the engine sends it.
+#
+#   The engine sends g-code in many small messages, one for every layer. They
+#   are kept as the raw bytes of the messages and only decoded to text when the
+#   g-code is read, for instance while it is written to a file, so the text of
+#   all layers doesn't need to be in memory at the same time. Messages that
+#   belong at the start, like the header and the prefix, are put in front
+#   without moving everything else.
+#
+#   This behaves like the list of strings that was used before: reading an
+#   item decodes it, assigned items are kept as strings.
+class GCodeList(MutableSequence):
+    def __init__(self, chunks = ()) -> None:
+        self._front = []  # type: List[Union[bytes, str]] # Put in front, the first chunk last.
+        self._back = list(chunks)  # type: List[Union[bytes, str]]
+
+    @staticmethod
+    def _decode(chunk: Union[bytes, str]) -> str:
+        if isinstance(chunk, (bytes, bytearray)):
+            return chunk.decode(_encoding, "replace")
+        return chunk
+
+    def _getChunks(self) -> List[Union[bytes, str]]:
+        return self._front[::-1] + self._back
+
+    def _setChunks(self, chunks: List[Union[bytes, str]]) -> None:
+        self._front = []
+        self._back = chunks
+
+    def _locate(self, index: int):
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("g-code index out of range")
+        front_length = len(self._front)
+        if index < front_length:
+            return self._front, front_length - 1 - index
+        return self._back, index - front_length
+
+    def __len__(self) -> int:
+        return len(self._front) + len(self._back)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._decode(chunk) for chunk in self._getChunks()[index]]
+        chunks, position = self._locate(index)
+        return self._decode(chunks[position])
+
+    def __setitem__(self, index, value) -> None:
+        if isinstance(index, slice):
+            chunks = self._getChunks()
+            chunks[index] = value
+            self._setChunks(chunks)
+            return
+        chunks, position = self._locate(index)
+        chunks[position] = value
+
+    def __delitem__(self, index) -> None:
+        if isinstance(index, slice):
+            chunks = self._getChunks()
+            del chunks[index]
+            self._setChunks(chunks)
+            return
+        chunks, position = self._locate(index)
+        del chunks[position]
+
+    ##  Iterates over the g-code, decoding one chunk at a time.
+    def __iter__(self) -> Iterator[str]:
+        for chunk in reversed(self._front):
+            yield self._decode(chunk)
+        for chunk in self._back:
+            yield self._decode(chunk)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (GCodeList, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return "GCodeList({0!r})".format(self._getChunks())
+
+    def insert(self, index: int, value: Union[bytes, str]) -> None:
+        if index == 0:
+            self._front.append(value)
+        elif index >= len(self):
+            self._back.append(value)
+        else:
+            chunks = self._getChunks()
+            chunks.insert(index, value)
+            self._setChunks(chunks)
+
+    def append(self, value: Union[bytes, str]) -> None:
+        self._back.append(value)
+
+    def extend(self, values) -> None:
+        self._back.extend(values)
+
+    ##  \return The size of the g-code, without decoding it. This is in bytes
+    #   for the chunks from the engine and in characters for the others.
+    def getSize(self) -> int:
+        return sum(len(chunk) for chunk in self._front) + sum(len(chunk) for chunk in self._back)
+
+    ##  Replaces placeholders like {print_time} in the g-code.
+    #
+    #   Only the chunks that contain a placeholder are decoded.
+    #   \param replacements The text to put in place of each placeholder.
+    def replaceTokens(self, replacements: Dict[str, str]) -> None:
+        for chunks in (self._front, self._back):
+            for position, chunk in enumerate(chunks):
+                if (b"{" if isinstance(chunk, (bytes, bytearray)) else "{") not in chunk:
+                    continue
+                text = self._decode(chunk)
+                for token, value in replacements.items():
+                    text = text.replace(token, value)
+                chunks[position] = text
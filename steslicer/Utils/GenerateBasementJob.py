@@ -19,6 +19,8 @@ from steslicer.LayerPolygon import LayerPolygon
 from steslicer.Settings.ExtruderManager import ExtruderManager
 from steslicer.Settings.ExtruderStack import ExtruderStack
 from steslicer.SteSlicerApplication import SteSlicerApplication
+from steslicer.Utils.PrintTimeEstimator import PrintTimeEstimator
+from steslicer.Utils.Tracer import Tracer
 
 catalog = i18nCatalog("steslicer")
 
@@ -105,6 +107,8 @@ class GenerateBasementJob(Job):
             "machine_c_axis_multiplier", "value") / self._global_stack.getProperty(
             "machine_c_axis_divider", "value")
 
+        self._time_estimator = PrintTimeEstimator.fromStack(self._global_stack)
+
     def abort(self):
         self._abort_requested = True
 
@@ -130,6 +134,10 @@ class GenerateBasementJob(Job):
         return self._times
 
     def run(self):
+        with Tracer.getInstance().span("basement", build_plate = self._build_plate_number):
+            self._generateBasement()
+
+    def _generateBasement(self):
         self._gcode_list = []
         self._material_amounts = [0.0, 0.0]
         self._times = {
@@ -411,14 +419,12 @@ class GenerateBasementJob(Job):
         return dVe / Af
 
     def _createPolygon(self, layer_number: int, path: List[List[Union[float, int]]]) -> bool:
-        countvalid = 0
-        for point in path:
-            if point[8] > 0:
-                countvalid += 1
-                if countvalid >= 2:
-                    # we know what to do now, no need to count further
-                    continue
-        if countvalid < 2:
+        if len(path) < 2:
+            return False
+        path_data = numpy.array([point[:7] for point in path], numpy.float64)
+        path_types = numpy.array([point[8] for point in path], numpy.int32)
+        self._estimatePathTimes(path_data, path_types)
+        if numpy.count_nonzero(path_types > 0) < 2:
             return False
         try:
             self._layer_data_builder.addLayer(layer_number)
@@ -430,30 +436,19 @@ class GenerateBasementJob(Job):
         except ValueError:
             return False
         count = len(path)
-        line_types = numpy.empty((count - 1, 1), numpy.int32)
-        line_widths = numpy.empty((count - 1, 1), numpy.float32)
-        line_thicknesses = numpy.empty((count - 1, 1), numpy.float32)
-        line_feedrates = numpy.empty((count - 1, 1), numpy.float32)
-        line_widths[:, 0] = self._raft_base_line_width
-        line_thicknesses[:, 0] = self._raft_base_thickness
+        line_types = path_types[1:].reshape(count - 1, 1)
+        is_travel = numpy.isin(line_types, [LayerPolygon.MoveCombingType, LayerPolygon.MoveRetractionType])
+        # Travels are set as zero thickness lines
+        line_widths = numpy.where(is_travel, 0.1, self._raft_base_line_width).astype(numpy.float32)
+        line_thicknesses = numpy.where(is_travel, 0.0, self._raft_base_thickness).astype(numpy.float32)
+        line_feedrates = path_data[1:, 6].reshape(count - 1, 1).astype(numpy.float32)
         points = numpy.empty((count, 6), numpy.float32)
-        extrusion_values = numpy.empty((count, 2), numpy.float32)
-        i = 0
-        for point in path:
-
-            points[i, :] = [point[0], point[2], -point[1],
-                            -point[4], point[5], -point[3]]
-            extrusion_values[i] = point[7]
-            if i > 0:
-                line_feedrates[i - 1] = point[6]
-                line_types[i - 1] = point[8]
-                if point[8] in [LayerPolygon.MoveCombingType, LayerPolygon.MoveRetractionType]:
-                    line_widths[i - 1] = 0.1
-                    # Travels are set as zero thickness lines
-                    line_thicknesses[i - 1] = 0.0
-                else:
-                    line_widths[i - 1] = self._raft_base_line_width
-            i += 1
+        points[:, 0] = path_data[:, 0]
+        points[:, 1] = path_data[:, 2]
+        points[:, 2] = -path_data[:, 1]
+        points[:, 3] = -path_data[:, 4]
+        points[:, 4] = path_data[:, 5]
+        points[:, 5] = -path_data[:, 3]
 
         this_poly = LayerPolygon(self._extruder_number, line_types,
                                  points, line_widths, line_thicknesses, line_feedrates)
@@ -462,31 +457,18 @@ class GenerateBasementJob(Job):
         this_layer.polygons.append(this_poly)
         return True
 
+    ##  Adds the estimated print time of a whole layer path to the time estimates.
+    def _estimatePathTimes(self, path_data: numpy.ndarray, path_types: numpy.ndarray) -> None:
+        line_types = path_types[1:]
+        # Retractions are stored as zero length moves, the filament moves the retraction amount.
+        stationary = numpy.all(numpy.diff(path_data[:, :3], axis = 0) == 0, axis = 1)
+        extrusions = numpy.where(stationary & (line_types == LayerPolygon.MoveRetractionType),
+                                 self._retraction_amount, 0.0)
+        rotary = PrintTimeEstimator.rotaryAnglesFromNormals(path_data[:, 3:6])
+        self._time_estimator.accumulateTimes(self._times, path_data[:, :3], path_data[1:, 6], line_types,
+                                             extrusions, rotary)
+
     def _addToPath(self, path: List[List[Union[float, int]]], addition: List[Union[float, int]]):
-        layer_type = addition[8]
-        layer_type_to_times_type = {
-            LayerPolygon.NoneType: "none",
-            LayerPolygon.Inset0Type: "inset_0",
-            LayerPolygon.InsetXType: "inset_x",
-            LayerPolygon.SkinType: "skin",
-            LayerPolygon.SupportType: "support",
-            LayerPolygon.SkirtType: "skirt",
-            LayerPolygon.InfillType: "infill",
-            LayerPolygon.SupportInfillType: "support_infill",
-            LayerPolygon.MoveCombingType: "travel",
-            LayerPolygon.MoveRetractionType: "retract",
-            LayerPolygon.SupportInterfaceType: "support_interface"
-        }
-        if len(path) > 0:
-            last_point = path[-1]
-        else:
-            last_point = addition
-        length = numpy.sqrt((last_point[0] - addition[0]) ** 2 + (last_point[1] - addition[1]) ** 2 + (
-                    last_point[2] - addition[2]) ** 2)
-        feedrate = addition[6]
-        if feedrate == 0:
-            feedrate = self._travel_speed
-        self._times[layer_type_to_times_type[layer_type]] += (length / feedrate) * 2
         path.append(addition)
 
     @staticmethod
@@ -0,0 +1,51 @@
+from typing import Tuple
+
+import numpy
+
+from UM.Mesh.MeshData import MeshData
+
+
+##  \return The vertex indices of the faces of mesh data. Mesh data without
+#   indices has every three vertices as a face.
+def getFaces(mesh_data: MeshData) -> numpy.ndarray:
+    if mesh_data.hasIndices():
+        return mesh_data.getIndices()
+    num_faces = mesh_data.getVertexCount() // 3
+    return numpy.arange(num_faces * 3, dtype = numpy.int32).reshape((num_faces, 3))
+
+
+##  Merges vertices at exactly the same position.
+#   \param vertices The vertices, for instance every corner of every face.
+#   \param faces The vertex indices of the faces.
+#   \return Every position once, and the faces as indices into those.
+def weldVertices(vertices: numpy.ndarray, faces: numpy.ndarray) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    unique_vertices, inverse = numpy.unique(vertices, axis = 0, return_inverse = True)
+    return unique_vertices, inverse.reshape(-1)[faces].astype(numpy.int32)
+
+
+##  Puts the mesh of a node into an object message for the engine.
+#
+#   Engines read the vertices of an object as three corners per face. An engine
+#   that reads the indices as well gets every vertex once with the faces as
+#   indices, which is about a third of the data for a typical mesh.
+#   \param obj The object message, with "vertices" and "indices" fields.
+#   \param vertices The transformed vertices of the mesh data.
+#   \param mesh_data The mesh data, for the faces.
+#   \param indexed Whether the engine reads the indices.
+def setObjectMesh(obj, vertices: numpy.ndarray, mesh_data: MeshData, indexed: bool = False) -> None:
+    if not indexed:
+        indices = mesh_data.getIndices()
+        if indices is not None:
+            obj.vertices = numpy.take(vertices, indices.flatten(), axis = 0)
+        else:
+            obj.vertices = numpy.array(vertices)
+        return
+
+    if mesh_data.hasIndices():
+        # Indexed mesh data already has every vertex once.
+        obj.vertices = numpy.ascontiguousarray(vertices, dtype = numpy.float32)
+        obj.indices = numpy.ascontiguousarray(mesh_data.getIndices(), dtype = numpy.int32)
+    else:
+        welded_vertices, indices = weldVertices(vertices, getFaces(mesh_data))
+        obj.vertices = numpy.ascontiguousarray(welded_vertices, dtype = numpy.float32)
+        obj.indices = indices
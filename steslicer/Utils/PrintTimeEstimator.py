@@ -0,0 +1,236 @@
+from typing import Dict, Optional
+
+import numpy
+
+from steslicer.LayerPolygon import LayerPolygon
+
+##  Minimal speed the planner assumes at the end of a path, same as in Marlin.
+MINIMUM_PLANNER_SPEED = 0.05
+
+##  Maps LayerPolygon line types to the feature names used by PrintInformation.
+LINE_TYPE_TO_FEATURE = {
+    LayerPolygon.NoneType: "none",
+    LayerPolygon.Inset0Type: "inset_0",
+    LayerPolygon.InsetXType: "inset_x",
+    LayerPolygon.SkinType: "skin",
+    LayerPolygon.SupportType: "support",
+    LayerPolygon.SkirtType: "skirt",
+    LayerPolygon.InfillType: "infill",
+    LayerPolygon.SupportInfillType: "support_infill",
+    LayerPolygon.MoveCombingType: "travel",
+    LayerPolygon.MoveRetractionType: "retract",
+    LayerPolygon.SupportInterfaceType: "support_interface"
+}
+
+
+##  Estimates the execution time of motion paths with a trapezoidal velocity
+#   profile.
+#
+#   This is the planner of scripts/check_gcode_buffer.py (acceleration limits
+#   per axis, jerk limited junction speeds and the reverse/forward planning
+#   passes) rewritten to work on whole arrays of points at once. The reverse and
+#   forward passes are recurrences of the form u[i] = min(J[i], u[i + 1] + w[i])
+#   on squared speeds, which are solved with a cumulative minimum over prefix
+#   sums instead of a Python loop.
+#
+#   Rotary A and C axes are taken into account as feedrate limits: a segment
+#   never finishes faster than its largest rotary delta allows.
+class PrintTimeEstimator:
+    def __init__(self,
+                 max_feedrate_xyz: tuple = (500.0, 500.0, 5.0),
+                 max_feedrate_e: float = 299792458000.0,
+                 max_feedrate_ac: tuple = (90.0, 360.0),
+                 max_acceleration_xyz: tuple = (9000.0, 9000.0, 100.0),
+                 max_acceleration_e: float = 10000.0,
+                 acceleration: float = 4000.0,
+                 max_jerk_xy: float = 20.0,
+                 max_jerk_z: float = 0.4,
+                 max_jerk_e: float = 5.0,
+                 minimum_feedrate: float = 0.0,
+                 default_feedrate: float = 150.0) -> None:
+        self._max_feedrates = numpy.array(list(max_feedrate_xyz) + [max_feedrate_e], dtype = numpy.float64)
+        self._max_rotary_feedrates = numpy.array(max_feedrate_ac, dtype = numpy.float64)
+        self._max_accelerations = numpy.array(list(max_acceleration_xyz) + [max_acceleration_e], dtype = numpy.float64)
+        self._acceleration = max(float(acceleration), 1.0)
+        self._max_jerk_xy = max_jerk_xy
+        self._max_jerk_z = max_jerk_z
+        self._max_jerk_e = max_jerk_e
+        self._minimum_feedrate = max(minimum_feedrate, 0.001)
+        self._default_feedrate = default_feedrate
+
+    ##  Creates an estimator using the machine settings of the given stack.
+    @classmethod
+    def fromStack(cls, stack) -> "PrintTimeEstimator":
+        def _get(key, default):
+            value = stack.getProperty(key, "value")
+            return default if value is None else float(value)
+
+        return cls(
+            max_feedrate_xyz = (_get("machine_max_feedrate_x", 500.0), _get("machine_max_feedrate_y", 500.0),
+                                _get("machine_max_feedrate_z", 5.0)),
+            max_feedrate_e = _get("machine_max_feedrate_e", 299792458000.0),
+            max_feedrate_ac = (_get("machine_max_feedrate_a", 90.0), _get("machine_max_feedrate_c", 360.0)),
+            max_acceleration_xyz = (_get("machine_max_acceleration_x", 9000.0),
+                                    _get("machine_max_acceleration_y", 9000.0),
+                                    _get("machine_max_acceleration_z", 100.0)),
+            max_acceleration_e = _get("machine_max_acceleration_e", 10000.0),
+            acceleration = _get("machine_acceleration", 4000.0),
+            max_jerk_xy = _get("machine_max_jerk_xy", 20.0),
+            max_jerk_z = _get("machine_max_jerk_z", 0.4),
+            max_jerk_e = _get("machine_max_jerk_e", 5.0),
+            minimum_feedrate = _get("machine_minimum_feedrate", 0.0),
+            default_feedrate = _get("speed_travel", 150.0)
+        )
+
+    ##  Overrides machine limits, for instance with values set by M203, M204 or
+    #   M205 commands in the g-code.
+    def updateLimits(self, acceleration: Optional[float] = None, max_feedrate_z: Optional[float] = None,
+                     max_jerk_xy: Optional[float] = None, max_jerk_z: Optional[float] = None,
+                     max_jerk_e: Optional[float] = None) -> None:
+        if acceleration is not None and acceleration > 0:
+            self._acceleration = float(acceleration)
+        if max_feedrate_z is not None and max_feedrate_z > 0:
+            self._max_feedrates[2] = max_feedrate_z
+        if max_jerk_xy is not None:
+            self._max_jerk_xy = max_jerk_xy
+        if max_jerk_z is not None:
+            self._max_jerk_z = max_jerk_z
+        if max_jerk_e is not None:
+            self._max_jerk_e = max_jerk_e
+
+    ##  Converts tool normals (i, j, k) to A and C axis angles in degrees.
+    #
+    #   The C angle is unwrapped so that going around a cylinder counts as
+    #   continuous rotation rather than a jump of 360 degrees.
+    @staticmethod
+    def rotaryAnglesFromNormals(normals: numpy.ndarray) -> numpy.ndarray:
+        normals = numpy.asarray(normals, dtype = numpy.float64)
+        a = numpy.degrees(numpy.arccos(numpy.clip(normals[:, 2], -1.0, 1.0)))
+        c = numpy.degrees(numpy.unwrap(numpy.arctan2(normals[:, 1], normals[:, 0])))
+        return numpy.column_stack((a, c))
+
+    ##  Estimates the time of every segment of a path.
+    #   \param points (N, 3) array with the positions of the path.
+    #   \param feedrates (N - 1) array with the feedrate of each segment in mm/s.
+    #   \param extrusions optional (N - 1) array with the filament length moved in each segment.
+    #   \param rotary optional (N, 2) array with A and C axis angles in degrees.
+    #   \return (N - 1) array with the time of each segment in seconds.
+    def estimateSegmentTimes(self, points: numpy.ndarray, feedrates: numpy.ndarray,
+                             extrusions: Optional[numpy.ndarray] = None,
+                             rotary: Optional[numpy.ndarray] = None) -> numpy.ndarray:
+        points = numpy.asarray(points, dtype = numpy.float64)
+        count = len(points) - 1
+        if count < 1:
+            return numpy.zeros(0, dtype = numpy.float64)
+
+        delta = numpy.zeros((count, 4), dtype = numpy.float64)
+        delta[:, :3] = numpy.diff(points[:, :3], axis = 0)
+        if extrusions is not None:
+            delta[:, 3] = extrusions
+        abs_delta = numpy.abs(delta)
+
+        distance = numpy.sqrt(numpy.einsum("ij,ij->i", delta[:, :3], delta[:, :3]))
+        distance = numpy.where(distance > 0, distance, abs_delta[:, 3])
+        moving = distance > 1e-9
+        safe_distance = numpy.where(moving, distance, 1.0)
+
+        nominal = numpy.asarray(feedrates, dtype = numpy.float64).reshape(-1)
+        nominal = numpy.where(nominal > 0, nominal, self._default_feedrate)
+        nominal = numpy.maximum(nominal, self._minimum_feedrate)
+
+        # Limit the nominal feedrate so that no axis exceeds its maximum speed.
+        axis_speed = abs_delta / safe_distance[:, None] * nominal[:, None]
+        with numpy.errstate(divide = "ignore"):
+            factor = numpy.min(numpy.where(axis_speed > 0, self._max_feedrates / axis_speed, numpy.inf), axis = 1)
+        rotary_delta = None
+        if rotary is not None:
+            rotary_delta = numpy.abs(numpy.diff(numpy.asarray(rotary, dtype = numpy.float64), axis = 0))
+            rotary_speed = rotary_delta / safe_distance[:, None] * nominal[:, None]
+            with numpy.errstate(divide = "ignore"):
+                rotary_factor = numpy.min(numpy.where(rotary_speed > 0, self._max_rotary_feedrates / rotary_speed, numpy.inf), axis = 1)
+            factor = numpy.minimum(factor, rotary_factor)
+        nominal = nominal * numpy.minimum(factor, 1.0)
+
+        # Limit the acceleration per axis.
+        acceleration = numpy.full(count, self._acceleration)
+        for axis in range(4):
+            limited = self._acceleration * abs_delta[:, axis] / safe_distance > self._max_accelerations[axis]
+            acceleration[limited] = self._max_accelerations[axis]
+
+        # Maximum junction speeds from the jerk settings.
+        velocity = delta / safe_distance[:, None] * nominal[:, None]
+        safe_speed = numpy.full(count, self._max_jerk_xy / 2)
+        safe_speed = numpy.where(numpy.abs(velocity[:, 2]) > self._max_jerk_z / 2, numpy.minimum(safe_speed, self._max_jerk_z), safe_speed)
+        safe_speed = numpy.where(numpy.abs(velocity[:, 3]) > self._max_jerk_e / 2, numpy.minimum(safe_speed, self._max_jerk_e), safe_speed)
+        safe_speed = numpy.minimum(safe_speed, nominal)
+
+        max_entry = safe_speed.copy()
+        if count > 1:
+            change = numpy.abs(velocity[1:] - velocity[:-1])
+            xy_jerk = numpy.sqrt(change[:, 0] ** 2 + change[:, 1] ** 2)
+            with numpy.errstate(divide = "ignore", invalid = "ignore"):
+                junction_factor = numpy.minimum.reduce([
+                    numpy.ones(count - 1),
+                    numpy.where(xy_jerk > self._max_jerk_xy, self._max_jerk_xy / xy_jerk, 1.0),
+                    numpy.where(change[:, 2] > self._max_jerk_z, self._max_jerk_z / change[:, 2], 1.0),
+                    numpy.where(change[:, 3] > self._max_jerk_e, self._max_jerk_e / change[:, 3], 1.0)
+                ])
+            max_entry[1:] = numpy.minimum(nominal[:-1], nominal[1:] * junction_factor)
+
+        # Segments that do not move the head (pure rotations) force a full stop around them.
+        stationary = numpy.logical_not(moving)
+        max_entry[stationary] = MINIMUM_PLANNER_SPEED
+        max_entry[1:][stationary[:-1]] = MINIMUM_PLANNER_SPEED
+
+        # Reverse and forward planner passes on squared speeds.
+        junction_limit = numpy.empty(count + 1, dtype = numpy.float64)
+        junction_limit[:-1] = max_entry ** 2
+        junction_limit[-1] = MINIMUM_PLANNER_SPEED ** 2
+        reach = 2 * acceleration * numpy.where(moving, distance, 0.0)
+        prefix = numpy.zeros(count + 1, dtype = numpy.float64)
+        numpy.cumsum(reach, out = prefix[1:])
+        squared = numpy.minimum.accumulate((junction_limit + prefix)[::-1])[::-1] - prefix
+        squared = numpy.minimum.accumulate(squared - prefix) + prefix
+        junction_speed = numpy.sqrt(numpy.maximum(squared, 0.0))
+
+        entry_speed = numpy.minimum(junction_speed[:-1], nominal)
+        exit_speed = numpy.minimum(junction_speed[1:], nominal)
+
+        # Trapezoid per segment.
+        accelerate_distance = (nominal ** 2 - entry_speed ** 2) / (2 * acceleration)
+        decelerate_distance = (nominal ** 2 - exit_speed ** 2) / (2 * acceleration)
+        plateau_distance = distance - accelerate_distance - decelerate_distance
+        no_plateau = plateau_distance < 0
+        intersection = (2 * acceleration * distance - entry_speed ** 2 + exit_speed ** 2) / (4 * acceleration)
+        accelerate_distance = numpy.where(no_plateau, numpy.clip(intersection, 0.0, distance), accelerate_distance)
+        plateau_distance = numpy.maximum(plateau_distance, 0.0)
+        peak_speed = numpy.where(no_plateau, numpy.sqrt(entry_speed ** 2 + 2 * acceleration * accelerate_distance), nominal)
+
+        times = (numpy.maximum(peak_speed - entry_speed, 0.0) + numpy.maximum(peak_speed - exit_speed, 0.0)) / acceleration
+        times += plateau_distance / nominal
+        times = numpy.where(moving, times, 0.0)
+
+        if rotary_delta is not None:
+            # Rotary motion can not be faster than the rotary axes allow.
+            rotary_time = numpy.max(rotary_delta / self._max_rotary_feedrates, axis = 1)
+            times = numpy.maximum(times, rotary_time)
+        return times
+
+    ##  Estimates the times of a path and adds them per feature type.
+    #   \param times_per_feature dict mapping feature names to seconds, updated in place.
+    #   \param line_types (N - 1) array with the LayerPolygon type of each segment.
+    #   \return The total time of the path in seconds.
+    def accumulateTimes(self, times_per_feature: Dict[str, float], points: numpy.ndarray, feedrates: numpy.ndarray,
+                        line_types: numpy.ndarray, extrusions: Optional[numpy.ndarray] = None,
+                        rotary: Optional[numpy.ndarray] = None) -> float:
+        times = self.estimateSegmentTimes(points, feedrates, extrusions, rotary)
+        if len(times) == 0:
+            return 0.0
+        line_types = numpy.asarray(line_types, dtype = numpy.int64).reshape(-1)
+        per_type = numpy.bincount(line_types, weights = times, minlength = len(LINE_TYPE_TO_FEATURE))
+        for line_type, feature_time in enumerate(per_type):
+            if feature_time == 0:
+                continue
+            feature = LINE_TYPE_TO_FEATURE.get(line_type, "none")
+            times_per_feature[feature] = times_per_feature.get(feature, 0) + float(feature_time)
+        return float(times.sum())
@@ -30,6 +30,7 @@ from steslicer.Scene.SteSlicerSceneNode import SteSlicerSceneNode
 from steslicer.OneAtATimeIterator import OneAtATimeIterator
 from steslicer.Settings.ExtruderManager import ExtruderManager
 from steslicer.GcodeStartEndFormatter import GcodeStartEndFormatter
+from steslicer.Utils.Tracer import Tracer
 
 NON_PRINTING_MESH_SETTINGS = ["anti_overhang_mesh", "infill_mesh", "cutting_mesh"]
 
@@ -63,8 +64,9 @@ class ProcessCliJob(Job):
         self._is_cancelled = value
 
     def run(self):
-        while self._process.poll() is None:
-            Job.yieldThread()
+        with Tracer.getInstance().span("engine", backend = "GlicerEngine", build_plate = self._build_plate_number):
+            while self._process.poll() is None:
+                Job.yieldThread()
 
         if self._build_plate_number is None:
             self.setResult(StartJobResult.Error)
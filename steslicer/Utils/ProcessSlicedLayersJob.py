@@ -22,6 +22,7 @@ from steslicer.Scene.SteSlicerSceneNode import SteSlicerSceneNode
 from steslicer.Settings.ExtruderManager import ExtruderManager
 from steslicer.Settings.ExtrudersModel import ExtrudersModel
 from steslicer.Utils.CliParser import CliParser
+from steslicer.Utils.Tracer import Tracer
 
 catalog = i18nCatalog("steslicer")
 
@@ -65,6 +66,10 @@ class ProcessSlicedLayersJob(Job):
         return self._build_plate_number
 
     def run(self):
+        with Tracer.getInstance().span("layer processing", build_plate = self._build_plate_number):
+            self._processLayers()
+
+    def _processLayers(self):
         Logger.log("d", "Processing new layer for build plate %s..." % self._build_plate_number)
         start_time = time()
         view = Application.getInstance().getController().getActiveView()
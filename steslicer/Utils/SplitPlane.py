@@ -146,12 +146,15 @@ def SplitByPlaneOneSide(mesh,
                 np.column_stack((vf, np.zeros(len(vf)))),
                 to_3D)
 
-            # check to see if our new faces are aligned with our normal
-            #check = windings_aligned(vf[ff], normal)
-#
-            ## if 50% of our new faces are aligned with the normal flip
-            #if check.astype(np.float64).mean() > 0.5:
-            #    ff = np.fliplr(ff)
+            # the kept part is on the positive side of the plane, so the cap
+            # has to face along the negative normal to close it. flip every
+            # face that doesn't, so the result is watertight and consistently
+            # wound without repairing it afterwards
+            triangles = vf[ff]
+            face_normals = np.cross(triangles[:, 1] - triangles[:, 0],
+                                    triangles[:, 2] - triangles[:, 0])
+            flip = np.dot(face_normals, normal) > 0
+            ff[flip] = ff[flip][:, ::-1]
 
             # add cap vertices and faces and reindex
             vertices, faces = util.append_faces([vertices, vf], [faces, ff])
@@ -0,0 +1,198 @@
+import hashlib
+import multiprocessing
+import os
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy
+import trimesh
+
+from UM.Logger import Logger
+from UM.Platform import Platform
+
+from steslicer.Utils.SplitPlane import SplitByPlaneOneSide
+
+# A splitting plane as (normal, origin).
+Plane = Tuple[Any, Any]
+
+
+##  Cuts off the part of a mesh on the positive side of a plane and caps it.
+#   Runs in the worker processes, so it takes and returns plain arrays.
+#   \return The vertices and faces of the part, or None if nothing is cut off.
+def _cutOff(vertices: numpy.ndarray, faces: numpy.ndarray, normal: numpy.ndarray, origin: numpy.ndarray) -> Optional[Tuple[numpy.ndarray, numpy.ndarray]]:
+    mesh = SplitByPlaneOneSide(trimesh.Trimesh(vertices = vertices, faces = faces, process = False), normal, origin, True)
+    if not mesh:
+        return None
+    return mesh.vertices, mesh.faces
+
+
+##  Splits a mesh by a chain of planes for discrete slicing, and remembers the
+#   pieces.
+#
+#   The mesh is repaired once, before the first cut. SplitByPlane caps every
+#   cut with faces that point away from the piece they close, so the pieces
+#   of a closed mesh are closed as well and aren't repaired again.
+#
+#   Every cut is cached by a key made of the mesh, its transformation and the
+#   planes up to and including that cut. Slicing an unchanged model with
+#   unchanged planes again skips all cuts, and changing only the last cut
+#   only repeats that one.
+#
+#   Every cut continues on the part that is left after the previous cut, but
+#   the parts that are cut off aren't cut any further. Those are cut off on a
+#   pool of processes, as trimesh holds the GIL, while the next cut is made on
+#   the part that is left. Splitting by many planes then takes about as long
+#   as making one side of every cut.
+class SplitTree:
+    MaxCachedCuts = 32
+    MaxWorkers = 4
+
+    __instance = None  # type: Optional[SplitTree]
+
+    ##  \param max_workers The number of processes to cut on. With 0 all cuts
+    #   are made in the calling thread, which is always the case in frozen
+    #   builds for other platforms than Windows.
+    def __init__(self, max_cached_cuts: int = MaxCachedCuts, max_workers: Optional[int] = None) -> None:
+        self._max_cached_cuts = max_cached_cuts
+        self._max_workers = max_workers if max_workers is not None else min(self.MaxWorkers, os.cpu_count() or 1)
+        if hasattr(sys, "frozen") and not Platform.isWindows():
+            # Spawned workers run the frozen executable, which multiprocessing.freeze_support() only turns into a
+            # worker on Windows. Elsewhere, every worker would start the application again.
+            self._max_workers = 0
+        self._executor = None  # type: Optional[ProcessPoolExecutor]
+        # Cut key -> (the piece that is split further, the piece that was cut off or None).
+        self._cuts = OrderedDict()  # type: OrderedDict
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @classmethod
+    def getInstance(cls) -> "SplitTree":
+        if cls.__instance is None:
+            cls.__instance = cls()
+        return cls.__instance
+
+    ##  Creates the key of a mesh in a certain place.
+    #   \param vertices The vertices of the mesh data of the node.
+    #   \param faces The vertex indices of the faces.
+    #   \param transformation The world transformation matrix of the node.
+    @staticmethod
+    def createMeshKey(vertices: numpy.ndarray, faces: numpy.ndarray, transformation: numpy.ndarray) -> bytes:
+        mesh_hash = hashlib.sha1()
+        for array in (vertices, faces, transformation):
+            array = numpy.ascontiguousarray(array)
+            mesh_hash.update(str((array.dtype, array.shape)).encode("utf-8"))
+            mesh_hash.update(array.tobytes())
+        return mesh_hash.digest()
+
+    ##  Splits a mesh by planes, from the last plane to the first.
+    #   \param mesh_key The key of the mesh, see createMeshKey.
+    #   \param create_mesh Creates the mesh in world coordinates, only called
+    #   if the pieces are not cached.
+    #   \param planes The splitting planes as (normal, origin).
+    #   \param overlap How far the pieces overlap.
+    #   \return The pieces that were cut off with the plane they were cut off
+    #   by, last plane first, followed by what is left with None for a plane.
+    #   The meshes are shared with the cache and must not be changed.
+    def split(self, mesh_key: bytes, create_mesh: Callable[[], trimesh.Trimesh], planes: List[Plane], overlap: float = 0) -> List[Tuple[trimesh.Trimesh, Optional[Plane]]]:
+        key = mesh_key
+        mesh = self._getCut(key)
+        mesh = mesh[0] if mesh is not None else None
+        if mesh is None:
+            mesh = self._repair(create_mesh())
+            self._addCut(key, (mesh, None))
+
+        # The cuts that weren't cached, with the key, the part that is left,
+        # the part that is cut off as it is cut off on the pool and what it is
+        # cut off with.
+        new_cuts = []  # type: List[Tuple[bytes, trimesh.Trimesh, Future, Tuple[Any, ...]]]
+        pieces = []  # type: List[Tuple[Any, Optional[Plane]]]
+        for plane in reversed(planes):
+            normal = numpy.asarray(plane[0], dtype = numpy.float64)
+            origin = numpy.asarray(plane[1], dtype = numpy.float64)
+            cut_hash = hashlib.sha1(key)
+            cut_hash.update(numpy.concatenate((normal, origin, [overlap])).tobytes())
+            key = cut_hash.digest()
+
+            cut = self._getCut(key)
+            if cut is not None:
+                mesh, cut_mesh = cut
+                if cut_mesh:
+                    pieces.append((cut_mesh, plane))
+                continue
+            cut_args = (mesh.vertices, mesh.faces, normal, origin - normal * overlap)
+            cut_future = self._submit(_cutOff, *cut_args)
+            mesh = SplitByPlaneOneSide(mesh, -normal, origin, True, None, True)
+            new_cuts.append((key, mesh, cut_future, cut_args))
+            pieces.append((cut_future, plane))
+
+        cut_meshes = {}  # type: Dict[Future, Optional[trimesh.Trimesh]]
+        for key, start_mesh, cut_future, cut_args in new_cuts:
+            try:
+                cut = cut_future.result()
+            except BrokenProcessPool:
+                Logger.logException("w", "The processes that cut meshes stopped, cutting without them from now on.")
+                self._max_workers = 0
+                cut = _cutOff(*cut_args)
+            cut_meshes[cut_future] = trimesh.Trimesh(vertices = cut[0], faces = cut[1], process = False) if cut is not None else None
+            self._addCut(key, (start_mesh, cut_meshes[cut_future]))
+
+        result = []  # type: List[Tuple[trimesh.Trimesh, Optional[Plane]]]
+        for piece, plane in pieces:
+            if isinstance(piece, Future):
+                piece = cut_meshes[piece]
+                if not piece:
+                    continue
+            result.append((piece, plane))
+        result.append((mesh, None))
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cuts.clear()
+
+    ##  \return How often a cut was found in the cache and how often not.
+    def getStatistics(self) -> Tuple[int, int]:
+        return self._hits, self._misses
+
+    def _getCut(self, key: bytes) -> Optional[Tuple[trimesh.Trimesh, Optional[trimesh.Trimesh]]]:
+        with self._lock:
+            cut = self._cuts.get(key)
+            if cut is None:
+                self._misses += 1
+                return None
+            self._cuts.move_to_end(key)
+            self._hits += 1
+            return cut
+
+    def _addCut(self, key: bytes, cut: Tuple[trimesh.Trimesh, Optional[trimesh.Trimesh]]) -> None:
+        with self._lock:
+            self._cuts[key] = cut
+            while len(self._cuts) > self._max_cached_cuts:
+                self._cuts.popitem(last = False)
+
+    ##  Runs a function on the pool, or right away without workers.
+    def _submit(self, function: Callable[..., Any], *args: Any) -> Future:
+        if self._max_workers > 0:
+            with self._lock:
+                if self._executor is None:
+                    # Spawn the workers, forking would copy the state of the threads of the application.
+                    self._executor = ProcessPoolExecutor(max_workers = self._max_workers,
+                                                         mp_context = multiprocessing.get_context("spawn"))
+            return self._executor.submit(function, *args)
+        future = Future()  # type: Future
+        future.set_result(function(*args))
+        return future
+
+    @staticmethod
+    def _repair(mesh: trimesh.Trimesh) -> trimesh.Trimesh:
+        mesh.fill_holes()
+        mesh.fix_normals()
+        mesh.remove_duplicate_faces()
+        if not mesh.is_watertight:
+            Logger.log("w", "Mesh is not closed after repairing it, the cuts of discrete slicing may not be capped.")
+        return mesh
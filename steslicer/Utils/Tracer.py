@@ -0,0 +1,162 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from UM.Logger import Logger
+
+
+##  A stage that is being traced. Use it as a context manager:
+#
+#       with Tracer.getInstance().span("layer processing", build_plate = 0):
+#           ...
+#
+#   or, when the stage starts and ends in different callbacks, call end() on
+#   the span that Tracer.startSpan() returned.
+class TraceSpan:
+    __slots__ = ("_tracer", "_name", "_category", "_args", "_start_time", "_thread_id")
+
+    def __init__(self, tracer: "Tracer", name: str, category: str, args: Dict[str, Any]) -> None:
+        self._tracer = tracer
+        self._name = name
+        self._category = category
+        self._args = args
+        self._start_time = None  # type: Optional[float]
+        self._thread_id = 0
+
+    def start(self) -> "TraceSpan":
+        self._thread_id = threading.get_ident()
+        self._tracer._registerThread(self._thread_id)
+        self._start_time = time.perf_counter()
+        return self
+
+    ##  Ends the span and records it. Ending a span twice records it once.
+    #   \param args Extra information to store with the span.
+    def end(self, **args: Any) -> None:
+        if self._start_time is None:
+            return
+        end_time = time.perf_counter()
+        self._args.update(args)
+        self._tracer._record(self._name, self._category, self._start_time, end_time, self._thread_id, self._args)
+        self._start_time = None
+
+    def __enter__(self) -> "TraceSpan":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is not None:
+            self._args["error"] = exc_type.__name__
+        self.end()
+
+
+##  The span that is handed out while tracing is disabled. It records nothing.
+class _DisabledSpan:
+    __slots__ = ()
+
+    def start(self) -> "_DisabledSpan":
+        return self
+
+    def end(self, **args: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_DisabledSpan":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        pass
+
+
+_disabled_span = _DisabledSpan()
+
+
+##  Records how long the stages of the slicing pipeline take.
+#
+#   Spans are kept in a ring buffer, so a long session only keeps the most
+#   recent ones. They can be saved as a Chrome trace (chrome://tracing or
+#   https://ui.perfetto.dev), where the spans of each thread are nested by time.
+#
+#   Tracing is disabled by default. While it is, span() and startSpan() return
+#   a shared span that does nothing, so instrumenting a stage costs no more
+#   than a method call.
+class Tracer:
+    DefaultCapacity = 100000  # Number of spans kept in the ring buffer.
+
+    __instance = None  # type: Optional[Tracer]
+
+    def __init__(self, capacity: int = DefaultCapacity) -> None:
+        self._enabled = False
+        self._events = deque(maxlen = capacity)  # type: Deque[Tuple[str, str, float, float, int, Dict[str, Any]]]
+        self._thread_names = {}  # type: Dict[int, str]
+        self._start_time = time.perf_counter()  # Timestamps in the trace are relative to this.
+
+    @classmethod
+    def getInstance(cls) -> "Tracer":
+        if cls.__instance is None:
+            cls.__instance = cls()
+        return cls.__instance
+
+    def isEnabled(self) -> bool:
+        return self._enabled
+
+    def setEnabled(self, enabled: bool) -> None:
+        self._enabled = enabled
+
+    ##  Creates a span to use as a context manager.
+    #   \param name The name of the stage.
+    #   \param category The category of the stage, for filtering in the viewer.
+    #   \param args Extra information to store with the span, like the build plate.
+    def span(self, name: str, category: str = "slicing", **args: Any):
+        if not self._enabled:
+            return _disabled_span
+        return TraceSpan(self, name, category, args)
+
+    ##  Creates and starts a span that has to be ended with end().
+    def startSpan(self, name: str, category: str = "slicing", **args: Any):
+        if not self._enabled:
+            return _disabled_span
+        return TraceSpan(self, name, category, args).start()
+
+    def clear(self) -> None:
+        self._events.clear()
+
+    ##  \return The recorded spans, oldest first, with their start time and
+    #   duration in seconds.
+    def getSpans(self) -> List[Dict[str, Any]]:
+        return [{"name": name, "category": category, "start": start_time - self._start_time, "duration": duration,
+                 "thread": thread_id, "args": args}
+                for name, category, start_time, duration, thread_id, args in list(self._events)]
+
+    ##  \return The recorded spans in the Chrome trace event format.
+    def toChromeTrace(self) -> Dict[str, Any]:
+        process_id = os.getpid()
+        trace_events = []  # type: List[Dict[str, Any]]
+        for thread_id, thread_name in list(self._thread_names.items()):
+            trace_events.append({"name": "thread_name", "ph": "M", "pid": process_id, "tid": thread_id,
+                                 "args": {"name": thread_name}})
+        for span in self.getSpans():
+            trace_events.append({
+                "name": span["name"],
+                "cat": span["category"],
+                "ph": "X",  # A complete event, with a duration.
+                "ts": span["start"] * 1000000,
+                "dur": span["duration"] * 1000000,
+                "pid": process_id,
+                "tid": span["thread"],
+                "args": span["args"]
+            })
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def saveChromeTrace(self, file_name: str) -> None:
+        with open(file_name, "w", encoding = "utf-8") as f:
+            json.dump(self.toChromeTrace(), f, default = str)
+        Logger.log("i", "Saved %s trace spans to %s", len(self._events), file_name)
+
+    def _registerThread(self, thread_id: int) -> None:
+        if thread_id not in self._thread_names:
+            self._thread_names[thread_id] = threading.current_thread().name
+
+    def _record(self, name: str, category: str, start_time: float, end_time: float, thread_id: int, args: Dict[str, Any]) -> None:
+        # Appending to a deque is thread safe, spans end on job threads as well.
+        self._events.append((name, category, start_time, end_time - start_time, thread_id, args))
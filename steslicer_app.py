@@ -2,11 +2,16 @@
 
 import argparse
 import faulthandler
+import multiprocessing
 import os
 import sys
 
 from UM.Platform import Platform
 
+# On Windows, worker processes, like those that cut meshes for discrete slicing, start from the frozen executable as
+# well. Frozen builds for other platforms don't use such worker processes.
+multiprocessing.freeze_support()
+
 parser = argparse.ArgumentParser(prog = "steslicer",
                                  add_help = False)
 parser.add_argument("--debug",
@@ -20,6 +25,26 @@ parser.add_argument("--trigger-early-crash",
                     default = False,
                     help = "FOR TESTING ONLY. Trigger an early crash to show the crash dialog."
                     )
+parser.add_argument("--batch",
+                    dest = "batch_file",
+                    default = None)
+parser.add_argument("--batch-report",
+                    dest = "batch_report",
+                    default = None)
+parser.add_argument("--batch-workers",
+                    dest = "batch_workers",
+                    type = int,
+                    default = 1)
+parser.add_argument("--slicing-server",
+                    dest = "slicing_server",
+                    type = int,
+                    nargs = "?",
+                    const = 8765,
+                    default = None)
+parser.add_argument("--slicing-workers",
+                    dest = "slicing_workers",
+                    type = int,
+                    default = 2)
 known_args = vars(parser.parse_known_args()[0])
 
 if not known_args["debug"]:
@@ -115,18 +140,33 @@ def exceptHook(hook_type, value, traceback):
         sys.exit(application.exec_())
 
 
-# Set exception hook to use the crash dialog handler
-sys.excepthook = exceptHook
-# Enable dumping traceback for all threads
-faulthandler.enable(all_threads = True)
-
-# Workaround for a race condition on certain systems where there
-# is a race condition between Arcus and PyQt. Importing Arcus
-# first seems to prevent Sip from going into a state where it
-# tries to create PyQt objects on a non-main thread.
-import Arcus #@UnusedImport
-import Savitar #@UnusedImport
-from steslicer.SteSlicerApplication import SteSlicerApplication
+# Worker processes import this file as well, only start the application when this file is run.
+if __name__ == "__main__":
+    # Several batch workers: this process only distributes the jobs over headless STE Slicer processes.
+    if known_args["batch_file"] and known_args["batch_workers"] > 1:
+        from steslicer.BatchSlicing.BatchSlicingPool import BatchSlicingPool
+        pool = BatchSlicingPool(known_args["batch_file"], known_args["batch_workers"], known_args["batch_report"],
+                                extra_arguments = ["--debug"] if known_args["debug"] else [])
+        sys.exit(pool.run())
+
+    # Run a slicing job server on the given port, with warm headless STE Slicer processes as workers.
+    if known_args["slicing_server"] is not None:
+        from steslicer.BatchSlicing.SlicingJobServer import SlicingJobServer
+        SlicingJobServer(known_args["slicing_server"], known_args["slicing_workers"]).serveForever()
+        sys.exit(0)
+
+    # Set exception hook to use the crash dialog handler
+    sys.excepthook = exceptHook
+    # Enable dumping traceback for all threads
+    faulthandler.enable(all_threads = True)
+
+    # Workaround for a race condition on certain systems where there
+    # is a race condition between Arcus and PyQt. Importing Arcus
+    # first seems to prevent Sip from going into a state where it
+    # tries to create PyQt objects on a non-main thread.
+    import Arcus #@UnusedImport
+    import Savitar #@UnusedImport
+    from steslicer.SteSlicerApplication import SteSlicerApplication
 
-app = SteSlicerApplication()
-app.run()
+    app = SteSlicerApplication()
+    app.run()
@@ -0,0 +1,59 @@
+import os
+
+from UM.Settings.DefinitionContainer import DefinitionContainer
+
+from steslicer.Settings.DefinitionCache import DefinitionCache
+
+
+def _writeFile(path, content):
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def test_roundTrip(tmpdir):
+    definition_file = str(tmpdir.join("machine.def.json"))
+    _writeFile(definition_file, "{}")
+    cache_file = str(tmpdir.join("cache", "definitions.cache"))
+
+    cache = DefinitionCache(cache_file, "key")
+    cache.put("machine", {"settings": [1, 2, 3]}, [definition_file])
+    cache.save()
+
+    assert DefinitionCache(cache_file, "key").get("machine") == {"settings": [1, 2, 3]}
+    assert DefinitionCache(cache_file, "other key").get("machine") is None  # A different key invalidates everything.
+
+
+def test_changedFileInvalidatesEntry(tmpdir):
+    definition_file = str(tmpdir.join("machine.def.json"))
+    _writeFile(definition_file, "{}")
+    cache_file = str(tmpdir.join("definitions.cache"))
+
+    cache = DefinitionCache(cache_file, "key")
+    cache.put("machine", "definition", [definition_file])
+    cache.save()
+
+    _writeFile(definition_file, "{\"changed\": true}")
+    assert DefinitionCache(cache_file, "key").get("machine") is None
+
+
+def test_registryAddsCachedDefinitions(container_registry, tmpdir):
+    definition_file = str(tmpdir.join("machine.def.json"))
+    _writeFile(definition_file, "{}")
+    cache_file = str(tmpdir.join("definitions.cache"))
+    definition = DefinitionContainer("machine")
+    cache = DefinitionCache(cache_file, DefinitionCache.makeKey("1.0", 1, DefinitionContainer.Version))
+    cache.put("machine", definition, [definition_file])
+    cache.put("removed_machine", DefinitionContainer("removed_machine"), [definition_file])  # No longer provided.
+    cache.save()
+
+    container_registry.metadata["machine"] = definition.getMetaData()
+    container_registry.setDefinitionCacheFile(cache_file, "1.0", 1)
+    added = []
+    container_registry.containerAdded.connect(added.append)
+    container_registry.loadAllMetadata()
+
+    assert [container.getId() for container in added] == ["machine"]
+    # Looking the definition up doesn't load it again.
+    assert [container.getId() for container in container_registry.findContainers(id = "machine")] == ["machine"]
+    assert len(added) == 1
+    assert not container_registry.findContainers(id = "removed_machine")
@@ -0,0 +1,79 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from steslicer.Settings.ExtruderManager import ExtruderManager
+
+
+@pytest.fixture
+def extruder_manager():
+    ExtruderManager._ExtruderManager__instance = None  # Need to reset since we only allow one instance.
+    application = MagicMock()
+    application.getGlobalContainerStack = MagicMock(return_value = None)
+    with patch("steslicer.SteSlicerApplication.SteSlicerApplication.getInstance", MagicMock(return_value = application)):
+        manager = ExtruderManager()
+    manager._findUsedExtruderStacks = MagicMock(side_effect = lambda: [MagicMock()])
+    yield manager
+    ExtruderManager._ExtruderManager__instance = None
+
+
+def test_usedExtruderStacksHit(extruder_manager):
+    first_result = extruder_manager.getUsedExtruderStacks()
+    second_result = extruder_manager.getUsedExtruderStacks()
+
+    assert first_result == second_result
+    assert first_result is not second_result  # Changing the result doesn't change the cache.
+    assert extruder_manager._findUsedExtruderStacks.call_count == 1
+    assert extruder_manager.getUsedExtruderStacksStatistics() == {"hits": 1, "misses": 1}
+
+
+def test_usedExtruderStacksInvalidation(extruder_manager):
+    first_result = extruder_manager.getUsedExtruderStacks()
+
+    extruder_manager._onUsedExtruderStackPropertyChanged("support_enable", "enabled")  # Not a value, so still valid.
+    assert extruder_manager.getUsedExtruderStacks() == first_result
+
+    extruder_manager._onUsedExtruderStackPropertyChanged("support_enable", "value")
+    assert extruder_manager.getUsedExtruderStacks() != first_result
+    assert extruder_manager.getUsedExtruderStacksStatistics() == {"hits": 1, "misses": 2}
+
+
+def test_usedExtruderStacksChangedWhileComputing(extruder_manager):
+    # Something changes while the used extruders are computed, for instance in the slicing thread.
+    def findUsedExtruderStacksDuringChange():
+        extruder_manager._invalidateUsedExtruderStacks()
+        return [MagicMock()]
+    extruder_manager._findUsedExtruderStacks.side_effect = findUsedExtruderStacksDuringChange
+    outdated_result = extruder_manager.getUsedExtruderStacks()
+
+    # The outdated result is not used, but computed again.
+    extruder_manager._findUsedExtruderStacks.side_effect = lambda: [MagicMock()]
+    assert extruder_manager.getUsedExtruderStacks() != outdated_result
+    assert extruder_manager.getUsedExtruderStacksStatistics() == {"hits": 0, "misses": 2}
+
+
+##  Calls everything that was connected to a mocked signal.
+def emit(signal, *args):
+    for call in signal.connect.call_args_list:
+        call[0][0](*args)
+
+
+def test_usedExtruderStacksInvalidatedByContainerChanges(extruder_manager):
+    global_stack = MagicMock()
+    def findUsedExtruderStacks():
+        extruder_manager._watchApplicationForUsedExtruders()
+        extruder_manager._watchStackForUsedExtruders(global_stack)
+        return [MagicMock()]
+    extruder_manager._findUsedExtruderStacks.side_effect = findUsedExtruderStacks
+    first_result = extruder_manager.getUsedExtruderStacks()
+    assert extruder_manager.getUsedExtruderStacks() == first_result
+
+    # Switching the quality profile replaces a container, which may change support_enable and such.
+    emit(global_stack.containersChanged, MagicMock())
+    second_result = extruder_manager.getUsedExtruderStacks()
+    assert second_result != first_result
+
+    # Disabling an extruder may change the default extruder, which is used for adhesion.
+    emit(extruder_manager._application.getMachineManager().extruderChanged)
+    assert extruder_manager.getUsedExtruderStacks() != second_result
+    assert extruder_manager.getUsedExtruderStacksStatistics() == {"hits": 1, "misses": 3}
@@ -0,0 +1,46 @@
+from steslicer.Settings.MaterialCache import MaterialCache
+
+
+def test_roundTrip(tmpdir):
+    cache_file = str(tmpdir.join("cache", "materials.cache"))
+
+    cache = MaterialCache(cache_file, "key")
+    cache.put("metadata", "generic_pla", "<fdmmaterial/>", {"metadata": {"name": "PLA"}})
+    cache.save()
+
+    assert MaterialCache(cache_file, "key").get("metadata", "generic_pla", "<fdmmaterial/>") == {"metadata": {"name": "PLA"}}
+    assert MaterialCache(cache_file, "key").get("profile", "generic_pla", "<fdmmaterial/>") is None
+    assert MaterialCache(cache_file, "other key").get("metadata", "generic_pla", "<fdmmaterial/>") is None  # A different key invalidates everything.
+
+
+def test_changedContentsInvalidateEntry(tmpdir):
+    cache_file = str(tmpdir.join("materials.cache"))
+
+    cache = MaterialCache(cache_file, "key")
+    cache.put("metadata", "generic_pla", "<fdmmaterial/>", "parsed")
+    cache.save()
+
+    assert MaterialCache(cache_file, "key").get("metadata", "generic_pla", "<fdmmaterial version=\"1.3\"/>") is None
+
+
+def test_unusedEntriesArePruned(tmpdir):
+    cache_file = str(tmpdir.join("materials.cache"))
+
+    cache = MaterialCache(cache_file, "key")
+    cache.put("metadata", "generic_pla", "<fdmmaterial/>", "pla")
+    cache.put("profile", "generic_pla", "<fdmmaterial/>", "pla")
+    cache.put("metadata", "generic_abs", "<fdmmaterial/>", "abs")
+    cache.put("metadata", "generic_petg", "<fdmmaterial/>", "petg")
+    cache.save()
+
+    # The PLA profile isn't loaded in the next run, the ABS profile changed and PETG was removed.
+    cache = MaterialCache(cache_file, "key")
+    assert cache.get("metadata", "generic_pla", "<fdmmaterial/>") == "pla"
+    assert cache.get("metadata", "generic_abs", "<fdmmaterial version=\"1.3\"/>") is None
+    cache.save()
+
+    cache = MaterialCache(cache_file, "key")
+    assert cache.get("profile", "generic_pla", "<fdmmaterial/>") == "pla"  # Still current, so it's kept.
+    assert cache.get("metadata", "generic_abs", "<fdmmaterial/>") is None
+    assert cache.get("metadata", "generic_petg", "<fdmmaterial/>") is None
+    assert set(cache._getEntries()) == {("metadata", "generic_pla"), ("profile", "generic_pla")}
@@ -0,0 +1,48 @@
+import json
+import os
+
+import pytest
+
+from steslicer.BatchSlicing.BatchSlicingPool import BatchSlicingPool, loadBatchJobs
+
+
+def _writeModel(path, size):
+    with open(path, "wb") as f:
+        f.write(b"\0" * size)
+
+
+def test_loadBatchJobs(tmpdir):
+    batch_file = str(tmpdir.join("batch.json"))
+    with open(batch_file, "w") as f:
+        json.dump({"jobs": [{"models": ["models/cube.stl"], "machine": "ste320"},
+                            {"name": "named", "models": ["cube.stl"], "machine": "ste320", "output": "out/named.gcode.gz"}]}, f)
+
+    jobs = loadBatchJobs(batch_file)
+
+    assert jobs[0]["name"] == "cube"
+    assert jobs[0]["models"] == [os.path.join(str(tmpdir), "models", "cube.stl")]
+    assert jobs[0]["output"] == os.path.join(str(tmpdir), "models", "cube.gcode")
+    assert jobs[1]["output"] == os.path.join(str(tmpdir), "out", "named.gcode.gz")
+
+
+def test_loadBatchJobsWithoutMachine(tmpdir):
+    batch_file = str(tmpdir.join("batch.json"))
+    with open(batch_file, "w") as f:
+        json.dump([{"models": ["cube.stl"]}], f)
+
+    with pytest.raises(ValueError):
+        loadBatchJobs(batch_file)
+
+
+def test_divideJobs(tmpdir):
+    jobs = []
+    for index, size in enumerate([100, 10, 60, 50]):
+        model = str(tmpdir.join("model%s.stl" % index))
+        _writeModel(model, size)
+        jobs.append({"name": str(index), "models": [model]})
+
+    shares = BatchSlicingPool.divideJobs(jobs, 2)
+
+    # Largest jobs first, so both workers get 110 bytes of models.
+    assert [[job["index"] for job in share] for share in shares] == [[0, 1], [2, 3]]
+    assert len(BatchSlicingPool.divideJobs(jobs[:1], 4)) == 1
@@ -0,0 +1,41 @@
+import numpy
+
+from benchmarks.BenchmarkRunner import findRegressions, saveBaseline, loadBaseline, timeFunction
+from benchmarks.Fixtures import FixtureCache, SettingsStack, generateCli, generateMesh
+
+
+def test_fixturesAreReproducible(tmpdir):
+    assert generateCli(3, 2, 10) == generateCli(3, 2, 10)
+    fixtures = FixtureCache(str(tmpdir))
+    assert fixtures.getCli(layers = 3, polylines_per_layer = 2, points_per_polyline = 10) == generateCli(3, 2, 10)
+
+    vertices, faces = fixtures.getMesh(rings = 10, segments = 12)
+    assert numpy.array_equal(vertices, generateMesh(10, 12)[0])
+    # Closed surface: every edge is shared by two faces.
+    edges = numpy.sort(numpy.vstack((faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]])), axis = 1)
+    _, counts = numpy.unique(edges, axis = 0, return_counts = True)
+    assert (counts == 2).all()
+
+
+def test_findRegressions(tmpdir):
+    baseline_file = str(tmpdir.join("baseline.json"))
+    saveBaseline(baseline_file, {"fast": {"median": 1.0}, "slow": {"median": 1.0}, "broken": {"error": "ImportError"}})
+    baseline = loadBaseline(baseline_file)
+    assert "broken" not in baseline["results"]
+
+    results = {"fast": {"median": 1.1}, "slow": {"median": 1.5}, "new": {"median": 3.0}}
+    assert [name for name, _, _, _ in findRegressions(results, baseline, threshold = 0.2)] == ["slow"]
+
+
+def test_timeFunction():
+    calls = []
+    result = timeFunction(lambda: calls.append(1), repeat = 3, warmup = 1)
+    assert len(calls) == 4
+    assert result["repeat"] == 3
+    assert 0 <= result["min"] <= result["median"]
+
+
+def test_settingsStack():
+    global_stack = SettingsStack.createGlobalStack(printing_mode = "cylindrical")
+    assert global_stack.getProperty("printing_mode", "value") == "cylindrical"
+    assert global_stack.extruders["0"].getProperty("material_diameter", "value") == 1.75
@@ -0,0 +1,90 @@
+import gzip
+import io
+
+import pytest
+
+from plugins.GCodeWriter.ChunkedGCodeStream import ChunkedGCodeStream
+
+
+##  Binary stream that remembers every write.
+class RecordingStream(io.BytesIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = []
+
+    def write(self, data):
+        self.writes.append(bytes(data))
+        return super().write(data)
+
+
+def test_writesInChunks():
+    stream = RecordingStream()
+    progress = []
+    gcode_stream = ChunkedGCodeStream(stream, chunk_size = 10, progress_callback = progress.append, total_size = 24)
+    gcode_stream.write("G0 X1\n")  # 6 characters, kept.
+    assert stream.writes == []
+    gcode_stream.write("G0 X2\n")  # 12 characters, written at once.
+    assert stream.writes == [b"G0 X1\nG0 X2\n"]
+    gcode_stream.write("G0 X3\n")
+    gcode_stream.write("G0 X4\n")
+    gcode_stream.close()
+
+    assert stream.writes == [b"G0 X1\nG0 X2\n", b"G0 X3\nG0 X4\n"]
+    assert progress == [0.5, 1.0]
+    with pytest.raises(ValueError):
+        gcode_stream.write("G0 X5\n")
+
+
+def test_encodesForBinaryStreams():
+    stream = io.BytesIO()
+    gcode_stream = ChunkedGCodeStream(stream, chunk_size = 3)
+    gcode_stream.write(";Température\n")
+    gcode_stream.close()
+
+    assert stream.getvalue() == ";Température\n".encode("utf-8")
+
+
+def test_gzipRoundTrip():
+    lines = ["G1 X%s Y%s E%s\n" % (index, index * 2, index * 0.1) for index in range(1000)]
+    stream = io.BytesIO()
+    gcode_stream = ChunkedGCodeStream(stream, chunk_size = 1000, compress = True)
+    for line in lines:
+        gcode_stream.write(line)
+    gcode_stream.close()
+
+    assert gzip.decompress(stream.getvalue()).decode("utf-8") == "".join(lines)
+
+
+def test_gzipToTextStreamUsesItsBuffer():
+    buffer = io.BytesIO()
+    text_stream = io.TextIOWrapper(buffer, encoding = "utf-8")
+    text_stream.write(";")  # Written before, so it has to come first.
+    gcode_stream = ChunkedGCodeStream(text_stream, compress = True)
+    gcode_stream.write("G0 X1\n")
+    gcode_stream.close()
+
+    assert buffer.getvalue()[:1] == b";"
+    assert gzip.decompress(buffer.getvalue()[1:]) == b"G0 X1\n"
+
+
+def test_textStreamTranslatesNewlines():
+    buffer = io.BytesIO()
+    text_stream = io.TextIOWrapper(buffer, encoding = "utf-8", newline = "\r\n")  # As a text file on Windows.
+    gcode_stream = ChunkedGCodeStream(text_stream, chunk_size = 4)
+    gcode_stream.write("G0 X1\n")
+    gcode_stream.write("G0 X2\n")
+    gcode_stream.close()
+
+    assert buffer.getvalue() == b"G0 X1\r\nG0 X2\r\n"
+
+
+def test_textStreamWithoutBuffer():
+    stream = io.StringIO()
+    gcode_stream = ChunkedGCodeStream(stream, chunk_size = 4)
+    gcode_stream.write("G0 X1\n")
+    gcode_stream.write("G0 X2\n")
+    gcode_stream.close()
+
+    assert stream.getvalue() == "G0 X1\nG0 X2\n"
+    with pytest.raises(ValueError):
+        ChunkedGCodeStream(io.StringIO(), compress = True)  # Compressed g-code is binary.
@@ -0,0 +1,52 @@
+import numpy
+import pytest
+
+from steslicer.Utils.GCodeBufferChecker import GCodeBufferChecker, parseGCode, PARAMETER_LETTERS
+
+
+def test_parseGCode():
+    parsed = parseGCode(["; comment\n", "\n", "G1 X10 Y-2.5 E.5 F1200 ; move\n", "M204 S3000\n"])
+
+    assert parsed.line_numbers.tolist() == [2, 3]
+    assert parsed.codes.tolist() == ["G", "M"]
+    assert parsed.numbers.tolist() == [1, 204]
+    assert parsed.parameters[0, PARAMETER_LETTERS.index("Y")] == -2.5
+    assert parsed.parameters[0, PARAMETER_LETTERS.index("E")] == 0.5
+    assert numpy.isnan(parsed.parameters[0, PARAMETER_LETTERS.index("Z")])
+
+
+def test_relativeAndSetPosition():
+    lines = ["G92 E0\n", "G1 X10 F6000\n", "G91\n", "G0 X10\n", "G90\n", "G92 X0\n", "G1 X10\n", "G4 P500\n"]
+    checker = GCodeBufferChecker()
+    checker.process(lines)
+    times = checker.getCommandTimes()
+
+    # All three moves travel 10mm, G92 and G90/G91 don't take time.
+    assert times[0] == 0 and times[2] == 0 and times[4] == 0 and times[5] == 0
+    assert times[1] > 0 and times[3] > 0 and times[6] > 0
+    assert times[7] == pytest.approx(0.5)
+
+
+def test_detectsBufferUnderrun():
+    angles = numpy.linspace(0, 20 * numpy.pi, 5000)
+    lines = ["G1 X%.3f Y%.3f F6000\n" % (10 * numpy.cos(angle), 10 * numpy.sin(angle)) for angle in angles]
+    checker = GCodeBufferChecker(buffer_filling_rate = 50, buffer_size = 15)
+    checker.process(lines)
+
+    assert checker.hasBufferUnderruns()
+
+
+def test_slowMovesDontUnderrun():
+    lines = ["G1 X%s F600\n" % (position * 10) for position in range(100)]
+    checker = GCodeBufferChecker(buffer_filling_rate = 50, buffer_size = 15)
+    checker.process(lines)
+
+    assert not checker.hasBufferUnderruns()
+
+
+def test_defaultLimits():
+    # Without a machine, the limits of the Ultimaker S5 are simulated: Z moves at most 40mm/s.
+    checker = GCodeBufferChecker()
+    checker.process(["G1 Z10 F6000\n"])
+
+    assert 0.25 <= checker.getCommandTimes()[0] < 1.0
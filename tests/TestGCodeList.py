@@ -0,0 +1,39 @@
+from steslicer.Utils.GCodeList import GCodeList
+
+
+def test_insertInFront():
+    gcode_list = GCodeList()
+    gcode_list.append(b";LAYER:0\n")
+    gcode_list.append(b";LAYER:1\n")
+    gcode_list.insert(0, b";Generated with Cura_SteamEngine\n")
+    gcode_list.insert(0, ";FLAVOR:Marlin\n")
+
+    assert list(gcode_list) == [";FLAVOR:Marlin\n", ";Generated with Cura_SteamEngine\n", ";LAYER:0\n", ";LAYER:1\n"]
+    assert gcode_list[1] == ";Generated with Cura_SteamEngine\n"
+    assert gcode_list[-1] == ";LAYER:1\n"
+    assert gcode_list[1:3] == [";Generated with Cura_SteamEngine\n", ";LAYER:0\n"]
+
+
+def test_editLikeAList():
+    gcode_list = GCodeList([b"G0 X1\n", b"G0 X2\n"])
+    gcode_list.insert(0, b";START\n")
+    gcode_list[0] += ";POSTPROCESSED\n"
+    gcode_list.insert(2, "M0\n")
+    del gcode_list[-1]
+
+    assert gcode_list == [";START\n;POSTPROCESSED\n", "G0 X1\n", "M0\n"]
+
+
+def test_decodeInvalid():
+    gcode_list = GCodeList([b";\xff\n"])
+
+    assert gcode_list[0] == ";�\n"
+
+
+def test_replaceTokens():
+    gcode_list = GCodeList([b";TIME:{print_time}\n", b"G0 X1\n"])
+    gcode_list.insert(0, ";NAME:{jobname}\n")
+    gcode_list.replaceTokens({"{print_time}": "60", "{jobname}": "cube"})
+
+    assert gcode_list == [";NAME:cube\n", ";TIME:60\n", "G0 X1\n"]
+    assert gcode_list.getSize() == len("".join(gcode_list))
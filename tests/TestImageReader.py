@@ -0,0 +1,100 @@
+import numpy
+
+from PyQt5.QtGui import QImage, qRed, qGreen, qBlue
+
+from plugins.ImageReader.ImageReader import _imageToHeightData, _blurHeightData, _createBaseVertices
+
+
+##  Blurs heights the way the image reader did before it was vectorised.
+def oldBlurHeightData(height_data):
+    height_data = height_data.copy()
+    copy = numpy.pad(height_data, ((1, 1), (1, 1)), mode = "edge")
+    height_data += copy[1:-1, 2:]
+    height_data += copy[1:-1, :-2]
+    height_data += copy[2:, 1:-1]
+    height_data += copy[:-2, 1:-1]
+    height_data += copy[2:, 2:]
+    height_data += copy[:-2, 2:]
+    height_data += copy[2:, :-2]
+    height_data += copy[:-2, :-2]
+    height_data /= 9
+    return height_data
+
+
+##  Creates the faces of the bottom and the walls the way the image reader did
+#   before it was vectorised, with MeshBuilder.addFaceByPoints.
+def oldBaseFaces(height_data, texel_width, texel_height):
+    faces = []
+    def addFaceByPoints(x0, y0, z0, x1, y1, z1, x2, y2, z2):
+        faces.append(((x0, y0, z0), (x1, y1, z1), (x2, y2, z2)))
+
+    height_minus_one, width_minus_one = height_data.shape[0] - 1, height_data.shape[1] - 1
+    geo_width = width_minus_one * texel_width
+    geo_height = height_minus_one * texel_height
+
+    addFaceByPoints(0, 0, 0, 0, 0, geo_height, geo_width, 0, geo_height)
+    addFaceByPoints(geo_width, 0, geo_height, geo_width, 0, 0, 0, 0, 0)
+
+    for n in range(0, width_minus_one):
+        x = n * texel_width
+        nx = (n + 1) * texel_width
+        hn0 = height_data[0, n]
+        hn1 = height_data[0, n + 1]
+        hs0 = height_data[height_minus_one, n]
+        hs1 = height_data[height_minus_one, n + 1]
+        addFaceByPoints(x, 0, 0, nx, 0, 0, nx, hn1, 0)
+        addFaceByPoints(nx, hn1, 0, x, hn0, 0, x, 0, 0)
+        addFaceByPoints(x, 0, geo_height, nx, 0, geo_height, nx, hs1, geo_height)
+        addFaceByPoints(nx, hs1, geo_height, x, hs0, geo_height, x, 0, geo_height)
+
+    for n in range(0, height_minus_one):
+        y = n * texel_height
+        ny = (n + 1) * texel_height
+        hw0 = height_data[n, 0]
+        hw1 = height_data[n + 1, 0]
+        he0 = height_data[n, width_minus_one]
+        he1 = height_data[n + 1, width_minus_one]
+        addFaceByPoints(0, 0, y, 0, 0, ny, 0, hw1, ny)
+        addFaceByPoints(0, hw1, ny, 0, hw0, y, 0, 0, y)
+        addFaceByPoints(geo_width, 0, y, geo_width, 0, ny, geo_width, he1, ny)
+        addFaceByPoints(geo_width, he1, ny, geo_width, he0, y, geo_width, 0, y)
+    return faces
+
+
+def test_blurHeightData():
+    height_data = numpy.arange(20, dtype = numpy.float32).reshape((4, 5)) ** 2 / 400
+    assert numpy.allclose(_blurHeightData(height_data), oldBlurHeightData(height_data))
+
+
+def test_createBaseVertices():
+    height_data = numpy.array([[1, 2, 3], [4, 5, 6]], dtype = numpy.float32)
+    vertices = _createBaseVertices(height_data, 0.5, 2)
+
+    expected_faces = oldBaseFaces(height_data, 0.5, 2)
+    assert len(expected_faces) == 14  # The bottom, and two faces for every segment of the four walls.
+    assert vertices.shape == (len(expected_faces) * 3, 3)
+    # The walls are now made one at a time, so only the order of the faces is different.
+    faces = [tuple(tuple(vertex) for vertex in face) for face in vertices.reshape(-1, 3, 3).tolist()]
+    assert sorted(faces) == sorted(tuple(tuple(float(coordinate) for coordinate in vertex) for vertex in face) for face in expected_faces)
+
+
+def test_imageToHeightDataWithPaddedLines():
+    width, height = 3, 2
+    bytes_per_line = 4 * width + 8  # Every line ends with two pixels that aren't in the image.
+    pixels = numpy.full((height, bytes_per_line // 4), 0xffffffff, dtype = numpy.uint32)
+    pixels[:, :width] = [[0xff000000, 0xffff0000, 0xff00ff80],
+                         [0xffffffff, 0xff102030, 0xff0000ff]]
+    data = pixels.tobytes()
+    img = QImage(data, width, height, bytes_per_line, QImage.Format_RGB32)
+    assert img.bytesPerLine() == bytes_per_line
+
+    height_data = _imageToHeightData(img)
+
+    # What the image reader computed before, one pixel at a time.
+    expected = numpy.zeros((height, width), dtype = numpy.float32)
+    for x in range(0, width):
+        for y in range(0, height):
+            qrgb = img.pixel(x, y)
+            expected[y, x] = float(qRed(qrgb) + qGreen(qrgb) + qBlue(qrgb)) / (3 * 255)
+    assert height_data.shape == (height, width)
+    assert numpy.allclose(height_data, expected)
@@ -0,0 +1,56 @@
+import os
+import re
+from zipfile import ZipFile
+
+from steslicer.Backups.IncrementalBackupStore import IncrementalBackupStore
+
+
+def _writeFile(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok = True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def _readFile(path):
+    with open(path) as f:
+        return f.read()
+
+
+def test_snapshotDeduplicates(tmpdir):
+    data_path = str(tmpdir.join("data"))
+    store = IncrementalBackupStore(str(tmpdir.join("store")))
+    _writeFile(os.path.join(data_path, "machine_instances", "a.cfg"), "same")
+    _writeFile(os.path.join(data_path, "materials", "b.xml.fdm_material"), "same")
+
+    first = store.createSnapshot(data_path)
+    _writeFile(os.path.join(data_path, "materials", "b.xml.fdm_material"), "changed")
+    second = store.createSnapshot(data_path)
+
+    # Two identical files and one changed file give two objects in total.
+    assert len({entry["hash"] for entry in first["files"].values()}) == 1
+    assert len({entry["hash"] for entry in second["files"].values()}) == 2
+    assert [snapshot["id"] for snapshot in store.getSnapshots()] == [first["id"], second["id"]]
+
+    store.removeSnapshot(second["id"])
+    assert store.collectGarbage() == 1
+
+
+def test_restoreSnapshot(tmpdir):
+    data_path = str(tmpdir.join("data"))
+    store = IncrementalBackupStore(str(tmpdir.join("store")))
+    _writeFile(os.path.join(data_path, "machine_instances", "a.cfg"), "original")
+    snapshot = store.createSnapshot(data_path, re.compile("\\.log$"))
+
+    _writeFile(os.path.join(data_path, "machine_instances", "a.cfg"), "modified")
+    _writeFile(os.path.join(data_path, "machine_instances", "new.cfg"), "added")
+    _writeFile(os.path.join(data_path, "steslicer.log"), "log")
+
+    assert store.restoreSnapshot(snapshot["id"], data_path, re.compile("\\.log$"))
+    assert _readFile(os.path.join(data_path, "machine_instances", "a.cfg")) == "original"
+    assert not os.path.exists(os.path.join(data_path, "machine_instances", "new.cfg"))
+    assert os.path.exists(os.path.join(data_path, "steslicer.log"))  # Ignored files are left alone.
+
+    zip_path = str(tmpdir.join("export.zip"))
+    assert store.exportSnapshot(snapshot["id"], zip_path)
+    with ZipFile(zip_path) as archive:
+        assert archive.read("machine_instances/a.cfg") == b"original"
@@ -0,0 +1,102 @@
+from unittest.mock import MagicMock
+
+from steslicer.LayerDataStore import LayerDataStore, estimateLayerSize
+
+
+def createLayerMessage(size):
+    path_segment = MagicMock(points = b"\0" * size, line_type = b"", line_width = b"", line_thickness = b"", line_feedrate = b"")
+    message = MagicMock()
+    message.repeatedMessageCount = MagicMock(return_value = 1)
+    message.getRepeatedMessage = MagicMock(return_value = path_segment)
+    return message
+
+
+def test_estimateLayerSize():
+    assert estimateLayerSize(createLayerMessage(100)) == 100
+
+    layer = MagicMock(spec = ["polygons"])
+    layer.polygons = [MagicMock(data = MagicMock(nbytes = 40)), MagicMock(data = MagicMock(nbytes = 2))]
+    assert estimateLayerSize(layer) == 42
+
+
+def test_invalidateOneBuildPlate():
+    store = LayerDataStore()
+    store.append(0, createLayerMessage(10))
+    store.append(1, createLayerMessage(10))
+
+    store.invalidate([0])
+    assert 0 not in store
+    assert len(store.getLayers(1)) == 1
+    assert store.getMemoryUsage() == 10
+
+    store.invalidate()
+    assert store.getBuildPlates() == []
+
+
+def test_evictLeastRecentlyUsed():
+    store = LayerDataStore(memory_budget = 250)
+    for build_plate_number in range(3):
+        store.append(build_plate_number, createLayerMessage(100))
+    # The first build plate didn't fit, the other two do.
+    assert store.getBuildPlates() == [1, 2]
+    assert store.isEvicted(0)
+
+    store.getLayers(1)
+    store.setMemoryBudget(150)
+    assert store.getBuildPlates() == [1]
+    assert store.isEvicted(2)
+
+    # Slicing a build plate again makes it no longer evicted.
+    store.startBuildPlate(0)
+    assert not store.isEvicted(0)
+
+
+def test_keepBuildPlateBeingSliced():
+    store = LayerDataStore(memory_budget = 50)
+    store.append(0, createLayerMessage(100))
+    store.append(0, createLayerMessage(100))
+
+    assert len(store.getLayers(0)) == 2
+    assert not store.isEvicted(0)
+
+
+def test_keepBuildPlateBeingProcessed():
+    store = LayerDataStore(memory_budget = 150)
+    store.append(0, createLayerMessage(100))
+    store.pin(0)  # A job processes the layers of build plate 0.
+
+    # Slicing another build plate doesn't throw away the layers the job holds on to.
+    store.append(1, createLayerMessage(100))
+    assert store.getBuildPlates() == [0, 1]
+    assert not store.isEvicted(0)
+    assert store.getMemoryUsage() == 200
+
+    # The job finished, so build plate 0 is not sliced again.
+    store.remove(0)
+    assert not store.isEvicted(0)
+    assert store.getMemoryUsage() == 100
+
+    # Without pins, the build plate used longest ago is thrown away again.
+    store.append(0, createLayerMessage(100))
+    assert store.isEvicted(1)
+
+
+def test_removeEvictedBuildPlate():
+    store = LayerDataStore(memory_budget = 150)
+    store.append(0, createLayerMessage(100))
+    store.append(1, createLayerMessage(100))
+    assert store.isEvicted(0)
+
+    store.remove(0)
+    assert not store.isEvicted(0)
+
+
+def test_unpinEvicts():
+    store = LayerDataStore(memory_budget = 150)
+    store.append(0, createLayerMessage(100))
+    store.pin(0)
+    store.append(1, createLayerMessage(100))
+
+    store.unpin(0)  # The job was aborted.
+    assert store.isEvicted(0)
+    assert store.getBuildPlates() == [1]
@@ -0,0 +1,54 @@
+from unittest.mock import MagicMock, patch
+
+from UM.PluginObject import PluginObject
+
+from steslicer.LazyPluginObject import LazyPluginObject
+from steslicer.PluginLoadProfiler import PluginLoadProfiler
+
+
+class FakePlugin(PluginObject):
+    def getAnswer(self):
+        return 42
+
+
+class FakePluginRegistry:
+    def __init__(self):
+        self.loaded = []
+
+    def loadPlugin(self, plugin_id):
+        self.loaded.append(plugin_id)
+
+    def loadPlugins(self):
+        for plugin_id in ("A", "B"):
+            self.loadPlugin(plugin_id)
+
+
+def test_loadOnFirstUse():
+    factory = MagicMock(return_value = FakePlugin())
+    lazy_plugin = LazyPluginObject(factory)
+    lazy_plugin.setPluginId("FakePlugin")
+    assert not lazy_plugin.isLoaded()
+    factory.assert_not_called()
+
+    with patch("UM.Application.Application.getInstance", MagicMock(return_value = MagicMock(started = False))):
+        assert lazy_plugin.getAnswer() == 42
+        assert lazy_plugin.getAnswer() == 42
+    factory.assert_called_once_with()
+    assert lazy_plugin.isLoaded()
+    assert lazy_plugin.getPluginObject().getPluginId() == "FakePlugin"
+    assert "FakePlugin" in LazyPluginObject.getLoadTimes()
+
+
+def test_profileLoadPlugins():
+    registry = FakePluginRegistry()
+    profiler = PluginLoadProfiler(registry)
+    profiler.start()
+    registry.loadPlugin("C")
+    registry.loadPlugins()
+    profiler.stop()
+
+    assert registry.loaded == ["C", "A", "B"]
+    assert sorted(plugin_id for plugin_id, _ in profiler.getLoadTimes()) == ["A", "B", "C"]
+    # Loading after profiling is not measured.
+    registry.loadPlugin("D")
+    assert "D" not in dict(profiler.getLoadTimes())
@@ -0,0 +1,126 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from UM.Settings.SettingRelation import RelationType
+from UM.Settings.Validator import ValidatorState
+
+from steslicer.Machines.MachineErrorChecker import MachineErrorChecker
+
+
+##  A setting stack with the given validation states, in which "b" and "c"
+#   depend on the value of "a".
+class MockStack:
+    def __init__(self, stack_id, states):
+        self._id = stack_id
+        self.states = states
+        self.extruders = {}
+        self.propertyChanged = MagicMock()
+        self.containersChanged = MagicMock()
+        self.checked_keys = []
+
+    def getId(self):
+        return self._id
+
+    def getAllKeys(self):
+        return set(self.states)
+
+    def getProperty(self, key, property_name):
+        if property_name == "enabled":
+            return True
+        if property_name == "validationState":
+            self.checked_keys.append(key)
+            return self.states[key]
+
+    def getSettingDefinition(self, key):
+        definition = MagicMock()
+        definition.key = key
+        definition.relations = []
+        if key == "a":
+            for target_key in ("b", "c"):
+                relation = MagicMock()
+                relation.type = RelationType.RequiredByTarget
+                relation.role = "value"
+                relation.target = self.getSettingDefinition(target_key)
+                definition.relations.append(relation)
+        return definition
+
+
+@pytest.fixture
+def error_checker():
+    application = MagicMock()
+    later = []
+    application.callLater = later.append
+    stack = MockStack("global", {"a": ValidatorState.Valid, "b": ValidatorState.Valid, "c": ValidatorState.Valid,
+                                 "d": ValidatorState.MaximumError})
+    application.getMachineManager.return_value.activeMachine = stack
+
+    with patch("steslicer.Machines.MachineErrorChecker.Application.getInstance", MagicMock(return_value = application)):
+        checker = MachineErrorChecker()
+    checker._error_check_timer = MagicMock()
+    checker.initialize()
+
+    def runCheck():
+        checker._rescheduleCheck()
+        while later:
+            later.pop(0)()
+
+    return checker, stack, runCheck, later
+
+
+def test_fullCheck(error_checker):
+    checker, stack, runCheck, _ = error_checker
+    checker.startErrorCheck()
+    runCheck()
+
+    assert checker.hasError
+    assert checker.getErrorKeys() == {("global", "d")}
+    assert sorted(stack.checked_keys) == ["a", "b", "c", "d"]
+    assert checker.getLastCheckStatistics()["full_check"]
+
+
+def test_onlyChangedKeysAreChecked(error_checker):
+    checker, stack, runCheck, _ = error_checker
+    checker.startErrorCheck()
+    runCheck()
+    stack.checked_keys = []
+
+    stack.states["d"] = ValidatorState.Valid
+    checker._onPropertyChanged("d", "value")
+    runCheck()
+
+    assert stack.checked_keys == ["d"]
+    assert not checker.hasError
+    assert not checker.getLastCheckStatistics()["full_check"]
+
+    # Settings that depend on the value of a changed setting are checked too.
+    stack.checked_keys = []
+    stack.states["c"] = ValidatorState.MinimumError
+    checker._onPropertyChanged("a", "value")
+    runCheck()
+
+    assert sorted(stack.checked_keys) == ["a", "b", "c"]
+    assert checker.getErrorKeys() == {("global", "c")}
+
+
+def test_interruptedCheck(error_checker):
+    checker, stack, runCheck, later = error_checker
+    checker.BATCH_TIME = 0  # Check one setting per batch.
+    checker.startErrorCheck()
+    checker._rescheduleCheck()
+    later.pop(0)()  # First batch.
+    assert len(stack.checked_keys) == 1
+
+    # A setting changes while the full check is running.
+    checker._onPropertyChanged("d", "value")
+    checker._rescheduleCheck()
+    later.pop(0)()  # Discards the rest of the check.
+
+    assert checker.getLastCheckStatistics() == {}  # The full check didn't finish.
+
+    # The next check finishes the settings that weren't checked yet.
+    later.clear()
+    runCheck()
+    assert set(stack.checked_keys) == {"a", "b", "c", "d"}
+    assert checker.getErrorKeys() == {("global", "d")}
+    assert not checker.getLastCheckStatistics()["full_check"]
@@ -0,0 +1,142 @@
+import random
+from unittest.mock import MagicMock, patch
+
+from steslicer.Machines.MaterialManager import MaterialManager
+
+
+def createMaterial(material_id, base_file = None, **kwargs):
+    metadata = {"id": material_id, "type": "material", "base_file": base_file or material_id, "GUID": material_id + "_guid",
+                "definition": "fdmprinter", "approximate_diameter": "3", "material": "PLA", "brand": "Generic",
+                "name": material_id, "color": "Generic"}
+    metadata.update(kwargs)
+    return metadata
+
+
+class MockContainerRegistry:
+    def __init__(self, metadatas):
+        self.metadata = {metadata["id"]: metadata for metadata in metadatas}
+        self.containerMetaDataChanged = MagicMock()
+        self.containerAdded = MagicMock()
+        self.containerRemoved = MagicMock()
+
+    def findContainersMetadata(self, **kwargs):
+        return [metadata for metadata in self.metadata.values() if all(metadata.get(key) == value for key, value in kwargs.items())]
+
+    def isReadOnly(self, container_id):
+        return not container_id.startswith("custom")
+
+    def addWrongContainerId(self, container_id):
+        pass
+
+
+def createMaterialManager(container_registry):
+    application = MagicMock()
+    application.getPreferences().getValue = MagicMock(return_value = "")
+    with patch("UM.Application.Application.getInstance", MagicMock(return_value = application)):
+        manager = MaterialManager(container_registry)
+    manager.initialize()
+    return manager
+
+
+def getLookupTables(manager):
+    def nodeToDict(node):
+        return {"materials": {root_id: child.getMetaDataEntry("id") for root_id, child in node.material_map.items()},
+                "children": {name: nodeToDict(child) for name, child in node.children_map.items()}}
+
+    return {
+        "groups": {root_id: sorted(node.getMetaDataEntry("id") for node in [group.root_material_node] + group.derived_material_node_list)
+                   for root_id, group in manager._material_group_map.items()},
+        "guids": {guid: [group.name for group in groups] for guid, groups in manager._guid_material_groups_map.items() if groups},
+        "fallbacks": {material_type: metadata["id"] for material_type, metadata in manager._fallback_materials_map.items()},
+        "diameters": dict(manager._material_diameter_map),
+        "without_diameter": manager._diameter_material_map,
+        "tree": {diameter: {machine: nodeToDict(node) for machine, node in machines.items()}
+                 for diameter, machines in manager._diameter_machine_nozzle_buildplate_material_map.items()}
+    }
+
+
+def notifyChanged(manager, metadata):
+    container = MagicMock()
+    container.getId = MagicMock(return_value = metadata["id"])
+    container.getMetaDataEntry = lambda key, default = None: metadata.get(key, default)
+    manager._onContainerChanged(container)
+
+
+def test_incrementalUpdateMatchesFullUpdate():
+    container_registry = MockContainerRegistry([
+        createMaterial("generic_pla"),
+        createMaterial("generic_pla_175", approximate_diameter = "2", name = "generic_pla"),
+        createMaterial("generic_pla_machine", base_file = "generic_pla", definition = "machine"),
+        createMaterial("generic_abs", material = "ABS"),
+        createMaterial("custom_pla", brand = "Custom", GUID = "generic_pla_guid")
+    ])
+    manager = createMaterialManager(container_registry)
+    assert manager.getFallbackMaterialIdByMaterialType("ABS") == "generic_abs"
+
+    # Remove a material, add one and change one.
+    removed = container_registry.metadata.pop("generic_abs")
+    added = createMaterial("custom_abs", material = "ABS", brand = "Custom")
+    container_registry.metadata["custom_abs"] = added
+    container_registry.metadata["custom_pla"]["name"] = "generic_pla"
+    for metadata in (removed, added, container_registry.metadata["custom_pla"]):
+        container = MagicMock()
+        container.getId = MagicMock(return_value = metadata["id"])
+        container.getMetaDataEntry = lambda key, default = None, metadata = metadata: metadata.get(key, default)
+        manager._onContainerChanged(container)
+    manager._updateMaps()
+
+    assert manager.getFallbackMaterialIdByMaterialType("ABS") is None
+    assert "machine" in manager._diameter_machine_nozzle_buildplate_material_map["3"]
+    assert getLookupTables(manager) == getLookupTables(createMaterialManager(container_registry))
+
+    # Removing the last material of a machine removes its branch, so the fdmprinter materials are used for it.
+    removed = container_registry.metadata.pop("generic_pla_machine")
+    container = MagicMock()
+    container.getId = MagicMock(return_value = removed["id"])
+    container.getMetaDataEntry = lambda key, default = None: removed.get(key, default)
+    manager._onContainerChanged(container)
+    manager._updateMaps()
+    assert "machine" not in manager._diameter_machine_nozzle_buildplate_material_map["3"]
+    assert getLookupTables(manager) == getLookupTables(createMaterialManager(container_registry))
+
+
+def test_randomChangesMatchFullUpdate():
+    random_generator = random.Random(36)
+    container_registry = MockContainerRegistry([createMaterial("generic_pla"), createMaterial("generic_abs", material = "ABS")])
+    manager = createMaterialManager(container_registry)
+
+    for step in range(300):
+        root_ids = [material_id for material_id, metadata in container_registry.metadata.items() if metadata["base_file"] == material_id]
+        action = random_generator.choice(["add", "add_derived", "remove", "change"])
+        if action == "add" or not root_ids:
+            metadata = createMaterial(random_generator.choice(["generic", "custom"]) + "_%s" % step,
+                                      material = random_generator.choice(["PLA", "ABS"]),
+                                      brand = random_generator.choice(["Generic", "Custom"]),
+                                      approximate_diameter = random_generator.choice(["2", "3"]))
+            container_registry.metadata[metadata["id"]] = metadata
+        elif action == "add_derived":
+            # At most one material per root material in every branch of the lookup tree.
+            root_metadata = container_registry.metadata[random_generator.choice(root_ids)]
+            definition = random_generator.choice(["machine_a", "machine_b"])
+            nozzle_name = random_generator.choice([None, "0.4", "0.8"])
+            metadata = dict(root_metadata, id = "%s_%s_%s" % (root_metadata["id"], definition, nozzle_name), definition = definition)
+            if nozzle_name is not None:
+                metadata["variant_name"] = nozzle_name
+            if metadata["id"] in container_registry.metadata:
+                continue
+            container_registry.metadata[metadata["id"]] = metadata
+        elif action == "remove":
+            metadata = container_registry.metadata.pop(random_generator.choice(list(container_registry.metadata)))
+        else:
+            metadata = container_registry.metadata[random_generator.choice(list(container_registry.metadata))]
+            key = random_generator.choice(["name", "material", "brand", "color", "GUID", "approximate_diameter"])
+            metadata[key] = random_generator.choice({
+                "name": ["generic_pla", "generic_abs"], "material": ["PLA", "ABS"], "brand": ["Generic", "Custom"],
+                "color": ["Generic", "Red"], "GUID": ["generic_pla_guid", "generic_abs_guid"], "approximate_diameter": ["2", "3"]
+            }[key])
+        notifyChanged(manager, metadata)
+
+        # Several changes can be waiting for the update timer.
+        if random_generator.random() < 0.3:
+            manager._updateMaps()
+            assert getLookupTables(manager) == getLookupTables(createMaterialManager(container_registry)), "Step %s" % step
@@ -0,0 +1,47 @@
+from unittest.mock import MagicMock
+
+import numpy
+
+from steslicer.Utils.MeshTransfer import getFaces, setObjectMesh, weldVertices
+
+# Two triangles sharing an edge, with every corner of every face.
+flat_vertices = numpy.array([[0, 0, 0], [1, 0, 0], [0, 1, 0],
+                             [1, 0, 0], [1, 1, 0], [0, 1, 0]], dtype = numpy.float32)
+
+
+def createMeshData(indices = None, vertex_count = 6):
+    mesh_data = MagicMock()
+    mesh_data.hasIndices = MagicMock(return_value = indices is not None)
+    mesh_data.getIndices = MagicMock(return_value = indices)
+    mesh_data.getVertexCount = MagicMock(return_value = vertex_count)
+    return mesh_data
+
+
+def test_getFaces():
+    assert getFaces(createMeshData()).tolist() == [[0, 1, 2], [3, 4, 5]]
+    indices = numpy.array([[0, 1, 2], [1, 3, 2]])
+    assert getFaces(createMeshData(indices)) is indices
+
+
+def test_weldVertices():
+    vertices, faces = weldVertices(flat_vertices, getFaces(createMeshData()))
+
+    assert len(vertices) == 4
+    assert faces.dtype == numpy.int32
+    numpy.testing.assert_array_equal(vertices[faces].reshape((-1, 3)), flat_vertices)
+
+
+def test_setObjectMeshFlat():
+    obj = MagicMock()
+    vertices = flat_vertices[[0, 1, 2, 4]]
+    setObjectMesh(obj, vertices, createMeshData(numpy.array([[0, 1, 2], [1, 3, 2]]), 4))
+
+    numpy.testing.assert_array_equal(obj.vertices, flat_vertices)
+
+
+def test_setObjectMeshIndexed():
+    obj = MagicMock()
+    setObjectMesh(obj, flat_vertices, createMeshData(), indexed = True)
+
+    assert len(obj.vertices) == 4
+    numpy.testing.assert_array_equal(obj.vertices[obj.indices].reshape((-1, 3)), flat_vertices)
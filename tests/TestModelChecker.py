@@ -0,0 +1,154 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from plugins.ModelChecker.ModelChecker import ModelChecker
+
+
+##  A scene node with only what the model checker uses.
+class MockNode:
+    def __init__(self, name, parent = None, size = 10, decorations = None):
+        self._name = name
+        self._parent = None
+        self._children = []
+        self.getBoundingBox = MagicMock(side_effect = lambda: MagicMock(width = self.size, depth = self.size, height = self.size))
+        self.size = size
+        self.decorations = {"isSliceable": True, "getActiveExtruderPosition": "0"} if decorations is None else decorations
+        self.setParent(parent)
+
+    def getName(self):
+        return self._name
+
+    def getParent(self):
+        return self._parent
+
+    def getChildren(self):
+        return self._children
+
+    def setParent(self, parent):
+        if self._parent is not None:
+            self._parent._children.remove(self)
+        self._parent = parent
+        if parent is not None:
+            parent._children.append(self)
+
+    def callDecoration(self, function):
+        return self.decorations.get(function)
+
+
+def iterateNodes(node):
+    yield node
+    for child in node.getChildren():
+        yield from iterateNodes(child)
+
+
+@pytest.fixture
+def scene_root():
+    return MockNode("root", decorations = {})
+
+
+@pytest.fixture
+def application(scene_root):
+    extruder = MagicMock()
+    extruder.material.getProperty = MagicMock(return_value = 1.0)  # Shrinks a lot.
+    application = MagicMock()
+    application.getController().getScene().getRoot.return_value = scene_root
+    application.getGlobalContainerStack().extruders = {"0": extruder}
+    return application
+
+
+@pytest.fixture
+def model_checker(application):
+    with patch("plugins.ModelChecker.ModelChecker.Application.getInstance", MagicMock(return_value = application)):
+        with patch("plugins.ModelChecker.ModelChecker.DepthFirstIterator", iterateNodes):
+            model_checker = ModelChecker()
+            model_checker._update_timer = MagicMock()
+            model_checker._caution_message = MagicMock()
+            model_checker._update()
+            yield model_checker
+
+
+def test_nodeChangeChecksOneNode(model_checker, scene_root):
+    cube = MockNode("cube", scene_root)
+    sphere = MockNode("sphere", scene_root)
+    model_checker._onSceneChanged(scene_root)
+    model_checker._update()
+    assert cube.getBoundingBox.call_count == 1
+    assert sphere.getBoundingBox.call_count == 1
+
+    # Moving a model adds a convex hull to the root, which doesn't need any check.
+    model_checker._update_timer.reset_mock()
+    hull = MockNode("hull", scene_root, decorations = {})
+    model_checker._onSceneChanged(scene_root)
+    model_checker._onSceneChanged(hull)
+    model_checker._update_timer.start.assert_not_called()
+
+    model_checker._onSceneChanged(cube)
+    model_checker._update()
+    assert cube.getBoundingBox.call_count == 2
+    assert sphere.getBoundingBox.call_count == 1  # Only the model that changed is checked again.
+
+
+def test_groupChangeChecksItsNodes(model_checker, scene_root):
+    group = MockNode("group", scene_root, decorations = {"isGroup": True})
+    cube = MockNode("cube", group)
+    sphere = MockNode("sphere", scene_root)
+    model_checker._onSceneChanged(scene_root)
+    model_checker._update()
+
+    model_checker._onSceneChanged(group)
+    model_checker._update()
+    assert cube.getBoundingBox.call_count == 2
+    assert sphere.getBoundingBox.call_count == 1
+
+    # Taking a model out of the group checks everything again.
+    cube.setParent(scene_root)
+    model_checker._onSceneChanged(group)
+    model_checker._update()
+    assert cube.getBoundingBox.call_count == 3
+    assert sphere.getBoundingBox.call_count == 2
+
+
+def test_addAndRemoveNodes(model_checker, scene_root):
+    cube = MockNode("cube", scene_root, size = 200)
+    model_checker._onSceneChanged(scene_root)
+    model_checker._update()
+    assert model_checker.hasWarnings
+
+    cube.setParent(None)
+    model_checker._onSceneChanged(scene_root)
+    model_checker._update()
+    assert not model_checker.hasWarnings
+
+
+def test_materialChangeDoesNotMeasure(model_checker, application, scene_root):
+    cube = MockNode("cube", scene_root, size = 200)
+    model_checker._onSceneChanged(scene_root)
+    model_checker._update()
+    assert model_checker.hasWarnings
+
+    # A material that doesn't shrink as much only changes the result, the model isn't checked again.
+    application.getGlobalContainerStack().extruders["0"].material.getProperty.return_value = 0
+    model_checker._onMaterialChanged()
+    model_checker._update()
+    assert not model_checker.hasWarnings
+    assert cube.getBoundingBox.call_count == 1
+
+
+def test_onChangedOnlyWhenResultChanges(model_checker, scene_root):
+    changes = []
+    model_checker.onChanged.connect(lambda: changes.append(model_checker.hasWarnings))
+    cube = MockNode("cube", scene_root, size = 200)
+    model_checker._onSceneChanged(scene_root)
+    model_checker._update()
+    assert changes == [True]
+
+    cube.size = 190  # Still too large.
+    model_checker._onSceneChanged(cube)
+    model_checker._update()
+    assert changes == [True]
+
+    cube.size = 10
+    model_checker._onSceneChanged(cube)
+    model_checker._update()
+    assert changes == [True, False]
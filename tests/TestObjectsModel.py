@@ -0,0 +1,131 @@
+import builtins
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from UM.Scene.SceneNode import SceneNode
+
+from steslicer.ObjectsModel import ObjectsModel
+
+
+##  A sliceable node with only what the objects model uses.
+class MockNode(SceneNode):
+    def __init__(self, name, parent = None):  # Doesn't call the constructor of SceneNode, nothing of it is used.
+        self._name = name
+        self._parent = parent
+        self._children = []
+        self.is_outside_build_area = False
+        if parent is not None:
+            parent._children.append(self)
+
+    def getName(self):
+        return self._name
+
+    def setName(self, name):
+        self._name = name
+
+    def getParent(self):
+        return self._parent
+
+    def getMeshData(self):
+        return self._parent is not None
+
+    def isOutsideBuildArea(self):
+        return self.is_outside_build_area
+
+    def callDecoration(self, function):
+        return {"isSliceable": self._parent is not None, "getBuildPlateNumber": 0}.get(function)
+
+    def remove(self):
+        self._parent._children.remove(self)
+        self._parent = None
+
+
+def iterateNodes(node):
+    for child in node._children:
+        yield child
+        yield from iterateNodes(child)
+
+
+@pytest.fixture
+def model_and_root():
+    root = MockNode("root")
+    application = MagicMock()
+    application.getController().getScene().getRoot.return_value = root
+    application.getPreferences().getValue.return_value = False  # Don't filter by build plate.
+    with patch("steslicer.ObjectsModel.Application.getInstance", MagicMock(return_value = application)):
+        with patch("steslicer.ObjectsModel.DepthFirstIterator", iterateNodes):
+            model = ObjectsModel()
+            model._update_timer = MagicMock()
+            yield model, root
+
+
+def getNames(model):
+    return [item["name"] for item in model.items]
+
+
+def test_insertAndRemove(model_and_root):
+    model, root = model_and_root
+    cube = MockNode("cube", root)
+    MockNode("sphere", root)
+    model._update()
+    assert getNames(model) == ["cube", "sphere"]
+    cube_item = model.items[0]
+
+    MockNode("cone", root)
+    model._onSceneChanged(root)
+    model._update()
+    assert getNames(model) == ["cone", "cube", "sphere"]
+    assert model.items[1] is cube_item  # The rows of the other nodes are kept.
+
+    cube.remove()
+    model._onSceneChanged(root)
+    model._update()
+    assert getNames(model) == ["cone", "sphere"]
+    assert model._rows == {id(item["node"]): row for row, item in enumerate(model.items)}
+
+
+def test_move(model_and_root):
+    model, root = model_and_root
+    cube = MockNode("cube", root)
+    MockNode("sphere", root)
+    model._update()
+
+    # Moving a node only updates its row, the list of objects is not recomputed.
+    cube.is_outside_build_area = True
+    model._onSceneChanged(cube)
+    with patch.object(model, "_createItems") as create_items:
+        model._update()
+    create_items.assert_not_called()
+    assert [item["isOutsideBuildArea"] for item in model.items] == [True, False]
+
+
+def test_rename(model_and_root):
+    model, root = model_and_root
+    cube = MockNode("cube", root)
+    MockNode("sphere", root)
+    model._update()
+
+    cube.setName("tetrahedron")
+    model._onSceneChanged(cube)
+    model._update()
+    assert getNames(model) == ["sphere", "tetrahedron"]
+    assert model.items[1]["node"] is cube
+    assert model._rows == {id(item["node"]): row for row, item in enumerate(model.items)}
+
+
+def test_reusedNodeId(model_and_root):
+    model, root = model_and_root
+    cube = MockNode("cube", root)
+    model._update()
+
+    # The cube is deleted and a new node with the same name gets its id.
+    cube.remove()
+    new_cube = MockNode("cube", root)
+    reused_ids = {builtins.id(new_cube): builtins.id(cube)}
+    with patch("steslicer.ObjectsModel.id", lambda node: reused_ids.get(builtins.id(node), builtins.id(node)), create = True):
+        model._onSceneChanged(new_cube)
+        model._update()
+
+    assert getNames(model) == ["cube"]
+    assert model.items[0]["node"] is new_cube
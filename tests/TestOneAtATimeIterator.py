@@ -0,0 +1,20 @@
+import numpy
+
+from steslicer.OneAtATimeIterator import _findCandidatePairs, _getPrintOrder
+
+
+def test_findCandidatePairs():
+    bounding_boxes = numpy.array([[0, 0, 10, 10], [20, 0, 30, 10], [100, 100, 110, 110]], dtype = numpy.float64)
+    head_boxes = numpy.array([[-5, -5, 20, 15], [15, -5, 40, 15], [95, 95, 115, 115]], dtype = numpy.float64)
+
+    pairs = _findCandidatePairs(bounding_boxes, head_boxes)
+
+    # The head of the first node touches the second node, but not the other way around. The third node is far away.
+    assert pairs.tolist() == [[1, 0]]
+
+
+def test_getPrintOrder():
+    hull_boxes = numpy.array([[50, 0, 60, 10], [0, 50, 10, 60], [0, 0, 10, 10]], dtype = numpy.float64)
+
+    assert _getPrintOrder(hull_boxes, [100, 100], False, False).tolist() == [2, 1, 0]
+    assert _getPrintOrder(hull_boxes, [100, 100], True, False).tolist() == [0, 2, 1]  # Start on the high x side.
@@ -0,0 +1,30 @@
+import gzip
+
+from steslicer.PrinterOutput.ParallelGzipCompressor import ParallelGzipCompressor
+
+
+def test_membersFormOneGzipStream():
+    lines = ["G1 X%s Y%s E%s\n" % (i, i * 2, i * 0.1) for i in range(20000)]
+    compressor = ParallelGzipCompressor(max_workers = 3, batch_size = 4096)
+    members = list(compressor.compress(lines))
+
+    assert len(members) > 1
+    assert gzip.decompress(b"".join(members)).decode("utf-8") == "".join(lines)
+
+
+def test_emptyInput():
+    compressor = ParallelGzipCompressor()
+
+    assert list(compressor.compress([])) == []
+
+
+def test_cancel():
+    lines = ["G1 X%s\n" % i for i in range(20000)]
+    compressor = ParallelGzipCompressor(max_workers = 2, batch_size = 1024)
+    members = []
+    for member in compressor.compress(lines):
+        members.append(member)
+        compressor.cancel()
+
+    assert len(members) == 1
+    assert compressor.isCancelled()
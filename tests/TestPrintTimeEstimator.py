@@ -0,0 +1,57 @@
+import numpy
+import pytest
+
+from steslicer.LayerPolygon import LayerPolygon
+from steslicer.Utils.PrintTimeEstimator import PrintTimeEstimator
+
+
+##  A single straight move accelerates, cruises and decelerates.
+def test_straightLine():
+    estimator = PrintTimeEstimator(acceleration = 4000, max_jerk_xy = 20)
+    points = numpy.array([[0, 0, 0], [100, 0, 0]], dtype = numpy.float64)
+    times = estimator.estimateSegmentTimes(points, numpy.array([100.0]))
+
+    assert len(times) == 1
+    # Never faster than the nominal speed, slightly slower due to acceleration.
+    assert 1.0 < times[0] < 1.05
+
+
+##  Many short segments on a smooth curve keep the speed at the junctions.
+def test_smoothCurveIsNearNominal():
+    estimator = PrintTimeEstimator()
+    angles = numpy.linspace(0, 2 * numpy.pi, 2000)
+    points = numpy.column_stack((50 * numpy.cos(angles), 50 * numpy.sin(angles), numpy.zeros(2000)))
+    times = estimator.estimateSegmentTimes(points, numpy.full(1999, 60.0))
+
+    assert times.sum() == pytest.approx(2 * numpy.pi * 50 / 60, rel = 0.01)
+
+
+##  Retractions don't move the head, the time comes from the filament move.
+def test_retractionTime():
+    estimator = PrintTimeEstimator()
+    points = numpy.zeros((2, 3), dtype = numpy.float64)
+    times = estimator.estimateSegmentTimes(points, numpy.array([25.0]), extrusions = numpy.array([5.0]))
+
+    assert times[0] >= 5.0 / 25.0
+
+
+##  Pure rotary moves are limited by the rotary axis speed.
+def test_rotaryOnlyMove():
+    estimator = PrintTimeEstimator(max_feedrate_ac = (90.0, 180.0))
+    points = numpy.zeros((2, 3), dtype = numpy.float64)
+    rotary = numpy.array([[0, 0], [0, 360]], dtype = numpy.float64)
+    times = estimator.estimateSegmentTimes(points, numpy.array([100.0]), rotary = rotary)
+
+    assert times[0] == pytest.approx(2.0)
+
+
+def test_accumulateTimesPerFeature():
+    estimator = PrintTimeEstimator()
+    points = numpy.array([[0, 0, 0], [10, 0, 0], [20, 0, 0]], dtype = numpy.float64)
+    line_types = numpy.array([LayerPolygon.MoveCombingType, LayerPolygon.InfillType])
+    times = {"travel": 1.0}
+    total = estimator.accumulateTimes(times, points, numpy.array([150.0, 50.0]), line_types)
+
+    assert times["travel"] > 1.0
+    assert times["infill"] > 0.2
+    assert total == pytest.approx(times["travel"] - 1.0 + times["infill"])
@@ -0,0 +1,120 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from steslicer.Machines.QualityManager import QualityManager
+
+
+def createQuality(quality_id, definition = "fdmprinter", quality_type = "normal", **kwargs):
+    metadata = {"id": quality_id, "type": "quality", "definition": definition, "quality_type": quality_type, "name": quality_type}
+    metadata.update(kwargs)
+    return metadata
+
+
+class MockContainerRegistry:
+    def __init__(self, metadatas):
+        self.metadata = {metadata["id"]: metadata for metadata in metadatas}
+        self.containerMetaDataChanged = MagicMock()
+        self.containerAdded = MagicMock()
+        self.containerRemoved = MagicMock()
+
+    def findContainersMetadata(self, **kwargs):
+        return [metadata for metadata in self.metadata.values() if all(metadata.get(key) == value for key, value in kwargs.items())]
+
+
+@pytest.fixture
+def application():
+    application = MagicMock()
+    with patch("UM.Application.Application.getInstance", MagicMock(return_value = application)):
+        yield application
+
+
+def createQualityManager(application, container_registry):
+    application.getContainerRegistry.return_value = container_registry
+    manager = QualityManager(application)
+    manager.initialize()
+    return manager
+
+
+def notifyChanged(manager, metadata):
+    container = MagicMock()
+    container.getId = MagicMock(return_value = metadata["id"])
+    container.getMetaDataEntry = lambda key, default = None: metadata.get(key, default)
+    manager._onContainerChanged(container)
+
+
+def getLookupTables(manager):
+    def nodeToDict(node):
+        return {"qualities": {quality_type: child.getMetaDataEntry("id") for quality_type, child in node.quality_type_map.items()},
+                "children": {name: nodeToDict(child) for name, child in node.children_map.items()}}
+
+    def qualityChangesToDict(node):
+        return {quality_type: {name: (group.node_for_global and group.node_for_global.getMetaDataEntry("id"),
+                                      {position: extruder_node.getMetaDataEntry("id") for position, extruder_node in group.nodes_for_extruders.items()})
+                               for name, group in quality_type_node.children_map.items()}
+                for quality_type, quality_type_node in node.quality_type_map.items()}
+
+    return {
+        "qualities": {definition_id: nodeToDict(node) for definition_id, node in manager._machine_nozzle_buildplate_material_quality_type_to_quality_dict.items()},
+        "quality_changes": {definition_id: qualityChangesToDict(node) for definition_id, node in manager._machine_quality_type_to_quality_changes_dict.items()}
+    }
+
+
+def test_incrementalUpdateMatchesFullUpdate(application):
+    container_registry = MockContainerRegistry([
+        createQuality("fdmprinter_normal", global_quality = True),
+        createQuality("machine_normal", definition = "machine", global_quality = True),
+        createQuality("machine_04_pla_normal", definition = "machine", variant = "0.4", material = "generic_pla"),
+        createQuality("machine_04_pla_fine", definition = "machine", variant = "0.4", material = "generic_pla", quality_type = "fine"),
+        {"id": "my_profile", "type": "quality_changes", "definition": "machine", "quality_type": "normal", "name": "My profile"},
+        {"id": "my_profile_0", "type": "quality_changes", "definition": "machine", "quality_type": "normal", "name": "My profile", "position": "0"}
+    ])
+    manager = createQualityManager(application, container_registry)
+
+    # Remove a profile, add one and change one.
+    removed = container_registry.metadata.pop("machine_04_pla_fine")
+    added = createQuality("machine_08_pla_normal", definition = "machine", variant = "0.8", material = "generic_pla")
+    container_registry.metadata[added["id"]] = added
+    container_registry.metadata["my_profile_0"]["name"] = "Other profile"
+    for metadata in (removed, added, container_registry.metadata["my_profile_0"]):
+        notifyChanged(manager, metadata)
+    manager._updateMaps()
+
+    assert getLookupTables(manager) == getLookupTables(createQualityManager(application, container_registry))
+    assert "Other profile" in manager._machine_quality_type_to_quality_changes_dict["machine"].quality_type_map["normal"].children_map
+
+    # Removing the last profile of a branch removes the branch, so it doesn't look like the machine has extruder qualities.
+    for quality_id in ("machine_04_pla_normal", "machine_08_pla_normal"):
+        notifyChanged(manager, container_registry.metadata.pop(quality_id))
+    manager._updateMaps()
+
+    assert not manager._machine_nozzle_buildplate_material_quality_type_to_quality_dict["machine"].children_map
+    assert getLookupTables(manager) == getLookupTables(createQualityManager(application, container_registry))
+
+
+# When two profiles are for the same quality type in the same place of the tree, the one with the lowest ID is used,
+# however they are added.
+def test_lowestIdWinsOnConflicts(application):
+    container_registry = MockContainerRegistry([
+        createQuality("machine_normal_b", definition = "machine", global_quality = True),
+        createQuality("machine_normal_a", definition = "machine", global_quality = True)
+    ])
+    manager = createQualityManager(application, container_registry)
+
+    def getNormalQualityId():
+        return manager._machine_nozzle_buildplate_material_quality_type_to_quality_dict["machine"].getQualityNode("normal").getMetaDataEntry("id")
+
+    assert getNormalQualityId() == "machine_normal_a"
+
+    # Adding a profile with a higher ID changes nothing, one with a lower ID takes over.
+    for quality_id in ("machine_normal_c", "machine_normal_0"):
+        added = createQuality(quality_id, definition = "machine", global_quality = True)
+        container_registry.metadata[quality_id] = added
+        notifyChanged(manager, added)
+        manager._updateMaps()
+    assert getNormalQualityId() == "machine_normal_0"
+
+    # When it's removed, the next one takes its place again.
+    notifyChanged(manager, container_registry.metadata.pop("machine_normal_0"))
+    manager._updateMaps()
+    assert getNormalQualityId() == "machine_normal_a"
@@ -0,0 +1,144 @@
+import io
+import json
+import os
+import socket
+import sys
+import time
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+
+from steslicer.BatchSlicing.SlicingJobServer import SlicingJobClient, SlicingJobServer
+
+# Stands in for a headless STE Slicer worker: it speaks the worker protocol and writes some g-code.
+FAKE_WORKER = """
+import json, os, socket, sys
+host, port = sys.argv[sys.argv.index("--slicing-worker") + 1].split(":")
+connection = socket.create_connection((host, int(port)))
+stream = connection.makefile("rwb")
+def send(message):
+    stream.write(json.dumps(message).encode("utf-8") + b"\\n")
+    stream.flush()
+send({"event": "ready", "secret": os.environ["STESLICER_SLICING_WORKER_SECRET"]})
+for line in stream:
+    message = json.loads(line.decode("utf-8"))
+    if message["command"] == "quit":
+        break
+    job = message["job"]
+    send({"event": "progress", "job_id": job["id"], "stage": "slice", "progress": 0.5})
+    with open(job["output"], "w") as f:
+        f.write(";" + job["machine"] + "\\nG28\\n")
+    send({"event": "finished", "job_id": job["id"], "result": {"status": "succeeded", "timings": {"slice": 0.1}}})
+"""
+
+
+def startServer(tmpdir, **kwargs):
+    worker_file = tmpdir.join("worker.py")
+    worker_file.write(FAKE_WORKER)
+    job_server = SlicingJobServer(port = 0, workers = 2, spool_path = str(tmpdir.join("spool")),
+                                  worker_command = [sys.executable, str(worker_file)], **kwargs)
+    job_server.start()
+    return job_server
+
+
+@pytest.fixture
+def server(tmpdir):
+    job_server = startServer(tmpdir)
+    yield job_server
+    job_server.stop()
+
+
+def sliceJob(server, tmpdir):
+    model_file = tmpdir.join("cube.stl")
+    model_file.write("solid cube\nendsolid cube\n")
+    client = SlicingJobClient(server.getToken(), server.getPort())
+    job = client.submitJob({"models": [client.uploadModel(str(model_file))], "machine": "ste320"})
+    events = list(client.watchJob(job["id"]))
+    return client, events[-1]
+
+
+def test_sliceJob(server, tmpdir):
+    model_file = tmpdir.join("cube.stl")
+    model_file.write("solid cube\nendsolid cube\n")
+    client = SlicingJobClient(server.getToken(), server.getPort())
+
+    model_path = client.uploadModel(str(model_file))
+    job = client.submitJob({"models": [model_path], "machine": "ste320"})
+    events = list(client.watchJob(job["id"]))
+    gcode = io.BytesIO()
+    client.downloadGCode(job["id"], gcode)
+
+    assert events[-1]["status"] == "succeeded"
+    assert events[-1]["timings"] == {"slice": 0.1}
+    assert gcode.getvalue() == b";ste320\nG28\n"
+
+
+def test_rejectsInvalidJob(server):
+    with pytest.raises(ValueError):
+        server.submitJob({"models": ["relative.stl"]})
+
+
+def test_rejectsPathsOutsideSpoolFolder(server, tmpdir):
+    model_file = tmpdir.join("cube.stl")
+    model_file.write("solid cube\nendsolid cube\n")
+    with pytest.raises(ValueError):
+        server.submitJob({"models": [str(model_file)], "machine": "ste320"})
+    with pytest.raises(ValueError):
+        server.submitJob({"models": ["models/cube.stl"], "machine": "ste320", "output": str(tmpdir.join("cube.gcode"))})
+    with pytest.raises(ValueError):
+        server.submitJob({"models": ["models/cube.stl"], "machine": "ste320", "output": "../cube.gcode"})
+
+
+@pytest.mark.parametrize("headers, status", [
+    ({"Authorization": None}, 401),  # No token.
+    ({"Authorization": "Bearer wrong"}, 401),
+    ({"Content-Type": "text/plain"}, 415),  # As a form in a web page would send it.
+    ({"Origin": "http://example.com"}, 403),
+    ({"Host": "example.com"}, 403)  # A DNS rebinding attack.
+])
+def test_rejectsForeignRequests(server, headers, status):
+    request_headers = {"Authorization": "Bearer " + server.getToken(), "Content-Type": "application/json"}
+    request_headers.update(headers)
+    request = Request("http://127.0.0.1:{port}/jobs".format(port = server.getPort()), method = "POST",
+                      headers = {key: value for key, value in request_headers.items() if value is not None},
+                      data = json.dumps({"models": ["models/cube.stl"], "machine": "ste320"}).encode("utf-8"))
+    with pytest.raises(HTTPError) as error:
+        urlopen(request)
+    assert error.value.code == status
+    assert server.getJobs() == []
+
+
+def test_rejectsWorkersWithoutSecret(server):
+    # A process that pretends to be a worker gets no jobs.
+    connection = socket.create_connection(("127.0.0.1", server._worker_listener.getsockname()[1]))
+    stream = connection.makefile("rwb")
+    stream.write(b'{"event": "ready", "secret": "guessed"}\n')
+    stream.flush()
+    assert stream.readline() == b""  # The server closed the connection.
+    connection.close()
+
+
+def test_removesFetchedJobs(server, tmpdir):
+    client, job = sliceJob(server, tmpdir)
+    output = os.path.join(str(tmpdir.join("spool")), job["id"] + ".gcode")
+    assert os.path.isfile(output)
+
+    client.downloadGCode(job["id"], io.BytesIO())
+    # The job is removed after the server sent the last of the g-code, which can be just after the client got it.
+    deadline = time.time() + 5
+    while server.getJob(job["id"]) is not None and time.time() < deadline:
+        time.sleep(0.01)
+    assert server.getJob(job["id"]) is None
+    assert not os.path.exists(output)
+
+
+def test_removesExpiredJobs(tmpdir):
+    server = startServer(tmpdir, job_retention = 0)
+    try:
+        _, job = sliceJob(server, tmpdir)
+        time.sleep(0.01)
+        assert server.getJobs() == []
+        assert not os.path.exists(os.path.join(str(tmpdir.join("spool")), job["id"] + ".gcode"))
+    finally:
+        server.stop()
@@ -0,0 +1,115 @@
+from unittest.mock import MagicMock, patch
+
+import numpy
+import trimesh
+
+from steslicer.Utils.SplitTree import SplitTree
+
+
+def createSplitTree():
+    split_tree = SplitTree(max_cached_cuts = 4, max_workers = 0)
+    split_tree._repair = MagicMock(side_effect = lambda mesh: mesh)
+    return split_tree
+
+
+def createMesh():
+    return trimesh.Trimesh(vertices = numpy.zeros((3, 3)), faces = numpy.array([[0, 1, 2]]), process = False)
+
+
+##  Moves what is left down by one and what is cut off up by ten, so the
+#   pieces tell which cuts they went through.
+def fakeSplitByPlaneOneSide(mesh, normal, origin, cap, cached_dots = None, reversed = False):
+    return trimesh.Trimesh(vertices = mesh.vertices - 1, faces = mesh.faces, process = False)
+
+
+def fakeCutOff(vertices, faces, normal, origin):
+    return vertices + 10, faces
+
+
+def fakeSplit(split_by_plane_one_side = None, cut_off = None):
+    return patch.multiple("steslicer.Utils.SplitTree",
+                          SplitByPlaneOneSide = split_by_plane_one_side or MagicMock(side_effect = fakeSplitByPlaneOneSide),
+                          _cutOff = cut_off or MagicMock(side_effect = fakeCutOff))
+
+
+planes = [(numpy.array([0.0, 1.0, 0.0]), numpy.array([0.0, 0.0, 0.0])),
+          (numpy.array([0.0, 0.0, 1.0]), numpy.array([0.0, 0.0, 5.0]))]
+
+
+def test_createMeshKey():
+    vertices = numpy.zeros((3, 3), dtype = numpy.float32)
+    faces = numpy.array([[0, 1, 2]])
+    transformation = numpy.identity(4)
+    moved = numpy.identity(4)
+    moved[0, 3] = 10
+
+    assert SplitTree.createMeshKey(vertices, faces, transformation) == SplitTree.createMeshKey(vertices.copy(), faces, transformation)
+    assert SplitTree.createMeshKey(vertices, faces, transformation) != SplitTree.createMeshKey(vertices, faces, moved)
+
+
+def test_splitOrder():
+    split_tree = createSplitTree()
+    with fakeSplit():
+        pieces = split_tree.split(b"mesh", createMesh, planes, 0.5)
+
+    # The last plane is cut off first, what is left of the mesh comes last.
+    assert [plane for _, plane in pieces] == [planes[1], planes[0], None]
+    assert [piece.vertices[0, 0] for piece, _ in pieces] == [10, 9, -2]
+
+
+def test_splitCached():
+    split_tree = createSplitTree()
+    create_mesh = MagicMock(side_effect = createMesh)
+    split_by_plane = MagicMock(side_effect = fakeSplitByPlaneOneSide)
+    with fakeSplit(split_by_plane_one_side = split_by_plane):
+        first_pieces = split_tree.split(b"mesh", create_mesh, planes, 0.5)
+        assert split_tree.split(b"mesh", create_mesh, planes, 0.5) == first_pieces
+        assert create_mesh.call_count == 1
+        assert split_by_plane.call_count == 2
+
+        # Only the cuts after the changed plane are made again.
+        split_tree.split(b"mesh", create_mesh, [(numpy.array([1.0, 0.0, 0.0]), planes[0][1]), planes[1]], 0.5)
+        assert split_by_plane.call_count == 3
+
+        # A different overlap changes every cut.
+        split_tree.split(b"mesh", create_mesh, planes, 0)
+        assert split_by_plane.call_count == 5
+    assert create_mesh.call_count == 1
+
+
+def test_splitNothingCutOff():
+    split_tree = createSplitTree()
+    with fakeSplit(cut_off = MagicMock(return_value = None)):
+        pieces = split_tree.split(b"mesh", createMesh, planes, 0.5)
+
+    assert len(pieces) == 1
+    assert pieces[0][1] is None
+
+
+def test_splitOnProcessPool():
+    box = trimesh.creation.box(extents = (10, 10, 10))
+    box_planes = [(numpy.array([0.0, 0.0, 1.0]), numpy.array([0.0, 0.0, -2.0])),
+                  (numpy.array([0.0, 0.0, 1.0]), numpy.array([0.0, 0.0, 2.0]))]
+    expected_pieces = SplitTree(max_workers = 0).split(b"box", box.copy, box_planes, 0)
+
+    split_tree = SplitTree(max_workers = 1)
+    try:
+        pieces = split_tree.split(b"box", box.copy, box_planes, 0)
+        assert split_tree._executor is not None  # The pieces were cut off by a worker process.
+    finally:
+        if split_tree._executor is not None:
+            split_tree._executor.shutdown()
+
+    assert len(pieces) == len(expected_pieces) == 3
+    for (piece, plane), (expected_piece, expected_plane) in zip(pieces, expected_pieces):
+        assert plane is expected_plane
+        numpy.testing.assert_allclose(piece.vertices, expected_piece.vertices)
+        numpy.testing.assert_array_equal(piece.faces, expected_piece.faces)
+
+
+def test_noProcessPoolInFrozenBuilds():
+    with patch("steslicer.Utils.SplitTree.sys.frozen", True, create = True):
+        with patch("steslicer.Utils.SplitTree.Platform.isWindows", MagicMock(return_value = False)):
+            assert SplitTree(max_workers = 2)._max_workers == 0
+        with patch("steslicer.Utils.SplitTree.Platform.isWindows", MagicMock(return_value = True)):
+            assert SplitTree(max_workers = 2)._max_workers == 2
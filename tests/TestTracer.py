@@ -0,0 +1,44 @@
+import json
+
+from steslicer.Utils.Tracer import Tracer
+
+
+def test_disabled():
+    tracer = Tracer()
+    with tracer.span("stage"):
+        pass
+    tracer.startSpan("engine").end()
+    assert tracer.getSpans() == []
+
+
+def test_nestedSpans(tmpdir):
+    tracer = Tracer()
+    tracer.setEnabled(True)
+    with tracer.span("slice", build_plate = 0):
+        with tracer.span("start job", build_plate = 0):
+            pass
+        engine_span = tracer.startSpan("engine", build_plate = 0)
+    engine_span.end(layers = 12)
+    engine_span.end()  # Only recorded once.
+
+    spans = tracer.getSpans()
+    assert [span["name"] for span in spans] == ["start job", "slice", "engine"]
+    assert spans[2]["args"] == {"build_plate": 0, "layers": 12}
+    start_job, slice_span = spans[0], spans[1]
+    assert slice_span["start"] <= start_job["start"]
+    assert start_job["start"] + start_job["duration"] <= slice_span["start"] + slice_span["duration"]
+
+    file_name = str(tmpdir.join("trace.json"))
+    tracer.saveChromeTrace(file_name)
+    with open(file_name) as f:
+        trace = json.load(f)
+    assert sorted(event["name"] for event in trace["traceEvents"] if event["ph"] == "X") == ["engine", "slice", "start job"]
+
+
+def test_ringBuffer():
+    tracer = Tracer(capacity = 3)
+    tracer.setEnabled(True)
+    for index in range(5):
+        with tracer.span("stage", index = index):
+            pass
+    assert [span["args"]["index"] for span in tracer.getSpans()] == [2, 3, 4]
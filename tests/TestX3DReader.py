@@ -0,0 +1,79 @@
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from plugins.X3DReader.X3DReader import X3DReader
+
+
+##  Reads a single geometry node, as X3DReader.processShape does, and returns
+#   the reader with its vertices and faces.
+def readGeometry(xml, index_base = 0):
+    reader = X3DReader()
+    reader.defs = {}
+    reader.index_base = index_base
+    reader.verts = reader.faces = []
+    node = ET.fromstring(xml)
+    reader.geometry_importers[node.tag](reader, node)
+    return reader
+
+
+def assertFaces(reader, expected_faces):
+    assert reader.num_faces == len(expected_faces)
+    assert reader.faces.tolist() == expected_faces
+
+
+# Two runs that share nothing, so every face shows which run it comes from.
+RUNS = "0 1 2 3 -1 4 5 6"
+COORDINATES = "<Coordinate point='0 0 0, 1 0 0, 1 1 0, 0 1 0, 2 0 0, 3 0 0, 3 1 0'/>"
+
+
+@pytest.mark.parametrize("ccw, expected_faces", [
+    ("true", [[0, 1, 2], [2, 1, 3], [4, 5, 6]]),
+    ("false", [[1, 0, 2], [1, 2, 3], [5, 4, 6]])  # Every other triangle is flipped, starting over for every strip.
+])
+def test_indexedTriangleStripSet(ccw, expected_faces):
+    reader = readGeometry("<IndexedTriangleStripSet ccw='{ccw}' index='{runs}'>{coordinates}</IndexedTriangleStripSet>".format(ccw = ccw, runs = RUNS, coordinates = COORDINATES))
+    assertFaces(reader, expected_faces)
+
+
+@pytest.mark.parametrize("ccw, expected_faces", [
+    ("true", [[0, 1, 2], [0, 2, 3], [4, 5, 6]]),
+    ("false", [[0, 2, 1], [0, 3, 2], [4, 6, 5]])
+])
+def test_indexedTriangleFanSet(ccw, expected_faces):
+    reader = readGeometry("<IndexedTriangleFanSet ccw='{ccw}' index='{runs} -1'>{coordinates}</IndexedTriangleFanSet>".format(ccw = ccw, runs = RUNS, coordinates = COORDINATES))
+    assertFaces(reader, expected_faces)
+
+
+# Triangles come first, then convex quads, then the other polygons. Empty runs are skipped.
+@pytest.mark.parametrize("ccw, expected_faces", [
+    ("true", [[4, 5, 6], [3, 0, 1], [1, 2, 3]]),
+    ("false", [[5, 4, 6], [0, 3, 1], [2, 1, 3]])
+])
+def test_indexedFaceSet(ccw, expected_faces):
+    reader = readGeometry("<IndexedFaceSet ccw='{ccw}' coordIndex='0 1 2 3 -1 -1 4 5 6 -1'>{coordinates}</IndexedFaceSet>".format(ccw = ccw, coordinates = COORDINATES))
+    assertFaces(reader, expected_faces)
+
+
+def test_indexedFaceSetConcavePolygons():
+    # An arrow head and a pentagon are cut up one ear at a time.
+    reader = readGeometry("<IndexedFaceSet coordIndex='0 1 2 3 -1 4 5 6 7 8'><Coordinate point='0 0 0, 2 1 0, 0 2 0, 1 1 0, 0 0 0, 2 0 0, 3 1 0, 1 2 0, -1 1 0'/></IndexedFaceSet>")
+    assertFaces(reader, [[3, 0, 1], [1, 2, 3], [5, 6, 7], [4, 5, 7], [4, 7, 8]])
+
+
+@pytest.mark.parametrize("ccw, expected_faces", [
+    ("true", [[0, 4, 1], [0, 3, 4], [1, 5, 2], [1, 4, 5]]),
+    ("false", [[4, 0, 1], [3, 0, 4], [5, 1, 2], [4, 1, 5]])
+])
+def test_elevationGrid(ccw, expected_faces):
+    reader = readGeometry("<ElevationGrid ccw='{ccw}' xDimension='3' zDimension='2' xSpacing='0.5' zSpacing='2' height='0 1 2 3 4 5'/>".format(ccw = ccw))
+
+    assertFaces(reader, expected_faces)
+    # The vertices go along x first, then along z.
+    assert reader.verts[:3].transpose().tolist() == [[0, 0, 0], [0.5, 1, 0], [1, 2, 0], [0, 3, 2], [0.5, 4, 2], [1, 5, 2]]
+
+
+def test_indexBase():
+    # The indices of the faces are offset by the number of vertices of the shapes that were read before.
+    reader = readGeometry("<IndexedTriangleFanSet index='{runs}'>{coordinates}</IndexedTriangleFanSet>".format(runs = RUNS, coordinates = COORDINATES), index_base = 10)
+    assertFaces(reader, [[10, 11, 12], [10, 12, 13], [14, 15, 16]])
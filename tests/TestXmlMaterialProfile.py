@@ -0,0 +1,84 @@
+import copy
+import glob
+import json
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from plugins.XmlMaterialProfile.XmlMaterialProfile import XmlMaterialProfile
+from steslicer.Settings.MaterialCache import MaterialCache
+
+material_files = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "..", "resources", "materials", "*.xml.fdm_material")))
+product_id_file = os.path.join(os.path.dirname(__file__), "..", "plugins", "XmlMaterialProfile", "product_to_id.json")
+
+
+##  A registry in which every printer and variant exists.
+class MockContainerRegistry:
+    def __init__(self):
+        self.containers = {}
+
+    def findDefinitionContainersMetadata(self, id):
+        return [{"id": id, "manufacturer": "Unknown"}]
+
+    def findInstanceContainersMetadata(self, **kwargs):
+        return [kwargs]
+
+    def isLoaded(self, container_id):
+        return container_id in self.containers
+
+    def findContainers(self, id):
+        return [self.containers[id]]
+
+    def addContainer(self, container):
+        self.containers[container.getId()] = container
+
+
+@pytest.fixture
+def container_registry():
+    container_registry = MockContainerRegistry()
+    with patch("plugins.XmlMaterialProfile.XmlMaterialProfile.ContainerRegistry.getInstance", MagicMock(return_value = container_registry)):
+        with patch("plugins.XmlMaterialProfile.XmlMaterialProfile.SteSlicerApplication.getInstance", MagicMock()):
+            yield container_registry
+    XmlMaterialProfile.setMaterialCache(None)
+
+
+##  Reads all bundled materials, returning what deserializeMetadata and
+#   deserialize made of them.
+def readMaterials(container_registry):
+    XmlMaterialProfile._product_id_map = None  # Read the mapping again in every run, to see that it isn't changed.
+    metadata = {}
+    containers = {}
+    for material_file in material_files:
+        with open(material_file, encoding = "utf-8") as f:
+            serialized = f.read()
+        material_id = os.path.basename(material_file).split(".")[0]
+
+        metadata[material_id] = copy.deepcopy(XmlMaterialProfile.deserializeMetadata(serialized, material_id))
+
+        container_registry.containers = {}
+        material = XmlMaterialProfile(material_id)
+        material.deserialize(serialized)
+        container_registry.addContainer(material)
+        containers[material_id] = {container_id: (copy.deepcopy(container.getMetaData()), container._cached_values) for container_id, container in container_registry.containers.items()}
+    return metadata, containers, XmlMaterialProfile.getProductIdMap()
+
+
+# The material cache must give the same materials as parsing the files, both when it's filled and when it's read.
+def test_cachedMaterialsMatchParsedMaterials(container_registry, tmpdir):
+    assert material_files
+
+    parsed = readMaterials(container_registry)
+    with open(product_id_file, encoding = "utf-8") as f:
+        assert parsed[2] == {product: [definition_id] for product, definition_id in json.load(f).items()}
+
+    cache_file = str(tmpdir.join("materials.cache"))
+    XmlMaterialProfile.setMaterialCache(MaterialCache(cache_file, "key"))
+    assert readMaterials(container_registry) == parsed
+    XmlMaterialProfile._material_cache.save()
+
+    cache = MaterialCache(cache_file, "key")
+    XmlMaterialProfile.setMaterialCache(cache)
+    cache.put = MagicMock()
+    assert readMaterials(container_registry) == parsed
+    cache.put.assert_not_called()  # Everything came from the cache.